@@ -12,11 +12,16 @@ contract AyiiOracle is
     using strings for bytes32;
     using Chainlink for Chainlink.Request;
 
+    // abi.encode(projectId, uaiId, cropId) of a single risk
+    // batch requests encode arrays and are therefore longer
+    uint256 public constant SINGLE_RISK_INPUT_LENGTH = 3 * 32;
+
     mapping(bytes32 /* Chainlink request ID */ => uint256 /* GIF request ID */) public gifRequests;
     bytes32 public jobId;
     uint256 public payment;
 
     event LogAyiiRequest(uint256 requestId, bytes32 chainlinkRequestId);
+    event LogAyiiBatchRequest(uint256 requestId, bytes32 chainlinkRequestId, uint256 risks);
     
     event LogAyiiFulfill(
         uint256 requestId, 
@@ -27,6 +32,12 @@ contract AyiiOracle is
         uint256 aaay
     );
 
+    event LogAyiiFulfillBatch(
+        uint256 requestId, 
+        bytes32 chainlinkRequestId, 
+        uint256 risks
+    );
+
     constructor(
         bytes32 _name,
         address _registry,
@@ -64,6 +75,11 @@ contract AyiiOracle is
         external override
         onlyQuery
     {
+        if (input.length > SINGLE_RISK_INPUT_LENGTH) {
+            _requestBatch(gifRequestId, input);
+            return;
+        }
+
         Chainlink.Request memory request_ = buildChainlinkRequest(
             jobId,
             address(this),
@@ -103,6 +119,23 @@ contract AyiiOracle is
         emit LogAyiiFulfill(gifRequest, chainlinkRequestId, projectId, uaiId, cropId, aaay);
     }
 
+    function fulfillBatch(
+        bytes32 chainlinkRequestId, 
+        bytes32 [] memory projectIds, 
+        bytes32 [] memory uaiIds, 
+        bytes32 [] memory cropIds, 
+        uint256 [] memory aaays
+    )
+        public recordChainlinkFulfillment(chainlinkRequestId) 
+    {
+        uint256 gifRequest = gifRequests[chainlinkRequestId];
+        bytes memory data =  abi.encode(projectIds, uaiIds, cropIds, aaays);        
+        _respond(gifRequest, data);
+
+        delete gifRequests[chainlinkRequestId];
+        emit LogAyiiFulfillBatch(gifRequest, chainlinkRequestId, aaays.length);
+    }
+
     function cancel(uint256 requestId)
         external override
         onlyOwner
@@ -132,6 +165,27 @@ contract AyiiOracle is
         );
     }
 
+    // only used for testing of chainlink operator
+    function encodeFulfillBatchParameters(
+        bytes32 chainlinkRequestId, 
+        bytes32 [] memory projectIds, 
+        bytes32 [] memory uaiIds, 
+        bytes32 [] memory cropIds, 
+        uint256 [] memory aaays
+    ) 
+        external
+        pure
+        returns(bytes memory parameterData)
+    {
+        return abi.encode(
+            chainlinkRequestId, 
+            projectIds, 
+            uaiIds, 
+            cropIds, 
+            aaays
+        );
+    }
+
     function getChainlinkJobId() external view returns(bytes32 chainlinkJobId) {
         return jobId;
     }
@@ -147,5 +201,42 @@ contract AyiiOracle is
     function getChainlinkOperator() external view returns(address operator) {
         return chainlinkOracleAddress();
     }
+
+    function _requestBatch(uint256 gifRequestId, bytes calldata input)
+        internal
+    {
+        Chainlink.Request memory request_ = buildChainlinkRequest(
+            jobId,
+            address(this),
+            this.fulfillBatch.selector
+        );
+
+        (
+            bytes32 [] memory projectIds, 
+            bytes32 [] memory uaiIds, 
+            bytes32 [] memory cropIds
+        ) = abi.decode(input, (bytes32[], bytes32[], bytes32[]));
+
+        request_.addStringArray("projectIds", _toB32Strings(projectIds));
+        request_.addStringArray("uaiIds", _toB32Strings(uaiIds));
+        request_.addStringArray("cropIds", _toB32Strings(cropIds));
+
+        bytes32 chainlinkRequestId = sendChainlinkRequest(request_, payment);
+
+        gifRequests[chainlinkRequestId] = gifRequestId;
+        emit LogAyiiBatchRequest(gifRequestId, chainlinkRequestId, projectIds.length);
+    }
+
+    function _toB32Strings(bytes32 [] memory values)
+        internal
+        pure
+        returns(string [] memory strings_)
+    {
+        strings_ = new string[](values.length);
+
+        for (uint256 i = 0; i < values.length; i++) {
+            strings_[i] = values[i].toB32String();
+        }
+    }
 }
 
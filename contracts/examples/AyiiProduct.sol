@@ -7,9 +7,11 @@ import "@openzeppelin/contracts/access/AccessControl.sol";
 import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 import "@openzeppelin/contracts/utils/structs/EnumerableSet.sol";
 
 import "@etherisc/gif-interface/contracts/components/Product.sol";
+import "../flows/PolicyDefaultFlow.sol";
 import "../modules/PolicyController.sol";
 
 import "../modules/AccessController.sol";
@@ -36,6 +38,16 @@ contract AyiiProduct is
     uint256 public constant RISK_EXIT_MAX = PERCENTAGE_MULTIPLIER / 5;
     uint256 public constant RISK_TSI_AT_EXIT_MIN = PERCENTAGE_MULTIPLIER / 2;
 
+    uint8 private constant RISK_FLAG_REQUEST_TRIGGERED = 1;
+
+    enum RiskState {
+        Undefined,
+        Created, // risk defined, no oracle request pending
+        Requested, // oracle request pending
+        Responded, // oracle data received, policies not yet all processed
+        Settled // oracle data received and all policies processed
+    }
+
     // group policy data structure
     struct Risk {
         bytes32 id; // hash over projectId, uaiId, cropId
@@ -55,13 +67,40 @@ contract AyiiProduct is
         uint256 updatedAt;
     }
 
+    // storage layout of a risk, the risk id is the mapping key
+    // all percentages and yields are bounded by _validateRiskParameters
+    // and AAAY_MAX which leaves plenty of room in 64 bits
+    struct PackedRisk {
+        bytes32 projectId;
+        bytes32 uaiId;
+        bytes32 cropId;
+        uint64 trigger;
+        uint64 exit;
+        uint64 tsi;
+        uint64 aph;
+        uint64 aaay;
+        uint64 payoutPercentage;
+        uint40 createdAt;
+        uint40 updatedAt;
+        uint8 flags;
+        RiskState state;
+        uint64 requestId;
+        uint40 responseAt;
+    }
+
     uint256 private _oracleId;
     IERC20 private _token;
 
     bytes32 [] private _riskIds;
-    mapping(bytes32 /* riskId */ => Risk) private _risks;
+    mapping(bytes32 /* riskId */ => PackedRisk) private _risks;
     mapping(bytes32 /* riskId */ => EnumerableSet.Bytes32Set /* processIds */) private _policies;
     bytes32 [] private _applications; // useful for debugging, might need to get rid of this
+    mapping(uint256 /* requestId */ => bytes32 [] /* riskIds */) private _batchRequests;
+
+    // secondary risk indices
+    mapping(bytes32 /* projectId */ => bytes32 [] /* riskIds */) private _riskIdsForProject;
+    mapping(bytes32 /* cropId */ => bytes32 [] /* riskIds */) private _riskIdsForCrop;
+    mapping(RiskState => EnumerableSet.Bytes32Set /* riskIds */) private _riskIdsForState;
 
     event LogAyiiPolicyApplicationCreated(bytes32 policyId, address policyHolder, uint256 premiumAmount, uint256 sumInsuredAmount);
     event LogAyiiPolicyCreated(bytes32 policyId, address policyHolder, uint256 premiumAmount, uint256 sumInsuredAmount);
@@ -71,6 +110,9 @@ contract AyiiProduct is
     event LogAyiiRiskDataRequested(uint256 requestId, bytes32 riskId, bytes32 projectId, bytes32 uaiId, bytes32 cropId);
     event LogAyiiRiskDataReceived(uint256 requestId, bytes32 riskId, uint256 aaay);
     event LogAyiiRiskDataRequestCancelled(bytes32 processId, uint256 requestId);
+    event LogAyiiRiskBatchRequested(uint256 requestId, uint256 risks);
+    event LogAyiiRiskBatchReceived(uint256 requestId, uint256 risks);
+    event LogAyiiRiskStateChanged(bytes32 riskId, RiskState oldState, RiskState newState);
     event LogAyiiRiskProcessed(bytes32 riskId, uint256 policies);
     event LogAyiiPolicyProcessed(bytes32 policyId);
     event LogAyiiClaimCreated(bytes32 policyId, uint256 claimId, uint256 payoutAmount);
@@ -115,25 +157,28 @@ contract AyiiProduct is
         riskId = getRiskId(projectId, uaiId, cropId);
         _riskIds.push(riskId);
 
-        Risk storage risk = _risks[riskId];
+        PackedRisk storage risk = _risks[riskId];
         require(risk.createdAt == 0, "ERROR:AYI-001:RISK_ALREADY_EXISTS");
 
-        risk.id = riskId;
         risk.projectId = projectId;
         risk.uaiId = uaiId;
         risk.cropId = cropId;
-        risk.trigger = trigger;
-        risk.exit = exit;
-        risk.tsi = tsi;
-        risk.aph = aph;
-        risk.createdAt = block.timestamp; // solhint-disable-line
-        risk.updatedAt = block.timestamp; // solhint-disable-line
+        risk.trigger = uint64(trigger);
+        risk.exit = uint64(exit);
+        risk.tsi = uint64(tsi);
+        risk.aph = uint64(aph);
+        risk.createdAt = uint40(block.timestamp); // solhint-disable-line
+        risk.updatedAt = uint40(block.timestamp); // solhint-disable-line
+
+        _riskIdsForProject[projectId].push(riskId);
+        _riskIdsForCrop[cropId].push(riskId);
+        _setRiskState(riskId, RiskState.Created);
 
         emit LogAyiiRiskDataCreated(
-            risk.id, 
-            risk.projectId,
-            risk.uaiId, 
-            risk.cropId);
+            riskId, 
+            projectId,
+            uaiId, 
+            cropId);
     }
 
     function adjustRisk(
@@ -148,28 +193,28 @@ contract AyiiProduct is
     {
         _validateRiskParameters(trigger, exit, tsi, aph);
 
-        Risk storage risk = _risks[riskId];
+        PackedRisk storage risk = _risks[riskId];
         require(risk.createdAt > 0, "ERROR:AYI-002:RISK_UNKNOWN");
         require(EnumerableSet.length(_policies[riskId]) == 0, "ERROR:AYI-003:RISK_WITH_POLICIES_NOT_ADJUSTABLE");
 
         emit LogAyiiRiskDataBeforeAdjustment(
-            risk.id, 
+            riskId, 
             risk.trigger,
             risk.exit, 
             risk.tsi,
             risk.aph);
         
-        risk.trigger = trigger;
-        risk.exit = exit;
-        risk.tsi = tsi;
-        risk.aph = aph;
+        risk.trigger = uint64(trigger);
+        risk.exit = uint64(exit);
+        risk.tsi = uint64(tsi);
+        risk.aph = uint64(aph);
 
         emit LogAyiiRiskDataAfterAdjustment(
-            risk.id, 
-            risk.trigger,
-            risk.exit, 
-            risk.tsi,
-            risk.aph);
+            riskId, 
+            trigger,
+            exit, 
+            tsi,
+            aph);
     }
 
     function getRiskId(
@@ -195,7 +240,38 @@ contract AyiiProduct is
         onlyRole(INSURER_ROLE)
         returns(bytes32 processId)
     {
-        Risk storage risk = _risks[riskId];
+        processId = _applyForPolicy(policyHolder, premium, sumInsured, riskId);
+    }
+
+    // the premium allowance is created with a permit signed by the policy holder
+    function applyForPolicyWithPermit(
+        address policyHolder, 
+        uint256 premium, 
+        uint256 sumInsured,
+        bytes32 riskId,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    ) 
+        external 
+        onlyRole(INSURER_ROLE)
+        returns(bytes32 processId)
+    {
+        PolicyDefaultFlow(_getContractAddress("ProductService")).permitPremium(policyHolder, premium, deadline, v, r, s);
+        processId = _applyForPolicy(policyHolder, premium, sumInsured, riskId);
+    }
+
+    function _applyForPolicy(
+        address policyHolder, 
+        uint256 premium, 
+        uint256 sumInsured,
+        bytes32 riskId
+    ) 
+        internal
+        returns(bytes32 processId)
+    {
+        PackedRisk storage risk = _risks[riskId];
         require(risk.createdAt > 0, "ERROR:AYI-004:RISK_UNDEFINED");
         require(policyHolder != address(0), "ERROR:AYI-005:POLICY_HOLDER_ZERO");
 
@@ -221,6 +297,11 @@ contract AyiiProduct is
 
         if (success) {
             EnumerableSet.add(_policies[riskId], processId);
+
+            // a settled risk has policies to process again
+            if (risk.state == RiskState.Settled) {
+                _setRiskState(riskId, RiskState.Responded);
+            }
    
             emit LogAyiiPolicyCreated(
                 processId, 
@@ -300,9 +381,11 @@ contract AyiiProduct is
         onlyRole(INSURER_ROLE)
         returns(uint256 requestId)
     {
-        Risk storage risk = _risks[_getRiskId(processId)];
+        bytes32 riskId = _getRiskId(processId);
+        PackedRisk storage risk = _risks[riskId];
         require(risk.createdAt > 0, "ERROR:AYI-010:RISK_UNDEFINED");
         require(risk.responseAt == 0, "ERROR:AYI-011:ORACLE_ALREADY_RESPONDED");
+        require(!_isPendingInBatch(risk), "ERROR:AYI-015:RISK_IN_PENDING_BATCH_REQUEST");
 
         bytes memory queryData = abi.encode(
             risk.projectId,
@@ -317,34 +400,112 @@ contract AyiiProduct is
                 _oracleId
             );
 
-        risk.requestId = requestId;
-        risk.requestTriggered = true;
-        risk.updatedAt = block.timestamp; // solhint-disable-line
+        risk.requestId = SafeCast.toUint64(requestId);
+        risk.flags |= RISK_FLAG_REQUEST_TRIGGERED;
+        risk.updatedAt = uint40(block.timestamp); // solhint-disable-line
+        _setRiskState(riskId, RiskState.Requested);
 
         emit LogAyiiRiskDataRequested(
-            risk.requestId, 
-            risk.id, 
+            requestId, 
+            riskId, 
             risk.projectId, 
             risk.uaiId, 
             risk.cropId);
     }    
 
+    /* a single oracle request may cover many risks with a common trigger event
+     * (eg all crops of a region). the query data holds the risk keys as arrays
+     * and the oracle responds with an array of aaay values (one per risk) in
+     * the same order. the first process id anchors the request to this product
+     */
+    function triggerOracleBatch(bytes32 [] calldata processIds) 
+        external
+        onlyRole(INSURER_ROLE)
+        returns(uint256 requestId)
+    {
+        require(processIds.length > 0, "ERROR:AYI-016:BATCH_EMPTY");
+
+        bytes32 [] memory riskIds = new bytes32[](processIds.length);
+        bytes32 [] memory projectIds = new bytes32[](processIds.length);
+        bytes32 [] memory uaiIds = new bytes32[](processIds.length);
+        bytes32 [] memory cropIds = new bytes32[](processIds.length);
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            riskIds[i] = _getRiskId(processIds[i]);
+            PackedRisk storage risk = _risks[riskIds[i]];
+            require(risk.createdAt > 0, "ERROR:AYI-017:RISK_UNDEFINED");
+            require(risk.responseAt == 0, "ERROR:AYI-018:ORACLE_ALREADY_RESPONDED");
+            // also rejects the same risk appearing twice in this batch
+            require(!_isRequestTriggered(risk), "ERROR:AYI-019:ORACLE_REQUEST_PENDING");
+
+            risk.flags |= RISK_FLAG_REQUEST_TRIGGERED;
+
+            projectIds[i] = risk.projectId;
+            uaiIds[i] = risk.uaiId;
+            cropIds[i] = risk.cropId;
+        }
+
+        requestId = _request(
+                processIds[0], 
+                abi.encode(projectIds, uaiIds, cropIds),
+                "oracleCallbackBatch",
+                _oracleId
+            );
+
+        _batchRequests[requestId] = riskIds;
+
+        uint64 requestId64 = SafeCast.toUint64(requestId);
+
+        for (uint256 i = 0; i < riskIds.length; i++) {
+            PackedRisk storage risk = _risks[riskIds[i]];
+            risk.requestId = requestId64;
+            risk.updatedAt = uint40(block.timestamp); // solhint-disable-line
+            _setRiskState(riskIds[i], RiskState.Requested);
+
+            emit LogAyiiRiskDataRequested(
+                requestId, 
+                riskIds[i], 
+                projectIds[i], 
+                uaiIds[i], 
+                cropIds[i]);
+        }
+
+        emit LogAyiiRiskBatchRequested(requestId, riskIds.length);
+    }
+
     function cancelOracleRequest(bytes32 processId) 
         external
         onlyRole(INSURER_ROLE)
     {
-        Risk storage risk = _risks[_getRiskId(processId)];
+        bytes32 riskId = _getRiskId(processId);
+        PackedRisk storage risk = _risks[riskId];
         require(risk.createdAt > 0, "ERROR:AYI-012:RISK_UNDEFINED");
-        require(risk.requestTriggered, "ERROR:AYI-013:ORACLE_REQUEST_NOT_FOUND");
+        require(_isRequestTriggered(risk), "ERROR:AYI-013:ORACLE_REQUEST_NOT_FOUND");
         require(risk.responseAt == 0, "ERROR:AYI-014:EXISTING_CALLBACK");
 
-        _cancelRequest(risk.requestId);
+        uint256 requestId = risk.requestId;
+        _cancelRequest(requestId);
+
+        // cancelling a batch request resets all risks covered by the batch
+        bytes32 [] storage batchRiskIds = _batchRequests[requestId];
+
+        if (batchRiskIds.length > 0) {
+            for (uint256 i = 0; i < batchRiskIds.length; i++) {
+                PackedRisk storage batchRisk = _risks[batchRiskIds[i]];
+                batchRisk.flags &= ~RISK_FLAG_REQUEST_TRIGGERED;
+                batchRisk.updatedAt = uint40(block.timestamp); // solhint-disable-line
+                _setRiskState(batchRiskIds[i], RiskState.Created);
+            }
 
-        // reset request id to allow to trigger again
-        risk.requestTriggered = false;
-        risk.updatedAt = block.timestamp; // solhint-disable-line
+            delete _batchRequests[requestId];
+        } else {
+            // reset request id to allow to trigger again
+            risk.flags &= ~RISK_FLAG_REQUEST_TRIGGERED;
+            risk.updatedAt = uint40(block.timestamp); // solhint-disable-line
+            _setRiskState(riskId, RiskState.Created);
+        }
 
-        emit LogAyiiRiskDataRequestCancelled(processId, risk.requestId);
+        emit LogAyiiRiskDataRequestCancelled(processId, requestId);
     }    
 
     function oracleCallback(
@@ -365,32 +526,44 @@ contract AyiiProduct is
         bytes32 riskId = _getRiskId(processId);
         require(riskId == getRiskId(projectId, uaiId, cropId), "ERROR:AYI-020:RISK_ID_MISMATCH");
 
-        Risk storage risk = _risks[riskId];
-        require(risk.createdAt > 0, "ERROR:AYI-021:RISK_UNDEFINED");
-        require(risk.requestId == requestId, "ERROR:AYI-022:REQUEST_ID_MISMATCH");
-        require(risk.responseAt == 0, "ERROR:AYI-023:EXISTING_CALLBACK");
-
-        require(aaay >= (AAAY_MIN * PERCENTAGE_MULTIPLIER) 
-                && aaay < (AAAY_MAX * PERCENTAGE_MULTIPLIER), 
-                "ERROR:AYI-024:AAAY_INVALID");
+        _updateRiskWithOracleResponse(riskId, requestId, aaay);
+    }
 
-        // update risk using aaay info
-        risk.aaay = aaay;
-        risk.payoutPercentage = calculatePayoutPercentage(
-            risk.tsi,
-            risk.trigger,
-            risk.exit,
-            risk.aph,
-            risk.aaay
-        );
+    function oracleCallbackBatch(
+        uint256 requestId, 
+        bytes32 processId, 
+        bytes calldata responseData
+    ) 
+        external 
+        onlyOracle
+    {
+        (
+            bytes32 [] memory projectIds, 
+            bytes32 [] memory uaiIds, 
+            bytes32 [] memory cropIds, 
+            uint256 [] memory aaays
+        ) = abi.decode(responseData, (bytes32[], bytes32[], bytes32[], uint256[]));
+
+        bytes32 [] memory riskIds = _batchRequests[requestId];
+        require(riskIds.length > 0, "ERROR:AYI-025:BATCH_REQUEST_UNKNOWN");
+        require(
+            projectIds.length == riskIds.length
+            && uaiIds.length == riskIds.length
+            && cropIds.length == riskIds.length
+            && aaays.length == riskIds.length, 
+            "ERROR:AYI-026:BATCH_SIZE_MISMATCH");
+
+        for (uint256 i = 0; i < riskIds.length; i++) {
+            require(
+                riskIds[i] == getRiskId(projectIds[i], uaiIds[i], cropIds[i]), 
+                "ERROR:AYI-027:RISK_ID_MISMATCH");
+
+            _updateRiskWithOracleResponse(riskIds[i], requestId, aaays[i]);
+        }
 
-        risk.responseAt = block.timestamp; // solhint-disable-line
-        risk.updatedAt = block.timestamp; // solhint-disable-line
+        delete _batchRequests[requestId];
 
-        emit LogAyiiRiskDataReceived(
-            requestId, 
-            riskId,
-            aaay);
+        emit LogAyiiRiskBatchReceived(requestId, riskIds.length);
     }
 
     function processPoliciesForRisk(bytes32 riskId, uint256 batchSize)
@@ -398,11 +571,11 @@ contract AyiiProduct is
         onlyRole(INSURER_ROLE)
         returns(bytes32 [] memory processedPolicies)
     {
-        Risk memory risk = _risks[riskId];
-        require(risk.responseAt > 0, "ERROR:AYI-030:ORACLE_RESPONSE_MISSING");
+        require(_risks[riskId].responseAt > 0, "ERROR:AYI-030:ORACLE_RESPONSE_MISSING");
 
         uint256 elements = EnumerableSet.length(_policies[riskId]);
         if (elements == 0) {
+            _setRiskState(riskId, RiskState.Settled);
             emit LogAyiiRiskProcessed(riskId, 0);
             return new bytes32[](0);
         }
@@ -429,14 +602,17 @@ contract AyiiProduct is
     {
         IPolicy.Application memory application = _getApplication(policyId);
         bytes32 riskId = abi.decode(application.data, (bytes32));
-        Risk memory risk = _risks[riskId];
+        PackedRisk storage risk = _risks[riskId];
 
-        require(risk.id == riskId, "ERROR:AYI-031:RISK_ID_INVALID");
+        require(risk.createdAt > 0, "ERROR:AYI-031:RISK_ID_INVALID");
         require(risk.responseAt > 0, "ERROR:AYI-032:ORACLE_RESPONSE_MISSING");
         require(EnumerableSet.contains(_policies[riskId], policyId), "ERROR:AYI-033:POLICY_FOR_RISK_UNKNOWN");
 
         EnumerableSet.remove(_policies[riskId], policyId);
 
+        if (EnumerableSet.length(_policies[riskId]) == 0) {
+            _setRiskState(riskId, RiskState.Settled);
+        }
 
         uint256 claimAmount = calculatePayout(
             risk.payoutPercentage, 
@@ -510,7 +686,49 @@ contract AyiiProduct is
 
     function risks() external view returns(uint256) { return _riskIds.length; }
     function getRiskId(uint256 idx) external view returns(bytes32 riskId) { return _riskIds[idx]; }
-    function getRisk(bytes32 riskId) external view returns(Risk memory risk) { return _risks[riskId]; }
+    function getRisk(bytes32 riskId) external view returns(Risk memory risk) { return _getRisk(riskId); }
+
+    function getRiskState(bytes32 riskId) external view returns(RiskState state) { return _risks[riskId].state; }
+
+    function risksForProject(bytes32 projectId) external view returns(uint256) { return _riskIdsForProject[projectId].length; }
+    function risksForCrop(bytes32 cropId) external view returns(uint256) { return _riskIdsForCrop[cropId].length; }
+    function risksInState(RiskState state) external view returns(uint256) { return EnumerableSet.length(_riskIdsForState[state]); }
+
+    // paginated risk views. pages past the end of an index are empty
+    // the state index reorders on state changes, page through it in a single block
+    function getRisksForProject(bytes32 projectId, uint256 offset, uint256 limit) 
+        external 
+        view 
+        returns(Risk [] memory risksPage) 
+    {
+        return _getRisks(_riskIdsForProject[projectId], offset, limit);
+    }
+
+    function getRisksForCrop(bytes32 cropId, uint256 offset, uint256 limit) 
+        external 
+        view 
+        returns(Risk [] memory risksPage) 
+    {
+        return _getRisks(_riskIdsForCrop[cropId], offset, limit);
+    }
+
+    function getRisksInState(RiskState state, uint256 offset, uint256 limit) 
+        external 
+        view 
+        returns(Risk [] memory risksPage) 
+    {
+        EnumerableSet.Bytes32Set storage riskIds = _riskIdsForState[state];
+        uint256 elements = _pageSize(EnumerableSet.length(riskIds), offset, limit);
+        risksPage = new Risk[](elements);
+
+        for (uint256 i = 0; i < elements; i++) {
+            risksPage[i] = _getRisk(EnumerableSet.at(riskIds, offset + i));
+        }
+    }
+
+    function getBatchRequestRiskIds(uint256 requestId) external view returns(bytes32 [] memory riskIds) {
+        return _batchRequests[requestId];
+    }
 
     function applications() external view returns(uint256 applicationCount) {
         return _applications.length;
@@ -551,6 +769,43 @@ contract AyiiProduct is
         require(aph <= RISK_APH_MAX, "ERROR:AYI-047:RISK_APH_TOO_LARGE");
     }
 
+    function _updateRiskWithOracleResponse(
+        bytes32 riskId,
+        uint256 requestId,
+        uint256 aaay
+    )
+        internal
+    {
+        PackedRisk storage risk = _risks[riskId];
+        require(risk.createdAt > 0, "ERROR:AYI-021:RISK_UNDEFINED");
+        require(risk.requestId == requestId, "ERROR:AYI-022:REQUEST_ID_MISMATCH");
+        require(risk.responseAt == 0, "ERROR:AYI-023:EXISTING_CALLBACK");
+
+        require(aaay >= (AAAY_MIN * PERCENTAGE_MULTIPLIER) 
+                && aaay < (AAAY_MAX * PERCENTAGE_MULTIPLIER), 
+                "ERROR:AYI-024:AAAY_INVALID");
+
+        // update risk using aaay info
+        // payout percentage is bounded by tsi
+        risk.aaay = uint64(aaay);
+        risk.payoutPercentage = uint64(calculatePayoutPercentage(
+            risk.tsi,
+            risk.trigger,
+            risk.exit,
+            risk.aph,
+            aaay
+        ));
+
+        risk.responseAt = uint40(block.timestamp); // solhint-disable-line
+        risk.updatedAt = uint40(block.timestamp); // solhint-disable-line
+        _setRiskState(riskId, RiskState.Responded);
+
+        emit LogAyiiRiskDataReceived(
+            requestId, 
+            riskId,
+            aaay);
+    }
+
     function _processPolicy(bytes32 policyId, Risk memory risk)
         internal
     {
@@ -581,6 +836,80 @@ contract AyiiProduct is
         emit LogAyiiPolicyProcessed(policyId);
     }
 
+    function _setRiskState(bytes32 riskId, RiskState newState) internal {
+        PackedRisk storage risk = _risks[riskId];
+        RiskState oldState = risk.state;
+        if (oldState == newState) {
+            return;
+        }
+
+        if (oldState != RiskState.Undefined) {
+            EnumerableSet.remove(_riskIdsForState[oldState], riskId);
+        }
+
+        EnumerableSet.add(_riskIdsForState[newState], riskId);
+        risk.state = newState;
+
+        emit LogAyiiRiskStateChanged(riskId, oldState, newState);
+    }
+
+    function _getRisks(bytes32 [] storage riskIds, uint256 offset, uint256 limit)
+        internal
+        view
+        returns(Risk [] memory risksPage)
+    {
+        uint256 elements = _pageSize(riskIds.length, offset, limit);
+        risksPage = new Risk[](elements);
+
+        for (uint256 i = 0; i < elements; i++) {
+            risksPage[i] = _getRisk(riskIds[offset + i]);
+        }
+    }
+
+    function _pageSize(uint256 elements, uint256 offset, uint256 limit) 
+        internal 
+        pure 
+        returns(uint256 size)
+    {
+        if (offset >= elements) {
+            return 0;
+        }
+
+        return min(limit, elements - offset);
+    }
+
+    function _getRisk(bytes32 riskId) internal view returns(Risk memory risk) {
+        PackedRisk storage packed = _risks[riskId];
+
+        if (packed.createdAt == 0) {
+            return risk;
+        }
+
+        risk.id = riskId;
+        risk.projectId = packed.projectId;
+        risk.uaiId = packed.uaiId;
+        risk.cropId = packed.cropId;
+        risk.trigger = packed.trigger;
+        risk.exit = packed.exit;
+        risk.tsi = packed.tsi;
+        risk.aph = packed.aph;
+        risk.requestId = packed.requestId;
+        risk.requestTriggered = _isRequestTriggered(packed);
+        risk.responseAt = packed.responseAt;
+        risk.aaay = packed.aaay;
+        risk.payoutPercentage = packed.payoutPercentage;
+        risk.createdAt = packed.createdAt;
+        risk.updatedAt = packed.updatedAt;
+    }
+
+    function _isRequestTriggered(PackedRisk storage risk) private view returns(bool) {
+        return risk.flags & RISK_FLAG_REQUEST_TRIGGERED != 0;
+    }
+
+    function _isPendingInBatch(PackedRisk storage risk) private view returns(bool) {
+        return _isRequestTriggered(risk) && _batchRequests[risk.requestId].length > 0;
+    }
+
     function _getRiskId(bytes32 processId) private view returns(bytes32 riskId) {
         IPolicy.Application memory application = _getApplication(processId);
         (riskId) = abi.decode(application.data, (bytes32));
@@ -7,6 +7,8 @@ import "@etherisc/gif-interface/contracts/components/BasicRiskpool.sol";
 import "@etherisc/gif-interface/contracts/modules/IBundle.sol";
 import "@etherisc/gif-interface/contracts/modules/IPolicy.sol";
 
+import "../services/RiskpoolService.sol";
+
 contract AyiiRiskpool is 
     BasicRiskpool,
     AccessControl
@@ -47,6 +49,23 @@ contract AyiiRiskpool is
         bundleId = super.createBundle(filter, initialAmount);
     }
 
+    // the capital allowance is created with a permit signed by the bundle owner
+    function createBundleWithPermit(
+        bytes memory filter, 
+        uint256 initialAmount,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    )
+        external
+        returns(uint256 bundleId)
+    {
+        RiskpoolService riskpoolService = RiskpoolService(address(_riskpoolService));
+        riskpoolService.permitCapital(_msgSender(), initialAmount, deadline, v, r, s);
+        bundleId = createBundle(filter, initialAmount);
+    }
+
 
     // trivial implementation that matches every application
     function bundleMatchesApplication(
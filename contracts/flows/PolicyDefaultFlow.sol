@@ -49,8 +49,7 @@ contract PolicyDefaultFlow is
     modifier onlyResponsibleProduct(bytes32 processId) {
         PolicyController policy = getPolicyContract();
         IPolicy.Metadata memory metadata = policy.getMetadata(processId);
-        ComponentController component = ComponentController(getContractFromRegistry("Component"));
-        require(metadata.productId == component.getComponentId(address(msg.sender)), "ERROR:PFD-004:PROCESSID_PRODUCT_MISMATCH");
+        _checkResponsibleProduct(metadata.productId);
         _;
     }
 
@@ -102,15 +101,20 @@ contract PolicyDefaultFlow is
         policy.revokeApplication(processId);
     }
 
-    /* success implies the successful creation of a policy */
+    /* success implies the successful creation of a policy.
+     * the process context is fetched once and handed to the pool and treasury modules
+     */
     function underwrite(bytes32 processId) 
         external 
-        onlyResponsibleProduct(processId)
         returns(bool success) 
     {
+        PolicyController policyController = getPolicyContract();
+        IProcessContext.ProcessContext memory context = policyController.getProcessContext(processId);
+        _checkResponsibleProduct(context.metadata.productId);
+
         // attempt to get the collateral to secure the policy
         PoolController pool = getPoolContract();
-        success = pool.underwrite(processId);
+        success = pool.underwrite(processId, context);
 
         // TODO remove premium collection part below
         // this should be implemented on the prduct level
@@ -118,42 +122,147 @@ contract PolicyDefaultFlow is
         // also, bad naming: the function name is 'underwrite? and not
         // 'underwriteAndIfSuccessfulCollectPremiumToo'
         if (success) {
-            PolicyController policyController = getPolicyContract();
             policyController.underwriteApplication(processId);
             policyController.createPolicy(processId);
 
             // transfer premium amount
-            IPolicy.Policy memory policy = policyController.getPolicy(processId);
-            collectPremium(processId, policy.premiumExpectedAmount);
+            context = _underwrittenContext(policyController, processId, context);
+            _collectPremium(
+                getTreasuryContract(),
+                policyController,
+                pool,
+                processId,
+                context.policy.premiumExpectedAmount,
+                context);
+        }
+    }
+
+    /* batch version of underwrite. modules and the calling product are resolved
+     * once for the whole batch. applications that cannot be underwritten
+     * (eg invalid state, insufficient capacity) do not revert the batch, the
+     * outcome for each process id is reported in the success array.
+     * processIds that do not belong to the calling product revert the batch.
+     * the pool module collateralizes all applications in a single call and the 
+     * premiums of the new policies are collected with a single treasury call.
+     */
+    function underwriteBatch(bytes32 [] calldata processIds)
+        external
+        returns(bool [] memory success)
+    {
+        uint256 productId = getComponentContract().getComponentId(msg.sender);
+        PoolController pool = getPoolContract();
+        PolicyController policyController = getPolicyContract();
+
+        IProcessContext.ProcessContext [] memory contexts = new IProcessContext.ProcessContext[](processIds.length);
+        for (uint256 i = 0; i < processIds.length; i++) {
+            contexts[i] = policyController.getProcessContext(processIds[i]);
+            require(
+                contexts[i].metadata.productId == productId,
+                "ERROR:PFD-006:PROCESSID_PRODUCT_MISMATCH");
+        }
+
+        // attempt to get the collateral to secure the policies
+        success = pool.underwriteBatch(contexts);
+
+        uint256 policies;
+        for (uint256 i = 0; i < processIds.length; i++) {
+            if (success[i]) {
+                policies++;
+            }
         }
+
+        if (policies == 0) {
+            return success;
+        }
+
+        // create policies and collect the expected premium amounts
+        bytes32 [] memory policyIds = new bytes32[](policies);
+        uint256 [] memory premiumAmounts = new uint256[](policies);
+        uint256 idx;
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            if (success[i]) {
+                policyController.underwriteApplication(processIds[i]);
+                policyController.createPolicy(processIds[i]);
+
+                policyIds[idx] = processIds[i];
+                premiumAmounts[idx] = contexts[i].application.premiumAmount;
+                idx++;
+            }
+        }
+
+        _collectPremiumBatch(getTreasuryContract(), policyController, pool, policyIds, premiumAmounts);
     }
 
     /* success implies the successful collection of the amount for the policy.
      * valid amounts need to be > 0 up to the full premium amount
      * if no fee structure is defined for the policy, this call will revert. 
+     * the policy checks are done on the process context handed to the pool and treasury modules
      */
     function collectPremium(bytes32 processId, uint256 amount) 
         public 
-        notClosedPolicy(processId)
-        onlyResponsibleProduct(processId)
         returns(
             bool success, 
             uint256 feeAmount, 
             uint256 netPremiumAmount
         ) 
     {
-        TreasuryModule treasury = getTreasuryContract();
         PolicyController policy = getPolicyContract();
+        IProcessContext.ProcessContext memory context = policy.getProcessContext(processId);
 
-        (success, feeAmount, netPremiumAmount) = treasury.processPremium(processId, amount);
+        // same checks as notClosedPolicy and onlyResponsibleProduct
+        require(context.policy.createdAt > 0, "ERROR:POC-102:POLICY_DOES_NOT_EXIST");
+        require(context.policy.state != IPolicy.PolicyState.Closed, "ERROR:PFD-003:POLICY_CLOSED");
+        _checkResponsibleProduct(context.metadata.productId);
 
-        // if premium collected: update book keeping of policy and riskpool
-        if (success) {
-            policy.collectPremium(processId, netPremiumAmount + feeAmount);
+        (success, feeAmount, netPremiumAmount) = _collectPremium(
+            getTreasuryContract(),
+            policy,
+            getPoolContract(),
+            processId,
+            amount,
+            context);
+    }
 
-            PoolController pool = getPoolContract();
-            pool.processPremium(processId, netPremiumAmount);
-        }
+    /* creates the treasury allowance for the premium of owner with an EIP-2612 permit.
+     * allows products to collect premiums without a prior approve transaction.
+     */
+    function permitPremium(
+        address owner,
+        uint256 amount,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    )
+        external
+    {
+        uint256 productId = getComponentContract().getComponentId(msg.sender);
+        getTreasuryContract().processPermit(productId, owner, amount, deadline, v, r, s);
+    }
+
+    /* batch version of collectPremium for policies of the calling product.
+     * the treasury aggregates the token transfers per payer, success is reported per policy.
+     * closed policies revert the batch before any premium is transferred.
+     */
+    function collectPremiumBatch(bytes32 [] calldata processIds, uint256 [] calldata amounts)
+        external
+        returns(
+            bool [] memory success, 
+            uint256 [] memory feeAmounts, 
+            uint256 [] memory netPremiumAmounts
+        ) 
+    {
+        PolicyController policy = getPolicyContract();
+        _checkBatchProduct(policy, processIds);
+        _checkBatchNotClosed(policy, processIds);
+
+        (success, feeAmounts, netPremiumAmounts) = _collectPremiumBatch(
+            getTreasuryContract(),
+            policy,
+            getPoolContract(),
+            processIds,
+            amounts);
     }
     
     function adjustPremiumSumInsured(
@@ -199,6 +308,34 @@ contract PolicyDefaultFlow is
         pool.release(processId);
     }
 
+    /* batch version of expire. policy state checks are left to the policy module */
+    function expireBatch(bytes32 [] calldata processIds)
+        external
+    {
+        PolicyController policy = getPolicyContract();
+        _checkBatchProduct(policy, processIds);
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            policy.expirePolicy(processIds[i]);
+        }
+    }
+
+    /* batch version of close. collateral of all policies is released
+     * with a single call to the pool module.
+     */
+    function closeBatch(bytes32 [] calldata processIds)
+        external
+    {
+        PolicyController policy = getPolicyContract();
+        _checkBatchProduct(policy, processIds);
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            policy.closePolicy(processIds[i]);
+        }
+
+        getPoolContract().releaseBatch(processIds);
+    }
+
     function newClaim(
         bytes32 processId, 
         uint256 claimAmount,
@@ -280,6 +417,29 @@ contract PolicyDefaultFlow is
         pool.processPayout(processId, netPayoutAmount + feeAmount);
     }
 
+    /* batch version of processPayout. the treasury merges the payouts 
+     * per policy holder into a single token transfer.
+     */
+    function processPayoutBatch(bytes32 [] calldata processIds, uint256 [] calldata payoutIds)
+        external
+        returns(
+            uint256 [] memory feeAmounts,
+            uint256 [] memory netPayoutAmounts
+        )
+    {
+        PolicyController policy = getPolicyContract();
+        _checkBatchProduct(policy, processIds);
+
+        (feeAmounts, netPayoutAmounts) = getTreasuryContract().processPayoutBatch(processIds, payoutIds);
+
+        // update book keeping of policies and riskpool
+        PoolController pool = getPoolContract();
+        for (uint256 i = 0; i < processIds.length; i++) {
+            policy.processPayout(processIds[i], payoutIds[i]);
+            pool.processPayout(processIds[i], netPayoutAmounts[i] + feeAmounts[i]);
+        }
+    }
+
     function request(
         bytes32 processId,
         bytes calldata _input,
@@ -336,6 +496,95 @@ contract PolicyDefaultFlow is
         return policy.getPayout(processId, payoutId).data;
     }
 
+    function _checkResponsibleProduct(uint256 productId) internal view {
+        ComponentController component = ComponentController(getContractFromRegistry("Component"));
+        require(productId == component.getComponentId(address(msg.sender)), "ERROR:PFD-004:PROCESSID_PRODUCT_MISMATCH");
+    }
+
+    function _checkBatchProduct(PolicyController policy, bytes32 [] calldata processIds) internal view {
+        uint256 productId = getComponentContract().getComponentId(msg.sender);
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            require(
+                policy.getMetadata(processIds[i]).productId == productId,
+                "ERROR:PFD-007:PROCESSID_PRODUCT_MISMATCH"
+            );
+        }
+    }
+
+    function _checkBatchNotClosed(PolicyController policy, bytes32 [] calldata processIds) internal view {
+        for (uint256 i = 0; i < processIds.length; i++) {
+            require(
+                policy.getPolicy(processIds[i]).state != IPolicy.PolicyState.Closed,
+                "ERROR:PFD-003:POLICY_CLOSED"
+            );
+        }
+    }
+
+    function _collectPremium(
+        TreasuryModule treasury,
+        PolicyController policy,
+        PoolController pool,
+        bytes32 processId,
+        uint256 amount,
+        IProcessContext.ProcessContext memory context
+    )
+        internal
+        returns(
+            bool success,
+            uint256 feeAmount,
+            uint256 netPremiumAmount
+        )
+    {
+        (success, feeAmount, netPremiumAmount) = treasury.processPremium(processId, amount, context);
+
+        // if premium collected: update book keeping of policy and riskpool
+        if (success) {
+            policy.collectPremium(processId, netPremiumAmount + feeAmount);
+            pool.processPremium(processId, netPremiumAmount, context);
+        }
+    }
+
+    function _collectPremiumBatch(
+        TreasuryModule treasury,
+        PolicyController policy,
+        PoolController pool,
+        bytes32 [] memory processIds,
+        uint256 [] memory amounts
+    )
+        internal
+        returns(
+            bool [] memory success, 
+            uint256 [] memory feeAmounts, 
+            uint256 [] memory netPremiumAmounts
+        )
+    {
+        (success, feeAmounts, netPremiumAmounts) = treasury.processPremiumBatch(processIds, amounts);
+
+        // update book keeping of policies and riskpool for collected premiums
+        for (uint256 i = 0; i < processIds.length; i++) {
+            if (success[i]) {
+                policy.collectPremium(processIds[i], amounts[i]);
+                pool.processPremium(processIds[i], netPremiumAmounts[i]);
+            }
+        }
+    }
+
+    // brings a context fetched before underwriting in line with the underwritten application
+    function _underwrittenContext(
+        PolicyController policy,
+        bytes32 processId,
+        IProcessContext.ProcessContext memory context
+    )
+        internal
+        view
+        returns(IProcessContext.ProcessContext memory)
+    {
+        context.application.state = IPolicy.ApplicationState.Underwritten;
+        context.policy = policy.getPolicy(processId);
+        return context;
+    }
+
     function getComponentContract() internal view returns (ComponentController) {
         return ComponentController(getContractFromRegistry("Component"));
     }
@@ -2,6 +2,7 @@
 pragma solidity 0.8.2;
 
 import "./PolicyController.sol";
+import "../shared/AccountingCheckpoints.sol";
 import "../shared/CoreController.sol";
 import "../tokens/BundleToken.sol";
 
@@ -26,6 +27,18 @@ contract BundleController is
 
     uint256 private _bundleCount;
 
+    // optional accounting history per bundle, enabled per riskpool and then kept enabled
+    // active bundles get a starting checkpoint when enabling, locked and closed bundles get 
+    // their first checkpoint with their next accounting change (lookups revert until then)
+    mapping(uint256 /* riskpoolId */ => bool /* checkpointing enabled */) private _checkpointingEnabled;
+    mapping(uint256 /* bundleId */ => AccountingCheckpoints.History /* bundle checkpoints */) private _bundleHistory;
+
+    // collateralizing bundle per policy until the policy is released, also for policies
+    // whose locked capital was fully paid out
+    mapping(bytes32 /* processId */ => uint256 /* bundleId */) private _bundleForPolicy;
+
+    event LogBundleCheckpointingEnabled(uint256 riskpoolId);
+
     modifier onlyRiskpoolService() {
         require(
             _msgSender() == _getContractAddress("RiskpoolService"),
@@ -34,6 +47,14 @@ contract BundleController is
         _;
     }
 
+    modifier onlyInstanceOperatorService() {
+        require(
+            _msgSender() == _getContractAddress("InstanceOperatorService"),
+            "ERROR:BUC-004:NOT_INSTANCE_OPERATOR_SERVICE"
+        );
+        _;
+    }
+
     modifier onlyFundableBundle(uint256 bundleId) {
         Bundle storage bundle = _bundles[bundleId];
         require(bundle.createdAt > 0, "ERROR:BUC-002:BUNDLE_DOES_NOT_EXIST");
@@ -72,6 +93,7 @@ contract BundleController is
         bundle.balance = amount_;
         bundle.createdAt = block.timestamp;
         bundle.updatedAt = block.timestamp;
+        _checkpointBundle(bundleId);
 
         // update bundle count
         _bundleCount++;
@@ -92,6 +114,7 @@ contract BundleController is
         bundle.capital += amount;
         bundle.balance += amount;
         bundle.updatedAt = block.timestamp;
+        _checkpointBundle(bundleId);
 
         uint256 capacityAmount = bundle.capital - bundle.lockedCapital;
         emit LogBundleCapitalProvided(bundleId, _msgSender(), amount, capacityAmount);
@@ -115,6 +138,7 @@ contract BundleController is
 
         bundle.balance -= amount;
         bundle.updatedAt = block.timestamp;
+        _checkpointBundle(bundleId);
 
         uint256 capacityAmount = bundle.capital - bundle.lockedCapital;
         emit LogBundleCapitalWithdrawn(bundleId, _msgSender(), amount, capacityAmount);
@@ -173,9 +197,11 @@ contract BundleController is
 
         bundle.lockedCapital += amount;
         bundle.updatedAt = block.timestamp;
+        _checkpointBundle(bundleId);
 
         _activePolicies[bundleId] += 1;
         _valueLockedPerPolicy[bundleId][processId] = amount;
+        _bundleForPolicy[processId] = bundleId;
 
         uint256 capacityAmount = bundle.capital - bundle.lockedCapital;
         emit LogBundlePolicyCollateralized(bundleId, processId, amount, capacityAmount);
@@ -198,6 +224,7 @@ contract BundleController is
         
         bundle.balance += amount;
         bundle.updatedAt = block.timestamp; // solhint-disable-line
+        _checkpointBundle(bundleId);
     }
 
 
@@ -231,6 +258,7 @@ contract BundleController is
         bundle.lockedCapital -= amount;
         bundle.balance -= amount;
         bundle.updatedAt = block.timestamp; // solhint-disable-line
+        _checkpointBundle(bundleId);
 
         emit LogBundlePayoutProcessed(bundleId, processId, amount);
     }
@@ -262,15 +290,115 @@ contract BundleController is
         // policy no longer relevant for bundle
         _activePolicies[bundleId] -= 1;
         delete _valueLockedPerPolicy[bundleId][processId];
+        delete _bundleForPolicy[processId];
 
         // update bundle capital
         bundle.lockedCapital -= lockedForPolicyAmount;
         bundle.updatedAt = block.timestamp; // solhint-disable-line
+        _checkpointBundle(bundleId);
 
         uint256 capacityAmount = bundle.capital - bundle.lockedCapital;
         emit LogBundlePolicyReleased(bundleId, processId, lockedForPolicyAmount, capacityAmount);
     }
 
+    // batch version of releasePolicy for policies collateralized by the same bundle
+    // bundle capital and active policy counter are updated once for the whole batch
+    // every policy must be collateralized by the bundle and not yet released, which also rejects duplicates
+    function releasePolicyBatch(uint256 bundleId, bytes32 [] calldata processIds)
+        external
+        onlyRiskpoolService
+        returns(uint256 remainingCollateralAmount)
+    {
+        // make sure bundle exists and is not yet closed
+        Bundle storage bundle = _bundles[bundleId];
+        require(bundle.createdAt > 0, "ERROR:BUC-080:BUNDLE_DOES_NOT_EXIST");
+        require(_activePolicies[bundleId] >= processIds.length, "ERROR:BUC-081:NO_ACTIVE_POLICIES_FOR_BUNDLE");
+
+        uint256 lockedCapital = bundle.lockedCapital;
+        uint256 capacityAmount = bundle.capital - lockedCapital;
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            bytes32 processId = processIds[i];
+            require(
+                _policy.getPolicy(processId).state == IPolicy.PolicyState.Closed,
+                "ERROR:BUC-082:POLICY_STATE_INVALID"
+            );
+
+            require(_bundleForPolicy[processId] == bundleId, "ERROR:BUC-084:POLICY_NOT_COLLATERALIZED_BY_BUNDLE");
+
+            uint256 lockedForPolicyAmount = _valueLockedPerPolicy[bundleId][processId];
+
+            // this should never ever fail ...
+            require(
+                lockedCapital >= remainingCollateralAmount + lockedForPolicyAmount,
+                "PANIC:BUC-083:UNLOCK_CAPITAL_TOO_BIG"
+            );
+
+            // policy no longer relevant for bundle
+            delete _valueLockedPerPolicy[bundleId][processId];
+            delete _bundleForPolicy[processId];
+            remainingCollateralAmount += lockedForPolicyAmount;
+            capacityAmount += lockedForPolicyAmount;
+
+            emit LogBundlePolicyReleased(bundleId, processId, lockedForPolicyAmount, capacityAmount);
+        }
+
+        // update bundle capital
+        _activePolicies[bundleId] -= processIds.length;
+        bundle.lockedCapital = lockedCapital - remainingCollateralAmount;
+        bundle.updatedAt = block.timestamp; // solhint-disable-line
+        _checkpointBundle(bundleId);
+    }
+
+    function enableCheckpointing(uint256 riskpoolId)
+        external
+        onlyInstanceOperatorService
+    {
+        require(!_checkpointingEnabled[riskpoolId], "ERROR:BUC-092:CHECKPOINTING_ALREADY_ENABLED");
+        _checkpointingEnabled[riskpoolId] = true;
+
+        // start history of active bundles with the current values
+        PoolController pool = _getPoolController();
+        uint256 activeBundles = pool.activeBundles(riskpoolId);
+        for (uint256 i = 0; i < activeBundles; i++) {
+            _checkpointBundle(pool.getActiveBundleId(riskpoolId, i));
+        }
+
+        emit LogBundleCheckpointingEnabled(riskpoolId);
+    }
+
+    function isCheckpointingEnabled(uint256 riskpoolId) external view returns(bool) {
+        return _checkpointingEnabled[riskpoolId];
+    }
+
+    function checkpoints(uint256 bundleId) external view returns(uint256 numberOfCheckpoints) {
+        return AccountingCheckpoints.length(_bundleHistory[bundleId]);
+    }
+
+    function getCheckpoint(uint256 bundleId, uint256 idx) external view returns(AccountingCheckpoints.Checkpoint memory checkpoint) {
+        return AccountingCheckpoints.at(_bundleHistory[bundleId], idx);
+    }
+
+    function getCheckpointAtBlock(uint256 bundleId, uint256 blockNumber) 
+        external 
+        view 
+        returns(AccountingCheckpoints.Checkpoint memory checkpoint) 
+    {
+        bool found;
+        (found, checkpoint) = AccountingCheckpoints.lookupByBlock(_bundleHistory[bundleId], blockNumber);
+        require(found, "ERROR:BUC-090:NO_CHECKPOINT_AT_BLOCK");
+    }
+
+    function getCheckpointAtTimestamp(uint256 bundleId, uint256 timestamp) 
+        external 
+        view 
+        returns(AccountingCheckpoints.Checkpoint memory checkpoint) 
+    {
+        bool found;
+        (found, checkpoint) = AccountingCheckpoints.lookupByTimestamp(_bundleHistory[bundleId], timestamp);
+        require(found, "ERROR:BUC-091:NO_CHECKPOINT_AT_TIMESTAMP");
+    }
+
     function getOwner(uint256 bundleId) public view returns(address) { 
         uint256 tokenId = getBundle(bundleId).tokenId;
         return _token.ownerOf(tokenId); 
@@ -319,6 +447,20 @@ contract BundleController is
         _poolController = PoolController(_getContractAddress("Pool"));
     }
 
+    function _checkpointBundle(uint256 bundleId) internal {
+        Bundle storage bundle = _bundles[bundleId];
+        if (!_checkpointingEnabled[bundle.riskpoolId]) {
+            return;
+        }
+
+        AccountingCheckpoints.push(
+            _bundleHistory[bundleId],
+            bundle.capital,
+            bundle.lockedCapital,
+            bundle.balance,
+            0);
+    }
+
     function _changeState(uint256 bundleId, BundleState newState) internal {
         BundleState oldState = getState(bundleId);
 
@@ -3,10 +3,12 @@ pragma solidity 0.8.2;
 
 import "../shared/CoreController.sol";
 import "./ComponentController.sol";
+import "../shared/IProcessContext.sol";
 import "@etherisc/gif-interface/contracts/modules/IPolicy.sol";
 
 contract PolicyController is 
     IPolicy, 
+    IProcessContext,
     CoreController
 {
     // bytes32 public constant NAME = "PolicyController";
@@ -478,6 +480,18 @@ contract PolicyController is
         require(application.createdAt > 0, "ERROR:POC-101:APPLICATION_DOES_NOT_EXIST");        
     }
 
+    function getProcessContext(bytes32 processId)
+        external
+        view
+        returns (ProcessContext memory context)
+    {
+        context.processId = processId;
+        context.metadata = getMetadata(processId);
+        context.application = applications[processId];
+        context.policy = policies[processId];
+        context.riskpoolId = IRiskpoolForProduct(_getContractAddress("Pool")).getRiskPoolForProduct(context.metadata.productId);
+    }
+
     function getNumberOfClaims(bytes32 processId) external view returns(uint256 numberOfClaims) {
         numberOfClaims = getPolicy(processId).claimsCount;
     }
@@ -4,7 +4,10 @@ pragma solidity 0.8.2;
 import "./ComponentController.sol";
 import "./PolicyController.sol";
 import "./BundleController.sol";
+import "../shared/AccountingCheckpoints.sol";
+import "../shared/BundleCapacityHeap.sol";
 import "../shared/CoreController.sol";
+import "../shared/IRiskpoolBatchRelease.sol";
 
 import "@etherisc/gif-interface/contracts/modules/IPool.sol";
 import "@etherisc/gif-interface/contracts/components/IComponent.sol";
@@ -20,6 +23,9 @@ contract PoolController is
 
     using EnumerableSet for EnumerableSet.UintSet;
 
+    event LogRiskpoolCheckpointingEnabled(uint256 riskpoolId);
+    event LogRiskpoolCapacityIndexEnabled(uint256 riskpoolId);
+
     // used for representation of collateralization
     // collateralization between 0 and 1 (1=100%) 
     // value might be larger when overcollateralization
@@ -46,6 +52,15 @@ contract PoolController is
     PolicyController private _policy;
     BundleController private _bundle;
 
+    // active bundles per riskpool ordered by free capacity (riskpools that opted in only)
+    mapping(uint256 /* riskpoolId */ => BundleCapacityHeap.Heap /* active bundle ids by capacity */) private _activeBundleCapacityForRiskpoolId;
+
+    // optional accounting history per riskpool, once enabled it stays enabled to keep the history complete
+    mapping(uint256 /* riskpoolId */ => bool /* checkpointing enabled */) private _checkpointingEnabled;
+    mapping(uint256 /* riskpoolId */ => AccountingCheckpoints.History /* riskpool checkpoints */) private _riskpoolHistory;
+
+    mapping(uint256 /* riskpoolId */ => bool /* capacity index enabled */) private _capacityIndexEnabled;
+
     modifier onlyInstanceOperatorService() {
         require(
             _msgSender() == _getContractAddress("InstanceOperatorService"),
@@ -80,6 +95,15 @@ contract PoolController is
         _;
     }
 
+    modifier onlyMatchingContext(bytes32 processId, IProcessContext.ProcessContext memory context) {
+        require(
+            context.processId == processId
+            && _riskpoolIdForProductId[context.metadata.productId] == context.riskpoolId,
+            "ERROR:POL-055:PROCESS_CONTEXT_MISMATCH"
+        );
+        _;
+    }
+
     function _afterInitialize() internal override onlyInitializing {
         _component = ComponentController(_getContractAddress("Component"));
         _policy = PolicyController(_getContractAddress("Policy"));
@@ -145,6 +169,7 @@ contract PoolController is
         pool.capital += amount;
         pool.balance += amount;
         pool.updatedAt = block.timestamp;
+        _checkpointRiskpool(riskpoolId);
     }
 
     function defund(uint256 riskpoolId, uint256 amount) 
@@ -159,6 +184,7 @@ contract PoolController is
 
         pool.balance -= amount;
         pool.updatedAt = block.timestamp;
+        _checkpointRiskpool(riskpoolId);
     }
 
     function underwrite(bytes32 processId) 
@@ -167,43 +193,73 @@ contract PoolController is
         onlyActivePoolForProcess(processId)
         returns(bool success)
     {
-        // check that application is in applied state
-        IPolicy.Application memory application = _policy.getApplication(processId);
-        require(
-            application.state == IPolicy.ApplicationState.Applied,
-            "ERROR:POL-020:APPLICATION_STATE_INVALID"
-        );
+        success = _underwrite(processId, _policy.getProcessContext(processId));
+    }
 
-        // determine riskpool responsible for application
-        IPolicy.Metadata memory metadata = _policy.getMetadata(processId);
-        uint256 riskpoolId = _riskpoolIdForProductId[metadata.productId];
+    // variant for policy flows that already hold the process context
+    function underwrite(bytes32 processId, IProcessContext.ProcessContext memory context) 
+        external 
+        onlyPolicyFlow("Pool")
+        onlyMatchingContext(processId, context)
+        onlyActivePool(context.riskpoolId)
+        returns(bool success)
+    {
+        success = _underwrite(processId, context);
+    }
 
-        // calculate required collateral amount
-        uint256 sumInsuredAmount = application.sumInsuredAmount;
-        uint256 collateralAmount = calculateCollateral(riskpoolId, sumInsuredAmount);
-        _collateralAmount[processId] = collateralAmount;
+    // batch version of underwrite for applications of a single riskpool
+    // applications that cannot be underwritten (state, sum insured cap, declined or reverted 
+    // collateralization) are reported as not successful instead of reverting the batch.
+    // the riskpool collateralizes policy by policy and sees the pool totals including the 
+    // earlier policies of the batch, the pool is checkpointed once for the whole batch
+    function underwriteBatch(IProcessContext.ProcessContext [] memory contexts) 
+        external 
+        onlyPolicyFlow("Pool")
+        returns(bool [] memory success)
+    {
+        success = new bool[](contexts.length);
 
-        emit LogRiskpoolRequiredCollateral(processId, sumInsuredAmount, collateralAmount);
+        if (contexts.length == 0) {
+            return success;
+        }
 
-        // check that riskpool stays inside sum insured cap when underwriting this application 
-        IPool.Pool storage pool = _riskpools[riskpoolId];
+        uint256 riskpoolId = contexts[0].riskpoolId;
         require(
-            pool.sumOfSumInsuredCap >= pool.sumOfSumInsuredAtRisk + sumInsuredAmount,
-            "ERROR:POL-022:RISKPOOL_SUM_INSURED_CAP_EXCEEDED"
+            _component.getComponentState(riskpoolId) == IComponent.ComponentState.Active, 
+            "ERROR:POL-003:RISKPOOL_NOT_ACTIVE"
         );
 
-        // ask riskpool to secure application
-        IRiskpool riskpool = _getRiskpoolComponent(metadata);
-        success = riskpool.collateralizePolicy(processId, collateralAmount);
+        IRiskpool riskpool = _getRiskpoolForId(riskpoolId);
+        IPool.Pool storage pool = _riskpools[riskpoolId];
+        uint256 collateralization = pool.collateralizationLevel;
+        bool collateralized = false;
+
+        for (uint256 i = 0; i < contexts.length; i++) {
+            require(
+                contexts[i].riskpoolId == riskpoolId
+                && _riskpoolIdForProductId[contexts[i].metadata.productId] == riskpoolId,
+                "ERROR:POL-056:BATCH_RISKPOOL_MISMATCH"
+            );
+
+            uint256 collateralAmount;
+            (success[i], collateralAmount) = _underwriteBatchItem(
+                riskpool, 
+                riskpoolId, 
+                collateralization, 
+                pool.sumOfSumInsuredCap - pool.sumOfSumInsuredAtRisk,
+                contexts[i]);
+
+            // updated before the next collateralization, riskpools check their free capital
+            if (success[i]) {
+                pool.sumOfSumInsuredAtRisk += contexts[i].application.sumInsuredAmount;
+                pool.lockedCapital += collateralAmount;
+                collateralized = true;
+            }
+        }
 
-        if (success) {
-            pool.sumOfSumInsuredAtRisk += sumInsuredAmount;
-            pool.lockedCapital += collateralAmount;
+        if (collateralized) {
             pool.updatedAt = block.timestamp;
-
-            emit LogRiskpoolCollateralizationSucceeded(riskpoolId, processId, sumInsuredAmount);
-        } else {
-            emit LogRiskpoolCollateralizationFailed(riskpoolId, processId, sumInsuredAmount);
+            _checkpointRiskpool(riskpoolId);
         }
     }
 
@@ -213,19 +269,7 @@ contract PoolController is
         view 
         returns (uint256 collateralAmount) 
     {
-        uint256 collateralization = getRiskpool(riskpoolId).collateralizationLevel;
-
-        // fully collateralized case
-        if (collateralization == FULL_COLLATERALIZATION_LEVEL) {
-            collateralAmount = sumInsuredAmount;
-        // over or under collateralized case
-        } else if (collateralization > 0) {
-            collateralAmount = (collateralization * sumInsuredAmount) / FULL_COLLATERALIZATION_LEVEL;
-        }
-        // collateralization == 0, eg complete risk coverd by re insurance outside gif
-        else {
-            collateralAmount = 0;
-        }
+        collateralAmount = _calculateCollateral(getRiskpool(riskpoolId).collateralizationLevel, sumInsuredAmount);
     }
 
 
@@ -235,16 +279,21 @@ contract PoolController is
         onlyActivePoolForProcess(processId)
     {
         IPolicy.Metadata memory metadata = _policy.getMetadata(processId);
-        IRiskpool riskpool = _getRiskpoolComponent(metadata);
-        riskpool.processPolicyPremium(processId, amount);
+        _processPremium(processId, amount, metadata, _riskpoolIdForProductId[metadata.productId]);
+    }
 
-        uint256 riskpoolId = _riskpoolIdForProductId[metadata.productId];
-        IPool.Pool storage pool = _riskpools[riskpoolId];
-        pool.balance += amount;
-        pool.updatedAt = block.timestamp;
+    // variant for policy flows that already hold the process context
+    function processPremium(bytes32 processId, uint256 amount, IProcessContext.ProcessContext memory context) 
+        external
+        onlyPolicyFlow("Pool")
+        onlyMatchingContext(processId, context)
+        onlyActivePool(context.riskpoolId)
+    {
+        _processPremium(processId, amount, context.metadata, context.riskpoolId);
     }
 
 
+
     function processPayout(bytes32 processId, uint256 amount) 
         external override
         onlyPolicyFlow("Pool")
@@ -262,6 +311,7 @@ contract PoolController is
         pool.lockedCapital -= amount;
         pool.balance -= amount;
         pool.updatedAt = block.timestamp; // solhint-disable-line
+        _checkpointRiskpool(riskpoolId);
 
         IRiskpool riskpool = _getRiskpoolComponent(metadata);
         riskpool.processPolicyPayout(processId, amount);
@@ -291,12 +341,68 @@ contract PoolController is
         pool.sumOfSumInsuredAtRisk -= application.sumInsuredAmount;
         pool.lockedCapital -= remainingCollateralAmount;
         pool.updatedAt = block.timestamp; // solhint-disable-line
+        _checkpointRiskpool(riskpoolId);
 
         // free memory
         delete _collateralAmount[processId];
         emit LogRiskpoolCollateralReleased(riskpoolId, processId, remainingCollateralAmount);
     }
 
+    // batch version of release for closed policies of a single product
+    // riskpool counters are updated once for the whole batch
+    function releaseBatch(bytes32 [] calldata processIds) 
+        external
+        onlyPolicyFlow("Pool")
+    {
+        if (processIds.length == 0) {
+            return;
+        }
+
+        IPolicy.Metadata memory metadata = _policy.getMetadata(processIds[0]);
+        uint256 productId = metadata.productId;
+        uint256 riskpoolId = _riskpoolIdForProductId[productId];
+        IRiskpool riskpool = _getRiskpoolComponent(metadata);
+
+        uint256 sumInsuredAmount;
+        uint256 remainingCollateralAmount;
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            bytes32 processId = processIds[i];
+            require(
+                _policy.getMetadata(processId).productId == productId,
+                "ERROR:POL-047:BATCH_PRODUCT_MISMATCH"
+            );
+
+            IPolicy.Policy memory policy = _policy.getPolicy(processId);
+            require(
+                policy.state == IPolicy.PolicyState.Closed,
+                "ERROR:POL-048:POLICY_STATE_INVALID"
+            );
+
+            uint256 remainingCollateralForPolicy = _collateralAmount[processId] - policy.payoutAmount;
+            sumInsuredAmount += _policy.getApplication(processId).sumInsuredAmount;
+            remainingCollateralAmount += remainingCollateralForPolicy;
+
+            // free memory
+            delete _collateralAmount[processId];
+            emit LogRiskpoolCollateralReleased(riskpoolId, processId, remainingCollateralForPolicy);
+        }
+
+        if (_supportsBatchRelease(riskpool)) {
+            IRiskpoolBatchRelease(address(riskpool)).releasePolicyBatch(processIds);
+        } else {
+            for (uint256 i = 0; i < processIds.length; i++) {
+                riskpool.releasePolicy(processIds[i]);
+            }
+        }
+
+        IPool.Pool storage pool = _riskpools[riskpoolId];
+        pool.sumOfSumInsuredAtRisk -= sumInsuredAmount;
+        pool.lockedCapital -= remainingCollateralAmount;
+        pool.updatedAt = block.timestamp; // solhint-disable-line
+        _checkpointRiskpool(riskpoolId);
+    }
+
     function setMaximumNumberOfActiveBundles(uint256 riskpoolId, uint256 maxNumberOfActiveBundles)
         external 
         onlyRiskpoolService
@@ -305,6 +411,20 @@ contract PoolController is
         _maxmimumNumberOfActiveBundlesForRiskpoolId[riskpoolId] = maxNumberOfActiveBundles;
     }
 
+    function enableCheckpointing(uint256 riskpoolId)
+        external
+        onlyInstanceOperatorService
+    {
+        require(_riskpools[riskpoolId].createdAt > 0, "ERROR:POL-050:RISKPOOL_DOES_NOT_EXIST");
+        require(!_checkpointingEnabled[riskpoolId], "ERROR:POL-057:CHECKPOINTING_ALREADY_ENABLED");
+        _checkpointingEnabled[riskpoolId] = true;
+
+        // start history with the current values
+        _checkpointRiskpool(riskpoolId);
+
+        emit LogRiskpoolCheckpointingEnabled(riskpoolId);
+    }
+
     function getMaximumNumberOfActiveBundles(uint256 riskpoolId) public view returns(uint256 maximumNumberOfActiveBundles) {
         return _maxmimumNumberOfActiveBundlesForRiskpoolId[riskpoolId];
     }
@@ -348,6 +468,10 @@ contract PoolController is
         );
 
         EnumerableSet.add(_activeBundleIdsForRiskpoolId[riskpoolId], bundleId);
+
+        if (_capacityIndexEnabled[riskpoolId]) {
+            BundleCapacityHeap.set(_activeBundleCapacityForRiskpoolId[riskpoolId], bundleId, _bundle.getCapacity(bundleId));
+        }
     }
 
     function removeBundleIdFromActiveSet(uint256 riskpoolId, uint256 bundleId) 
@@ -360,12 +484,218 @@ contract PoolController is
         );
 
         EnumerableSet.remove(_activeBundleIdsForRiskpoolId[riskpoolId], bundleId);
+
+        if (_capacityIndexEnabled[riskpoolId] && BundleCapacityHeap.contains(_activeBundleCapacityForRiskpoolId[riskpoolId], bundleId)) {
+            BundleCapacityHeap.remove(_activeBundleCapacityForRiskpoolId[riskpoolId], bundleId);
+        }
+    }
+
+    // opt in of a riskpool to the capacity index, active bundles are added to the index
+    function enableCapacityIndex(uint256 riskpoolId)
+        external
+        onlyRiskpoolService
+    {
+        require(_riskpools[riskpoolId].createdAt > 0, "ERROR:POL-053:RISKPOOL_DOES_NOT_EXIST");
+        require(!_capacityIndexEnabled[riskpoolId], "ERROR:POL-054:CAPACITY_INDEX_ALREADY_ENABLED");
+        _capacityIndexEnabled[riskpoolId] = true;
+
+        EnumerableSet.UintSet storage activeBundleIds = _activeBundleIdsForRiskpoolId[riskpoolId];
+        for (uint256 i = 0; i < EnumerableSet.length(activeBundleIds); i++) {
+            uint256 bundleId = EnumerableSet.at(activeBundleIds, i);
+            BundleCapacityHeap.set(_activeBundleCapacityForRiskpoolId[riskpoolId], bundleId, _bundle.getCapacity(bundleId));
+        }
+
+        emit LogRiskpoolCapacityIndexEnabled(riskpoolId);
+    }
+
+    // to be called whenever capital or locked capital of a bundle changes
+    // bundles that are not active and riskpools without capacity index are ignored
+    function updateBundleCapacity(uint256 riskpoolId, uint256 bundleId)
+        external
+        onlyRiskpoolService
+    {
+        if (_capacityIndexEnabled[riskpoolId] && EnumerableSet.contains(_activeBundleIdsForRiskpoolId[riskpoolId], bundleId)) {
+            BundleCapacityHeap.set(_activeBundleCapacityForRiskpoolId[riskpoolId], bundleId, _bundle.getCapacity(bundleId));
+        }
+    }
+
+    function getActiveBundleIdWithMaxCapacity(uint256 riskpoolId) 
+        external view 
+        returns(uint256 bundleId, uint256 capacityAmount)
+    {
+        return BundleCapacityHeap.top(_activeBundleCapacityForRiskpoolId[riskpoolId]);
+    }
+
+    function getActiveBundleCapacity(uint256 riskpoolId, uint256 bundleId) external view returns(uint256 capacityAmount) {
+        return BundleCapacityHeap.capacityOf(_activeBundleCapacityForRiskpoolId[riskpoolId], bundleId);
+    }
+
+    function isCapacityIndexEnabled(uint256 riskpoolId) external view returns(bool) {
+        return _capacityIndexEnabled[riskpoolId];
+    }
+
+    function isCheckpointingEnabled(uint256 riskpoolId) external view returns(bool) {
+        return _checkpointingEnabled[riskpoolId];
+    }
+
+    function checkpoints(uint256 riskpoolId) external view returns(uint256 numberOfCheckpoints) {
+        return AccountingCheckpoints.length(_riskpoolHistory[riskpoolId]);
+    }
+
+    function getCheckpoint(uint256 riskpoolId, uint256 idx) external view returns(AccountingCheckpoints.Checkpoint memory checkpoint) {
+        return AccountingCheckpoints.at(_riskpoolHistory[riskpoolId], idx);
+    }
+
+    function getCheckpointAtBlock(uint256 riskpoolId, uint256 blockNumber) 
+        external 
+        view 
+        returns(AccountingCheckpoints.Checkpoint memory checkpoint) 
+    {
+        bool found;
+        (found, checkpoint) = AccountingCheckpoints.lookupByBlock(_riskpoolHistory[riskpoolId], blockNumber);
+        require(found, "ERROR:POL-051:NO_CHECKPOINT_AT_BLOCK");
+    }
+
+    function getCheckpointAtTimestamp(uint256 riskpoolId, uint256 timestamp) 
+        external 
+        view 
+        returns(AccountingCheckpoints.Checkpoint memory checkpoint) 
+    {
+        bool found;
+        (found, checkpoint) = AccountingCheckpoints.lookupByTimestamp(_riskpoolHistory[riskpoolId], timestamp);
+        require(found, "ERROR:POL-052:NO_CHECKPOINT_AT_TIMESTAMP");
     }
 
     function getFullCollateralizationLevel() external pure returns (uint256) {
         return FULL_COLLATERALIZATION_LEVEL;
     }
 
+    function _underwrite(bytes32 processId, IProcessContext.ProcessContext memory context) 
+        internal
+        returns(bool success)
+    {
+        // check that application is in applied state
+        IPolicy.Application memory application = context.application;
+        require(application.createdAt > 0, "ERROR:POL-049:APPLICATION_DOES_NOT_EXIST");
+        require(
+            application.state == IPolicy.ApplicationState.Applied,
+            "ERROR:POL-020:APPLICATION_STATE_INVALID"
+        );
+
+        // determine riskpool responsible for application
+        uint256 riskpoolId = context.riskpoolId;
+
+        // calculate required collateral amount
+        uint256 sumInsuredAmount = application.sumInsuredAmount;
+        uint256 collateralAmount = calculateCollateral(riskpoolId, sumInsuredAmount);
+        _collateralAmount[processId] = collateralAmount;
+
+        emit LogRiskpoolRequiredCollateral(processId, sumInsuredAmount, collateralAmount);
+
+        // check that riskpool stays inside sum insured cap when underwriting this application 
+        IPool.Pool storage pool = _riskpools[riskpoolId];
+        require(
+            pool.sumOfSumInsuredCap >= pool.sumOfSumInsuredAtRisk + sumInsuredAmount,
+            "ERROR:POL-022:RISKPOOL_SUM_INSURED_CAP_EXCEEDED"
+        );
+
+        // ask riskpool to secure application
+        IRiskpool riskpool = _getRiskpoolComponent(context.metadata);
+        success = riskpool.collateralizePolicy(processId, collateralAmount);
+
+        if (success) {
+            pool.sumOfSumInsuredAtRisk += sumInsuredAmount;
+            pool.lockedCapital += collateralAmount;
+            pool.updatedAt = block.timestamp;
+            _checkpointRiskpool(riskpoolId);
+
+            emit LogRiskpoolCollateralizationSucceeded(riskpoolId, processId, sumInsuredAmount);
+        } else {
+            emit LogRiskpoolCollateralizationFailed(riskpoolId, processId, sumInsuredAmount);
+        }
+    }
+
+    function _calculateCollateral(uint256 collateralization, uint256 sumInsuredAmount) 
+        internal
+        pure 
+        returns (uint256 collateralAmount) 
+    {
+        // fully collateralized case
+        if (collateralization == FULL_COLLATERALIZATION_LEVEL) {
+            collateralAmount = sumInsuredAmount;
+        // over or under collateralized case
+        } else if (collateralization > 0) {
+            collateralAmount = (collateralization * sumInsuredAmount) / FULL_COLLATERALIZATION_LEVEL;
+        }
+        // collateralization == 0, eg complete risk coverd by re insurance outside gif
+        else {
+            collateralAmount = 0;
+        }
+    }
+
+    function _underwriteBatchItem(
+        IRiskpool riskpool,
+        uint256 riskpoolId,
+        uint256 collateralization,
+        uint256 sumInsuredAvailable,
+        IProcessContext.ProcessContext memory context
+    ) 
+        internal
+        returns(bool success, uint256 collateralAmount)
+    {
+        IPolicy.Application memory application = context.application;
+        if (application.createdAt == 0 || application.state != IPolicy.ApplicationState.Applied) {
+            return (false, 0);
+        }
+
+        bytes32 processId = context.processId;
+        uint256 sumInsuredAmount = application.sumInsuredAmount;
+        collateralAmount = _calculateCollateral(collateralization, sumInsuredAmount);
+        emit LogRiskpoolRequiredCollateral(processId, sumInsuredAmount, collateralAmount);
+
+        // riskpool must stay inside sum insured cap, the collateralization may revert
+        if (sumInsuredAmount <= sumInsuredAvailable) {
+            try riskpool.collateralizePolicy(processId, collateralAmount) returns(bool isCollateralized) {
+                success = isCollateralized;
+            } catch {
+                success = false;
+            }
+        }
+
+        if (success) {
+            _collateralAmount[processId] = collateralAmount;
+            emit LogRiskpoolCollateralizationSucceeded(riskpoolId, processId, sumInsuredAmount);
+        } else {
+            emit LogRiskpoolCollateralizationFailed(riskpoolId, processId, sumInsuredAmount);
+        }
+    }
+
+    function _processPremium(bytes32 processId, uint256 amount, IPolicy.Metadata memory metadata, uint256 riskpoolId) 
+        internal
+    {
+        IRiskpool riskpool = _getRiskpoolComponent(metadata);
+        riskpool.processPolicyPremium(processId, amount);
+
+        IPool.Pool storage pool = _riskpools[riskpoolId];
+        pool.balance += amount;
+        pool.updatedAt = block.timestamp;
+        _checkpointRiskpool(riskpoolId);
+    }
+
+    function _checkpointRiskpool(uint256 riskpoolId) internal {
+        if (!_checkpointingEnabled[riskpoolId]) {
+            return;
+        }
+
+        IPool.Pool storage pool = _riskpools[riskpoolId];
+        AccountingCheckpoints.push(
+            _riskpoolHistory[riskpoolId],
+            pool.capital,
+            pool.lockedCapital,
+            pool.balance,
+            pool.sumOfSumInsuredAtRisk);
+    }
+
     function _getRiskpoolComponent(IPolicy.Metadata memory metadata) internal view returns (IRiskpool riskpool) {
         uint256 riskpoolId = _riskpoolIdForProductId[metadata.productId];
         require(riskpoolId > 0, "ERROR:POL-045:RISKPOOL_DOES_NOT_EXIST");
@@ -373,6 +703,14 @@ contract PoolController is
         riskpool = _getRiskpoolForId(riskpoolId);
     }
 
+    function _supportsBatchRelease(IRiskpool riskpool) internal view returns (bool) {
+        // riskpools without the optional extension revert or return nothing
+        (bool success, bytes memory returnData) = address(riskpool).staticcall(
+            abi.encodeWithSelector(IRiskpoolBatchRelease.supportsBatchRelease.selector));
+
+        return success && returnData.length == 32 && abi.decode(returnData, (bool));
+    }
+
     function _getRiskpoolForId(uint256 riskpoolId) internal view returns (IRiskpool riskpool) {
         require(_component.isRiskpool(riskpoolId), "ERROR:POL-046:COMPONENT_NOT_RISKPOOL");
         
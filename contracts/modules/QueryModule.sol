@@ -17,6 +17,12 @@ contract QueryModule is
     ComponentController private _component;
     OracleRequest[] private _oracleRequests;
 
+    // callback selectors are computed once when the request is made
+    // and replace the callback method name stored with the request
+    mapping(uint256 /* requestId */ => bytes4 /* callback selector */) private _callbackSelectors;
+
+    event LogOracleResponseRejected(uint256 requestId, address responder);
+
     modifier onlyOracleService() {
         require(
             _msgSender() == _getContractAddress("OracleService"),
@@ -26,7 +32,7 @@ contract QueryModule is
     }
 
     modifier onlyResponsibleOracle(uint256 requestId, address responder) {
-        OracleRequest memory oracleRequest = _oracleRequests[requestId];
+        OracleRequest storage oracleRequest = _oracleRequests[requestId];
 
         require(
             oracleRequest.createdAt > 0,
@@ -76,11 +82,16 @@ contract QueryModule is
         OracleRequest storage req = _oracleRequests[requestId];
         req.processId = processId;
         req.data = input;
-        req.callbackMethodName = callbackMethodName;
         req.callbackContractAddress = callbackContractAddress;
         req.responsibleOracleId = responsibleOracleId;
         req.createdAt = block.timestamp; // solhint-disable-line
 
+        _callbackSelectors[requestId] = bytes4(keccak256(
+            abi.encodePacked(
+                callbackMethodName,
+                "(uint256,bytes32,bytes)"
+            )));
+
         _getOracle(responsibleOracleId).request(
             requestId,
             input
@@ -103,30 +114,33 @@ contract QueryModule is
         onlyOracleService 
         onlyResponsibleOracle(requestId, responder) 
     {
-        OracleRequest storage req = _oracleRequests[requestId];
-        string memory functionSignature = string(
-            abi.encodePacked(
-                req.callbackMethodName,
-                "(uint256,bytes32,bytes)"
-            ));
-        bytes32 processId = req.processId;
-
-        (bool success, ) =
-            req.callbackContractAddress.call(
-                abi.encodeWithSignature(
-                    functionSignature,
-                    requestId,
-                    processId,
-                    data
-                )
-            );
-
+        bool success = _respond(requestId, responder, data);
         require(success, "ERROR:QUC-020:PRODUCT_CALLBACK_UNSUCCESSFUL");
-        delete _oracleRequests[requestId];
-
-        // TODO implement reward payment
+    }
 
-        emit LogOracleResponded(processId, requestId, responder, success);
+    /* Oracle Batch Response */
+    // responses for unknown requests or requests the responder is not
+    // responsible for as well as failing product callbacks are reported 
+    // per request and do not revert the batch
+    function respondBatch(
+        uint256 [] calldata requestIds,
+        address responder,
+        bytes [] calldata data
+    ) 
+        external
+        onlyOracleService 
+        returns(bool [] memory success)
+    {
+        require(requestIds.length == data.length, "ERROR:QUC-021:BATCH_SIZE_MISMATCH");
+        success = new bool[](requestIds.length);
+
+        for (uint256 i = 0; i < requestIds.length; i++) {
+            if (_isResponsibleOracle(requestIds[i], responder)) {
+                success[i] = _respond(requestIds[i], responder, data[i]);
+            } else {
+                emit LogOracleResponseRejected(requestIds[i], responder);
+            }
+        }
     }
 
     function cancel(uint256 requestId) 
@@ -136,6 +150,7 @@ contract QueryModule is
         OracleRequest storage oracleRequest = _oracleRequests[requestId];
         require(oracleRequest.createdAt > 0, "ERROR:QUC-030:REQUEST_ID_INVALID");
         delete _oracleRequests[requestId];
+        delete _callbackSelectors[requestId];
         emit LogOracleCanceled(requestId);
     }
 
@@ -155,6 +170,72 @@ contract QueryModule is
         return _oracleRequests.length;
     }
 
+    function _respond(
+        uint256 requestId,
+        address responder,
+        bytes calldata data
+    ) 
+        internal
+        returns(bool success)
+    {
+        OracleRequest storage req = _oracleRequests[requestId];
+        bytes32 processId = req.processId;
+
+        (success, ) =
+            req.callbackContractAddress.call(
+                abi.encodeWithSelector(
+                    _getCallbackSelector(requestId, req),
+                    requestId,
+                    processId,
+                    data
+                )
+            );
+
+        if (success) {
+            delete _oracleRequests[requestId];
+            delete _callbackSelectors[requestId];
+        }
+
+        // TODO implement reward payment
+
+        emit LogOracleResponded(processId, requestId, responder, success);
+    }
+
+    function _getCallbackSelector(uint256 requestId, OracleRequest storage req) 
+        internal 
+        view 
+        returns(bytes4 selector)
+    {
+        selector = _callbackSelectors[requestId];
+
+        // requests created before selectors were precomputed
+        // only hold the callback method name
+        if (selector == bytes4(0)) {
+            selector = bytes4(keccak256(
+                abi.encodePacked(
+                    req.callbackMethodName,
+                    "(uint256,bytes32,bytes)"
+                )));
+        }
+    }
+
+    function _isResponsibleOracle(uint256 requestId, address responder) 
+        internal 
+        view 
+        returns(bool isResponsible)
+    {
+        if (requestId >= _oracleRequests.length) {
+            return false;
+        }
+
+        OracleRequest storage req = _oracleRequests[requestId];
+        if (req.createdAt == 0) {
+            return false;
+        }
+
+        return address(_getOracle(req.responsibleOracleId)) == responder;
+    }
+
     function _getOracle(uint256 id) internal view returns (IOracle oracle) {
         IComponent cmp = _component.getComponent(id);
         oracle = IOracle(address(cmp));
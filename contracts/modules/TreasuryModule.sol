@@ -15,6 +15,8 @@ import "@etherisc/gif-interface/contracts/modules/ITreasury.sol";
 
 import "@openzeppelin/contracts/security/Pausable.sol";
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/extensions/draft-IERC20Permit.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 import "@openzeppelin/contracts/utils/Strings.sol";
 
 contract TreasuryModule is 
@@ -29,6 +31,31 @@ contract TreasuryModule is
     event LogTransferHelperInputValidation2Failed(uint256 balance, uint256 allowance);
     event LogTransferHelperCallFailed(bool callSuccess, uint256 returnDataLength, bytes returnData);
 
+    event LogTreasuryFeeAccrualSet(bool enabled);
+    event LogTreasuryFeesAccrued(address token, uint256 productId, uint256 amount);
+    event LogTreasuryNetPremiumsForwarded(uint256 riskpoolId, address riskpoolWalletAddress, uint256 amount);
+    event LogTreasuryFeesSwept(address token, address to, uint256 amount);
+
+    // aggregated premium transfers of a payer in a premium batch
+    struct PayerPremium {
+        address payer;
+        uint256 feeAmount;
+        uint256 netAmount;
+        bool paid;
+    }
+
+    // aggregated payout transfers to a recipient in a payout batch
+    struct RecipientPayout {
+        address recipient;
+        uint256 amount;
+    }
+
+    // premiums held by the treasury for a riskpool, packed into a single slot
+    struct PremiumAccrual {
+        uint128 fees; // fees not yet swept to the instance wallet
+        uint128 netPremiums; // net premiums not yet forwarded to the riskpool wallet
+    }
+
     address private _instanceWalletAddress;
     mapping(uint256 => address) private _riskpoolWallet; // riskpoolId => walletAddress
     mapping(uint256 => FeeSpecification) private _fees; // componentId => fee specification
@@ -39,6 +66,13 @@ contract TreasuryModule is
     PolicyController private _policy;
     PoolController private _pool;
 
+    // premium fee accrual: premiums are transferred to the treasury with a single transfer.
+    // the net premiums are forwarded to the riskpool wallet in bulk, on request of the instance
+    // operator and before any transfer out of the riskpool wallet (payouts, withdrawals).
+    // the accrued fees are swept to the instance wallet by the instance operator
+    bool private _feeAccrualEnabled;
+    mapping(uint256 => PremiumAccrual) private _premiumAccrual; // riskpoolId => premiums held by the treasury
+
     modifier instanceWalletDefined() {
         require(
             _instanceWalletAddress != address(0),
@@ -54,6 +88,13 @@ contract TreasuryModule is
         _;
     }
 
+    modifier riskpoolWalletDefined(uint256 riskpoolId) {
+        require(
+            _riskpoolWallet[riskpoolId] != address(0),
+            "ERROR:TRS-006:RISKPOOL_WALLET_UNDEFINED");
+        _;
+    }
+
     modifier riskpoolWalletDefinedForBundle(uint256 bundleId) {
         IBundle.Bundle memory bundle = _bundle.getBundle(bundleId);
         require(
@@ -62,6 +103,12 @@ contract TreasuryModule is
         _;
     }
 
+    // the riskpool of the context is validated by the policy flow (the only caller) and the pool
+    modifier onlyMatchingContext(bytes32 processId, IProcessContext.ProcessContext memory context) {
+        require(context.processId == processId, "ERROR:TRS-040:PROCESS_CONTEXT_MISMATCH");
+        _;
+    }
+
     // surrogate modifier for whenNotPaused to create treasury specific error message
     modifier whenNotSuspended() {
         require(!paused(), "ERROR:TRS-004:TREASURY_SUSPENDED");
@@ -136,6 +183,52 @@ contract TreasuryModule is
         emit LogTreasuryInstanceWalletSet (instanceWalletAddress);
     }
 
+    function setFeeAccrual(bool enabled)
+        external
+        whenNotSuspended
+        onlyInstanceOperator
+    {
+        // fees accrued so far remain available for sweeping
+        _feeAccrualEnabled = enabled;
+        emit LogTreasuryFeeAccrualSet(enabled);
+    }
+
+    function sweepFees(IERC20 token)
+        external
+        whenNotSuspended
+        instanceWalletDefined
+        onlyInstanceOperator
+        returns(uint256 amount)
+    {
+        // riskpools are few, sweeping is rare compared to premium collection
+        for (uint256 i = 0; i < _component.riskpools(); i++) {
+            uint256 riskpoolId = _component.getRiskpoolId(i);
+            if (_componentToken[riskpoolId] == token && _premiumAccrual[riskpoolId].fees > 0) {
+                amount += _premiumAccrual[riskpoolId].fees;
+                _premiumAccrual[riskpoolId].fees = 0;
+            }
+        }
+
+        if (amount == 0) {
+            return amount;
+        }
+
+        bool success = TransferHelper.unifiedTransfer(token, _instanceWalletAddress, amount);
+
+        emit LogTreasuryFeesSwept(address(token), _instanceWalletAddress, amount);
+        require(success, "ERROR:TRS-071:FEE_SWEEP_TRANSFER_FAILED");
+    }
+
+    function forwardNetPremiums(uint256 riskpoolId)
+        external
+        whenNotSuspended
+        riskpoolWalletDefined(riskpoolId)
+        onlyInstanceOperator
+        returns(uint256 amount)
+    {
+        amount = _forwardNetPremiums(_componentToken[riskpoolId], riskpoolId, _riskpoolWallet[riskpoolId]);
+    }
+
     function setRiskpoolWallet(uint256 riskpoolId, address riskpoolWalletAddress) 
         external override
         whenNotSuspended
@@ -230,6 +323,41 @@ contract TreasuryModule is
     }
     
 
+    /*
+     * Consumes an EIP-2612 permit that sets the treasury allowance of owner for the component token.
+     * Allows to create the allowance and to transfer the tokens in a single transaction.
+     * A permit that has already been used (eg front-run) is accepted if the allowance is sufficient.
+     */
+    function processPermit(
+        uint256 componentId,
+        address owner,
+        uint256 amount,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    )
+        external
+        whenNotSuspended
+    {
+        require(
+            _msgSender() == _getContractAddress("ProductService")
+            || _msgSender() == _getContractAddress("RiskpoolService"),
+            "ERROR:TRS-080:NOT_PRODUCT_OR_RISKPOOL_SERVICE"
+        );
+
+        IERC20 token = getComponentToken(componentId);
+
+        try IERC20Permit(address(token)).permit(owner, address(this), amount, deadline, v, r, s) {
+        } catch {
+            require(
+                token.allowance(owner, address(this)) >= amount, 
+                "ERROR:TRS-081:PERMIT_FAILED"
+            );
+        }
+    }
+
+
     /*
      * Process the remaining premium by calculating the remaining amount, the fees for that amount and 
      * then transfering the fees to the instance wallet and the net premium remaining to the riskpool. 
@@ -270,37 +398,73 @@ contract TreasuryModule is
             uint256 netAmount
         ) 
     {
-        IPolicy.Policy memory policy =  _policy.getPolicy(processId);
-        require(
-            policy.premiumPaidAmount + amount <= policy.premiumExpectedAmount, 
-            "ERROR:TRS-030:AMOUNT_TOO_BIG"
-        );
+        (success, feeAmount, netAmount) = _processPremium(processId, amount, _policy.getProcessContext(processId));
+    }
 
-        IPolicy.Metadata memory metadata = _policy.getMetadata(processId);
-        (feeAmount, netAmount) 
-            = calculateFee(metadata.productId, amount);
+    /*
+     * Variant of processPremium for policy flows that already hold the process context.
+     */
+    function processPremium(bytes32 processId, uint256 amount, IProcessContext.ProcessContext memory context) 
+        external
+        whenNotSuspended
+        onlyPolicyFlow("Treasury")
+        onlyMatchingContext(processId, context)
+        instanceWalletDefined
+        riskpoolWalletDefined(context.riskpoolId)
+        returns(
+            bool success, 
+            uint256 feeAmount, 
+            uint256 netAmount
+        ) 
+    {
+        (success, feeAmount, netAmount) = _processPremium(processId, amount, context);
+    }
 
-        // check if allowance covers requested amount
-        IERC20 token = getComponentToken(metadata.productId);
-        if (token.allowance(metadata.owner, address(this)) < amount) {
-            success = false;
-            return (success, feeAmount, netAmount);
+
+    /*
+     * Batch version of processPremium for policies of a single product (and therefore a single riskpool).
+     * Fees are calculated per policy, the transfers are aggregated into one fee transfer and one 
+     * net premium transfer per payer. If the allowance of a payer does not cover the aggregated 
+     * amount, none of the payer's policies is processed.
+     */
+    function processPremiumBatch(bytes32 [] calldata processIds, uint256 [] calldata amounts) 
+        external
+        whenNotSuspended
+        onlyPolicyFlow("Treasury")
+        instanceWalletDefined
+        returns(
+            bool [] memory success, 
+            uint256 [] memory feeAmounts, 
+            uint256 [] memory netAmounts
+        ) 
+    {
+        require(processIds.length == amounts.length, "ERROR:TRS-033:BATCH_LENGTH_MISMATCH");
+
+        success = new bool[](processIds.length);
+        feeAmounts = new uint256[](processIds.length);
+        netAmounts = new uint256[](processIds.length);
+
+        if (processIds.length == 0) {
+            return (success, feeAmounts, netAmounts);
         }
 
-        // collect premium fees
-        success = TransferHelper.unifiedTransferFrom(token, metadata.owner, _instanceWalletAddress, feeAmount);
-        emit LogTreasuryFeesTransferred(metadata.owner, _instanceWalletAddress, feeAmount);
-        require(success, "ERROR:TRS-031:FEE_TRANSFER_FAILED");
+        (
+            PayerPremium [] memory payers,
+            uint256 [] memory payerIdx,
+            uint256 productId,
+            uint256 riskpoolId
+        ) = _calculatePremiumBatch(processIds, amounts, feeAmounts, netAmounts);
 
-        // transfer premium net amount to riskpool for product
-        // actual transfer of net premium to riskpool
-        (uint256 riskpoolId, address riskpoolWalletAddress) = _getRiskpoolWallet(processId);
-        success = TransferHelper.unifiedTransferFrom(token, metadata.owner, riskpoolWalletAddress, netAmount);
+        _transferPremiumBatch(getComponentToken(productId), productId, riskpoolId, payers);
 
-        emit LogTreasuryPremiumTransferred(metadata.owner, riskpoolWalletAddress, netAmount);
-        require(success, "ERROR:TRS-032:PREMIUM_TRANSFER_FAILED");
+        // accounting events per policy
+        for (uint256 i = 0; i < processIds.length; i++) {
+            success[i] = payers[payerIdx[i]].paid;
 
-        emit LogTreasuryPremiumProcessed(processId, amount);
+            if (success[i]) {
+                emit LogTreasuryPremiumProcessed(processIds[i], amounts[i]);
+            }
+        }
     }
 
 
@@ -320,6 +484,7 @@ contract TreasuryModule is
         (uint256 riskpoolId, address riskpoolWalletAddress) = _getRiskpoolWallet(processId);
 
         IPolicy.Payout memory payout =  _policy.getPayout(processId, payoutId);
+        _forwardNetPremiums(token, riskpoolId, riskpoolWalletAddress);
         require(
             token.balanceOf(riskpoolWalletAddress) >= payout.amount, 
             "ERROR:TRS-042:RISKPOOL_WALLET_BALANCE_TOO_SMALL"
@@ -340,6 +505,40 @@ contract TreasuryModule is
         emit LogTreasuryPayoutProcessed(riskpoolId,  metadata.owner, payout.amount);
     }
 
+    /*
+     * Batch version of processPayout for policies of a single product (and therefore a single riskpool).
+     * Balance and allowance of the riskpool wallet are checked once for the total payout amount,
+     * the payouts of a policy holder are merged into a single transfer.
+     */
+    function processPayoutBatch(bytes32 [] calldata processIds, uint256 [] calldata payoutIds) 
+        external
+        whenNotSuspended
+        onlyPolicyFlow("Treasury")
+        instanceWalletDefined
+        returns(
+            uint256 [] memory feeAmounts,
+            uint256 [] memory netPayoutAmounts
+        )
+    {
+        require(processIds.length == payoutIds.length, "ERROR:TRS-045:BATCH_LENGTH_MISMATCH");
+
+        feeAmounts = new uint256[](processIds.length);
+        netPayoutAmounts = new uint256[](processIds.length);
+
+        if (processIds.length == 0) {
+            return (feeAmounts, netPayoutAmounts);
+        }
+
+        (
+            RecipientPayout [] memory recipients,
+            uint256 productId,
+            uint256 riskpoolId
+        ) = _calculatePayoutBatch(processIds, payoutIds, netPayoutAmounts);
+
+        _transferPayoutBatch(getComponentToken(productId), riskpoolId, recipients);
+    }
+
+
     function processCapital(uint256 bundleId, uint256 capitalAmount) 
         external override 
         whenNotSuspended
@@ -408,6 +607,7 @@ contract TreasuryModule is
         address bundleOwner = _bundle.getOwner(bundleId);
         IERC20 token = _componentToken[bundle.riskpoolId];
 
+        _forwardNetPremiums(token, bundle.riskpoolId, riskpoolWallet);
         require(
             token.balanceOf(riskpoolWallet) >= amount, 
             "ERROR:TRS-061:RISKPOOL_WALLET_BALANCE_TOO_SMALL"
@@ -455,6 +655,305 @@ contract TreasuryModule is
         return _riskpoolWallet[riskpoolId];
     }
 
+    function isFeeAccrualEnabled() external view returns(bool) {
+        return _feeAccrualEnabled;
+    }
+
+    // fees held by the treasury that are not yet swept to the instance wallet
+    function getAccruedFees(IERC20 token) external view returns(uint256 amount) {
+        for (uint256 i = 0; i < _component.riskpools(); i++) {
+            uint256 riskpoolId = _component.getRiskpoolId(i);
+            if (_componentToken[riskpoolId] == token) {
+                amount += _premiumAccrual[riskpoolId].fees;
+            }
+        }
+    }
+
+    // net premiums held by the treasury that are not yet forwarded to the riskpool wallet
+    function getPendingNetPremiums(uint256 riskpoolId) external view returns(uint256) {
+        return _premiumAccrual[riskpoolId].netPremiums;
+    }
+
+
+    function _processPremium(bytes32 processId, uint256 amount, IProcessContext.ProcessContext memory context)
+        internal
+        returns(
+            bool success, 
+            uint256 feeAmount, 
+            uint256 netAmount
+        ) 
+    {
+        IPolicy.Policy memory policy = context.policy;
+        require(
+            policy.premiumPaidAmount + amount <= policy.premiumExpectedAmount, 
+            "ERROR:TRS-030:AMOUNT_TOO_BIG"
+        );
+
+        IPolicy.Metadata memory metadata = context.metadata;
+        (feeAmount, netAmount) 
+            = calculateFee(metadata.productId, amount);
+
+        // check if allowance covers requested amount
+        IERC20 token = getComponentToken(metadata.productId);
+        if (token.allowance(metadata.owner, address(this)) < amount) {
+            success = false;
+            return (success, feeAmount, netAmount);
+        }
+
+        if (_feeAccrualEnabled) {
+            // with fee accrual the treasury holds the premium, the net premium is forwarded later
+            success = TransferHelper.unifiedTransferFrom(token, metadata.owner, address(this), amount);
+            emit LogTreasuryPremiumTransferred(metadata.owner, address(this), amount);
+            require(success, "ERROR:TRS-032:PREMIUM_TRANSFER_FAILED");
+
+            _accruePremium(token, metadata.productId, context.riskpoolId, feeAmount, netAmount);
+        } else {
+            // collect premium fees
+            success = TransferHelper.unifiedTransferFrom(token, metadata.owner, _instanceWalletAddress, feeAmount);
+            emit LogTreasuryFeesTransferred(metadata.owner, _instanceWalletAddress, feeAmount);
+            require(success, "ERROR:TRS-031:FEE_TRANSFER_FAILED");
+
+            // actual transfer of net premium to riskpool
+            address riskpoolWalletAddress = _riskpoolWallet[context.riskpoolId];
+            success = TransferHelper.unifiedTransferFrom(token, metadata.owner, riskpoolWalletAddress, netAmount);
+            emit LogTreasuryPremiumTransferred(metadata.owner, riskpoolWalletAddress, netAmount);
+            require(success, "ERROR:TRS-032:PREMIUM_TRANSFER_FAILED");
+        }
+
+        emit LogTreasuryPremiumProcessed(processId, amount);
+    }
+
+    // calculates fees per policy and aggregates fee and net premium amounts per payer
+    function _calculatePremiumBatch(
+        bytes32 [] calldata processIds, 
+        uint256 [] calldata amounts,
+        uint256 [] memory feeAmounts,
+        uint256 [] memory netAmounts
+    )
+        internal
+        view
+        returns(
+            PayerPremium [] memory payers,
+            uint256 [] memory payerIdx,
+            uint256 productId,
+            uint256 riskpoolId
+        )
+    {
+        payers = new PayerPremium[](processIds.length);
+        payerIdx = new uint256[](processIds.length);
+
+        IProcessContext.ProcessContext memory context = _policy.getProcessContext(processIds[0]);
+        productId = context.metadata.productId;
+        riskpoolId = context.riskpoolId;
+
+        FeeSpecification memory feeSpec = getFeeSpecification(productId);
+        require(feeSpec.createdAt > 0, "ERROR:TRS-034:FEE_SPEC_UNDEFINED");
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            if (i > 0) {
+                context = _policy.getProcessContext(processIds[i]);
+                require(context.metadata.productId == productId, "ERROR:TRS-035:BATCH_PRODUCT_MISMATCH");
+            }
+
+            require(
+                context.policy.premiumPaidAmount + amounts[i] <= context.policy.premiumExpectedAmount, 
+                "ERROR:TRS-036:AMOUNT_TOO_BIG"
+            );
+
+            feeAmounts[i] = _calculateFee(feeSpec, amounts[i]);
+            netAmounts[i] = amounts[i] - feeAmounts[i];
+            payerIdx[i] = _addPayerPremium(payers, context.metadata.owner, feeAmounts[i], netAmounts[i]);
+        }
+    }
+
+    function _addPayerPremium(
+        PayerPremium [] memory payers,
+        address payer,
+        uint256 feeAmount,
+        uint256 netAmount
+    )
+        internal
+        pure
+        returns(uint256 idx)
+    {
+        // batches typically have a single or a few payers
+        while (payers[idx].payer != address(0) && payers[idx].payer != payer) {
+            idx++;
+        }
+
+        payers[idx].payer = payer;
+        payers[idx].feeAmount += feeAmount;
+        payers[idx].netAmount += netAmount;
+    }
+
+    function _transferPremiumBatch(
+        IERC20 token,
+        uint256 productId,
+        uint256 riskpoolId,
+        PayerPremium [] memory payers
+    )
+        internal
+    {
+        address riskpoolWalletAddress = _getDefinedRiskpoolWallet(riskpoolId);
+        bool feeAccrualEnabled = _feeAccrualEnabled;
+        uint256 accruedFees = 0;
+        uint256 accruedNetPremiums = 0;
+
+        for (uint256 i = 0; i < payers.length && payers[i].payer != address(0); i++) {
+            PayerPremium memory payer = payers[i];
+
+            // check if allowance covers aggregated amount
+            if (token.allowance(payer.payer, address(this)) < payer.feeAmount + payer.netAmount) {
+                continue;
+            }
+
+            bool success;
+            if (feeAccrualEnabled) {
+                // with fee accrual the treasury holds the premiums, the net premiums are forwarded later
+                success = TransferHelper.unifiedTransferFrom(token, payer.payer, address(this), payer.feeAmount + payer.netAmount);
+                emit LogTreasuryPremiumTransferred(payer.payer, address(this), payer.feeAmount + payer.netAmount);
+                require(success, "ERROR:TRS-039:PREMIUM_TRANSFER_FAILED");
+
+                accruedFees += payer.feeAmount;
+                accruedNetPremiums += payer.netAmount;
+            } else {
+                // collect premium fees
+                success = TransferHelper.unifiedTransferFrom(token, payer.payer, _instanceWalletAddress, payer.feeAmount);
+                emit LogTreasuryFeesTransferred(payer.payer, _instanceWalletAddress, payer.feeAmount);
+                require(success, "ERROR:TRS-038:FEE_TRANSFER_FAILED");
+
+                // transfer net premium to riskpool
+                success = TransferHelper.unifiedTransferFrom(token, payer.payer, riskpoolWalletAddress, payer.netAmount);
+                emit LogTreasuryPremiumTransferred(payer.payer, riskpoolWalletAddress, payer.netAmount);
+                require(success, "ERROR:TRS-039:PREMIUM_TRANSFER_FAILED");
+            }
+
+            payer.paid = true;
+        }
+
+        if (accruedFees + accruedNetPremiums > 0) {
+            _accruePremium(token, productId, riskpoolId, accruedFees, accruedNetPremiums);
+        }
+    }
+
+    // single storage write per premium, fees and net premiums share the slot of the riskpool
+    function _accruePremium(
+        IERC20 token,
+        uint256 productId,
+        uint256 riskpoolId,
+        uint256 feeAmount,
+        uint256 netAmount
+    )
+        internal
+    {
+        PremiumAccrual memory accrual = _premiumAccrual[riskpoolId];
+        accrual.fees = SafeCast.toUint128(accrual.fees + feeAmount);
+        accrual.netPremiums = SafeCast.toUint128(accrual.netPremiums + netAmount);
+        _premiumAccrual[riskpoolId] = accrual;
+
+        emit LogTreasuryFeesAccrued(address(token), productId, feeAmount);
+    }
+
+    // transfers the net premiums held for the riskpool with a single transfer
+    function _forwardNetPremiums(IERC20 token, uint256 riskpoolId, address riskpoolWalletAddress)
+        internal
+        returns(uint256 amount)
+    {
+        amount = _premiumAccrual[riskpoolId].netPremiums;
+        if (amount == 0) {
+            return amount;
+        }
+
+        _premiumAccrual[riskpoolId].netPremiums = 0;
+        bool success = TransferHelper.unifiedTransfer(token, riskpoolWalletAddress, amount);
+
+        emit LogTreasuryPremiumTransferred(address(this), riskpoolWalletAddress, amount);
+        require(success, "ERROR:TRS-041:PREMIUM_FORWARD_FAILED");
+
+        emit LogTreasuryNetPremiumsForwarded(riskpoolId, riskpoolWalletAddress, amount);
+    }
+
+    // merges the payouts per policy holder, emits the accounting events per payout
+    function _calculatePayoutBatch(
+        bytes32 [] calldata processIds, 
+        uint256 [] calldata payoutIds,
+        uint256 [] memory netPayoutAmounts
+    )
+        internal
+        returns(
+            RecipientPayout [] memory recipients,
+            uint256 productId,
+            uint256 riskpoolId
+        )
+    {
+        recipients = new RecipientPayout[](processIds.length);
+        productId = _policy.getMetadata(processIds[0]).productId;
+        riskpoolId = _pool.getRiskPoolForProduct(productId);
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            IPolicy.Metadata memory metadata = _policy.getMetadata(processIds[i]);
+            require(metadata.productId == productId, "ERROR:TRS-046:BATCH_PRODUCT_MISMATCH");
+
+            // payouts are not subject to fees
+            netPayoutAmounts[i] = _policy.getPayout(processIds[i], payoutIds[i]).amount;
+
+            uint256 idx = 0;
+            while (recipients[idx].recipient != address(0) && recipients[idx].recipient != metadata.owner) {
+                idx++;
+            }
+
+            recipients[idx].recipient = metadata.owner;
+            recipients[idx].amount += netPayoutAmounts[i];
+
+            emit LogTreasuryPayoutProcessed(riskpoolId, metadata.owner, netPayoutAmounts[i]);
+        }
+    }
+
+    function _transferPayoutBatch(
+        IERC20 token,
+        uint256 riskpoolId,
+        RecipientPayout [] memory recipients
+    )
+        internal
+    {
+        address riskpoolWalletAddress = _getDefinedRiskpoolWallet(riskpoolId);
+        _forwardNetPremiums(token, riskpoolId, riskpoolWalletAddress);
+
+        // check balance and allowance once for the total payout amount
+        uint256 totalAmount = 0;
+        uint256 numberOfRecipients = 0;
+        while (numberOfRecipients < recipients.length && recipients[numberOfRecipients].recipient != address(0)) {
+            totalAmount += recipients[numberOfRecipients].amount;
+            numberOfRecipients++;
+        }
+
+        require(
+            token.balanceOf(riskpoolWalletAddress) >= totalAmount, 
+            "ERROR:TRS-047:RISKPOOL_WALLET_BALANCE_TOO_SMALL"
+        );
+        require(
+            token.allowance(riskpoolWalletAddress, address(this)) >= totalAmount, 
+            "ERROR:TRS-048:PAYOUT_ALLOWANCE_TOO_SMALL"
+        );
+
+        // one transfer per policy holder
+        for (uint256 i = 0; i < numberOfRecipients; i++) {
+            RecipientPayout memory payout = recipients[i];
+            bool success = TransferHelper.unifiedTransferFrom(token, riskpoolWalletAddress, payout.recipient, payout.amount);
+
+            emit LogTreasuryPayoutTransferred(riskpoolWalletAddress, payout.recipient, payout.amount);
+            require(success, "ERROR:TRS-049:PAYOUT_TRANSFER_FAILED");
+        }
+    }
+
+    function _getDefinedRiskpoolWallet(uint256 riskpoolId)
+        internal
+        view
+        returns(address riskpoolWalletAddress)
+    {
+        riskpoolWalletAddress = _riskpoolWallet[riskpoolId];
+        require(riskpoolWalletAddress != address(0), "ERROR:TRS-037:RISKPOOL_WALLET_UNDEFINED");
+    }
 
     function _calculatePremiumFee(
         FeeSpecification memory feeSpec, 
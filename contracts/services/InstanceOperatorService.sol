@@ -257,4 +257,36 @@ contract InstanceOperatorService is
     {
         _treasury.setCapitalFees(feeSpec);
     }
+
+    function setFeeAccrual(bool enabled) 
+        external
+        onlyInstanceOperatorAddress
+    {
+        _treasury.setFeeAccrual(enabled);
+    }
+
+    function sweepFees(IERC20 token) 
+        external
+        onlyInstanceOperatorAddress
+        returns(uint256 amount)
+    {
+        amount = _treasury.sweepFees(token);
+    }
+
+    function forwardNetPremiums(uint256 riskpoolId) 
+        external
+        onlyInstanceOperatorAddress
+        returns(uint256 amount)
+    {
+        amount = _treasury.forwardNetPremiums(riskpoolId);
+    }
+
+    /* accounting history, enabling is final */
+    function enableRiskpoolCheckpointing(uint256 riskpoolId) 
+        external
+        onlyInstanceOperatorAddress
+    {
+        _pool.enableCheckpointing(riskpoolId);
+        BundleController(_getContractAddress("Bundle")).enableCheckpointing(riskpoolId);
+    }
 }
@@ -287,6 +287,18 @@ contract InstanceService is
         return _pool.getMaximumNumberOfActiveBundles(riskpoolId);
     }
 
+    function getActiveBundleIdWithMaxCapacity(uint256 riskpoolId) external view returns(uint256 bundleId, uint256 capacityAmount) {
+        return _pool.getActiveBundleIdWithMaxCapacity(riskpoolId);
+    }
+
+    function getRiskpoolCheckpointAtBlock(uint256 riskpoolId, uint256 blockNumber) external view returns(AccountingCheckpoints.Checkpoint memory checkpoint) {
+        return _pool.getCheckpointAtBlock(riskpoolId, blockNumber);
+    }
+
+    function getRiskpoolCheckpointAtTimestamp(uint256 riskpoolId, uint256 timestamp) external view returns(AccountingCheckpoints.Checkpoint memory checkpoint) {
+        return _pool.getCheckpointAtTimestamp(riskpoolId, timestamp);
+    }
+
     /* bundle */
     function getBundleToken() external override view returns(IBundleToken token) {
         BundleToken bundleToken = _bundle.getToken();
@@ -297,6 +309,14 @@ contract InstanceService is
         bundle = _bundle.getBundle(bundleId);
     }
 
+    function getBundleCheckpointAtBlock(uint256 bundleId, uint256 blockNumber) external view returns(AccountingCheckpoints.Checkpoint memory checkpoint) {
+        return _bundle.getCheckpointAtBlock(bundleId, blockNumber);
+    }
+
+    function getBundleCheckpointAtTimestamp(uint256 bundleId, uint256 timestamp) external view returns(AccountingCheckpoints.Checkpoint memory checkpoint) {
+        return _bundle.getCheckpointAtTimestamp(bundleId, timestamp);
+    }
+
     function bundles() external override view returns (uint256) {
         return _bundle.bundles();
     }
@@ -325,4 +345,16 @@ contract InstanceService is
     function getFeeFractionFullUnit() external override view returns(uint256) {
         return _treasury.getFractionFullUnit();
     }
+
+    function isFeeAccrualEnabled() external view returns(bool) {
+        return _treasury.isFeeAccrualEnabled();
+    }
+
+    function getAccruedFees(IERC20 token) external view returns(uint256) {
+        return _treasury.getAccruedFees(token);
+    }
+
+    function getPendingNetPremiums(uint256 riskpoolId) external view returns(uint256) {
+        return _treasury.getPendingNetPremiums(riskpoolId);
+    }
 }
@@ -1,6 +1,7 @@
 // SPDX-License-Identifier: Apache-2.0
 pragma solidity 0.8.2;
 
+import "../modules/QueryModule.sol";
 import "../shared/CoreController.sol";
 
 import "@etherisc/gif-interface/contracts/modules/IQuery.sol";
@@ -21,4 +22,12 @@ contract OracleService is
         // function below enforces msg.sender to be a registered oracle
         _query.respond(_requestId, _msgSender(), _data);
     }
+
+    function respondBatch(uint256 [] calldata _requestIds, bytes [] calldata _data) 
+        external
+        returns(bool [] memory _success)
+    {
+        // requests the sender is not responsible for are rejected per request
+        _success = QueryModule(address(_query)).respondBatch(_requestIds, _msgSender(), _data);
+    }
 }
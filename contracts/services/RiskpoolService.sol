@@ -21,6 +21,9 @@ contract RiskpoolService is
     PoolController private _pool;
     TreasuryModule private _treasury;
 
+    // riskpools that maintain the capacity index of their active bundles
+    mapping(address /* riskpool */ => bool /* capacity indexed */) private _capacityIndexed;
+
     modifier onlyProposedRiskpool() {
         uint256 componentId = _component.getComponentId(_msgSender());
         require(
@@ -133,6 +136,35 @@ contract RiskpoolService is
 
         _bundle.fund(bundleId, netCapital);
         _pool.fund(riskpoolId, netCapital);
+        _updateBundleCapacity(bundleId);
+    }
+
+
+    // opt in to the capacity index of the pool module (see CapacityIndexedRiskpool)
+    function enableCapacityIndex()
+        external
+        onlyActiveRiskpool
+    {
+        uint256 riskpoolId = _component.getComponentId(_msgSender());
+        _capacityIndexed[_msgSender()] = true;
+        _pool.enableCapacityIndex(riskpoolId);
+    }
+
+
+    // creates the treasury allowance for the capital of owner with an EIP-2612 permit
+    function permitCapital(
+        address owner, 
+        uint256 amount,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    )
+        external
+        onlyActiveRiskpool
+    {
+        uint256 riskpoolId = _component.getComponentId(_msgSender());
+        _treasury.processPermit(riskpoolId, owner, amount, deadline, v, r, s);
     }
 
 
@@ -153,6 +185,7 @@ contract RiskpoolService is
 
         _bundle.fund(bundleId, netAmount);
         _pool.fund(bundle.riskpoolId, netAmount);
+        _updateBundleCapacity(bundleId);
     }
 
 
@@ -173,6 +206,7 @@ contract RiskpoolService is
 
         _bundle.defund(bundleId, amount);
         _pool.defund(bundle.riskpoolId, netAmount);
+        _updateBundleCapacity(bundleId);
     }
 
 
@@ -231,6 +265,7 @@ contract RiskpoolService is
         onlyOwningRiskpool(bundleId, true)  
     {
         _bundle.collateralizePolicy(bundleId, processId, collateralAmount);
+        _updateBundleCapacity(bundleId);
     }
 
     function processPremium(uint256 bundleId, bytes32 processId, uint256 amount)
@@ -245,6 +280,7 @@ contract RiskpoolService is
         onlyOwningRiskpool(bundleId, true)  
     {
         _bundle.processPayout(bundleId, processId, amount);
+        _updateBundleCapacity(bundleId);
     }
 
     function releasePolicy(uint256 bundleId, bytes32 processId)
@@ -253,6 +289,16 @@ contract RiskpoolService is
         returns(uint256 collateralAmount)
     {
         collateralAmount = _bundle.releasePolicy(bundleId, processId);
+        _updateBundleCapacity(bundleId);
+    }
+
+    function releasePolicyBatch(uint256 bundleId, bytes32 [] calldata processIds)
+        external
+        onlyOwningRiskpool(bundleId, false)
+        returns(uint256 collateralAmount)
+    {
+        collateralAmount = _bundle.releasePolicyBatch(bundleId, processIds);
+        _updateBundleCapacity(bundleId);
     }
 
     function setMaximumNumberOfActiveBundles(uint256 riskpoolId, uint256 maxNumberOfActiveBundles)
@@ -261,4 +307,11 @@ contract RiskpoolService is
     {
         _pool.setMaximumNumberOfActiveBundles(riskpoolId, maxNumberOfActiveBundles);
     }   
+
+    // only called from functions restricted to the riskpool owning the bundle
+    function _updateBundleCapacity(uint256 bundleId) internal {
+        if (_capacityIndexed[_msgSender()]) {
+            _pool.updateBundleCapacity(_component.getComponentId(_msgSender()), bundleId);
+        }
+    }
 }
@@ -0,0 +1,104 @@
+// SPDX-License-Identifier: Apache-2.0
+pragma solidity 0.8.2;
+
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
+
+// append only history of bundle/riskpool accounting values
+// at most one checkpoint per block, checkpoints are ordered by block number (and timestamp)
+// a checkpoint is packed into 3 storage slots, the last slot stays empty for bundles
+library AccountingCheckpoints {
+
+    struct Checkpoint {
+        uint64 blockNumber;
+        uint64 timestamp;
+        uint128 capital;
+        uint128 lockedCapital;
+        uint128 balance;
+        uint128 sumOfSumInsuredAtRisk;
+    }
+
+    struct History {
+        Checkpoint [] checkpoints;
+    }
+
+    function length(History storage history) internal view returns(uint256) {
+        return history.checkpoints.length;
+    }
+
+    function at(History storage history, uint256 idx) internal view returns(Checkpoint memory checkpoint) {
+        require(idx < history.checkpoints.length, "ERROR:ACP-001:INDEX_TOO_LARGE");
+        checkpoint = history.checkpoints[idx];
+    }
+
+    // adds a checkpoint for the current block, replaces the latest checkpoint when written in the same block
+    function push(
+        History storage history,
+        uint256 capital,
+        uint256 lockedCapital,
+        uint256 balance,
+        uint256 sumOfSumInsuredAtRisk
+    )
+        internal
+    {
+        uint256 checkpoints = history.checkpoints.length;
+        Checkpoint storage checkpoint;
+
+        if (checkpoints > 0 && history.checkpoints[checkpoints - 1].blockNumber == block.number) {
+            checkpoint = history.checkpoints[checkpoints - 1];
+        } else {
+            checkpoint = history.checkpoints.push();
+            checkpoint.blockNumber = SafeCast.toUint64(block.number);
+            checkpoint.timestamp = SafeCast.toUint64(block.timestamp); // solhint-disable-line
+        }
+
+        checkpoint.capital = SafeCast.toUint128(capital);
+        checkpoint.lockedCapital = SafeCast.toUint128(lockedCapital);
+        checkpoint.balance = SafeCast.toUint128(balance);
+        checkpoint.sumOfSumInsuredAtRisk = SafeCast.toUint128(sumOfSumInsuredAtRisk);
+    }
+
+    // latest checkpoint with checkpoint.blockNumber <= blockNumber
+    function lookupByBlock(History storage history, uint256 blockNumber)
+        internal
+        view
+        returns(bool found, Checkpoint memory checkpoint)
+    {
+        return _lookup(history, blockNumber, false);
+    }
+
+    // latest checkpoint with checkpoint.timestamp <= timestamp
+    function lookupByTimestamp(History storage history, uint256 timestamp)
+        internal
+        view
+        returns(bool found, Checkpoint memory checkpoint)
+    {
+        return _lookup(history, timestamp, true);
+    }
+
+    function _lookup(History storage history, uint256 value, bool byTimestamp)
+        private
+        view
+        returns(bool found, Checkpoint memory checkpoint)
+    {
+        // binary search for the first checkpoint after value
+        uint256 low = 0;
+        uint256 high = history.checkpoints.length;
+
+        while (low < high) {
+            uint256 mid = (low + high) / 2;
+            Checkpoint storage candidate = history.checkpoints[mid];
+            uint256 key = byTimestamp ? candidate.timestamp : candidate.blockNumber;
+
+            if (key > value) {
+                high = mid;
+            } else {
+                low = mid + 1;
+            }
+        }
+
+        if (low > 0) {
+            found = true;
+            checkpoint = history.checkpoints[low - 1];
+        }
+    }
+}
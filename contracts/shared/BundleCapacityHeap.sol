@@ -0,0 +1,145 @@
+// SPDX-License-Identifier: Apache-2.0
+pragma solidity 0.8.2;
+
+// binary max heap of bundle ids ordered by free capacity (capital - locked capital)
+// the bundle with the largest capacity is always at index 0
+// insert, update and remove are O(log n), reading the top element is O(1)
+library BundleCapacityHeap {
+
+    struct Heap {
+        uint256 [] bundleIds;
+        mapping(uint256 /* bundleId */ => uint256 /* heap index + 1 */) position;
+        mapping(uint256 /* bundleId */ => uint256 /* capacity */) capacity;
+    }
+
+    function size(Heap storage heap) internal view returns(uint256) {
+        return heap.bundleIds.length;
+    }
+
+    function contains(Heap storage heap, uint256 bundleId) internal view returns(bool) {
+        return heap.position[bundleId] > 0;
+    }
+
+    function capacityOf(Heap storage heap, uint256 bundleId) internal view returns(uint256) {
+        return heap.capacity[bundleId];
+    }
+
+    function at(Heap storage heap, uint256 idx) internal view returns(uint256 bundleId, uint256 capacity) {
+        require(idx < heap.bundleIds.length, "ERROR:BCH-001:INDEX_TOO_LARGE");
+        bundleId = heap.bundleIds[idx];
+        capacity = heap.capacity[bundleId];
+    }
+
+    function top(Heap storage heap) internal view returns(uint256 bundleId, uint256 capacity) {
+        if (heap.bundleIds.length == 0) {
+            return (0, 0);
+        }
+
+        bundleId = heap.bundleIds[0];
+        capacity = heap.capacity[bundleId];
+    }
+
+    // inserts bundle if not yet in heap, updates its capacity otherwise
+    function set(Heap storage heap, uint256 bundleId, uint256 capacity) internal {
+        uint256 position = heap.position[bundleId];
+
+        if (position == 0) {
+            heap.bundleIds.push(bundleId);
+            heap.position[bundleId] = heap.bundleIds.length;
+            heap.capacity[bundleId] = capacity;
+            _siftUp(heap, heap.bundleIds.length - 1);
+            return;
+        }
+
+        uint256 oldCapacity = heap.capacity[bundleId];
+        heap.capacity[bundleId] = capacity;
+
+        if (capacity > oldCapacity) {
+            _siftUp(heap, position - 1);
+        } else if (capacity < oldCapacity) {
+            _siftDown(heap, position - 1);
+        }
+    }
+
+    function remove(Heap storage heap, uint256 bundleId) internal {
+        uint256 position = heap.position[bundleId];
+        require(position > 0, "ERROR:BCH-002:BUNDLE_NOT_IN_HEAP");
+
+        uint256 idx = position - 1;
+        uint256 lastIdx = heap.bundleIds.length - 1;
+        uint256 lastBundleId = heap.bundleIds[lastIdx];
+
+        // move last element into the gap
+        heap.bundleIds[idx] = lastBundleId;
+        heap.position[lastBundleId] = position;
+        heap.bundleIds.pop();
+
+        delete heap.position[bundleId];
+        delete heap.capacity[bundleId];
+
+        // restore heap property for moved element
+        if (idx < lastIdx) {
+            _siftUp(heap, idx);
+            _siftDown(heap, heap.position[lastBundleId] - 1);
+        }
+    }
+
+    function _siftUp(Heap storage heap, uint256 idx) private {
+        uint256 bundleId = heap.bundleIds[idx];
+        uint256 capacity = heap.capacity[bundleId];
+
+        while (idx > 0) {
+            uint256 parentIdx = (idx - 1) / 2;
+            uint256 parentId = heap.bundleIds[parentIdx];
+
+            if (heap.capacity[parentId] >= capacity) {
+                break;
+            }
+
+            heap.bundleIds[idx] = parentId;
+            heap.position[parentId] = idx + 1;
+            idx = parentIdx;
+        }
+
+        heap.bundleIds[idx] = bundleId;
+        heap.position[bundleId] = idx + 1;
+    }
+
+    function _siftDown(Heap storage heap, uint256 idx) private {
+        uint256 length = heap.bundleIds.length;
+        uint256 bundleId = heap.bundleIds[idx];
+        uint256 capacity = heap.capacity[bundleId];
+
+        while (true) {
+            uint256 childIdx = 2 * idx + 1;
+            if (childIdx >= length) {
+                break;
+            }
+
+            uint256 childId = heap.bundleIds[childIdx];
+            uint256 childCapacity = heap.capacity[childId];
+
+            if (childIdx + 1 < length) {
+                uint256 rightId = heap.bundleIds[childIdx + 1];
+                uint256 rightCapacity = heap.capacity[rightId];
+
+                if (rightCapacity > childCapacity) {
+                    childIdx += 1;
+                    childId = rightId;
+                    childCapacity = rightCapacity;
+                }
+            }
+
+            if (capacity >= childCapacity) {
+                break;
+            }
+
+            heap.bundleIds[idx] = childId;
+            heap.position[childId] = idx + 1;
+            idx = childIdx;
+        }
+
+        heap.bundleIds[idx] = bundleId;
+        heap.position[bundleId] = idx + 1;
+    }
+}
@@ -0,0 +1,153 @@
+// SPDX-License-Identifier: Apache-2.0
+pragma solidity 0.8.2;
+
+import "./IRiskpoolBatchRelease.sol";
+import "../services/InstanceService.sol";
+import "../services/RiskpoolService.sol";
+
+import "@etherisc/gif-interface/contracts/components/Riskpool.sol";
+import "@etherisc/gif-interface/contracts/modules/IBundle.sol";
+import "@etherisc/gif-interface/contracts/modules/IPolicy.sol";
+
+// basic riskpool variant: a policy is collateralized by a single bundle
+// instead of walking the active bundles round robin the bundle with the
+// largest free capacity is taken from the capacity index of the pool module.
+// only when this bundle does not match the application the active bundles
+// are scanned linearly for a matching bundle with sufficient capacity.
+// the riskpool opts in to the capacity index on approval, other riskpools
+// do not pay for maintaining the index.
+abstract contract CapacityIndexedRiskpool is 
+    Riskpool,
+    IRiskpoolBatchRelease
+{
+
+    event LogCapacityRiskpoolBundleSelected(uint256 bundleId, bytes32 processId, uint256 capacityAmount, bool fromIndex);
+    event LogCapacityRiskpoolNoBundleFound(bytes32 processId, uint256 collateralAmount);
+
+    // remember bundleId for each processId
+    mapping(bytes32 /* processId */ => uint256 /* bundleId */) internal _collateralizedBy;
+
+    constructor(
+        bytes32 name,
+        uint256 collateralization,
+        uint256 sumOfSumInsuredCap,
+        address erc20Token,
+        address wallet,
+        address registry
+    )
+        Riskpool(name, collateralization, sumOfSumInsuredCap, erc20Token, wallet, registry)
+    { }
+
+    function supportsBatchRelease() external pure override returns(bool) {
+        return true;
+    }
+
+    // releases policies grouped by collateralizing bundle, each bundle is updated once
+    function releasePolicyBatch(bytes32 [] calldata processIds)
+        external override
+        returns(uint256 collateralAmount)
+    {
+        require(_msgSender() == _getContractAddress("Pool"), "ERROR:CIR-002:NOT_POOL");
+
+        RiskpoolService riskpoolService = RiskpoolService(address(_riskpoolService));
+        bool [] memory released = new bool[](processIds.length);
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            if (released[i]) {
+                continue;
+            }
+
+            uint256 bundleId = _collateralizedBy[processIds[i]];
+            uint256 policies = 0;
+            for (uint256 j = i; j < processIds.length; j++) {
+                if (!released[j] && _collateralizedBy[processIds[j]] == bundleId) {
+                    policies++;
+                }
+            }
+
+            bytes32 [] memory bundleProcessIds = new bytes32[](policies);
+            uint256 k = 0;
+            for (uint256 j = i; j < processIds.length; j++) {
+                if (!released[j] && _collateralizedBy[processIds[j]] == bundleId) {
+                    bundleProcessIds[k++] = processIds[j];
+                    released[j] = true;
+                }
+            }
+
+            collateralAmount += riskpoolService.releasePolicyBatch(bundleId, bundleProcessIds);
+        }
+    }
+
+    function _afterApprove() internal override virtual {
+        RiskpoolService(address(_riskpoolService)).enableCapacityIndex();
+        super._afterApprove();
+    }
+
+    function _lockCollateral(bytes32 processId, uint256 collateralAmount)
+        internal override
+        returns(bool success)
+    {
+        uint256 riskpoolId = getId();
+        require(_instanceService.activeBundles(riskpoolId) > 0, "ERROR:CIR-001:NO_ACTIVE_BUNDLES");
+
+        (uint256 bundleId, uint256 capacityAmount) = InstanceService(address(_instanceService)).getActiveBundleIdWithMaxCapacity(riskpoolId);
+
+        // no active bundle has sufficient capacity
+        if (capacityAmount < collateralAmount) {
+            emit LogCapacityRiskpoolNoBundleFound(processId, collateralAmount);
+            return false;
+        }
+
+        IPolicy.Application memory application = _instanceService.getApplication(processId);
+        IBundle.Bundle memory bundle = _instanceService.getBundle(bundleId);
+
+        if (bundleMatchesApplication(bundle, application)) {
+            _collateralizeWithBundle(bundleId, processId, collateralAmount);
+            emit LogCapacityRiskpoolBundleSelected(bundleId, processId, capacityAmount, true);
+            return true;
+        }
+
+        // fallback for riskpools with filtering bundles
+        uint256 activeBundles = _instanceService.activeBundles(riskpoolId);
+        for (uint256 i = 0; i < activeBundles; i++) {
+            bundleId = _instanceService.getActiveBundleId(riskpoolId, i);
+            bundle = _instanceService.getBundle(bundleId);
+            capacityAmount = bundle.capital - bundle.lockedCapital;
+
+            if (capacityAmount >= collateralAmount && bundleMatchesApplication(bundle, application)) {
+                _collateralizeWithBundle(bundleId, processId, collateralAmount);
+                emit LogCapacityRiskpoolBundleSelected(bundleId, processId, capacityAmount, false);
+                return true;
+            }
+        }
+
+        emit LogCapacityRiskpoolNoBundleFound(processId, collateralAmount);
+    }
+
+    function _processPayout(bytes32 processId, uint256 amount)
+        internal override
+    {
+        uint256 bundleId = _collateralizedBy[processId];
+        _riskpoolService.processPayout(bundleId, processId, amount);
+    }
+
+    function _processPremium(bytes32 processId, uint256 amount)
+        internal override
+    {
+        uint256 bundleId = _collateralizedBy[processId];
+        _riskpoolService.processPremium(bundleId, processId, amount);
+    }
+
+    function _releaseCollateral(bytes32 processId)
+        internal override
+        returns(uint256 collateralAmount)
+    {
+        uint256 bundleId = _collateralizedBy[processId];
+        collateralAmount = _riskpoolService.releasePolicy(bundleId, processId);
+    }
+
+    function _collateralizeWithBundle(uint256 bundleId, bytes32 processId, uint256 collateralAmount) internal {
+        _riskpoolService.collateralizePolicy(bundleId, processId, collateralAmount);
+        _collateralizedBy[processId] = bundleId;
+    }
+}
@@ -0,0 +1,25 @@
+// SPDX-License-Identifier: Apache-2.0
+pragma solidity 0.8.2;
+
+import "@etherisc/gif-interface/contracts/modules/IPolicy.sol";
+
+// consolidated view on a process for policy flows and modules
+// application and policy are empty (createdAt == 0) when not (yet) created
+// modules accepting a context check that processId and riskpoolId match their own state
+interface IProcessContext {
+
+    struct ProcessContext {
+        bytes32 processId;
+        IPolicy.Metadata metadata;
+        IPolicy.Application application;
+        IPolicy.Policy policy;
+        uint256 riskpoolId;
+    }
+}
+
+// riskpool lookup of the pool module, used to fill in the process context
+// without a dependency of the policy controller on the pool controller
+interface IRiskpoolForProduct {
+
+    function getRiskPoolForProduct(uint256 productId) external view returns(uint256 riskpoolId);
+}
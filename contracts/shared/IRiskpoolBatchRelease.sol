@@ -0,0 +1,15 @@
+// SPDX-License-Identifier: Apache-2.0
+pragma solidity 0.8.2;
+
+// optional riskpool extension to release the collateral of many policies in one call
+// the pool module only uses the batch function when supportsBatchRelease returns true
+// unlike IRiskpool.releasePolicy the batch does not emit LogRiskpoolCollateralReleased per policy,
+// the released amount per policy is logged by the pool (LogRiskpoolCollateralReleased) and 
+// bundle (LogBundlePolicyReleased) modules. policies whose locked collateral was fully paid
+// out are released like by IRiskpool.releasePolicy
+interface IRiskpoolBatchRelease {
+
+    function supportsBatchRelease() external view returns(bool);
+
+    function releasePolicyBatch(bytes32 [] calldata processIds) external returns(uint256 collateralAmount);
+}
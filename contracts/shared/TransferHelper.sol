@@ -57,4 +57,45 @@ library TransferHelper {
             emit LogTransferHelperCallFailed(callSuccess, data.length, data);
         }
     }
-}
\ No newline at end of file
+
+    // transfer of tokens held by the calling contract, no allowance involved
+    function unifiedTransfer(
+        IERC20 token,
+        address to,
+        uint256 value
+    )
+        internal
+        returns(bool success)
+    {
+        // input validation step 1
+        address tokenAddress = address(token);
+        bool tokenIsContract = (tokenAddress.code.length > 0);
+        if (to == address (0) || !tokenIsContract) {
+            emit LogTransferHelperInputValidation1Failed(tokenIsContract, address(this), to);
+            return false;
+        }
+        
+        // input validation step 2, reports the requested value in place of the allowance
+        uint256 balance = token.balanceOf(address(this));
+        if (balance < value) {
+            emit LogTransferHelperInputValidation2Failed(balance, value);
+            return false;
+        }
+
+        // low-level call to transfer
+        // bytes4(keccak256(bytes('transfer(address,uint256)')));
+        (bool callSuccess, bytes memory data) = address(token).call(
+            abi.encodeWithSelector(
+                0xa9059cbb, 
+                to, 
+                value));
+
+        success = callSuccess && (false
+            || data.length == 0 
+            || (data.length == 32 && abi.decode(data, (bool))));
+
+        if (!success) {
+            emit LogTransferHelperCallFailed(callSuccess, data.length, data);
+        }
+    }
+}
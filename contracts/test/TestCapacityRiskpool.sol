@@ -0,0 +1,41 @@
+// SPDX-License-Identifier: Apache-2.0
+pragma solidity 0.8.2;
+
+import "../shared/CapacityIndexedRiskpool.sol";
+
+import "@etherisc/gif-interface/contracts/modules/IBundle.sol";
+import "@etherisc/gif-interface/contracts/modules/IPolicy.sol";
+
+contract TestCapacityRiskpool is CapacityIndexedRiskpool {
+
+    uint256 public constant SUM_OF_SUM_INSURED_CAP = 10**24;
+
+    constructor(
+        bytes32 name,
+        uint256 collateralization,
+        address erc20Token,
+        address wallet,
+        address registry
+    )
+        CapacityIndexedRiskpool(name, collateralization, SUM_OF_SUM_INSURED_CAP, erc20Token, wallet, registry)
+    { }
+
+    // empty filter matches every application
+    // otherwise filter holds the abi encoded max sum insured amount
+    function bundleMatchesApplication(
+        IBundle.Bundle memory bundle, 
+        IPolicy.Application memory application
+    ) 
+        public override
+        pure
+        returns(bool isMatching) 
+    {
+        if (bundle.filter.length == 0) {
+            return true;
+        }
+
+        uint256 maxSumInsuredAmount = abi.decode(bundle.filter, (uint256));
+        isMatching = application.sumInsuredAmount <= maxSumInsuredAmount;
+    }
+
+}
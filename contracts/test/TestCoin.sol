@@ -2,8 +2,10 @@
 pragma solidity 0.8.2;
 
 import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/extensions/draft-ERC20Permit.sol";
 
-contract TestCoin is ERC20 {
+// supports EIP-2612 permits to create allowances without an approve transaction
+contract TestCoin is ERC20Permit {
 
     string public constant NAME = "Test Dummy";
     string public constant SYMBOL = "TDY";
@@ -12,6 +14,7 @@ contract TestCoin is ERC20 {
 
     constructor()
         ERC20(NAME, SYMBOL)
+        ERC20Permit(NAME)
     {
         _mint(
             _msgSender(),
@@ -1,6 +1,8 @@
 // SPDX-License-Identifier: Apache-2.0
 pragma solidity 0.8.2;
 
+import "../services/OracleService.sol";
+
 import "@etherisc/gif-interface/contracts/components/Oracle.sol";
 
 contract TestOracle is Oracle {
@@ -46,6 +48,20 @@ contract TestOracle is Oracle {
         _respond(requestId, output);
     }
 
+    function respondBatch(uint256 [] calldata requestIds, bool [] calldata isLossEvent) 
+        external
+        returns(bool [] memory success)
+    {
+        bytes [] memory output = new bytes[](isLossEvent.length);
+
+        for (uint256 i = 0; i < isLossEvent.length; i++) {
+            output[i] = abi.encode(bool(isLossEvent[i]));
+        }
+
+        OracleService oracleService = OracleService(_getContractAddress("OracleService"));
+        success = oracleService.respondBatch(requestIds, output);
+    }
+
     // dummy implementation
     // "real" oracles will get the output from some off-chain
     // component providing the outcome of the business logic
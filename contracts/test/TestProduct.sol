@@ -1,6 +1,8 @@
 // SPDX-License-Identifier: Apache-2.0
 pragma solidity 0.8.2;
 
+import "../flows/PolicyDefaultFlow.sol";
+
 import "@etherisc/gif-interface/contracts/modules/IPolicy.sol";
 import "@etherisc/gif-interface/contracts/services/IProductService.sol";
 import "@etherisc/gif-interface/contracts/services/IInstanceService.sol";
@@ -71,6 +73,38 @@ contract TestProduct is
         }
     }
 
+    // applies for a policy using a permit of the policy holder instead of a prior approve
+    function applyForPolicyWithPermit(
+        uint256 premium, 
+        uint256 sumInsured,
+        bytes calldata metaData,
+        bytes calldata applicationData,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    ) 
+        external 
+        returns (bytes32 processId) 
+    {
+        address payable policyHolder = payable(_msgSender());
+        _permitPremium(policyHolder, premium, deadline, v, r, s);
+
+        processId = _newApplication(
+            policyHolder,
+            premium, 
+            sumInsured,
+            metaData,
+            applicationData);
+
+        _applications.push(processId);
+
+        bool success = _underwrite(processId);
+        if (success) {
+            _policies.push(processId);
+        }
+    }
+
     function applyForPolicy(
         address payable policyHolder,
         uint256 premium, 
@@ -136,6 +170,21 @@ contract TestProduct is
         }
     }
 
+    function underwriteBatch(bytes32 [] calldata processIds) 
+        external onlyOwner 
+        returns(bool [] memory success)
+    { 
+        // product service delegates calls to the policy flow
+        PolicyDefaultFlow policyFlow = PolicyDefaultFlow(_getContractAddress("ProductService"));
+        success = policyFlow.underwriteBatch(processIds);
+
+        for (uint256 i = 0; i < processIds.length; i++) {
+            if (success[i]) {
+                _policies.push(processIds[i]);
+            }
+        }
+    }
+
     function collectPremium(bytes32 policyId) 
         external onlyOwner
         returns(bool success, uint256 fee, uint256 netPremium)
@@ -150,6 +199,13 @@ contract TestProduct is
         (success, fee, netPremium) = _collectPremium(policyId, amount);
     }
 
+    function collectPremiumBatch(bytes32 [] calldata policyIds, uint256 [] calldata amounts) 
+        external onlyOwner
+        returns(bool [] memory success)
+    {
+        (success,,) = PolicyDefaultFlow(_getContractAddress("ProductService")).collectPremiumBatch(policyIds, amounts);
+    }
+
     function adjustPremiumSumInsured(
         bytes32 processId,
         uint256 expectedPremiumAmount,
@@ -168,6 +224,14 @@ contract TestProduct is
         _close(policyId);
     }
 
+    function expireBatch(bytes32 [] calldata policyIds) external onlyOwner {
+        PolicyDefaultFlow(_getContractAddress("ProductService")).expireBatch(policyIds);
+    }
+
+    function closeBatch(bytes32 [] calldata policyIds) external onlyOwner {
+        PolicyDefaultFlow(_getContractAddress("ProductService")).closeBatch(policyIds);
+    }
+
     function submitClaim(bytes32 policyId, uint256 claimAmount) 
         external
         onlyPolicyHolder(policyId)
@@ -311,6 +375,16 @@ contract TestProduct is
         _processPayout(policyId, payoutId);
     }
 
+    function processPayoutBatch(
+        bytes32 [] calldata policyIds, 
+        uint256 [] calldata payoutIds
+    ) 
+        external
+        onlyOwner
+    {
+        PolicyDefaultFlow(_getContractAddress("ProductService")).processPayoutBatch(policyIds, payoutIds);
+    }
+
     function oracleCallback(
         uint256 requestId, 
         bytes32 policyId, 
@@ -354,6 +428,19 @@ contract TestProduct is
         }
     }
 
+    function _permitPremium(
+        address policyHolder,
+        uint256 premium,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    )
+        internal
+    {
+        PolicyDefaultFlow(_getContractAddress("ProductService")).permitPremium(policyHolder, premium, deadline, v, r, s);
+    }
+
     function getClaimId(bytes32 policyId) external view returns (uint256) { return _policyIdToClaimId[policyId]; }
     function getPayoutId(bytes32 policyId) external view returns (uint256) { return _policyIdToPayoutId[policyId]; }
     function applications() external view returns (uint256) { return _applications.length; }
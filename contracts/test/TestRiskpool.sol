@@ -5,6 +5,8 @@ import "@etherisc/gif-interface/contracts/components/BasicRiskpool.sol";
 import "@etherisc/gif-interface/contracts/modules/IBundle.sol";
 import "@etherisc/gif-interface/contracts/modules/IPolicy.sol";
 
+import "../services/RiskpoolService.sol";
+
 contract TestRiskpool is BasicRiskpool {
 
     uint256 public constant SUM_OF_SUM_INSURED_CAP = 10**24;
@@ -19,6 +21,23 @@ contract TestRiskpool is BasicRiskpool {
         BasicRiskpool(name, collateralization, SUM_OF_SUM_INSURED_CAP, erc20Token, wallet, registry)
     { }
 
+    // the capital allowance is created with a permit signed by the bundle owner
+    function createBundleWithPermit(
+        bytes memory filter, 
+        uint256 initialAmount,
+        uint256 deadline,
+        uint8 v,
+        bytes32 r,
+        bytes32 s
+    )
+        external
+        returns(uint256 bundleId)
+    {
+        RiskpoolService riskpoolService = RiskpoolService(address(_riskpoolService));
+        riskpoolService.permitCapital(_msgSender(), initialAmount, deadline, v, r, s);
+        bundleId = createBundle(filter, initialAmount);
+    }
+
     // trivial implementation that matches every application
     function bundleMatchesApplication(
         IBundle.Bundle memory bundle, 
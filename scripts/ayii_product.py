@@ -1,13 +1,13 @@
 from web3 import Web3
 
-from brownie import Contract
+from brownie import Contract, web3
 from brownie.convert import to_bytes
 from brownie.network import accounts
 from brownie.network.account import Account
 
-# pylint: disable-msg=E0611
-from brownie import (
-    Wei,
+from brownie import Wei
+
+from scripts.containers import (
     PolicyController,
     OracleService,
     ComponentOwnerService,
@@ -15,8 +15,8 @@ from brownie import (
     AyiiRiskpool,
     AyiiProduct,
     AyiiOracle,
-    ChainlinkOperator, 
-    ChainlinkToken, 
+    ChainlinkOperator,
+    ChainlinkToken,
 )
 
 from scripts.util import (
@@ -35,6 +35,18 @@ RISKPOOL_NAME = 'AyiiRiskpool'
 ORACLE_NAME = 'AyiiOracle'
 PRODUCT_NAME = 'AyiiProduct'
 
+# AyiiProduct.RiskState
+RISK_STATE_CREATED = 1
+RISK_STATE_REQUESTED = 2
+RISK_STATE_RESPONDED = 3
+RISK_STATE_SETTLED = 4
+
+RISK_INDEX_PROJECT = 'project'
+RISK_INDEX_CROP = 'crop'
+RISK_INDEX_STATE = 'state'
+
+RISK_PAGE_SIZE = 50
+
 class GifAyiiRiskpool(object):
 
     def __init__(self, 
@@ -392,3 +404,33 @@ class GifAyiiProductComplete(object):
 
     def getProduct(self) -> GifAyiiProduct:
         return self.product
+
+
+def get_risks(
+    product: AyiiProduct, 
+    index: str, 
+    key, 
+    pageSize: int = RISK_PAGE_SIZE, 
+    blockIdentifier = None
+):
+    """Iterate over the risks of a secondary index of the ayii product.
+
+    index is one of RISK_INDEX_PROJECT (key: projectId), RISK_INDEX_CROP (key: cropId)
+    or RISK_INDEX_STATE (key: RISK_STATE_*). all pages are read from the same block 
+    (latest block if blockIdentifier is not provided) as the state index is reordered 
+    whenever a risk changes its state. yields risks as dicts.
+    """
+    (countFn, pageFn) = {
+        RISK_INDEX_PROJECT: (product.risksForProject, product.getRisksForProject),
+        RISK_INDEX_CROP: (product.risksForCrop, product.getRisksForCrop),
+        RISK_INDEX_STATE: (product.risksInState, product.getRisksInState),
+    }[index]
+
+    if blockIdentifier is None:
+        blockIdentifier = web3.eth.block_number
+
+    count = countFn(key, block_identifier=blockIdentifier)
+
+    for offset in range(0, count, pageSize):
+        for risk in pageFn(key, offset, pageSize, block_identifier=blockIdentifier):
+            yield risk.dict()
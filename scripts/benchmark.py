@@ -0,0 +1,552 @@
+import json
+import os
+
+from brownie.network.account import Account
+
+from scripts.containers import (
+    AyiiProduct,
+    AyiiOracle,
+    ChainlinkOperator,
+)
+
+from scripts.util import s2b32
+
+# gas measurements for selected contract interactions
+#
+# usage (brownie console)
+# >>> from scripts.benchmark import GasRecorder, benchmark_ayii_risk
+# >>> recorder = benchmark_ayii_risk(product, oracle, clOperator, insurer, customer, risks=10)
+# >>> recorder.print_summary()
+# >>> recorder.save('gas_ayii.json')
+# >>> recorder.print_comparison('gas_ayii_baseline.json')
+#
+# bundle selection with growing numbers of active bundles (use a fresh riskpool per run)
+# >>> for bundles in [1, 10, 100, 1000]:
+# ...     benchmark_bundle_selection(instance, owner, product, riskpool, riskpoolKeeper, capitalOwner, customer, coin, bundles, recorder=recorder)
+#
+# bundle selection when only one of the active bundles has sufficient capacity
+# >>> for bundles in [1, 10, 100]:
+# ...     benchmark_bundle_search(instance, owner, product, riskpool, riskpoolKeeper, capitalOwner, customer, coin, bundles, recorder=recorder)
+#
+# per step gas of the policy flow for a test product, compare against a baseline
+# recorded with an earlier version of the contracts
+# >>> recorder = benchmark_policy_flow(instance, owner, product, productOwner, customer, coin)
+# >>> recorder.print_comparison('gas_policy_flow_baseline.json')
+#
+# payouts processed one by one against a single batch, including the number of token calls
+# >>> recorder = benchmark_payouts(instance, owner, product, productOwner, [customer, customer2], coin, batch=False)
+# >>> benchmark_payouts(instance, owner, product, productOwner, [customer, customer2], coin, batch=True, recorder=recorder)
+# >>> recorder.print_summary()
+#
+# gas regression check of the full lifecycle against a committed baseline
+# the baseline is only written with update=True (--update-gas-baseline in tests)
+# >>> recorder = benchmark_lifecycle(instance, owner, product, productOwner, oracle, oracleProvider, riskpool, riskpoolKeeper, capitalOwner, customer, coin)
+# >>> recorder.check_baseline('tests/gas/lifecycle_test_product.json')
+
+AYII_CREATE_RISK = 'createRisk'
+AYII_TRIGGER_ORACLE = 'triggerOracle'
+AYII_ORACLE_CALLBACK = 'oracleCallback'
+AYII_PROCESS_POLICY = 'processPolicy'
+
+POLICY_APPLY_FOR_POLICY = 'applyForPolicy'
+POLICY_NEW_APPLICATION = 'newApplication'
+POLICY_UNDERWRITE = 'underwrite'
+POLICY_COLLECT_PREMIUM = 'collectPremium'
+POLICY_ADJUST_PREMIUM_SUM_INSURED = 'adjustPremiumSumInsured'
+POLICY_NEW_CLAIM = 'newClaim'
+POLICY_CONFIRM_CLAIM = 'confirmClaim'
+POLICY_NEW_PAYOUT = 'newPayout'
+POLICY_EXPIRE = 'expire'
+POLICY_CLOSE = 'close'
+POLICY_PROCESS_PAYOUT = 'processPayout'
+POLICY_PROCESS_PAYOUT_BATCH = 'processPayoutBatch'
+
+ORACLE_REQUEST = 'oracleRequest'
+ORACLE_RESPOND = 'oracleRespond'
+
+BUNDLE_CREATE = 'createBundle'
+BUNDLE_FUND = 'fundBundle'
+BUNDLE_DEFUND = 'defundBundle'
+BUNDLE_CLOSE = 'closeBundle'
+BUNDLE_BURN = 'burnBundle'
+
+# allowed increase of the average gas used per operation against the baseline
+GAS_REGRESSION_THRESHOLD_PERCENT = 2.0
+
+# suffixes for derived measurements
+PER_ITEM = '[perItem]'
+TOKEN_CALLS = '[tokenCalls]'
+
+AYII_PROJECT_ID = '2022.kenya.wfp.ayii'
+AYII_CROP_ID = 'maize'
+
+
+class GasRecorder(object):
+
+    def __init__(self):
+        self.measurements = {}
+
+    def record(self, name: str, tx):
+        self.measurements.setdefault(name, []).append(tx.gas_used)
+        return tx
+
+    def record_value(self, name: str, value: int):
+        self.measurements.setdefault(name, []).append(value)
+
+    def summary(self) -> dict:
+        summary = {}
+
+        for name, gasUsed in self.measurements.items():
+            summary[name] = {
+                'count': len(gasUsed),
+                'min': min(gasUsed),
+                'max': max(gasUsed),
+                'avg': int(sum(gasUsed) / len(gasUsed)),
+            }
+
+        return summary
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2, sort_keys=True)
+
+    def compare(self, baselinePath: str) -> dict:
+        with open(baselinePath) as f:
+            baseline = json.load(f)
+
+        comparison = {}
+        for name, current in self.summary().items():
+            if name not in baseline:
+                continue
+
+            before = baseline[name]['avg']
+            after = current['avg']
+            comparison[name] = {
+                'baseline': before,
+                'current': after,
+                'delta': after - before,
+                'deltaPercent': round(100.0 * (after - before) / before, 2) if before > 0 else None,
+            }
+
+        return comparison
+
+    def regressions(self, baselinePath: str, thresholdPercent: float = GAS_REGRESSION_THRESHOLD_PERCENT) -> dict:
+        return {
+            name: values for (name, values) in self.compare(baselinePath).items()
+            if values['deltaPercent'] is not None and values['deltaPercent'] > thresholdPercent}
+
+    def check_baseline(
+        self,
+        baselinePath: str,
+        thresholdPercent: float = GAS_REGRESSION_THRESHOLD_PERCENT,
+        update: bool = False
+    ) -> dict:
+        # a missing baseline is an error, it is only (re)written on request
+        if update:
+            os.makedirs(os.path.dirname(baselinePath) or '.', exist_ok=True)
+            self.save(baselinePath)
+            return {}
+
+        if not os.path.exists(baselinePath):
+            raise FileNotFoundError('ERROR:no gas baseline {}, record it with update=True and commit it'.format(baselinePath))
+
+        return self.regressions(baselinePath, thresholdPercent)
+
+    def print_summary(self):
+        print('{:<24} {:>6} {:>10} {:>10} {:>10}'.format('operation', 'count', 'min', 'avg', 'max'))
+
+        for name, values in self.summary().items():
+            print('{:<24} {:>6} {:>10} {:>10} {:>10}'.format(
+                name, values['count'], values['min'], values['avg'], values['max']))
+
+    def print_comparison(self, baselinePath: str):
+        print('{:<24} {:>10} {:>10} {:>10} {:>8}'.format('operation', 'baseline', 'current', 'delta', '%'))
+
+        for name, values in self.compare(baselinePath).items():
+            print('{:<24} {:>10} {:>10} {:>10} {:>8}'.format(
+                name, values['baseline'], values['current'], values['delta'], values['deltaPercent']))
+
+
+def benchmark_ayii_risk(
+    product: AyiiProduct,
+    oracle: AyiiOracle,
+    clOperator: ChainlinkOperator,
+    insurer: Account,
+    customer: Account,
+    risks: int = 10,
+    premium: int = 300,
+    sumInsured: int = 2000,
+    recorder: GasRecorder = None,
+) -> GasRecorder:
+    # the riskpool needs to be funded to cover risks * sumInsured
+    # and the customer needs to have approved risks * premium
+    recorder = recorder or GasRecorder()
+    multiplier = product.getPercentageMultiplier()
+
+    projectId = s2b32(AYII_PROJECT_ID)
+    cropId = s2b32(AYII_CROP_ID)
+    uaiIds = [s2b32('bench{}'.format(product.risks() + i)) for i in range(risks)]
+
+    riskIds = []
+    policyIds = []
+    for uaiId in uaiIds:
+        tx = recorder.record(AYII_CREATE_RISK, product.createRisk(
+            projectId, uaiId, cropId,
+            multiplier * 0.75, multiplier * 0.1, multiplier * 0.9, multiplier * 2.0,
+            {'from': insurer}))
+        riskIds.append(tx.return_value)
+
+        tx = recorder.record(POLICY_APPLY_FOR_POLICY, product.applyForPolicy(
+            customer, premium, sumInsured, riskIds[-1], {'from': insurer}))
+        policyIds.append(tx.return_value)
+
+    for (uaiId, policyId) in zip(uaiIds, policyIds):
+        tx = recorder.record(AYII_TRIGGER_ORACLE, product.triggerOracle(policyId, {'from': insurer}))
+        clRequestEvent = tx.events['OracleRequest'][0]
+
+        # aaay below trigger to exercise the payout path in processPolicy
+        data = oracle.encodeFulfillParameters(clRequestEvent['requestId'], projectId, uaiId, cropId, multiplier * 1.1)
+
+        # gas used by the full chainlink fulfillment including the product callback
+        recorder.record(AYII_ORACLE_CALLBACK, clOperator.fulfillOracleRequest2(
+            clRequestEvent['requestId'],
+            clRequestEvent['payment'],
+            clRequestEvent['callbackAddr'],
+            clRequestEvent['callbackFunctionId'],
+            clRequestEvent['cancelExpiration'],
+            data))
+
+    for policyId in policyIds:
+        recorder.record(AYII_PROCESS_POLICY, product.processPolicy(policyId, {'from': insurer}))
+
+    return recorder
+
+
+def benchmark_bundle_selection(
+    instance,
+    owner: Account,
+    product,
+    riskpool,
+    riskpoolKeeper: Account,
+    capitalOwner: Account,
+    customer: Account,
+    coin,
+    bundles: int,
+    policies: int = 10,
+    bundleFunding: int = 10000,
+    premium: int = 100,
+    sumInsured: int = 1000,
+    recorder: GasRecorder = None,
+) -> GasRecorder:
+    # measures underwriting gas (new application + underwrite) for a test product
+    # with the specified number of active bundles in its riskpool
+    recorder = recorder or GasRecorder()
+    name = 'underwrite[bundles={}]'.format(bundles)
+
+    riskpool.setMaximumNumberOfActiveBundles(riskpool.activeBundles() + bundles, {'from': riskpoolKeeper})
+
+    coin.transfer(riskpoolKeeper, bundles * bundleFunding, {'from': owner})
+    coin.approve(instance.getTreasury(), bundles * bundleFunding, {'from': riskpoolKeeper})
+    coin.approve(instance.getTreasury(), 2**256-1, {'from': capitalOwner})
+
+    for _ in range(bundles):
+        riskpool.createBundle(bytes(0), bundleFunding, {'from': riskpoolKeeper})
+
+    coin.transfer(customer, policies * premium, {'from': owner})
+    coin.approve(instance.getTreasury(), policies * premium, {'from': customer})
+
+    for _ in range(policies):
+        recorder.record(name, product.applyForPolicy(premium, sumInsured, bytes(0), bytes(0), {'from': customer}))
+
+    return recorder
+
+
+def benchmark_bundle_search(
+    instance,
+    owner: Account,
+    product,
+    riskpool,
+    riskpoolKeeper: Account,
+    capitalOwner: Account,
+    customer: Account,
+    coin,
+    bundles: int,
+    policies: int = 3,
+    bundleFunding: int = 100000,
+    smallBundleFunding: int = 500,
+    premium: int = 100,
+    sumInsured: int = 1000,
+    recorder: GasRecorder = None,
+) -> GasRecorder:
+    # measures underwriting gas when a single active bundle has sufficient capacity.
+    # the first bundle gets all the capital, the riskpool is then filled up to the
+    # specified number of active bundles with bundles too small for a policy.
+    # may be called repeatedly with growing numbers of bundles for the same riskpool
+    recorder = recorder or GasRecorder()
+    name = 'underwrite[search,bundles={}]'.format(bundles)
+
+    amounts = [smallBundleFunding] * (bundles - riskpool.activeBundles())
+    if riskpool.activeBundles() == 0:
+        amounts[0] = bundleFunding
+
+    riskpool.setMaximumNumberOfActiveBundles(bundles, {'from': riskpoolKeeper})
+
+    coin.transfer(riskpoolKeeper, sum(amounts), {'from': owner})
+    coin.approve(instance.getTreasury(), sum(amounts), {'from': riskpoolKeeper})
+    coin.approve(instance.getTreasury(), 2**256-1, {'from': capitalOwner})
+
+    for amount in amounts:
+        riskpool.createBundle(bytes(0), amount, {'from': riskpoolKeeper})
+
+    coin.transfer(customer, policies * premium, {'from': owner})
+    coin.approve(instance.getTreasury(), policies * premium, {'from': customer})
+
+    for _ in range(policies):
+        recorder.record(name, product.applyForPolicy(premium, sumInsured, bytes(0), bytes(0), {'from': customer}))
+
+    return recorder
+
+
+def benchmark_policy_flow(
+    instance,
+    owner: Account,
+    product,
+    productOwner: Account,
+    customer: Account,
+    coin,
+    policies: int = 10,
+    premium: int = 100,
+    sumInsured: int = 1000,
+    recorder: GasRecorder = None,
+) -> GasRecorder:
+    # measures the individual steps of the policy lifecycle for a test product
+    # the riskpool of the product needs to be funded to cover policies * sumInsured
+    recorder = recorder or GasRecorder()
+
+    coin.transfer(customer, policies * premium, {'from': owner})
+
+    for _ in range(policies):
+        tx = recorder.record(POLICY_NEW_APPLICATION, product.newAppliation(premium, sumInsured, bytes(0), bytes(0), {'from': customer}))
+        processId = tx.return_value
+
+        # without allowance underwriting succeeds but premium collection is skipped
+        recorder.record(POLICY_UNDERWRITE, product.underwrite(processId, {'from': productOwner}))
+
+        coin.approve(instance.getTreasury(), premium, {'from': customer})
+        recorder.record(POLICY_COLLECT_PREMIUM, product.collectPremium(processId, premium, {'from': productOwner}))
+
+        recorder.record(POLICY_EXPIRE, product.expire(processId, {'from': productOwner}))
+        recorder.record(POLICY_CLOSE, product.close(processId, {'from': productOwner}))
+
+    return recorder
+
+
+def benchmark_payouts(
+    instance,
+    owner: Account,
+    product,
+    productOwner: Account,
+    customers: list,
+    coin,
+    policies: int = 10,
+    premium: int = 100,
+    sumInsured: int = 1000,
+    payout: int = 500,
+    batch: bool = True,
+    recorder: GasRecorder = None,
+) -> GasRecorder:
+    # measures payout processing for a test product, one transaction per payout
+    # or a single batch. policies are distributed round robin over the customers.
+    # the riskpool of the product needs to be funded to cover policies * sumInsured
+    recorder = recorder or GasRecorder()
+    policyIds = []
+    payoutIds = []
+
+    for i in range(policies):
+        customer = customers[i % len(customers)]
+        coin.transfer(customer, premium, {'from': owner})
+        coin.approve(instance.getTreasury(), premium, {'from': customer})
+
+        tx = product.applyForPolicy(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
+        policyId = tx.return_value
+
+        tx = product.submitClaimNoOracle(policyId, payout, {'from': customer})
+        claimId = tx.return_value
+
+        product.confirmClaim(policyId, claimId, payout, {'from': productOwner})
+        tx = product.newPayout(policyId, claimId, payout, {'from': productOwner})
+
+        policyIds.append(policyId)
+        payoutIds.append(tx.return_value)
+
+    if batch:
+        tx = recorder.record(POLICY_PROCESS_PAYOUT_BATCH, product.processPayoutBatch(policyIds, payoutIds, {'from': productOwner}))
+        recorder.record_value(POLICY_PROCESS_PAYOUT_BATCH + PER_ITEM, tx.gas_used // policies)
+        recorder.record_value(POLICY_PROCESS_PAYOUT_BATCH + TOKEN_CALLS, count_token_calls(tx, coin))
+    else:
+        tokenCalls = 0
+        for (policyId, payoutId) in zip(policyIds, payoutIds):
+            tx = recorder.record(POLICY_PROCESS_PAYOUT, product.processPayout(policyId, payoutId, {'from': productOwner}))
+            recorder.record_value(POLICY_PROCESS_PAYOUT + PER_ITEM, tx.gas_used)
+            tokenCalls += count_token_calls(tx, coin)
+
+        recorder.record_value(POLICY_PROCESS_PAYOUT + TOKEN_CALLS, tokenCalls)
+
+    return recorder
+
+
+def benchmark_lifecycle(
+    instance,
+    owner: Account,
+    product,
+    productOwner: Account,
+    oracle,
+    oracleProvider: Account,
+    riskpool,
+    riskpoolKeeper: Account,
+    capitalOwner: Account,
+    customer: Account,
+    coin,
+    policies: int = 3,
+    bundleFunding: int = 10000,
+    premium: int = 100,
+    premiumIncrease: int = 10,
+    sumInsured: int = 1000,
+    payout: int = 500,
+    recorder: GasRecorder = None,
+) -> GasRecorder:
+    # measures every public lifecycle call of a test product and its riskpool and oracle
+    # from bundle creation to burning the bundle after all policies are closed
+    recorder = recorder or GasRecorder()
+    treasury = instance.getTreasury()
+
+    # the riskpool keeper is the bundle owner
+    coin.transfer(riskpoolKeeper, 2 * bundleFunding, {'from': owner})
+    coin.approve(treasury, 2 * bundleFunding, {'from': riskpoolKeeper})
+    coin.approve(treasury, 2**256-1, {'from': capitalOwner})
+
+    tx = recorder.record(BUNDLE_CREATE, riskpool.createBundle(bytes(0), bundleFunding, {'from': riskpoolKeeper}))
+    bundleId = tx.return_value
+    recorder.record(BUNDLE_FUND, riskpool.fundBundle(bundleId, bundleFunding // 10, {'from': riskpoolKeeper}))
+
+    coin.transfer(customer, policies * (2 * premium + premiumIncrease), {'from': owner})
+    policyIds = []
+
+    for _ in range(policies):
+        # application, underwriting and premium collection in a single call
+        coin.approve(treasury, premium, {'from': customer})
+        tx = recorder.record(POLICY_APPLY_FOR_POLICY, product.applyForPolicy(premium, sumInsured, bytes(0), bytes(0), {'from': customer}))
+        policyId = tx.return_value
+        policyIds.append(policyId)
+
+        # claim without loss event, oracle response declines the claim
+        tx = recorder.record(ORACLE_REQUEST, product.submitClaimWithDeferredResponse(policyId, payout, {'from': customer}))
+        requestId = tx.return_value[1]
+        recorder.record(ORACLE_RESPOND, oracle.respond(requestId, False, {'from': oracleProvider}))
+
+        # step by step lifecycle, without allowance underwriting skips premium collection
+        tx = recorder.record(POLICY_NEW_APPLICATION, product.newAppliation(premium, sumInsured, bytes(0), bytes(0), {'from': customer}))
+        processId = tx.return_value
+        policyIds.append(processId)
+
+        recorder.record(POLICY_UNDERWRITE, product.underwrite(processId, {'from': productOwner}))
+        recorder.record(POLICY_ADJUST_PREMIUM_SUM_INSURED, product.adjustPremiumSumInsured(processId, premium + premiumIncrease, sumInsured, {'from': customer}))
+
+        coin.approve(treasury, premium + premiumIncrease, {'from': customer})
+        recorder.record(POLICY_COLLECT_PREMIUM, product.collectPremium(processId, premium + premiumIncrease, {'from': productOwner}))
+
+        tx = recorder.record(POLICY_NEW_CLAIM, product.submitClaimNoOracle(processId, payout, {'from': customer}))
+        claimId = tx.return_value
+
+        recorder.record(POLICY_CONFIRM_CLAIM, product.confirmClaim(processId, claimId, payout, {'from': productOwner}))
+        tx = recorder.record(POLICY_NEW_PAYOUT, product.newPayout(processId, claimId, payout, {'from': productOwner}))
+        recorder.record(POLICY_PROCESS_PAYOUT, product.processPayout(processId, tx.return_value, {'from': productOwner}))
+
+    for policyId in policyIds:
+        recorder.record(POLICY_EXPIRE, product.expire(policyId, {'from': productOwner}))
+        recorder.record(POLICY_CLOSE, product.close(policyId, {'from': productOwner}))
+
+    recorder.record(BUNDLE_DEFUND, riskpool.defundBundle(bundleId, bundleFunding // 10, {'from': riskpoolKeeper}))
+    recorder.record(BUNDLE_CLOSE, riskpool.closeBundle(bundleId, {'from': riskpoolKeeper}))
+    recorder.record(BUNDLE_BURN, riskpool.burnBundle(bundleId, {'from': riskpoolKeeper}))
+
+    return recorder
+
+
+def benchmark_ayii_lifecycle(
+    instance,
+    owner: Account,
+    product: AyiiProduct,
+    oracle: AyiiOracle,
+    clOperator: ChainlinkOperator,
+    riskpool,
+    insurer: Account,
+    investor: Account,
+    riskpoolWallet: Account,
+    customer: Account,
+    token,
+    policies: int = 3,
+    bundleFunding: int = 100000,
+    premium: int = 300,
+    premiumIncrease: int = 30,
+    sumInsured: int = 2000,
+    recorder: GasRecorder = None,
+) -> GasRecorder:
+    # measures the public lifecycle calls of the ayii product and its riskpool
+    # ayii policies are not closed, the bundle remains active
+    recorder = recorder or GasRecorder()
+    treasury = instance.getTreasury()
+    multiplier = product.getPercentageMultiplier()
+
+    token.transfer(investor, 2 * bundleFunding, {'from': owner})
+    token.approve(treasury, 2 * bundleFunding, {'from': investor})
+    token.approve(treasury, 2**256-1, {'from': riskpoolWallet})
+
+    tx = recorder.record(BUNDLE_CREATE, riskpool.createBundle(bytes(0), bundleFunding, {'from': investor}))
+    bundleId = tx.return_value
+    recorder.record(BUNDLE_FUND, riskpool.fundBundle(bundleId, bundleFunding // 10, {'from': investor}))
+
+    projectId = s2b32(AYII_PROJECT_ID)
+    cropId = s2b32(AYII_CROP_ID)
+    token.transfer(customer, policies * (premium + premiumIncrease), {'from': owner})
+
+    for _ in range(policies):
+        uaiId = s2b32('bench{}'.format(product.risks()))
+        tx = recorder.record(AYII_CREATE_RISK, product.createRisk(
+            projectId, uaiId, cropId,
+            multiplier * 0.75, multiplier * 0.1, multiplier * 0.9, multiplier * 2.0,
+            {'from': insurer}))
+        riskId = tx.return_value
+
+        # without allowance the policy is underwritten without premium collection
+        tx = recorder.record(POLICY_APPLY_FOR_POLICY, product.applyForPolicy(customer, premium, sumInsured, riskId, {'from': insurer}))
+        policyId = tx.return_value
+
+        recorder.record(POLICY_ADJUST_PREMIUM_SUM_INSURED, product.adjustPremiumSumInsured(policyId, premium + premiumIncrease, sumInsured, {'from': insurer}))
+
+        token.approve(treasury, premium + premiumIncrease, {'from': customer})
+        recorder.record(POLICY_COLLECT_PREMIUM, product.collectPremium(policyId, customer, premium + premiumIncrease, {'from': insurer}))
+
+        tx = recorder.record(AYII_TRIGGER_ORACLE, product.triggerOracle(policyId, {'from': insurer}))
+        clRequestEvent = tx.events['OracleRequest'][0]
+        data = oracle.encodeFulfillParameters(clRequestEvent['requestId'], projectId, uaiId, cropId, multiplier * 1.1)
+
+        recorder.record(AYII_ORACLE_CALLBACK, clOperator.fulfillOracleRequest2(
+            clRequestEvent['requestId'],
+            clRequestEvent['payment'],
+            clRequestEvent['callbackAddr'],
+            clRequestEvent['callbackFunctionId'],
+            clRequestEvent['cancelExpiration'],
+            data))
+
+        # claim, payout and payout processing
+        recorder.record(AYII_PROCESS_POLICY, product.processPolicy(policyId, {'from': insurer}))
+
+    recorder.record(BUNDLE_DEFUND, riskpool.defundBundle(bundleId, bundleFunding // 10, {'from': investor}))
+
+    return recorder
+
+
+def count_token_calls(tx, token) -> int:
+    # number of (static) calls into the token contract, requires a node with tracing support
+    return len([call for call in tx.subcalls if call['to'] == token.address])
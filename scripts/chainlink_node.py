@@ -0,0 +1,373 @@
+import csv
+import mmap
+import random
+import time
+
+from collections import deque
+
+from brownie import web3
+from brownie.network.account import Account
+
+from scripts.containers import (
+    AyiiProduct,
+    AyiiOracle,
+    ChainlinkOperator,
+)
+
+try:
+    from eth_abi import encode as abi_encode
+except ImportError:
+    from eth_abi import encode_abi as abi_encode
+
+from scripts.util import b322s
+
+# stand-in for a chainlink node serving ayii oracle requests.
+# the node watches the chainlink operator contract for 'OracleRequest'
+# events, joins them with the ayii oracle/product events of the same
+# transaction to obtain the risk keys and fulfills the requests with
+# aaay values read from a local dataset.
+#
+# usage (brownie console)
+# >>> from scripts.chainlink_node import AaayDataset, ChainlinkNodeStandIn
+# >>> dataset = AaayDataset('aaay.csv')
+# >>> node = ChainlinkNodeStandIn(product, oracle, clOperator, chainlinkNodeOperator, dataset, latency=2)
+# >>> node.run(duration=60)
+
+DATASET_COLUMNS = ['projectId', 'uaiId', 'cropId', 'aaay']
+
+FAILURE_DROP = 'drop' # request is never fulfilled
+FAILURE_DELAY = 'delay' # request is fulfilled after an additional delay
+FAILURE_INVALID = 'invalid' # request is fulfilled with an out of range aaay value
+FAILURE_MODES = [FAILURE_DROP, FAILURE_DELAY, FAILURE_INVALID]
+
+FAILURE_DELAY_FACTOR = 10
+
+
+class AaayDataset(object):
+    """Read only aaay lookup table keyed by (projectId, uaiId, cropId).
+
+    csv files are memory mapped and only the byte offsets per key are kept
+    in memory, values are parsed when a key is looked up. parquet files
+    (requires pyarrow) are memory mapped by pyarrow.
+    """
+
+    def __init__(self, path: str, multiplier: int = 2**24):
+        self.path = path
+        self.multiplier = multiplier
+        self._offsets = {}
+        self._values = None
+
+        if path.endswith('.parquet'):
+            self._load_parquet(path)
+        else:
+            self._load_csv(path)
+
+    def __len__(self) -> int:
+        return len(self._values) if self._values is not None else len(self._offsets)
+
+    def __contains__(self, key) -> bool:
+        return key in self._offsets or (self._values is not None and key in self._values)
+
+    def get(self, projectId: str, uaiId: str, cropId: str):
+        key = (projectId, uaiId, cropId)
+
+        if self._values is not None:
+            value = self._values.get(key)
+        elif key in self._offsets:
+            (start, end) = self._offsets[key]
+            value = float(self._mmap[start:end].decode('utf-8'))
+        else:
+            value = None
+
+        return None if value is None else int(value * self.multiplier)
+
+    def close(self):
+        if self._values is None:
+            self._mmap.close()
+            self._file.close()
+
+    def _load_csv(self, path: str):
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = self._mmap.readline().decode('utf-8').strip().split(',')
+        columns = [header.index(column) for column in DATASET_COLUMNS]
+
+        while True:
+            lineStart = self._mmap.tell()
+            line = self._mmap.readline()
+            if not line:
+                break
+
+            fields = line.rstrip(b'\r\n').split(b',')
+            if len(fields) < len(header):
+                continue
+
+            # offsets of the aaay value within the mapped file
+            aaayColumn = columns[3]
+            start = lineStart + sum(len(field) + 1 for field in fields[:aaayColumn])
+            end = start + len(fields[aaayColumn])
+
+            key = tuple(fields[column].decode('utf-8') for column in columns[:3])
+            self._offsets[key] = (start, end)
+
+    def _load_parquet(self, path: str):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError('ERROR:reading parquet datasets requires pyarrow (pip install pyarrow)')
+
+        table = pq.read_table(path, columns=DATASET_COLUMNS, memory_map=True)
+        rows = zip(*[table.column(column).to_pylist() for column in DATASET_COLUMNS])
+        self._values = {(p, u, c): a for (p, u, c, a) in rows}
+
+
+class OracleJob(object):
+
+    def __init__(self, event, gifRequestId: int, keys: list, isBatch: bool, dueAt: float):
+        self.clRequestId = event['requestId']
+        self.payment = event['payment']
+        self.callbackAddr = event['callbackAddr']
+        self.callbackFunctionId = event['callbackFunctionId']
+        self.cancelExpiration = event['cancelExpiration']
+        self.gifRequestId = gifRequestId
+        self.keys = keys
+        self.isBatch = isBatch
+        self.dueAt = dueAt
+        self.failure = None
+
+
+class ChainlinkNodeStandIn(object):
+
+    def __init__(self,
+        product: AyiiProduct,
+        oracle: AyiiOracle,
+        clOperator: ChainlinkOperator,
+        nodeAccount: Account,
+        dataset: AaayDataset,
+        latency: float = 0.0,
+        latencyJitter: float = 0.0,
+        pipelineDepth: int = 16,
+        failureRate: float = 0.0,
+        failureModes: list = FAILURE_MODES,
+        pollInterval: float = 1.0,
+        fromBlock: int = None,
+        seed: int = None,
+    ):
+        self.product = product
+        self.oracle = oracle
+        self.clOperator = clOperator
+        self.nodeAccount = nodeAccount
+        self.dataset = dataset
+
+        self.latency = latency
+        self.latencyJitter = latencyJitter
+        self.pipelineDepth = pipelineDepth
+        self.failureRate = failureRate
+        self.failureModes = failureModes
+        self.pollInterval = pollInterval
+
+        self.random = random.Random(seed)
+        self.nextBlock = web3.eth.block_number if fromBlock is None else fromBlock
+
+        self.pending = [] # jobs waiting for their due time
+        self.inFlight = deque() # (job, tx) submitted but not yet mined
+
+        self.stats = {
+            'requests': 0,
+            'risks': 0,
+            'fulfilled': 0,
+            'failed': 0,
+            'dropped': 0,
+            'unknownKeys': 0,
+        }
+
+        self._clEvents = _web3_contract(clOperator).events
+        self._oracleEvents = _web3_contract(oracle).events
+        self._productEvents = _web3_contract(product).events
+
+    def run(self, duration: float = None, maxRequests: int = None):
+        start = time.time()
+
+        while True:
+            self.step()
+
+            if duration is not None and time.time() - start >= duration:
+                break
+
+            if maxRequests is not None and self.stats['requests'] >= maxRequests and not self.pending:
+                break
+
+            time.sleep(self.pollInterval)
+
+        self.drain()
+        return self.stats
+
+    def step(self):
+        self.poll()
+        self.submit_due()
+        self.collect(block=False)
+
+    def poll(self):
+        toBlock = web3.eth.block_number
+        if toBlock < self.nextBlock:
+            return
+
+        for job in self._fetch_jobs(self.nextBlock, toBlock):
+            # requests with keys missing in the dataset are not answered, there is
+            # no aaay value to fall back to (0 is a valid aaay with maximum payout)
+            unknownKeys = self._unknown_keys(job.keys)
+            if unknownKeys:
+                self.stats['unknownKeys'] += len(unknownKeys)
+                self.stats['dropped'] += 1
+                continue
+
+            self._inject_failure(job)
+
+            if job.failure == FAILURE_DROP:
+                self.stats['dropped'] += 1
+                continue
+
+            self.pending.append(job)
+
+        self.nextBlock = toBlock + 1
+
+    def submit_due(self):
+        now = time.time()
+        due = [job for job in self.pending if job.dueAt <= now]
+        self.pending = [job for job in self.pending if job.dueAt > now]
+
+        for job in sorted(due, key=lambda j: j.dueAt):
+            # keep at most pipelineDepth fulfillments unconfirmed
+            while len(self.inFlight) >= self.pipelineDepth:
+                self.collect(block=True)
+
+            tx = self.clOperator.fulfillOracleRequest2(
+                job.clRequestId,
+                job.payment,
+                job.callbackAddr,
+                job.callbackFunctionId,
+                job.cancelExpiration,
+                self._encode_response(job),
+                {'from': self.nodeAccount, 'required_confs': 0})
+
+            self.inFlight.append((job, tx))
+
+    def collect(self, block: bool):
+        while self.inFlight:
+            (job, tx) = self.inFlight[0]
+
+            if not block and tx.status < 0:
+                return
+
+            tx.wait(1)
+            self.inFlight.popleft()
+
+            # the chainlink operator swallows reverting oracle callbacks
+            if tx.status == 1 and tx.return_value:
+                self.stats['fulfilled'] += 1
+            else:
+                self.stats['failed'] += 1
+
+            block = False
+
+    def drain(self):
+        while self.pending:
+            self.submit_due()
+            time.sleep(self.pollInterval)
+
+        while self.inFlight:
+            self.collect(block=True)
+
+    def _fetch_jobs(self, fromBlock: int, toBlock: int) -> list:
+        logFilter = {'fromBlock': fromBlock, 'toBlock': toBlock}
+        clRequests = self._clEvents.OracleRequest().getLogs(**logFilter)
+        if not clRequests:
+            return []
+
+        # chainlink request id -> (gif request id, is batch)
+        gifRequests = {}
+        for log in self._oracleEvents.LogAyiiRequest().getLogs(**logFilter):
+            gifRequests[log.args.chainlinkRequestId] = (log.args.requestId, False)
+
+        for log in self._oracleEvents.LogAyiiBatchRequest().getLogs(**logFilter):
+            gifRequests[log.args.chainlinkRequestId] = (log.args.requestId, True)
+
+        # gif request id -> risk keys (in request order)
+        riskKeys = {}
+        for log in self._productEvents.LogAyiiRiskDataRequested().getLogs(**logFilter):
+            key = (log.args.projectId, log.args.uaiId, log.args.cropId)
+            riskKeys.setdefault(log.args.requestId, []).append(key)
+
+        jobs = []
+        for log in clRequests:
+            event = log.args
+            if event.requester != self.oracle.address or event.requestId not in gifRequests:
+                continue
+
+            (gifRequestId, isBatch) = gifRequests[event.requestId]
+            keys = riskKeys.get(gifRequestId, [])
+            if not keys:
+                continue
+
+            dueAt = time.time() + self.latency + self.random.uniform(0, self.latencyJitter)
+
+            self.stats['requests'] += 1
+            self.stats['risks'] += len(keys)
+            jobs.append(OracleJob(event, gifRequestId, keys, isBatch, dueAt))
+
+        return jobs
+
+    def _inject_failure(self, job: OracleJob):
+        if self.failureRate <= 0 or self.random.random() >= self.failureRate:
+            return
+
+        job.failure = self.random.choice(self.failureModes)
+
+        if job.failure == FAILURE_DELAY:
+            job.dueAt += FAILURE_DELAY_FACTOR * max(self.latency, self.pollInterval)
+
+    def _dataset_key(self, key) -> tuple:
+        return tuple(b322s(bytes(value)) for value in key)
+
+    def _unknown_keys(self, keys: list) -> list:
+        return [key for key in keys if self._dataset_key(key) not in self.dataset]
+
+    def _lookup_aaay(self, key) -> int:
+        aaay = self.dataset.get(*self._dataset_key(key))
+        if aaay is None:
+            raise KeyError('ERROR:no aaay value for risk key {}'.format(self._dataset_key(key)))
+
+        return aaay
+
+    def _encode_response(self, job: OracleJob) -> bytes:
+        if job.failure == FAILURE_INVALID:
+            # the product only accepts aaay values below AAAY_MAX
+            aaays = [2**128] * len(job.keys)
+        else:
+            aaays = [self._lookup_aaay(key) for key in job.keys]
+
+        projectIds = [key[0] for key in job.keys]
+        uaiIds = [key[1] for key in job.keys]
+        cropIds = [key[2] for key in job.keys]
+
+        if job.isBatch:
+            return abi_encode(
+                ['bytes32', 'bytes32[]', 'bytes32[]', 'bytes32[]', 'uint256[]'],
+                [job.clRequestId, projectIds, uaiIds, cropIds, aaays])
+
+        return abi_encode(
+            ['bytes32', 'bytes32', 'bytes32', 'bytes32', 'uint256'],
+            [job.clRequestId, projectIds[0], uaiIds[0], cropIds[0], aaays[0]])
+
+
+def write_dataset(path: str, rows: list):
+    # rows: list of (projectId, uaiId, cropId, aaay) with aaay as float
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(DATASET_COLUMNS)
+        writer.writerows(rows)
+
+
+def _web3_contract(contract):
+    return web3.eth.contract(address=contract.address, abi=contract.abi)
@@ -4,11 +4,10 @@ from brownie.convert import to_bytes
 from brownie.network import accounts
 from brownie.network.account import Account
 
-# pylint: disable-msg=E0611
-from brownie import (
-    Wei,
-    interface,    
-    Contract, 
+from brownie import Wei, Contract
+
+from scripts.containers import (
+    interface,
     PolicyController,
     OracleService,
     ComponentOwnerService,
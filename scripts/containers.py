@@ -0,0 +1,84 @@
+import brownie
+
+from brownie import project
+
+# lazy access to the contract containers and interfaces of the loaded brownie project
+#
+# `from brownie import TestCoin` only works once brownie has loaded the project and
+# pulls the container in at import time. importing the same name from this module
+# returns a placeholder that looks the container up on first use, so the scripts
+# import without a loaded project and without touching the network.
+#
+# usage (python)
+# >>> from scripts.containers import TestCoin, interface
+# >>> usdc = TestCoin.deploy({'from': owner})
+# >>> token = interface.IERC20(usdc.address)
+
+
+class LazyContainer(object):
+
+    def __init__(self, name: str):
+        self._lazyName = name
+        self._lazyTarget = None
+
+    def resolve(self):
+        if self._lazyTarget is None:
+            self._lazyTarget = find_container(self._lazyName)
+
+        return self._lazyTarget
+
+    def __getattr__(self, attribute):
+        # only called for attributes not found on the placeholder itself
+        if attribute.startswith('_lazy'):
+            raise AttributeError(attribute)
+
+        return getattr(self.resolve(), attribute)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getitem__(self, key):
+        return self.resolve()[key]
+
+    def __iter__(self):
+        return iter(self.resolve())
+
+    def __len__(self):
+        return len(self.resolve())
+
+    def __repr__(self):
+        if self._lazyTarget is None:
+            return '<LazyContainer {}>'.format(self._lazyName)
+
+        return repr(self._lazyTarget)
+
+
+def find_container(name: str):
+    # brownie adds the containers of a loaded project to its own namespace
+    container = getattr(brownie, name, None)
+    if container is not None:
+        return container
+
+    for loadedProject in project.get_loaded_projects():
+        container = loadedProject.dict().get(name)
+        if container is not None:
+            return container
+
+        if name == 'interface':
+            return loadedProject.interface
+
+    raise AttributeError('no contract container {} in the loaded brownie projects'.format(name))
+
+
+_containers = {}
+
+
+def __getattr__(name: str) -> LazyContainer:
+    # module level attribute lookup (PEP 562), serves `from scripts.containers import <name>`
+    if name.startswith('__'):
+        raise AttributeError(name)
+
+    if name not in _containers:
+        _containers[name] = LazyContainer(name)
+
+    return _containers[name]
@@ -3,10 +3,10 @@ from brownie import web3
 from brownie.network import accounts
 from brownie.network.account import Account
 
-# pylint: disable-msg=E0611
-from brownie import (
+from brownie import network
+
+from scripts.containers import (
     interface,
-    network,
     TestCoin,
     InstanceService,
     InstanceOperatorService,
@@ -46,33 +46,38 @@ RISK_ID2 = 'riskId2'
 PROCESS_ID1 = 'processId1'
 PROCESS_ID2 = 'processId2'
 
-GAS_PRICE = web3.eth.gas_price
 GAS_PRICE_SAFETY_FACTOR = 1.25
 
 GAS_S = 2000000
 GAS_M = 3 * GAS_S
 GAS_L = 10 * GAS_M
 
-REQUIRED_FUNDS_S = int(GAS_PRICE * GAS_PRICE_SAFETY_FACTOR * GAS_S)
-REQUIRED_FUNDS_M = int(GAS_PRICE * GAS_PRICE_SAFETY_FACTOR * GAS_M)
-REQUIRED_FUNDS_L = int(GAS_PRICE * GAS_PRICE_SAFETY_FACTOR * GAS_L)
-
 INITIAL_ERC20_BUNDLE_FUNDING = 100000
 
-REQUIRED_FUNDS = {
-    INSTANCE_OPERATOR: REQUIRED_FUNDS_L,
-    INSTANCE_WALLET:   REQUIRED_FUNDS_S,
-    PRODUCT_OWNER:     REQUIRED_FUNDS_M,
-    INSURER:           REQUIRED_FUNDS_M,
-    ORACLE_PROVIDER:   REQUIRED_FUNDS_M,
-    RISKPOOL_KEEPER:   REQUIRED_FUNDS_M,
-    RISKPOOL_WALLET:   REQUIRED_FUNDS_S,
-    INVESTOR:          REQUIRED_FUNDS_S,
-    CUSTOMER1:         REQUIRED_FUNDS_S,
-    CUSTOMER2:         REQUIRED_FUNDS_S,
+# gas per stakeholder, funds depend on the gas price of the connected network
+REQUIRED_GAS = {
+    INSTANCE_OPERATOR: GAS_L,
+    INSTANCE_WALLET:   GAS_S,
+    PRODUCT_OWNER:     GAS_M,
+    INSURER:           GAS_M,
+    ORACLE_PROVIDER:   GAS_M,
+    RISKPOOL_KEEPER:   GAS_M,
+    RISKPOOL_WALLET:   GAS_S,
+    INVESTOR:          GAS_S,
+    CUSTOMER1:         GAS_S,
+    CUSTOMER2:         GAS_S,
 }
 
 
+def get_required_funds(gasPrice: int = None) -> dict:
+    if gasPrice is None:
+        gasPrice = web3.eth.gas_price
+
+    return {
+        accountName: int(gasPrice * GAS_PRICE_SAFETY_FACTOR * gas)
+        for (accountName, gas) in REQUIRED_GAS.items()}
+
+
 def stakeholders_accounts_ganache():
     # define stakeholder accounts    
     instanceOperator=accounts[0]
@@ -103,30 +108,32 @@ def stakeholders_accounts_ganache():
 
 
 def check_funds(stakeholders_accounts, erc20_token):
-    _print_constants()
+    gasPrice = web3.eth.gas_price
+    requiredFunds = get_required_funds(gasPrice)
+    _print_constants(gasPrice)
 
     a = stakeholders_accounts
 
     native_token_success = True
     fundsMissing = 0
-    for accountName, requiredAmount in REQUIRED_FUNDS.items():
-        if a[accountName].balance() >= REQUIRED_FUNDS[accountName]:
+    for accountName, requiredAmount in requiredFunds.items():
+        if a[accountName].balance() >= requiredFunds[accountName]:
             print('{} funding ok'.format(accountName))
         else:
-            fundsMissing += REQUIRED_FUNDS[accountName] - a[accountName].balance()
+            fundsMissing += requiredFunds[accountName] - a[accountName].balance()
             print('{} needs {} but has {}'.format(
                 accountName,
-                REQUIRED_FUNDS[accountName],
+                requiredFunds[accountName],
                 a[accountName].balance()
             ))
     
     if fundsMissing > 0:
         native_token_success = False
 
-        if a[INSTANCE_OPERATOR].balance() >= REQUIRED_FUNDS[INSTANCE_OPERATOR] + fundsMissing:
+        if a[INSTANCE_OPERATOR].balance() >= requiredFunds[INSTANCE_OPERATOR] + fundsMissing:
             print('{} sufficiently funded with native token to cover missing funds'.format(INSTANCE_OPERATOR))
         else:
-            additionalFunds = REQUIRED_FUNDS[INSTANCE_OPERATOR] + fundsMissing - a[INSTANCE_OPERATOR].balance()
+            additionalFunds = requiredFunds[INSTANCE_OPERATOR] + fundsMissing - a[INSTANCE_OPERATOR].balance()
             print('{} needs additional funding of {} ({} ETH) with native token to cover missing funds'.format(
                 INSTANCE_OPERATOR,
                 additionalFunds,
@@ -157,28 +164,29 @@ def check_erc20_funds(a, erc20_token):
 
 
 def amend_funds(stakeholders_accounts):
+    requiredFunds = get_required_funds()
     a = stakeholders_accounts
-    for accountName, requiredAmount in REQUIRED_FUNDS.items():
-        if a[accountName].balance() < REQUIRED_FUNDS[accountName]:
-            missingAmount = REQUIRED_FUNDS[accountName] - a[accountName].balance()
+    for accountName, requiredAmount in requiredFunds.items():
+        if a[accountName].balance() < requiredFunds[accountName]:
+            missingAmount = requiredFunds[accountName] - a[accountName].balance()
             print('funding {} with {}'.format(accountName, missingAmount))
             a[INSTANCE_OPERATOR].transfer(a[accountName], missingAmount)
 
     print('re-run check_funds() to verify funding before deploy')
 
 
-def _print_constants():
+def _print_constants(gasPrice):
     print('chain id: {}'.format(web3.eth.chain_id))
-    print('gas price [Mwei]: {}'.format(GAS_PRICE/10**6))
+    print('gas price [Mwei]: {}'.format(gasPrice/10**6))
     print('gas price safety factor: {}'.format(GAS_PRICE_SAFETY_FACTOR))
 
     print('gas S: {}'.format(GAS_S))
     print('gas M: {}'.format(GAS_M))
     print('gas L: {}'.format(GAS_L))
 
-    print('required S [ETH]: {}'.format(REQUIRED_FUNDS_S / 10**18))
-    print('required M [ETH]: {}'.format(REQUIRED_FUNDS_M / 10**18))
-    print('required L [ETH]: {}'.format(REQUIRED_FUNDS_L / 10**18))
+    print('required S [ETH]: {}'.format(int(gasPrice * GAS_PRICE_SAFETY_FACTOR * GAS_S) / 10**18))
+    print('required M [ETH]: {}'.format(int(gasPrice * GAS_PRICE_SAFETY_FACTOR * GAS_M) / 10**18))
+    print('required L [ETH]: {}'.format(int(gasPrice * GAS_PRICE_SAFETY_FACTOR * GAS_L) / 10**18))
 
 
 def _get_balances(stakeholders_accounts):
@@ -0,0 +1,261 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import signal
+import time
+
+from brownie import network
+
+from scripts.containers import (
+    TestCoin,
+)
+
+from brownie._config import CONFIG
+from brownie.network import accounts
+from brownie.network.rpc import Rpc
+
+from scripts.const import ACCOUNTS_MNEMONIC
+from scripts.instance import GifInstance
+from scripts.util import get_account
+
+# local dev nodes with a prebuilt instance state
+#
+# the state directory contains the node state (anvil state file or ganache
+# database) and a deployment file with the addresses of the prebuilt contracts.
+# pytest-xdist workers launch their own node on their own port and start
+# from a private copy of the prebuilt state.
+#
+# prebuilt states are cached per hash of the compiled contracts, the deploy
+# scripts and the network config. a change to any of them leads to a new state.
+#
+# build the state (anvil is used if installed, ganache otherwise)
+# $ brownie run scripts/devnode.py
+#
+# run the tests on 16 workers starting from the prebuilt state
+# $ brownie test -n 16 --dist loadfile --dev-node-state build/devnode
+#
+# run the tests starting from the cached state, builds the state if needed
+# $ brownie test -n 16 --dist loadfile --dev-node-state cache
+
+ANVIL = 'anvil'
+GANACHE = 'ganache'
+
+DEV_NETWORK = 'development'
+DEV_NODE_PORT = 8545
+DEV_NODE_STATE_DIR = os.path.join('build', 'devnode')
+DEV_NODE_CACHE_DIR = os.path.join('build', 'devnode-cache')
+DEV_NODE_CACHE_SIZE = 3
+
+# anything that changes the prebuilt state
+BUILD_ARTIFACTS = os.path.join('build', 'contracts', '**', '*.json')
+DEPLOY_SCRIPTS = [
+    'brownie-config.yaml',
+    os.path.join('scripts', 'const.py'),
+    os.path.join('scripts', 'util.py'),
+    os.path.join('scripts', 'instance.py'),
+    os.path.join('scripts', 'devnode.py'),
+]
+
+DEPLOYMENT_FILE = 'deployment.json'
+ANVIL_STATE_FILE = 'state.json'
+GANACHE_DB_DIR = 'db'
+
+MASTER = 'master'
+
+
+def worker_id() -> str:
+    return os.environ.get('PYTEST_XDIST_WORKER', MASTER)
+
+
+def worker_index() -> int:
+    digits = re.sub(r'\D', '', worker_id())
+    return int(digits) if digits else 0
+
+
+def node_backend() -> str:
+    backend = os.environ.get('GIF_DEV_NODE')
+    if backend:
+        assert backend in [ANVIL, GANACHE], 'unsupported dev node {}'.format(backend)
+        return backend
+
+    return ANVIL if shutil.which(ANVIL) else GANACHE
+
+
+def node_command(backend: str, stateDir: str = None, dumpState: bool = False) -> str:
+    if backend == ANVIL:
+        cmd = ANVIL
+        if stateDir:
+            stateFile = os.path.join(stateDir, ANVIL_STATE_FILE)
+            option = '--dump-state' if dumpState else '--load-state'
+            cmd = '{} {} {}'.format(cmd, option, stateFile)
+
+        return cmd
+
+    # ganache persists its database while running, loading and dumping is the same
+    cmd = 'ganache-cli'
+    if stateDir:
+        cmd = '{} --database.dbPath {}'.format(cmd, os.path.join(stateDir, GANACHE_DB_DIR))
+
+    return cmd
+
+
+def configure_node(
+    stateDir: str = None,
+    dumpState: bool = False,
+    backend: str = None,
+    port: int = None,
+    networkId: str = DEV_NETWORK
+):
+    # needs to happen before brownie launches the node of the network
+    settings = CONFIG.networks[networkId]
+    settings['cmd'] = node_command(backend or node_backend(), stateDir, dumpState)
+
+    if port:
+        settings['cmd_settings']['port'] = port
+
+
+def configure_worker_node(stateDir: str = None, networkId: str = DEV_NETWORK) -> str:
+    # each worker gets its own node on its own port
+    # the ganache database is modified by the node and is copied per worker
+    backend = node_backend()
+    workerStateDir = stateDir
+
+    if stateDir and backend == GANACHE:
+        workerStateDir = os.path.join(stateDir, 'workers', worker_id())
+        shutil.rmtree(workerStateDir, ignore_errors=True)
+        shutil.copytree(
+            os.path.join(stateDir, GANACHE_DB_DIR),
+            os.path.join(workerStateDir, GANACHE_DB_DIR))
+
+    configure_node(
+        workerStateDir,
+        backend=backend,
+        port=DEV_NODE_PORT + worker_index(),
+        networkId=networkId)
+
+    return workerStateDir
+
+
+def load_deployment(stateDir: str) -> dict:
+    with open(os.path.join(stateDir, DEPLOYMENT_FILE)) as f:
+        return json.load(f)
+
+
+def instance_from_deployment(deployment: dict) -> dict:
+    return {
+        'erc20Token': TestCoin.at(deployment['erc20Token']),
+        'instance': GifInstance(registryAddress=deployment['registry']),
+    }
+
+
+def deploy_instance() -> dict:
+    # same accounts as the instanceOperator and instanceWallet test fixtures
+    owner = fund_account(0)
+    feeOwner = fund_account(1)
+
+    erc20Token = TestCoin.deploy({'from': owner})
+    instance = GifInstance(owner, feeOwner)
+
+    return {
+        'registry': instance.getRegistry().address,
+        'erc20Token': erc20Token.address,
+    }
+
+
+def fund_account(accountNo: int, funding='1 ether'):
+    account = get_account(ACCOUNTS_MNEMONIC, accountNo)
+    accounts[accountNo].transfer(account, funding)
+    return account
+
+
+def build_state(stateDir: str = DEV_NODE_STATE_DIR, deploy=deploy_instance) -> dict:
+    backend = node_backend()
+    shutil.rmtree(stateDir, ignore_errors=True)
+    os.makedirs(stateDir)
+
+    if network.is_connected():
+        network.disconnect()
+
+    configure_node(stateDir, dumpState=True, backend=backend)
+    network.connect(DEV_NETWORK)
+
+    deployment = deploy()
+    deployment['backend'] = backend
+
+    with open(os.path.join(stateDir, DEPLOYMENT_FILE), 'w') as f:
+        json.dump(deployment, f, indent=2)
+
+    # anvil only writes its state file on a regular shutdown
+    process = Rpc().process
+    process.send_signal(signal.SIGINT)
+    process.wait()
+    network.disconnect(kill_rpc=False)
+
+    return deployment
+
+
+def state_key(backend: str = None) -> str:
+    digest = hashlib.sha256((backend or node_backend()).encode())
+
+    for path in sorted(glob.glob(BUILD_ARTIFACTS, recursive=True)):
+        with open(path) as f:
+            artifact = json.load(f)
+
+        # abi and metadata changes without bytecode changes do not affect the state
+        digest.update(artifact.get('contractName', '').encode())
+        digest.update(artifact.get('bytecode', '').encode())
+
+    for path in DEPLOY_SCRIPTS:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()[:16]
+
+
+def cached_state_dir(cacheDir: str = DEV_NODE_CACHE_DIR, backend: str = None) -> str:
+    return os.path.join(cacheDir, state_key(backend))
+
+
+def cached_state(cacheDir: str = DEV_NODE_CACHE_DIR, deploy=deploy_instance) -> str:
+    stateDir = cached_state_dir(cacheDir)
+
+    if os.path.isfile(os.path.join(stateDir, DEPLOYMENT_FILE)):
+        os.utime(stateDir)
+        return stateDir
+
+    # build aside and move into place, an interrupted build leaves no cache entry
+    buildDir = '{}.{}'.format(stateDir, os.getpid())
+    build_state(buildDir, deploy)
+    shutil.rmtree(stateDir, ignore_errors=True)
+    os.rename(buildDir, stateDir)
+
+    prune_state_cache(cacheDir)
+    return stateDir
+
+
+def prune_state_cache(cacheDir: str = DEV_NODE_CACHE_DIR, keep: int = DEV_NODE_CACHE_SIZE) -> list:
+    entries = [
+        os.path.join(cacheDir, name) for name in os.listdir(cacheDir)
+        if os.path.isfile(os.path.join(cacheDir, name, DEPLOYMENT_FILE))]
+
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for stateDir in entries[keep:]:
+        shutil.rmtree(stateDir, ignore_errors=True)
+
+    return entries[keep:]
+
+
+def main():
+    start = time.perf_counter()
+    stateDir = cached_state()
+    deployment = load_deployment(stateDir)
+
+    # fixed location for --dev-node-state build/devnode
+    shutil.rmtree(DEV_NODE_STATE_DIR, ignore_errors=True)
+    shutil.copytree(stateDir, DEV_NODE_STATE_DIR, ignore=shutil.ignore_patterns('workers'))
+
+    print('dev node state ({}) {} in {:.1f}s, copied to {}'.format(
+        deployment['backend'], stateDir, time.perf_counter() - start, DEV_NODE_STATE_DIR))
@@ -0,0 +1,581 @@
+from hypothesis import strategies as st
+
+from brownie.exceptions import VirtualMachineError
+from brownie.network.account import Account
+from brownie.test import strategy
+
+from scripts.instance import GifInstance
+from scripts.model import (
+    MAX_UINT256,
+    BUNDLE_OWNER,
+    CUSTOMER,
+    RISKPOOL_WALLET,
+    INSTANCE_WALLET,
+    TREASURY,
+    BUNDLE_ACTIVE,
+    BUNDLE_LOCKED,
+    BUNDLE_CLOSED,
+    APPLICATION_APPLIED,
+    APPLICATION_UNDERWRITTEN,
+    POLICY_ACTIVE,
+    POLICY_EXPIRED,
+    CLAIM_APPLIED,
+    CLAIM_CONFIRMED,
+    CLAIM_DECLINED,
+    OP_FUND,
+    OP_APPROVE,
+    OP_CREATE_BUNDLE,
+    OP_FUND_BUNDLE,
+    OP_DEFUND_BUNDLE,
+    OP_LOCK_BUNDLE,
+    OP_UNLOCK_BUNDLE,
+    OP_CLOSE_BUNDLE,
+    OP_BURN_BUNDLE,
+    OP_APPLY_FOR_POLICY,
+    OP_UNDERWRITE,
+    OP_COLLECT_PREMIUM,
+    OP_SUBMIT_CLAIM,
+    OP_CONFIRM_CLAIM,
+    OP_DECLINE_CLAIM,
+    OP_CLOSE_CLAIM,
+    OP_CREATE_PAYOUT,
+    OP_EXPIRE,
+    OP_CLOSE,
+    OP_SET_FEE_ACCRUAL,
+    OP_SWEEP_FEES,
+    OP_FORWARD_NET_PREMIUMS,
+    Bundle,
+    Claim,
+    GifModel,
+    Process,
+)
+
+# differential testing of the reference model (scripts/model.py) against a gif instance
+#
+# ChainDriver executes the operations of the model as transactions against the
+# test product and test riskpool and reads back the chain state in the structure
+# of GifModel.state. model bundle ids and process indices are mapped to the
+# bundle ids and process ids created on chain, ids that do not exist in the model
+# are mapped to ids that do not exist on chain either.
+#
+# operations are compared by revert status and resulting state, revert reasons
+# are only reported: the check order of the gif-interface base contracts is not
+# part of the model.
+#
+# DifferentialStateMachine generates the operation sequences, without a driver
+# it checks the model invariants only.
+#
+# usage (brownie console)
+# >>> from brownie.test import state_machine
+# >>> from scripts.differential import ChainDriver, DifferentialStateMachine
+# >>> driver = ChainDriver(instance, product, riskpool, coin, owner, riskpoolKeeper, customer, productOwner, capitalOwner, feeOwner, maxActiveBundles=3)
+# >>> state_machine(DifferentialStateMachine, driver, 3, settings={'max_examples': 20, 'stateful_step_count': 100})
+
+# upper bound for drawn amounts
+MAX_AMOUNT = 10000
+
+
+class ChainDriver(object):
+
+    def __init__(
+        self,
+        instance: GifInstance,
+        product,
+        riskpool,
+        coin,
+        owner: Account,
+        riskpoolKeeper: Account,
+        customer: Account,
+        productOwner: Account,
+        riskpoolWallet: Account,
+        instanceWallet: Account,
+        maxActiveBundles: int = 1,
+    ):
+        self.instance = instance
+        self.instanceService = instance.getInstanceService()
+        self.instanceOperatorService = instance.getInstanceOperatorService()
+        self.treasury = instance.getTreasury()
+
+        self.product = product
+        self.riskpool = riskpool
+        self.riskpoolId = riskpool.getId()
+        self.coin = coin
+
+        self.owner = owner
+        self.riskpoolKeeper = riskpoolKeeper
+        self.productOwner = productOwner
+        self.accounts = {
+            BUNDLE_OWNER: riskpoolKeeper,
+            CUSTOMER: customer,
+            RISKPOOL_WALLET: riskpoolWallet,
+            INSTANCE_WALLET: instanceWallet,
+        }
+
+        # chain ids of the model entities
+        self.bundleIds = []
+        self.processIds = []
+
+        self.riskpool.setMaximumNumberOfActiveBundles(maxActiveBundles, {'from': riskpoolKeeper})
+
+        # start from the empty token state of the model
+        for account in self.accounts.values():
+            balance = self.coin.balanceOf(account)
+            if balance > 0:
+                self.coin.transfer(owner, balance, {'from': account})
+
+            self.coin.approve(self.treasury, 0, {'from': account})
+
+    def reset(self):
+        # after a revert of the chain to the state right after the constructor
+        self.bundleIds = []
+        self.processIds = []
+
+    def execute(self, op: str, *args) -> tuple:
+        # (reverted, reason or return value), same signature as GifModel.try_execute
+        try:
+            return (False, getattr(self, '_' + op)(*args))
+        except VirtualMachineError as e:
+            return (True, e.revert_msg)
+
+    def _bundle_id(self, bundleId: int) -> int:
+        if 0 < bundleId <= len(self.bundleIds):
+            return self.bundleIds[bundleId - 1]
+
+        # not an existing bundle id on chain
+        return 0
+
+    def _process_id(self, processId: int) -> bytes:
+        if 0 <= processId < len(self.processIds):
+            return self.processIds[processId]
+
+        return bytes(32)
+
+    # --- token ---
+
+    def _fund(self, account: str, amount: int):
+        self.coin.transfer(self.accounts[account], amount, {'from': self.owner})
+
+    def _approve(self, account: str, amount: int):
+        self.coin.approve(self.treasury, amount, {'from': self.accounts[account]})
+
+    # --- bundles ---
+
+    def _createBundle(self, amount: int) -> int:
+        tx = self.riskpool.createBundle(bytes(0), amount, {'from': self.riskpoolKeeper})
+        self.bundleIds.append(tx.return_value)
+        return len(self.bundleIds)
+
+    def _fundBundle(self, bundleId: int, amount: int) -> int:
+        tx = self.riskpool.fundBundle(self._bundle_id(bundleId), amount, {'from': self.riskpoolKeeper})
+        return tx.return_value
+
+    def _defundBundle(self, bundleId: int, amount: int) -> int:
+        tx = self.riskpool.defundBundle(self._bundle_id(bundleId), amount, {'from': self.riskpoolKeeper})
+        return tx.return_value
+
+    def _lockBundle(self, bundleId: int):
+        self.riskpool.lockBundle(self._bundle_id(bundleId), {'from': self.riskpoolKeeper})
+
+    def _unlockBundle(self, bundleId: int):
+        self.riskpool.unlockBundle(self._bundle_id(bundleId), {'from': self.riskpoolKeeper})
+
+    def _closeBundle(self, bundleId: int):
+        self.riskpool.closeBundle(self._bundle_id(bundleId), {'from': self.riskpoolKeeper})
+
+    def _burnBundle(self, bundleId: int):
+        self.riskpool.burnBundle(self._bundle_id(bundleId), {'from': self.riskpoolKeeper})
+
+    # --- policies ---
+
+    def _applyForPolicy(self, premiumAmount: int, sumInsuredAmount: int) -> int:
+        tx = self.product.applyForPolicy(
+            premiumAmount,
+            sumInsuredAmount,
+            bytes(0),
+            bytes(0),
+            {'from': self.accounts[CUSTOMER]})
+
+        self.processIds.append(tx.return_value)
+        return len(self.processIds) - 1
+
+    def _underwrite(self, processId: int) -> bool:
+        policies = self.product.policies()
+        self.product.underwrite(self._process_id(processId), {'from': self.productOwner})
+        return self.product.policies() > policies
+
+    def _collectPremium(self, processId: int, amount: int) -> bool:
+        tx = self.product.collectPremium['bytes32,uint256'](
+            self._process_id(processId),
+            amount,
+            {'from': self.productOwner})
+
+        return tx.return_value[0]
+
+    def _submitClaim(self, processId: int, claimAmount: int) -> int:
+        tx = self.product.submitClaimNoOracle(self._process_id(processId), claimAmount, {'from': self.accounts[CUSTOMER]})
+        return tx.return_value
+
+    def _confirmClaim(self, processId: int, claimId: int, confirmedAmount: int):
+        self.product.confirmClaim(self._process_id(processId), claimId, confirmedAmount, {'from': self.productOwner})
+
+    def _declineClaim(self, processId: int, claimId: int):
+        self.product.declineClaim(self._process_id(processId), claimId, {'from': self.productOwner})
+
+    def _closeClaim(self, processId: int, claimId: int):
+        self.product.closeClaim(self._process_id(processId), claimId, {'from': self.productOwner})
+
+    def _createPayout(self, processId: int, claimId: int, payoutAmount: int) -> int:
+        tx = self.product.createPayout(self._process_id(processId), claimId, payoutAmount, {'from': self.productOwner})
+        return tx.return_value
+
+    def _expire(self, processId: int):
+        self.product.expire(self._process_id(processId), {'from': self.productOwner})
+
+    def _close(self, processId: int):
+        self.product.close(self._process_id(processId), {'from': self.productOwner})
+
+    # --- treasury ---
+
+    def _setFeeAccrual(self, enabled: bool):
+        self.instanceOperatorService.setFeeAccrual(enabled, {'from': self.owner})
+
+    def _sweepFees(self) -> int:
+        tx = self.instanceOperatorService.sweepFees(self.coin, {'from': self.owner})
+        return tx.return_value
+
+    def _forwardNetPremiums(self) -> int:
+        tx = self.instanceOperatorService.forwardNetPremiums(self.riskpoolId, {'from': self.owner})
+        return tx.return_value
+
+    # --- state ---
+
+    def _balances(self) -> dict:
+        balances = {name: self.coin.balanceOf(account) for (name, account) in self.accounts.items()}
+
+        # accrued fees and pending net premiums are held by the treasury
+        balances[TREASURY] = self.coin.balanceOf(self.treasury)
+        return balances
+
+    def state(self) -> dict:
+        # chain state with the structure of GifModel.state
+        instanceService = self.instanceService
+        pool = instanceService.getRiskpool(self.riskpoolId).dict()
+
+        bundles = []
+        for bundleId in self.bundleIds:
+            bundle = instanceService.getBundle(bundleId).dict()
+            bundles.append({
+                'state': bundle['state'],
+                'capital': bundle['capital'],
+                'lockedCapital': bundle['lockedCapital'],
+                'balance': bundle['balance'],
+            })
+
+        processes = []
+        for processId in self.processIds:
+            application = instanceService.getApplication(processId).dict()
+            process = {
+                'applicationState': application['state'],
+                'policyState': None,
+                'premiumPaidAmount': 0,
+                'payoutAmount': 0,
+                'claimsCount': 0,
+                'openClaimsCount': 0,
+                'claims': [],
+            }
+
+            if application['state'] == APPLICATION_UNDERWRITTEN:
+                policy = instanceService.getPolicy(processId).dict()
+                process['policyState'] = policy['state']
+                process['premiumPaidAmount'] = policy['premiumPaidAmount']
+                process['payoutAmount'] = policy['payoutAmount']
+                process['claimsCount'] = policy['claimsCount']
+                process['openClaimsCount'] = policy['openClaimsCount']
+
+                for claimId in range(policy['claimsCount']):
+                    claim = instanceService.getClaim(processId, claimId).dict()
+                    process['claims'].append((claim['state'], claim['claimAmount'], claim['paidAmount']))
+
+            processes.append(process)
+
+        activeBundleIds = [
+            instanceService.getActiveBundleId(self.riskpoolId, idx)
+            for idx in range(instanceService.activeBundles(self.riskpoolId))]
+
+        return {
+            'balances': self._balances(),
+            'pool': {
+                'capital': pool['capital'],
+                'lockedCapital': pool['lockedCapital'],
+                'balance': pool['balance'],
+                'sumOfSumInsuredAtRisk': pool['sumOfSumInsuredAtRisk'],
+            },
+            'activeBundles': [self.bundleIds.index(bundleId) + 1 for bundleId in activeBundleIds],
+            'accruedFees': instanceService.getAccruedFees(self.coin),
+            'pendingNetPremiums': instanceService.getPendingNetPremiums(self.riskpoolId),
+            'bundles': bundles,
+            'processes': processes,
+        }
+
+
+def diff_state(expected, actual, path: str = '') -> list:
+    # list of (path, expected, actual) for every differing leaf
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        diffs = []
+        for key in sorted(set(expected.keys()) | set(actual.keys())):
+            diffs += diff_state(expected.get(key), actual.get(key), '{}.{}'.format(path, key) if path else key)
+        return diffs
+
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)) and len(expected) == len(actual):
+        diffs = []
+        for (idx, (e, a)) in enumerate(zip(expected, actual)):
+            diffs += diff_state(e, a, '{}[{}]'.format(path, idx))
+        return diffs
+
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+        return [(path, expected, actual)]
+
+    return [] if expected == actual else [(path, expected, actual)]
+
+
+def compare_step(model: GifModel, driver: ChainDriver, op: str, args: tuple) -> list:
+    # executes a single operation against model and chain
+    # returns the differences in revert status and state, empty if both agree
+    (modelReverted, modelResult) = model.try_execute(op, *args)
+    (chainReverted, chainResult) = driver.execute(op, *args)
+
+    if modelReverted != chainReverted:
+        return [('{}{}.reverted'.format(op, args), (modelReverted, modelResult), (chainReverted, chainResult))]
+
+    return diff_state(model.state(), driver.state())
+
+
+class DifferentialStateMachine(object):
+
+    # stateful property based test of the model, run with brownie.test.state_machine.
+    # every rule executes one model operation, with a chain driver the operation is
+    # also executed on chain and compared. targeted operations pick an entity the
+    # operation can succeed on and an amount within its limits, the others pick any
+    # existing id, an id that does not exist or an unbounded amount. hypothesis
+    # shrinks a failing sequence towards few steps, the first entities and small
+    # amounts. the number of examples and steps per example are taken from the
+    # hypothesis section of brownie-config.yaml or the settings passed to state_machine.
+
+    st_account = st.sampled_from([BUNDLE_OWNER, CUSTOMER])
+    st_amount = strategy('uint256', max_value=MAX_AMOUNT)
+    st_capital = strategy('uint256', min_value=MAX_AMOUNT, max_value=10 * MAX_AMOUNT)
+    st_allowance = st.one_of(st.just(MAX_UINT256), strategy('uint256', max_value=MAX_AMOUNT))
+    st_index = strategy('uint8')
+    st_bool = strategy('bool')
+
+    # nine out of ten operations are targeted, like in OperationGenerator
+    st_targeted = st.sampled_from([True] * 9 + [False])
+
+    def __init__(cls, driver: ChainDriver = None, maxActiveBundles: int = 1):
+        cls.driver = driver
+        cls.maxActiveBundles = maxActiveBundles
+
+    def setup(self):
+        self.model = GifModel(maxActiveBundles=self.maxActiveBundles)
+
+        if self.driver:
+            self.driver.reset()
+
+        # the riskpool wallet pays out claims and returns capital
+        self._step(OP_APPROVE, RISKPOOL_WALLET, MAX_UINT256)
+
+    def initialize_bundle(self, capital='st_capital'):
+        # funded accounts and a first bundle, most sequences then reach policies and claims
+        for account in [BUNDLE_OWNER, CUSTOMER]:
+            self._step(OP_FUND, account, 10 * MAX_AMOUNT)
+            self._step(OP_APPROVE, account, MAX_UINT256)
+
+        self._step(OP_CREATE_BUNDLE, capital)
+
+    def _step(self, op: str, *args):
+        if self.driver is None:
+            self.model.try_execute(op, *args)
+            return
+
+        diffs = compare_step(self.model, self.driver, op, args)
+        assert diffs == [], format_mismatch(op, args, diffs)
+
+    def invariant_model(self):
+        self.model.check_invariants()
+
+    # --- argument selection ---
+
+    def _select(self, index: int, candidates: list, existing: list, targeted: bool):
+        # a candidate the operation can succeed on or any existing id including one that does not exist
+        ids = candidates if candidates and targeted else existing
+        return ids[index % len(ids)]
+
+    def _bundle_id(self, index: int, targeted: bool, states: list) -> int:
+        bundles = self.model.bundles
+        return self._select(
+            index,
+            [bundle.id for bundle in bundles if bundle.state in states],
+            list(range(1, len(bundles) + 2)),
+            targeted)
+
+    def _bundle(self, bundleId: int) -> Bundle:
+        return self.model.bundles[bundleId - 1] if bundleId <= len(self.model.bundles) else None
+
+    def _process_id(self, index: int, targeted: bool, condition) -> int:
+        processes = self.model.processes
+        return self._select(
+            index,
+            [process.id for process in processes if condition(process)],
+            list(range(len(processes) + 1)),
+            targeted)
+
+    def _process(self, processId: int) -> Process:
+        return self.model.processes[processId] if processId < len(self.model.processes) else None
+
+    def _claim_id(self, index: int, targeted: bool, condition) -> tuple:
+        processes = self.model.processes
+        return self._select(
+            index,
+            [
+                (process.id, claimId)
+                for process in processes
+                for (claimId, claim) in enumerate(process.claims)
+                if condition(claim)],
+            [
+                (process.id, claimId)
+                for process in processes
+                for claimId in range(len(process.claims) + 1)] + [(len(processes), 0)],
+            targeted)
+
+    def _claim(self, processId: int, claimId: int) -> Claim:
+        process = self._process(processId)
+        return process.claims[claimId] if process and claimId < len(process.claims) else None
+
+    def _limit(self, amount: int, maxAmount: int, targeted: bool) -> int:
+        return amount % (maxAmount + 1) if targeted else amount
+
+    # --- token ---
+
+    def rule_fund(self, account='st_account', amount='st_amount'):
+        self._step(OP_FUND, account, 5 * amount)
+
+    def rule_approve(self, account='st_account', allowance='st_allowance'):
+        self._step(OP_APPROVE, account, allowance)
+
+    # --- bundles ---
+
+    def _capital_amount(self, amount: int, targeted: bool) -> int:
+        # within balance and allowance of the bundle owner
+        available = min(self.model.balances[BUNDLE_OWNER], self.model.allowances[BUNDLE_OWNER], MAX_AMOUNT)
+        return self._limit(amount, available, targeted)
+
+    def rule_create_bundle(self, amount='st_amount', targeted='st_targeted'):
+        self._step(OP_CREATE_BUNDLE, self._capital_amount(amount, targeted))
+
+    def rule_fund_bundle(self, index='st_index', amount='st_amount', targeted='st_targeted'):
+        bundleId = self._bundle_id(index, targeted, [BUNDLE_ACTIVE, BUNDLE_LOCKED])
+        self._step(OP_FUND_BUNDLE, bundleId, self._capital_amount(amount, targeted))
+
+    def rule_defund_bundle(self, index='st_index', amount='st_amount', targeted='st_targeted'):
+        bundleId = self._bundle_id(index, targeted, [BUNDLE_ACTIVE, BUNDLE_LOCKED, BUNDLE_CLOSED])
+        bundle = self._bundle(bundleId)
+
+        # same withdrawal limit as BundleController.defund
+        if bundle:
+            maxAmount = bundle.balance if bundle.lockedCapital == 0 else bundle.capital - bundle.lockedCapital
+            amount = self._limit(amount, maxAmount, targeted)
+
+        self._step(OP_DEFUND_BUNDLE, bundleId, amount)
+
+    def rule_lock_bundle(self, index='st_index', targeted='st_targeted'):
+        self._step(OP_LOCK_BUNDLE, self._bundle_id(index, targeted, [BUNDLE_ACTIVE]))
+
+    def rule_unlock_bundle(self, index='st_index', targeted='st_targeted'):
+        self._step(OP_UNLOCK_BUNDLE, self._bundle_id(index, targeted, [BUNDLE_LOCKED]))
+
+    def rule_close_bundle(self, index='st_index', targeted='st_targeted'):
+        self._step(OP_CLOSE_BUNDLE, self._bundle_id(index, targeted, [BUNDLE_ACTIVE, BUNDLE_LOCKED]))
+
+    def rule_burn_bundle(self, index='st_index', targeted='st_targeted'):
+        self._step(OP_BURN_BUNDLE, self._bundle_id(index, targeted, [BUNDLE_CLOSED]))
+
+    # --- policies ---
+
+    def rule_apply_for_policy(self, sumInsured='st_amount', premium='st_amount'):
+        sumInsuredAmount = 1 + sumInsured % (MAX_AMOUNT // 2)
+        self._step(OP_APPLY_FOR_POLICY, premium % (sumInsuredAmount // 5 + 1), sumInsuredAmount)
+
+    def rule_underwrite(self, index='st_index', targeted='st_targeted'):
+        self._step(OP_UNDERWRITE, self._process_id(index, targeted, lambda process: process.applicationState == APPLICATION_APPLIED))
+
+    def rule_collect_premium(self, index='st_index', amount='st_amount', targeted='st_targeted'):
+        processId = self._process_id(index, targeted, lambda process: (
+            process.policyState in [POLICY_ACTIVE, POLICY_EXPIRED]
+            and process.premiumPaidAmount < process.premiumExpectedAmount))
+
+        process = self._process(processId)
+        if process and process.policyState is not None:
+            amount = self._limit(amount, process.premiumExpectedAmount - process.premiumPaidAmount, targeted)
+
+        self._step(OP_COLLECT_PREMIUM, processId, amount)
+
+    def rule_submit_claim(self, index='st_index', amount='st_amount', targeted='st_targeted'):
+        processId = self._process_id(index, targeted, lambda process: process.policyState == POLICY_ACTIVE)
+
+        process = self._process(processId)
+        if process and process.policyState is not None:
+            amount = self._limit(amount, process.payoutMaxAmount - process.payoutAmount, targeted)
+
+        self._step(OP_SUBMIT_CLAIM, processId, amount)
+
+    def rule_confirm_claim(self, index='st_index', amount='st_amount', targeted='st_targeted'):
+        (processId, claimId) = self._claim_id(index, targeted, lambda claim: claim.state == CLAIM_APPLIED)
+
+        claim = self._claim(processId, claimId)
+        if claim:
+            process = self._process(processId)
+            amount = self._limit(amount, min(claim.claimAmount, process.payoutMaxAmount - process.payoutAmount), targeted)
+
+        self._step(OP_CONFIRM_CLAIM, processId, claimId, amount)
+
+    def rule_decline_claim(self, index='st_index', targeted='st_targeted'):
+        self._step(OP_DECLINE_CLAIM, *self._claim_id(index, targeted, lambda claim: claim.state == CLAIM_APPLIED))
+
+    def rule_close_claim(self, index='st_index', targeted='st_targeted'):
+        self._step(OP_CLOSE_CLAIM, *self._claim_id(index, targeted, lambda claim: (
+            claim.state == CLAIM_DECLINED
+            or (claim.state == CLAIM_CONFIRMED and claim.claimAmount == claim.paidAmount))))
+
+    def rule_create_payout(self, index='st_index', amount='st_amount', targeted='st_targeted'):
+        (processId, claimId) = self._claim_id(index, targeted, lambda claim: claim.state == CLAIM_CONFIRMED and claim.paidAmount < claim.claimAmount)
+
+        claim = self._claim(processId, claimId)
+        if claim:
+            amount = self._limit(amount, claim.claimAmount - claim.paidAmount, targeted)
+
+        self._step(OP_CREATE_PAYOUT, processId, claimId, amount)
+
+    def rule_expire(self, index='st_index', targeted='st_targeted'):
+        self._step(OP_EXPIRE, self._process_id(index, targeted, lambda process: process.policyState == POLICY_ACTIVE))
+
+    def rule_close(self, index='st_index', targeted='st_targeted'):
+        self._step(OP_CLOSE, self._process_id(index, targeted, lambda process: process.policyState == POLICY_EXPIRED and process.openClaimsCount == 0))
+
+    # --- treasury ---
+
+    def rule_set_fee_accrual(self, enabled='st_bool'):
+        self._step(OP_SET_FEE_ACCRUAL, enabled)
+
+    def rule_sweep_fees(self):
+        self._step(OP_SWEEP_FEES)
+
+    def rule_forward_net_premiums(self):
+        self._step(OP_FORWARD_NET_PREMIUMS)
+
+
+def format_mismatch(op: str, args: tuple, diffs: list) -> str:
+    lines = ['{}{} model and chain differ'.format(op, args)]
+    for (path, expected, actual) in diffs:
+        lines.append('{}: model {} chain {}'.format(path, expected, actual))
+
+    return '\n'.join(lines)
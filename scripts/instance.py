@@ -7,10 +7,9 @@ from brownie.convert import to_bytes
 from brownie.network import accounts
 from brownie.network.account import Account
 
-# pylint: disable-msg=E0611
-from brownie import (
-    Wei,
-    Contract, 
+from brownie import Wei, Contract, network
+
+from scripts.containers import (
     BundleToken,
     RiskpoolToken,
     CoreProxy,
@@ -30,8 +29,7 @@ from brownie import (
     ComponentOwnerService,
     PolicyDefaultFlow,
     InstanceOperatorService,
-    InstanceService,
-    network
+    InstanceService
 )
 
 from scripts.const import (
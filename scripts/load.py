@@ -0,0 +1,339 @@
+import random
+import time
+
+from web3.exceptions import TransactionNotFound
+
+from brownie import web3
+from brownie.network import accounts
+from brownie.network.account import Account, LocalAccount
+
+from scripts.instance import GifInstance
+from scripts.setup import fund_riskpool
+
+# end-to-end policy traffic against a local node
+#
+# every policy runs through a flow of transactions (application, underwriting,
+# premium collection, claim, payout) where each step depends on the previous one.
+# customers run concurrently, one policy flow at a time per customer so that the
+# premium allowance of a customer only covers the flow in progress. transactions
+# are signed locally and sent as raw transactions with pipelined nonces per sender,
+# without waiting for earlier transactions of the same sender to be mined.
+#
+# usage (brownie console)
+# >>> from scripts.load import setup_load, LoadGenerator
+# >>> customers = setup_load(instance, owner, riskpool, riskpoolKeeper, capitalOwner, coin, customers=20, bundles=5)
+# >>> generator = LoadGenerator(instance, product, productOwner, coin, customers, mix={'premium': 0.9, 'claim': 0.3, 'payout': 0.8})
+# >>> generator.run(policies=500, inFlight=50).print_report()
+
+OP_APPLICATION = 'application'
+OP_UNDERWRITE = 'underwrite'
+OP_APPROVE = 'approve'
+OP_PREMIUM = 'premium'
+OP_CLAIM = 'claim'
+OP_CONFIRM_CLAIM = 'confirmClaim'
+OP_PAYOUT = 'payout'
+
+# probability that a policy flow continues with the named step
+DEFAULT_MIX = {
+    OP_PREMIUM: 1.0,
+    OP_CLAIM: 0.3,
+    OP_PAYOUT: 1.0,
+}
+
+# failure categories
+FAILURE_REVERTED = 'reverted'
+FAILURE_SEND = 'send'
+FAILURE_TIMEOUT = 'timeout'
+
+DEFAULT_GAS_LIMIT = 2000000
+PERCENTILES = [50, 90, 99]
+
+
+class Sender(object):
+
+    def __init__(self, account: LocalAccount):
+        assert isinstance(account, LocalAccount), 'raw transactions need a local account with private key'
+        self.account = account
+        self.resync()
+
+    def resync(self):
+        self.nonce = web3.eth.get_transaction_count(self.account.address, 'pending')
+
+    def next_nonce(self) -> int:
+        nonce = self.nonce
+        self.nonce += 1
+        return nonce
+
+
+class PolicyFlow(object):
+
+    def __init__(self, customer: int, steps: list):
+        self.customer = customer
+        self.steps = steps
+        self.processId = None
+        self.claimId = None
+
+    def next_step(self) -> str:
+        return self.steps.pop(0) if self.steps else None
+
+
+class LoadReport(object):
+
+    def __init__(self):
+        self.latencies = {}
+        self.failures = {}
+        self.sent = 0
+        self.mined = 0
+        self.policies = 0
+        self.completed = 0
+        self.start = time.perf_counter()
+        self.end = None
+
+    def add_latency(self, op: str, seconds: float):
+        self.latencies.setdefault(op, []).append(seconds)
+
+    def add_failure(self, op: str, category: str):
+        key = '{}:{}'.format(op, category)
+        self.failures[key] = self.failures.get(key, 0) + 1
+
+    def summary(self) -> dict:
+        elapsed = (self.end or time.perf_counter()) - self.start
+        allLatencies = [latency for latencies in self.latencies.values() for latency in latencies]
+
+        return {
+            'elapsed': elapsed,
+            'sent': self.sent,
+            'mined': self.mined,
+            'failed': sum(self.failures.values()),
+            'txPerSecond': self.mined / elapsed if elapsed > 0 else 0,
+            'policies': self.policies,
+            'completed': self.completed,
+            'policiesPerHour': 3600 * self.completed / elapsed if elapsed > 0 else 0,
+            'latency': percentiles(allLatencies),
+            'latencyPerOperation': {op: percentiles(latencies) for (op, latencies) in self.latencies.items()},
+            'failures': dict(self.failures),
+        }
+
+    def print_report(self):
+        summary = self.summary()
+        print('{:<20} {:>10.2f}s'.format('elapsed', summary['elapsed']))
+        print('{:<20} {:>10} sent {} mined {} failed'.format('transactions', summary['sent'], summary['mined'], summary['failed']))
+        print('{:<20} {:>10.1f}'.format('tx/s', summary['txPerSecond']))
+        print('{:<20} {:>10} of {} ({:.0f}/h)'.format('policies completed', summary['completed'], summary['policies'], summary['policiesPerHour']))
+
+        print('{:<20} {:>8} {}'.format('latency [ms]', 'count', ' '.join('{:>8}'.format('p{}'.format(p)) for p in PERCENTILES)))
+        for (op, values) in summary['latencyPerOperation'].items():
+            print('{:<20} {:>8} {}'.format(op, values['count'], ' '.join('{:>8.1f}'.format(1000 * values[p]) for p in PERCENTILES)))
+
+        for (category, count) in summary['failures'].items():
+            print('{:<20} {:>8}'.format(category, count))
+
+
+class LoadGenerator(object):
+
+    def __init__(
+        self,
+        instance: GifInstance,
+        product,
+        productOwner: LocalAccount,
+        coin,
+        customers: list,
+        mix: dict = DEFAULT_MIX,
+        premium: int = 100,
+        sumInsured: int = 1000,
+        payout: int = 500,
+        gasLimit: int = DEFAULT_GAS_LIMIT,
+        seed: int = None,
+    ):
+        self.instance = instance
+        self.product = product
+        self.coin = coin
+        self.treasury = instance.getTreasury()
+        self.policy = web3.eth.contract(address=instance.getPolicy().address, abi=instance.getPolicy().abi)
+
+        self.owner = Sender(productOwner)
+        self.customers = [Sender(customer) for customer in customers]
+        self.mix = mix
+        self.premium = premium
+        self.sumInsured = sumInsured
+        self.payout = payout
+        self.gasLimit = gasLimit
+        self.random = random.Random(seed)
+
+        self.chainId = web3.eth.chain_id
+        self.gasPrice = web3.eth.gas_price
+
+    def run(self, policies: int, inFlight: int = 20, timeout: float = 600.0, pollInterval: float = 0.01) -> LoadReport:
+        report = LoadReport()
+        report.policies = policies
+        pending = {}
+
+        # policy flows queued per customer, the first flow of every customer is ready
+        queues = [[] for _ in self.customers]
+        for idx in range(policies):
+            flow = self.new_flow(idx)
+            queues[flow.customer].append(flow)
+
+        ready = [queue.pop(0) for queue in queues if queue]
+
+        deadline = time.perf_counter() + timeout
+        while (ready or pending) and time.perf_counter() < deadline:
+            while ready and len(pending) < inFlight:
+                flow = ready.pop(0)
+                if not self.send_step(flow, flow.next_step(), pending, report):
+                    flow.steps = []
+                    if queues[flow.customer]:
+                        ready.append(queues[flow.customer].pop(0))
+
+            for (txHash, (flow, op, sentAt)) in list(pending.items()):
+                try:
+                    receipt = web3.eth.get_transaction_receipt(txHash)
+                except TransactionNotFound:
+                    continue
+
+                del pending[txHash]
+                report.mined += 1
+                report.add_latency(op, time.perf_counter() - sentAt)
+
+                if receipt['status'] == 0:
+                    report.add_failure(op, FAILURE_REVERTED)
+                    flow.steps = []
+                else:
+                    self.process_receipt(flow, op, receipt)
+                    if not flow.steps:
+                        report.completed += 1
+
+                if flow.steps:
+                    ready.append(flow)
+                elif queues[flow.customer]:
+                    ready.append(queues[flow.customer].pop(0))
+
+            if pending:
+                time.sleep(pollInterval)
+
+        for (_, (flow, op, _)) in pending.items():
+            report.add_failure(op, FAILURE_TIMEOUT)
+
+        report.end = time.perf_counter()
+        return report
+
+    def new_flow(self, idx: int) -> PolicyFlow:
+        customer = idx % len(self.customers)
+        steps = [OP_APPLICATION, OP_UNDERWRITE]
+
+        if self.random.random() < self.mix.get(OP_PREMIUM, 0):
+            steps += [OP_APPROVE, OP_PREMIUM]
+
+            if self.random.random() < self.mix.get(OP_CLAIM, 0):
+                steps += [OP_CLAIM, OP_CONFIRM_CLAIM]
+
+                if self.random.random() < self.mix.get(OP_PAYOUT, 0):
+                    steps.append(OP_PAYOUT)
+
+        return PolicyFlow(customer, steps)
+
+    def send_step(self, flow: PolicyFlow, op: str, pending: dict, report: LoadReport) -> bool:
+        (sender, contract, data) = self.build_step(flow, op)
+
+        tx = {
+            'to': contract.address,
+            'data': data,
+            'gas': self.gasLimit,
+            'gasPrice': self.gasPrice,
+            'nonce': sender.next_nonce(),
+            'chainId': self.chainId,
+            'value': 0,
+        }
+
+        signed = web3.eth.account.sign_transaction(tx, sender.account.private_key)
+        report.sent += 1
+
+        try:
+            txHash = web3.eth.send_raw_transaction(signed.rawTransaction)
+        except ValueError:
+            # the nonce was not used, later transactions of the sender would be stuck
+            sender.resync()
+            report.add_failure(op, FAILURE_SEND)
+            return False
+
+        pending[txHash] = (flow, op, time.perf_counter())
+        return True
+
+    def build_step(self, flow: PolicyFlow, op: str) -> tuple:
+        if op == OP_APPLICATION:
+            return (self.customers[flow.customer], self.product, self.product.newAppliation.encode_input(
+                self.premium, self.sumInsured, bytes(0), bytes(0)))
+
+        if op == OP_UNDERWRITE:
+            return (self.owner, self.product, self.product.underwrite.encode_input(flow.processId))
+
+        if op == OP_APPROVE:
+            return (self.customers[flow.customer], self.coin, self.coin.approve.encode_input(self.treasury, self.premium))
+
+        if op == OP_PREMIUM:
+            return (self.owner, self.product, self.product.collectPremium['bytes32,uint256'].encode_input(
+                flow.processId, self.premium))
+
+        if op == OP_CLAIM:
+            return (self.customers[flow.customer], self.product, self.product.submitClaimNoOracle.encode_input(
+                flow.processId, self.payout))
+
+        if op == OP_CONFIRM_CLAIM:
+            return (self.owner, self.product, self.product.confirmClaim.encode_input(
+                flow.processId, flow.claimId, self.payout))
+
+        if op == OP_PAYOUT:
+            return (self.owner, self.product, self.product.createPayout.encode_input(
+                flow.processId, flow.claimId, self.payout))
+
+        raise ValueError('unknown operation {}'.format(op))
+
+    def process_receipt(self, flow: PolicyFlow, op: str, receipt):
+        # ids are taken from the policy module events, the first event argument is the process id
+        if op == OP_APPLICATION:
+            event = self.policy.events.LogApplicationCreated().processReceipt(receipt)[0]
+            flow.processId = list(event['args'].values())[0]
+
+        elif op == OP_CLAIM:
+            event = self.policy.events.LogClaimCreated().processReceipt(receipt)[0]
+            flow.claimId = list(event['args'].values())[1]
+
+
+def setup_load(
+    instance: GifInstance,
+    owner: Account,
+    riskpool,
+    riskpoolKeeper: Account,
+    capitalOwner: Account,
+    coin,
+    customers: int = 10,
+    bundles: int = 2,
+    bundleFunding: int = 100000,
+    customerFunding: int = 10000,
+    customerEther: str = '0.1 ether',
+) -> list:
+    # funds the riskpool of the product with the specified number of bundles
+    # and creates customer accounts with private keys for raw transactions
+    riskpool.setMaximumNumberOfActiveBundles(riskpool.activeBundles() + bundles, {'from': riskpoolKeeper})
+
+    for _ in range(bundles):
+        fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, coin, bundleFunding)
+
+    customerAccounts = []
+    for _ in range(customers):
+        customer = accounts.add()
+        owner.transfer(customer, customerEther)
+        coin.transfer(customer, customerFunding, {'from': owner})
+        customerAccounts.append(customer)
+
+    return customerAccounts
+
+
+def percentiles(values: list) -> dict:
+    result = {'count': len(values)}
+    ordered = sorted(values)
+
+    for p in PERCENTILES:
+        result[p] = ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] if ordered else 0.0
+
+    return result
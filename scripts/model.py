@@ -0,0 +1,1030 @@
+import argparse
+import random
+import time
+
+# pure python reference model of the policy, bundle, pool and treasury state
+# machines of a gif instance with a single product and a BasicRiskpool.
+#
+# every operation of the model corresponds to a transaction against the test
+# product or test riskpool and reproduces its require checks, state transitions,
+# counters, fee calculation (TreasuryModule._calculateFee) and token transfers.
+# a reverting operation raises ModelRevert and leaves the model untouched,
+# all checks of an operation are done before any state is modified.
+#
+# accounts are symbolic names (see ACCOUNTS), entities are identified like on
+# chain: bundle ids start at 1, processes by their application index, claim ids
+# per policy start at 0. enum values are the solidity enum ordinals.
+#
+# the model is the reference for the differential tests (scripts/differential.py)
+# and doubles as a fast offline simulator for random operation sequences.
+#
+# usage (python)
+# >>> from scripts.model import GifModel, OperationGenerator, simulate
+# >>> model = GifModel()
+# >>> generator = OperationGenerator(model, seed=42)
+# >>> for (op, args) in generator.steps(1000): model.try_execute(op, *args)
+# >>> model.print_report()
+# >>> simulate(sequences=1000, steps=100, seed=42)
+#
+# usage (command line)
+# $ python -m scripts.model --sequences 1000 --steps 100 --seed 42
+
+FULL_COLLATERALIZATION_LEVEL = 10**18
+FRACTION_FULL_UNIT = 10**18
+MAX_UINT256 = 2**256 - 1
+
+# fee specifications of GifTestRiskpool and GifTestProduct (scripts/product.py)
+CAPITAL_FIXED_FEE = 42
+CAPITAL_FRACTIONAL_FEE = FRACTION_FULL_UNIT // 20
+PREMIUM_FIXED_FEE = 3
+PREMIUM_FRACTIONAL_FEE = FRACTION_FULL_UNIT // 10
+
+# TestRiskpool
+SUM_OF_SUM_INSURED_CAP = 10**24
+
+# symbolic accounts
+BUNDLE_OWNER = 'bundleOwner'
+CUSTOMER = 'customer'
+RISKPOOL_WALLET = 'riskpoolWallet'
+INSTANCE_WALLET = 'instanceWallet'
+TREASURY = 'treasury'
+ACCOUNTS = [BUNDLE_OWNER, CUSTOMER, RISKPOOL_WALLET, INSTANCE_WALLET, TREASURY]
+
+# IBundle.BundleState
+BUNDLE_ACTIVE = 0
+BUNDLE_LOCKED = 1
+BUNDLE_CLOSED = 2
+BUNDLE_BURNED = 3
+
+# IPolicy.ApplicationState
+APPLICATION_APPLIED = 0
+APPLICATION_REVOKED = 1
+APPLICATION_UNDERWRITTEN = 2
+APPLICATION_DECLINED = 3
+
+# IPolicy.PolicyState
+POLICY_ACTIVE = 0
+POLICY_EXPIRED = 1
+POLICY_CLOSED = 2
+
+# IPolicy.ClaimState
+CLAIM_APPLIED = 0
+CLAIM_CONFIRMED = 1
+CLAIM_DECLINED = 2
+CLAIM_CLOSED = 3
+
+# operations, token operations fund (transfer from the token owner) and approve (treasury allowance)
+OP_FUND = 'fund'
+OP_APPROVE = 'approve'
+OP_CREATE_BUNDLE = 'createBundle'
+OP_FUND_BUNDLE = 'fundBundle'
+OP_DEFUND_BUNDLE = 'defundBundle'
+OP_LOCK_BUNDLE = 'lockBundle'
+OP_UNLOCK_BUNDLE = 'unlockBundle'
+OP_CLOSE_BUNDLE = 'closeBundle'
+OP_BURN_BUNDLE = 'burnBundle'
+OP_APPLY_FOR_POLICY = 'applyForPolicy'
+OP_UNDERWRITE = 'underwrite'
+OP_COLLECT_PREMIUM = 'collectPremium'
+OP_SUBMIT_CLAIM = 'submitClaim'
+OP_CONFIRM_CLAIM = 'confirmClaim'
+OP_DECLINE_CLAIM = 'declineClaim'
+OP_CLOSE_CLAIM = 'closeClaim'
+OP_CREATE_PAYOUT = 'createPayout'
+OP_EXPIRE = 'expire'
+OP_CLOSE = 'close'
+OP_SET_FEE_ACCRUAL = 'setFeeAccrual'
+OP_SWEEP_FEES = 'sweepFees'
+OP_FORWARD_NET_PREMIUMS = 'forwardNetPremiums'
+
+OPERATIONS = [
+    OP_FUND,
+    OP_APPROVE,
+    OP_CREATE_BUNDLE,
+    OP_FUND_BUNDLE,
+    OP_DEFUND_BUNDLE,
+    OP_LOCK_BUNDLE,
+    OP_UNLOCK_BUNDLE,
+    OP_CLOSE_BUNDLE,
+    OP_BURN_BUNDLE,
+    OP_APPLY_FOR_POLICY,
+    OP_UNDERWRITE,
+    OP_COLLECT_PREMIUM,
+    OP_SUBMIT_CLAIM,
+    OP_CONFIRM_CLAIM,
+    OP_DECLINE_CLAIM,
+    OP_CLOSE_CLAIM,
+    OP_CREATE_PAYOUT,
+    OP_EXPIRE,
+    OP_CLOSE,
+    OP_SET_FEE_ACCRUAL,
+    OP_SWEEP_FEES,
+    OP_FORWARD_NET_PREMIUMS,
+]
+
+
+class ModelRevert(Exception):
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def require(condition: bool, reason: str):
+    if not condition:
+        raise ModelRevert(reason)
+
+
+def calculate_fee(fixedFee: int, fractionalFee: int, amount: int) -> int:
+    # TreasuryModule._calculateFee
+    feeAmount = fixedFee
+
+    if fractionalFee > 0:
+        feeAmount += (fractionalFee * amount) // FRACTION_FULL_UNIT
+
+    require(feeAmount < amount, 'ERROR:TRS-091:FEE_TOO_BIG')
+    return feeAmount
+
+
+class Bundle(object):
+
+    __slots__ = ['id', 'state', 'capital', 'lockedCapital', 'balance', 'activePolicies', 'valueLocked']
+
+    def __init__(self, bundleId: int):
+        self.id = bundleId
+        self.state = BUNDLE_ACTIVE
+        self.capital = 0
+        self.lockedCapital = 0
+        self.balance = 0
+        self.activePolicies = 0
+        self.valueLocked = {} # processId => collateral not yet paid out
+
+
+class Process(object):
+
+    __slots__ = [
+        'id', 'applicationState', 'premiumAmount', 'sumInsuredAmount',
+        'policyState', 'premiumExpectedAmount', 'premiumPaidAmount', 'payoutMaxAmount', 'payoutAmount',
+        'openClaimsCount', 'claims', 'payouts', 'bundleId', 'collateralAmount']
+
+    def __init__(self, processId: int, premiumAmount: int, sumInsuredAmount: int):
+        self.id = processId
+        self.applicationState = APPLICATION_APPLIED
+        self.premiumAmount = premiumAmount
+        self.sumInsuredAmount = sumInsuredAmount
+
+        # policy, policyState is None before underwriting
+        self.policyState = None
+        self.premiumExpectedAmount = 0
+        self.premiumPaidAmount = 0
+        self.payoutMaxAmount = 0
+        self.payoutAmount = 0
+        self.openClaimsCount = 0
+        self.claims = []
+        self.payouts = 0
+        self.bundleId = 0
+        self.collateralAmount = 0
+
+
+class Claim(object):
+
+    __slots__ = ['state', 'claimAmount', 'paidAmount']
+
+    def __init__(self, claimAmount: int):
+        self.state = CLAIM_APPLIED
+        self.claimAmount = claimAmount
+        self.paidAmount = 0
+
+
+class GifModel(object):
+
+    def __init__(
+        self,
+        maxActiveBundles: int = 1,
+        collateralizationLevel: int = FULL_COLLATERALIZATION_LEVEL,
+        sumOfSumInsuredCap: int = SUM_OF_SUM_INSURED_CAP,
+        capitalFees: tuple = (CAPITAL_FIXED_FEE, CAPITAL_FRACTIONAL_FEE),
+        premiumFees: tuple = (PREMIUM_FIXED_FEE, PREMIUM_FRACTIONAL_FEE),
+    ):
+        self.maxActiveBundles = maxActiveBundles
+        self.collateralizationLevel = collateralizationLevel
+        self.sumOfSumInsuredCap = sumOfSumInsuredCap
+        self.capitalFees = capitalFees
+        self.premiumFees = premiumFees
+
+        # token, allowances are the treasury allowances of the accounts
+        self.balances = dict.fromkeys(ACCOUNTS, 0)
+        self.allowances = dict.fromkeys(ACCOUNTS, 0)
+
+        # bundle and riskpool
+        self.bundles = []
+        self.activeBundles = [] # ordered like the EnumerableSet of the pool
+        self.poolCapital = 0
+        self.poolLockedCapital = 0
+        self.poolBalance = 0
+        self.sumOfSumInsuredAtRisk = 0
+        self.policiesCounter = 0 # BasicRiskpool round robin
+
+        # policies
+        self.processes = []
+
+        # treasury
+        self.feeAccrual = False
+        self.accruedFees = 0
+        self.pendingNetPremiums = 0 # held by the treasury for the riskpool wallet
+
+        self.executed = dict.fromkeys(OPERATIONS, 0)
+        self.reverted = dict.fromkeys(OPERATIONS, 0)
+
+    def execute(self, op: str, *args):
+        result = getattr(self, op)(*args)
+        self.executed[op] += 1
+        return result
+
+    def try_execute(self, op: str, *args) -> tuple:
+        # (reverted, reason or result)
+        try:
+            return (False, self.execute(op, *args))
+        except ModelRevert as e:
+            self.reverted[op] += 1
+            return (True, e.reason)
+
+    # --- token ---
+
+    def fund(self, account: str, amount: int):
+        self.balances[account] += amount
+
+    def approve(self, account: str, amount: int):
+        self.allowances[account] = amount
+
+    def _check_transfer(self, account: str, amount: int, reason: str):
+        require(self.balances[account] >= amount and self.allowances[account] >= amount, reason)
+
+    def _transfer(self, sender: str, recipient: str, amount: int):
+        # transferFrom by the treasury, max allowances are not decreased
+        if self.allowances[sender] != MAX_UINT256:
+            self.allowances[sender] -= amount
+
+        self.balances[sender] -= amount
+        self.balances[recipient] += amount
+
+    def _forward(self, recipient: str, amount: int):
+        # transfer of tokens held by the treasury, no allowance involved
+        self.balances[TREASURY] -= amount
+        self.balances[recipient] += amount
+
+    # --- bundles ---
+
+    def _riskpool_wallet_balance(self) -> int:
+        # net premiums held by the treasury are forwarded before any transfer out of the riskpool wallet
+        return self.balances[RISKPOOL_WALLET] + self.pendingNetPremiums
+
+    def _forward_net_premiums(self) -> int:
+        amount = self.pendingNetPremiums
+        self._forward(RISKPOOL_WALLET, amount)
+        self.pendingNetPremiums = 0
+        return amount
+
+    def _bundle(self, bundleId: int) -> Bundle:
+        require(0 < bundleId <= len(self.bundles), 'ERROR:BUC-060:BUNDLE_DOES_NOT_EXIST')
+        return self.bundles[bundleId - 1]
+
+    def _active_set_add(self, bundleId: int):
+        require(bundleId not in self.activeBundles, 'ERROR:POL-042:BUNDLE_ID_ALREADY_IN_SET')
+        require(len(self.activeBundles) < self.maxActiveBundles, 'ERROR:POL-043:MAXIMUM_NUMBER_OF_ACTIVE_BUNDLES_REACHED')
+
+    def _active_set_remove(self, bundleId: int):
+        # EnumerableSet.remove: last element takes the place of the removed one
+        idx = self.activeBundles.index(bundleId)
+        last = self.activeBundles.pop()
+        if idx < len(self.activeBundles):
+            self.activeBundles[idx] = last
+
+    def _capital_fee(self, amount: int) -> int:
+        return calculate_fee(self.capitalFees[0], self.capitalFees[1], amount)
+
+    def _process_capital(self, amount: int) -> int:
+        # TreasuryModule.processCapital
+        feeAmount = self._capital_fee(amount)
+        require(self.balances[BUNDLE_OWNER] >= amount, 'ERROR:TRS-052:BALANCE_TOO_SMALL')
+        require(self.allowances[BUNDLE_OWNER] >= amount, 'ERROR:TRS-053:CAPITAL_TRANSFER_ALLOWANCE_TOO_SMALL')
+
+        self._transfer(BUNDLE_OWNER, INSTANCE_WALLET, feeAmount)
+        self._transfer(BUNDLE_OWNER, RISKPOOL_WALLET, amount - feeAmount)
+        return amount - feeAmount
+
+    def _check_withdrawal(self, bundle: Bundle, amount: int):
+        # TreasuryModule.processWithdrawal
+        require(
+            bundle.capital >= bundle.lockedCapital + amount
+            or (bundle.lockedCapital == 0 and bundle.balance >= amount),
+            'ERROR:TRS-060:CAPACITY_OR_BALANCE_SMALLER_THAN_WITHDRAWAL')
+        require(self._riskpool_wallet_balance() >= amount, 'ERROR:TRS-061:RISKPOOL_WALLET_BALANCE_TOO_SMALL')
+        require(self.allowances[RISKPOOL_WALLET] >= amount, 'ERROR:TRS-062:WITHDRAWAL_ALLOWANCE_TOO_SMALL')
+
+    def _defund(self, bundle: Bundle, amount: int):
+        # BundleController.defund and PoolController.defund, capital is capped at zero separately
+        self._forward_net_premiums()
+        self._transfer(RISKPOOL_WALLET, BUNDLE_OWNER, amount)
+
+        bundle.capital = bundle.capital - amount if bundle.capital >= amount else 0
+        bundle.balance -= amount
+
+        self.poolCapital = self.poolCapital - amount if self.poolCapital >= amount else 0
+        self.poolBalance -= amount
+
+    def createBundle(self, amount: int) -> int:
+        bundleId = len(self.bundles) + 1
+        self._active_set_add(bundleId)
+        self._capital_fee(amount)
+        self._check_transfer(BUNDLE_OWNER, amount, 'ERROR:TRS-052:BALANCE_TOO_SMALL')
+
+        bundle = Bundle(bundleId)
+        self.bundles.append(bundle)
+        self.activeBundles.append(bundleId)
+
+        netAmount = self._process_capital(amount)
+        bundle.capital += netAmount
+        bundle.balance += netAmount
+        self.poolCapital += netAmount
+        self.poolBalance += netAmount
+        return bundleId
+
+    def fundBundle(self, bundleId: int, amount: int) -> int:
+        bundle = self._bundle(bundleId)
+        require(bundle.state not in [BUNDLE_CLOSED, BUNDLE_BURNED], 'ERROR:RPS-010:BUNDLE_CLOSED_OR_BURNED')
+        self._capital_fee(amount)
+        self._check_transfer(BUNDLE_OWNER, amount, 'ERROR:TRS-052:BALANCE_TOO_SMALL')
+
+        netAmount = self._process_capital(amount)
+        bundle.capital += netAmount
+        bundle.balance += netAmount
+        self.poolCapital += netAmount
+        self.poolBalance += netAmount
+        return netAmount
+
+    def defundBundle(self, bundleId: int, amount: int) -> int:
+        bundle = self._bundle(bundleId)
+        require(bundle.state != BUNDLE_BURNED, 'ERROR:RPS-011:BUNDLE_BURNED')
+        self._check_withdrawal(bundle, amount)
+
+        self._defund(bundle, amount)
+        return amount
+
+    def lockBundle(self, bundleId: int):
+        bundle = self._bundle(bundleId)
+        require(bundleId in self.activeBundles, 'ERROR:POL-044:BUNDLE_ID_NOT_IN_SET')
+        require(bundle.state == BUNDLE_ACTIVE, 'ERROR:BUC-070:ACTIVE_INVALID_TRANSITION')
+
+        self._active_set_remove(bundleId)
+        bundle.state = BUNDLE_LOCKED
+
+    def unlockBundle(self, bundleId: int):
+        bundle = self._bundle(bundleId)
+        self._active_set_add(bundleId)
+        require(bundle.state == BUNDLE_LOCKED, 'ERROR:BUC-071:LOCKED_INVALID_TRANSITION')
+
+        self.activeBundles.append(bundleId)
+        bundle.state = BUNDLE_ACTIVE
+
+    def closeBundle(self, bundleId: int):
+        bundle = self._bundle(bundleId)
+        require(bundle.activePolicies == 0, 'ERROR:BUC-015:BUNDLE_WITH_ACTIVE_POLICIES')
+        require(bundle.state in [BUNDLE_ACTIVE, BUNDLE_LOCKED], 'ERROR:BUC-072:CLOSED_INVALID_TRANSITION')
+
+        if bundle.state == BUNDLE_ACTIVE:
+            self._active_set_remove(bundleId)
+
+        bundle.state = BUNDLE_CLOSED
+
+    def burnBundle(self, bundleId: int):
+        bundle = self._bundle(bundleId)
+        require(bundle.state == BUNDLE_CLOSED, 'ERROR:RPS-020:BUNDLE_NOT_CLOSED')
+        self._check_withdrawal(bundle, bundle.balance)
+
+        self._defund(bundle, bundle.balance)
+        bundle.state = BUNDLE_BURNED
+
+    # --- policies ---
+
+    def _process(self, processId: int) -> Process:
+        require(0 <= processId < len(self.processes), 'ERROR:POC-101:APPLICATION_DOES_NOT_EXIST')
+        return self.processes[processId]
+
+    def _policy(self, processId: int) -> Process:
+        process = self._process(processId)
+        require(process.policyState is not None, 'ERROR:POC-102:POLICY_DOES_NOT_EXIST')
+        return process
+
+    def _claim(self, process: Process, claimId: int) -> Claim:
+        require(0 <= claimId < len(process.claims), 'ERROR:POC-103:CLAIM_DOES_NOT_EXIST')
+        return process.claims[claimId]
+
+    def calculate_collateral(self, sumInsuredAmount: int) -> int:
+        # PoolController.calculateCollateral
+        if self.collateralizationLevel == FULL_COLLATERALIZATION_LEVEL:
+            return sumInsuredAmount
+
+        return (self.collateralizationLevel * sumInsuredAmount) // FULL_COLLATERALIZATION_LEVEL
+
+    def _select_bundle(self, collateralAmount: int) -> int:
+        # BasicRiskpool._lockCollateral, bundles of the test riskpool match every application
+        activeBundles = len(self.activeBundles)
+        require(activeBundles > 0, 'ERROR:BRP-001:NO_ACTIVE_BUNDLES')
+        require(self.poolCapital > self.poolLockedCapital, 'ERROR:BRP-002:NO_FREE_CAPITAL')
+
+        if self.poolCapital < self.poolLockedCapital + collateralAmount:
+            return 0
+
+        idx = self.policiesCounter % activeBundles
+        for _ in range(activeBundles):
+            bundle = self.bundles[self.activeBundles[idx] - 1]
+            if bundle.capital - bundle.lockedCapital >= collateralAmount:
+                return bundle.id
+
+            idx = (idx + 1) % activeBundles
+
+        return 0
+
+    def _check_premium(self, process: Process, amount: int) -> tuple:
+        # TreasuryModule._processPremium up to the allowance check
+        # returns (success, feeAmount) where success is False for an insufficient allowance
+        require(process.premiumPaidAmount + amount <= process.premiumExpectedAmount, 'ERROR:TRS-030:AMOUNT_TOO_BIG')
+        feeAmount = calculate_fee(self.premiumFees[0], self.premiumFees[1], amount)
+
+        if self.allowances[CUSTOMER] < amount:
+            return (False, feeAmount)
+
+        require(self.balances[CUSTOMER] >= amount, 'ERROR:TRS-031:FEE_TRANSFER_FAILED')
+        bundle = self.bundles[process.bundleId - 1]
+        require(bundle.state not in [BUNDLE_CLOSED, BUNDLE_BURNED], 'ERROR:BUC-003:BUNDLE_BURNED_OR_CLOSED')
+        return (True, feeAmount)
+
+    def _collect_premium(self, process: Process, amount: int, feeAmount: int):
+        netAmount = amount - feeAmount
+
+        if self.feeAccrual:
+            # treasury holds the premium, the net premium is forwarded later
+            self._transfer(CUSTOMER, TREASURY, amount)
+            self.accruedFees += feeAmount
+            self.pendingNetPremiums += netAmount
+        else:
+            self._transfer(CUSTOMER, INSTANCE_WALLET, feeAmount)
+            self._transfer(CUSTOMER, RISKPOOL_WALLET, netAmount)
+
+        process.premiumPaidAmount += amount
+        self.bundles[process.bundleId - 1].balance += netAmount
+        self.poolBalance += netAmount
+
+    def _underwrite(self, process: Process) -> bool:
+        require(process.applicationState == APPLICATION_APPLIED, 'ERROR:POL-020:APPLICATION_STATE_INVALID')
+        require(
+            self.sumOfSumInsuredCap >= self.sumOfSumInsuredAtRisk + process.sumInsuredAmount,
+            'ERROR:POL-022:RISKPOOL_SUM_INSURED_CAP_EXCEEDED')
+
+        collateralAmount = self.calculate_collateral(process.sumInsuredAmount)
+        bundleId = self._select_bundle(collateralAmount)
+        if bundleId == 0:
+            return False
+
+        # premium checks need the policy as it is after underwriting
+        process.bundleId = bundleId
+        process.premiumExpectedAmount = process.premiumAmount
+        try:
+            (collect, feeAmount) = self._check_premium(process, process.premiumAmount)
+        except ModelRevert:
+            process.bundleId = 0
+            process.premiumExpectedAmount = 0
+            raise
+
+        bundle = self.bundles[bundleId - 1]
+        bundle.lockedCapital += collateralAmount
+        bundle.activePolicies += 1
+        bundle.valueLocked[process.id] = collateralAmount
+        self.poolLockedCapital += collateralAmount
+        self.sumOfSumInsuredAtRisk += process.sumInsuredAmount
+        self.policiesCounter += 1
+
+        process.applicationState = APPLICATION_UNDERWRITTEN
+        process.policyState = POLICY_ACTIVE
+        process.payoutMaxAmount = process.sumInsuredAmount
+        process.collateralAmount = collateralAmount
+
+        if collect:
+            self._collect_premium(process, process.premiumAmount, feeAmount)
+
+        return True
+
+    def applyForPolicy(self, premiumAmount: int, sumInsuredAmount: int) -> int:
+        require(premiumAmount > 0, 'ERROR:POC-012:PREMIUM_AMOUNT_ZERO')
+        require(sumInsuredAmount > premiumAmount, 'ERROR:POC-013:SUM_INSURED_AMOUNT_TOO_SMALL')
+
+        process = Process(len(self.processes), premiumAmount, sumInsuredAmount)
+        self._underwrite(process)
+        self.processes.append(process)
+        return process.id
+
+    def underwrite(self, processId: int) -> bool:
+        return self._underwrite(self._process(processId))
+
+    def collectPremium(self, processId: int, amount: int) -> bool:
+        process = self._policy(processId)
+        require(process.policyState != POLICY_CLOSED, 'ERROR:PFD-003:POLICY_CLOSED')
+
+        (collect, feeAmount) = self._check_premium(process, amount)
+        if collect:
+            self._collect_premium(process, amount, feeAmount)
+
+        return collect
+
+    def submitClaim(self, processId: int, claimAmount: int) -> int:
+        process = self._policy(processId)
+        require(process.policyState == POLICY_ACTIVE, 'ERROR:POC-041:POLICY_NOT_ACTIVE')
+        require(process.payoutAmount + claimAmount <= process.payoutMaxAmount, 'ERROR:POC-042:CLAIM_AMOUNT_EXCEEDS_MAX_PAYOUT')
+
+        process.claims.append(Claim(claimAmount))
+        process.openClaimsCount += 1
+        return len(process.claims) - 1
+
+    def confirmClaim(self, processId: int, claimId: int, confirmedAmount: int):
+        process = self._policy(processId)
+        require(process.openClaimsCount > 0, 'ERROR:POC-051:POLICY_WITHOUT_OPEN_CLAIMS')
+        require(process.payoutAmount + confirmedAmount <= process.payoutMaxAmount, 'ERROR:POC-052:PAYOUT_MAX_AMOUNT_EXCEEDED')
+        claim = self._claim(process, claimId)
+        require(claim.state == CLAIM_APPLIED, 'ERROR:POC-054:CLAIM_STATE_INVALID')
+
+        claim.state = CLAIM_CONFIRMED
+        claim.claimAmount = confirmedAmount
+        process.payoutAmount += confirmedAmount
+
+    def declineClaim(self, processId: int, claimId: int):
+        process = self._policy(processId)
+        require(process.openClaimsCount > 0, 'ERROR:POC-061:POLICY_WITHOUT_OPEN_CLAIMS')
+        claim = self._claim(process, claimId)
+        require(claim.state == CLAIM_APPLIED, 'ERROR:POC-063:CLAIM_STATE_INVALID')
+
+        claim.state = CLAIM_DECLINED
+
+    def closeClaim(self, processId: int, claimId: int):
+        process = self._policy(processId)
+        require(process.openClaimsCount > 0, 'ERROR:POC-071:POLICY_WITHOUT_OPEN_CLAIMS')
+        claim = self._claim(process, claimId)
+        require(claim.state in [CLAIM_CONFIRMED, CLAIM_DECLINED], 'ERROR:POC-073:CLAIM_STATE_INVALID')
+        require(
+            (claim.state == CLAIM_CONFIRMED and claim.claimAmount == claim.paidAmount)
+            or claim.state == CLAIM_DECLINED,
+            'ERROR:POC-074:CLAIM_WITH_UNPAID_PAYOUTS')
+
+        claim.state = CLAIM_CLOSED
+        process.openClaimsCount -= 1
+
+    def createPayout(self, processId: int, claimId: int, payoutAmount: int) -> int:
+        # TestProduct.createPayout creates and processes the payout
+        process = self._policy(processId)
+        claim = self._claim(process, claimId)
+        require(claim.state == CLAIM_CONFIRMED, 'ERROR:POC-082:CLAIM_NOT_CONFIRMED')
+        require(payoutAmount > 0, 'ERROR:POC-083:PAYOUT_AMOUNT_ZERO_INVALID')
+        require(claim.paidAmount + payoutAmount <= claim.claimAmount, 'ERROR:POC-084:PAYOUT_AMOUNT_TOO_BIG')
+
+        require(self._riskpool_wallet_balance() >= payoutAmount, 'ERROR:TRS-042:RISKPOOL_WALLET_BALANCE_TOO_SMALL')
+        require(self.allowances[RISKPOOL_WALLET] >= payoutAmount, 'ERROR:TRS-043:PAYOUT_ALLOWANCE_TOO_SMALL')
+
+        require(self.poolCapital >= payoutAmount, 'ERROR:POL-027:CAPITAL_TOO_LOW')
+        require(self.poolLockedCapital >= payoutAmount, 'ERROR:POL-028:LOCKED_CAPITAL_TOO_LOW')
+        require(self.poolBalance >= payoutAmount, 'ERROR:POL-029:BALANCE_TOO_LOW')
+
+        bundle = self.bundles[process.bundleId - 1]
+        require(bundle.valueLocked.get(processId, 0) >= payoutAmount, 'ERROR:BUC-042:COLLATERAL_INSUFFICIENT_FOR_POLICY')
+        require(bundle.state in [BUNDLE_ACTIVE, BUNDLE_LOCKED], 'ERROR:BUC-044:BUNDLE_STATE_INVALID')
+        require(bundle.capital >= payoutAmount, 'ERROR:BUC-045:CAPITAL_TOO_LOW')
+        require(bundle.lockedCapital >= payoutAmount, 'ERROR:BUC-046:LOCKED_CAPITAL_TOO_LOW')
+        require(bundle.balance >= payoutAmount, 'ERROR:BUC-047:BALANCE_TOO_LOW')
+
+        self._forward_net_premiums()
+        self._transfer(RISKPOOL_WALLET, CUSTOMER, payoutAmount)
+        process.payouts += 1
+
+        claim.paidAmount += payoutAmount
+        if claim.claimAmount == claim.paidAmount:
+            claim.state = CLAIM_CLOSED
+            process.openClaimsCount -= 1
+
+        self.poolCapital -= payoutAmount
+        self.poolLockedCapital -= payoutAmount
+        self.poolBalance -= payoutAmount
+
+        bundle.valueLocked[processId] -= payoutAmount
+        bundle.capital -= payoutAmount
+        bundle.lockedCapital -= payoutAmount
+        bundle.balance -= payoutAmount
+
+        return process.payouts - 1
+
+    def expire(self, processId: int):
+        process = self._policy(processId)
+        require(process.policyState == POLICY_ACTIVE, 'ERROR:PFD-001:POLICY_NOT_ACTIVE')
+
+        process.policyState = POLICY_EXPIRED
+
+    def close(self, processId: int):
+        process = self._policy(processId)
+        require(process.policyState == POLICY_EXPIRED, 'ERROR:PFD-002:POLICY_NOT_EXPIRED')
+        require(process.openClaimsCount == 0, 'ERROR:POC-033:POLICY_HAS_OPEN_CLAIMS')
+
+        process.policyState = POLICY_CLOSED
+
+        # BundleController.releasePolicy and PoolController.release
+        bundle = self.bundles[process.bundleId - 1]
+        bundle.lockedCapital -= bundle.valueLocked.pop(processId)
+        bundle.activePolicies -= 1
+
+        self.sumOfSumInsuredAtRisk -= process.sumInsuredAmount
+        self.poolLockedCapital -= process.collateralAmount - process.payoutAmount
+
+    # --- treasury ---
+
+    def setFeeAccrual(self, enabled: bool):
+        self.feeAccrual = enabled
+
+    def sweepFees(self) -> int:
+        amount = self.accruedFees
+        if amount == 0:
+            return amount
+
+        self._forward(INSTANCE_WALLET, amount)
+        self.accruedFees = 0
+        return amount
+
+    def forwardNetPremiums(self) -> int:
+        return self._forward_net_premiums()
+
+    # --- state ---
+
+    def state(self) -> dict:
+        # comparable state with the same structure as differential.chain_state
+        return {
+            'balances': dict(self.balances),
+            'pool': {
+                'capital': self.poolCapital,
+                'lockedCapital': self.poolLockedCapital,
+                'balance': self.poolBalance,
+                'sumOfSumInsuredAtRisk': self.sumOfSumInsuredAtRisk,
+            },
+            'activeBundles': list(self.activeBundles),
+            'accruedFees': self.accruedFees,
+            'pendingNetPremiums': self.pendingNetPremiums,
+            'bundles': [
+                {
+                    'state': bundle.state,
+                    'capital': bundle.capital,
+                    'lockedCapital': bundle.lockedCapital,
+                    'balance': bundle.balance,
+                }
+                for bundle in self.bundles],
+            'processes': [
+                {
+                    'applicationState': process.applicationState,
+                    'policyState': process.policyState,
+                    'premiumPaidAmount': process.premiumPaidAmount,
+                    'payoutAmount': process.payoutAmount,
+                    'claimsCount': len(process.claims),
+                    'openClaimsCount': process.openClaimsCount,
+                    'claims': [(claim.state, claim.claimAmount, claim.paidAmount) for claim in process.claims],
+                }
+                for process in self.processes],
+        }
+
+    def check_invariants(self):
+        # accounting relations that hold after every operation
+        bundles = self.bundles
+        assert self.poolLockedCapital == sum(bundle.lockedCapital for bundle in bundles)
+        assert self.poolBalance == sum(bundle.balance for bundle in bundles)
+        assert self.poolCapital <= sum(bundle.capital for bundle in bundles)
+        assert self.balances[RISKPOOL_WALLET] + self.pendingNetPremiums == self.poolBalance
+        assert self.balances[TREASURY] == self.accruedFees + self.pendingNetPremiums
+        assert len(self.activeBundles) <= self.maxActiveBundles
+
+        for bundle in bundles:
+            assert bundle.capital >= bundle.lockedCapital
+            assert bundle.balance >= bundle.lockedCapital
+            assert bundle.lockedCapital == sum(bundle.valueLocked.values())
+            assert (bundle.id in self.activeBundles) == (bundle.state == BUNDLE_ACTIVE)
+
+        for process in self.processes:
+            if process.policyState is not None:
+                assert process.premiumPaidAmount <= process.premiumExpectedAmount
+                assert process.payoutAmount <= process.payoutMaxAmount
+
+    def report(self) -> dict:
+        return {
+            'bundles': len(self.bundles),
+            'activeBundles': len(self.activeBundles),
+            'applications': len(self.processes),
+            'policies': len([p for p in self.processes if p.policyState is not None]),
+            'capital': self.poolCapital,
+            'lockedCapital': self.poolLockedCapital,
+            'balance': self.poolBalance,
+            'executed': {op: count for (op, count) in self.executed.items() if count > 0},
+            'reverted': {op: count for (op, count) in self.reverted.items() if count > 0},
+        }
+
+    def print_report(self):
+        for (name, value) in self.report().items():
+            if isinstance(value, dict):
+                for (op, count) in value.items():
+                    print('{:<32} {}'.format('{}.{}'.format(name, op), count))
+            else:
+                print('{:<32} {}'.format(name, value))
+
+
+class OperationGenerator(object):
+
+    # random operations with arguments picked from the current model state.
+    # most arguments target entities in a state where the operation can succeed,
+    # the rest are drawn at random so that a share of the operations reverts.
+
+    WEIGHTS = {
+        OP_FUND: 3,
+        OP_APPROVE: 1,
+        OP_CREATE_BUNDLE: 2,
+        OP_FUND_BUNDLE: 2,
+        OP_DEFUND_BUNDLE: 2,
+        OP_LOCK_BUNDLE: 1,
+        OP_UNLOCK_BUNDLE: 1,
+        OP_CLOSE_BUNDLE: 1,
+        OP_BURN_BUNDLE: 1,
+        OP_APPLY_FOR_POLICY: 6,
+        OP_UNDERWRITE: 1,
+        OP_COLLECT_PREMIUM: 2,
+        OP_SUBMIT_CLAIM: 3,
+        OP_CONFIRM_CLAIM: 3,
+        OP_DECLINE_CLAIM: 1,
+        OP_CLOSE_CLAIM: 1,
+        OP_CREATE_PAYOUT: 3,
+        OP_EXPIRE: 2,
+        OP_CLOSE: 2,
+        OP_SET_FEE_ACCRUAL: 1,
+        OP_SWEEP_FEES: 1,
+        OP_FORWARD_NET_PREMIUMS: 1,
+    }
+
+    def __init__(
+        self,
+        model: GifModel,
+        seed: int = None,
+        maxAmount: int = 10000,
+        weights: dict = None,
+        targeted: float = 0.9,
+    ):
+        self.model = model
+        self.random = random.Random(seed)
+        self.maxAmount = maxAmount
+        self.targeted = targeted
+
+        weights = weights or self.WEIGHTS
+        self.operations = list(weights.keys())
+        self.cumulativeWeights = []
+        total = 0
+        for op in self.operations:
+            total += weights[op]
+            self.cumulativeWeights.append(total)
+
+    def next(self) -> tuple:
+        op = self._redirect(self.random.choices(self.operations, cum_weights=self.cumulativeWeights)[0])
+        return (op, getattr(self, '_' + op)())
+
+    def _redirect(self, op: str) -> str:
+        # without active bundles most operations revert, build up capital first
+        if len(self.model.activeBundles) > 0 or op in [OP_FUND, OP_APPROVE] or self.random.random() >= self.targeted:
+            return op
+
+        if self.model.balances[BUNDLE_OWNER] <= CAPITAL_FIXED_FEE or self.model.allowances[BUNDLE_OWNER] <= CAPITAL_FIXED_FEE:
+            return self.random.choice([OP_FUND, OP_APPROVE]) if self.model.balances[BUNDLE_OWNER] > CAPITAL_FIXED_FEE else OP_FUND
+
+        return OP_CREATE_BUNDLE
+
+    def steps(self, count: int):
+        for _ in range(count):
+            yield self.next()
+
+    def _amount(self, maxAmount: int = None) -> int:
+        return self.random.randint(0, self.maxAmount if maxAmount is None else maxAmount)
+
+    def _pick(self, candidates: list, fallback):
+        if candidates and self.random.random() < self.targeted:
+            return self.random.choice(candidates)
+
+        return fallback()
+
+    def _bundle(self, states: list) -> Bundle:
+        # bundle in one of the states or a random bundle id including a non existing one
+        candidates = [bundle for bundle in self.model.bundles if bundle.state in states]
+        bundleId = self._pick(
+            [bundle.id for bundle in candidates],
+            lambda: self.random.randint(1, len(self.model.bundles) + 1))
+
+        return self.model.bundles[bundleId - 1] if bundleId <= len(self.model.bundles) else None
+
+    def _process(self, condition) -> Process:
+        candidates = [process for process in self.model.processes if condition(process)]
+        processId = self._pick(
+            [process.id for process in candidates],
+            lambda: self.random.randint(0, len(self.model.processes)))
+
+        return self.model.processes[processId] if processId < len(self.model.processes) else None
+
+    def _claim(self, condition) -> tuple:
+        candidates = [
+            (process, claimId)
+            for process in self.model.processes
+            for (claimId, claim) in enumerate(process.claims)
+            if condition(claim)]
+
+        if candidates and self.random.random() < self.targeted:
+            return self.random.choice(candidates)
+
+        process = self._process(lambda process: len(process.claims) > 0)
+        claims = len(process.claims) if process else 0
+        return (process, self.random.randint(0, claims))
+
+    def _fund(self):
+        return (self.random.choice([BUNDLE_OWNER, CUSTOMER]), 5 * self._amount())
+
+    def _approve(self):
+        # mostly unlimited allowances, limited and missing allowances lead to failed premium collections
+        return (self.random.choice([BUNDLE_OWNER, CUSTOMER]), self.random.choice([0, self._amount(), MAX_UINT256, MAX_UINT256]))
+
+    def _capital_amount(self) -> int:
+        # mostly within balance and allowance of the bundle owner
+        available = min(self.model.balances[BUNDLE_OWNER], self.model.allowances[BUNDLE_OWNER])
+        return self._pick([self._amount(available)] if available > 0 else [], self._amount)
+
+    def _createBundle(self):
+        return (self._capital_amount(),)
+
+    def _fundBundle(self):
+        bundle = self._bundle([BUNDLE_ACTIVE, BUNDLE_LOCKED])
+        return (bundle.id if bundle else 0, self._capital_amount())
+
+    def _defundBundle(self):
+        bundle = self._bundle([BUNDLE_ACTIVE, BUNDLE_LOCKED, BUNDLE_CLOSED])
+        if bundle is None:
+            return (0, self._amount())
+
+        # same withdrawal limit as BundleController.defund
+        maxAmount = bundle.balance if bundle.lockedCapital == 0 else bundle.capital - bundle.lockedCapital
+        return (bundle.id, self._pick([self._amount(maxAmount)], self._amount))
+
+    def _lockBundle(self):
+        bundle = self._bundle([BUNDLE_ACTIVE])
+        return (bundle.id if bundle else 0,)
+
+    def _unlockBundle(self):
+        bundle = self._bundle([BUNDLE_LOCKED])
+        return (bundle.id if bundle else 0,)
+
+    def _closeBundle(self):
+        bundle = self._bundle([BUNDLE_ACTIVE, BUNDLE_LOCKED])
+        return (bundle.id if bundle else 0,)
+
+    def _burnBundle(self):
+        bundle = self._bundle([BUNDLE_CLOSED])
+        return (bundle.id if bundle else 0,)
+
+    def _applyForPolicy(self):
+        sumInsured = self.random.randint(1, self.maxAmount // 2)
+        return (self.random.randint(0, sumInsured // 5), sumInsured)
+
+    def _process_id(self, process: Process) -> int:
+        return process.id if process else len(self.model.processes)
+
+    def _underwrite(self):
+        process = self._process(lambda process: process.applicationState == APPLICATION_APPLIED)
+        return (self._process_id(process),)
+
+    def _collectPremium(self):
+        process = self._process(lambda process: (
+            process.policyState in [POLICY_ACTIVE, POLICY_EXPIRED]
+            and process.premiumPaidAmount < process.premiumExpectedAmount))
+
+        amount = self._amount(self.maxAmount // 10)
+        if process and process.policyState is not None:
+            amount = self._pick([process.premiumExpectedAmount - process.premiumPaidAmount], lambda: amount)
+
+        return (self._process_id(process), amount)
+
+    def _submitClaim(self):
+        process = self._process(lambda process: process.policyState == POLICY_ACTIVE)
+
+        amount = self._amount(self.maxAmount // 4)
+        if process and process.policyState is not None:
+            amount = self._pick([self._amount(process.payoutMaxAmount - process.payoutAmount)], lambda: amount)
+
+        return (self._process_id(process), amount)
+
+    def _confirmClaim(self):
+        (process, claimId) = self._claim(lambda claim: claim.state == CLAIM_APPLIED)
+
+        amount = self._amount(self.maxAmount // 4)
+        if process and claimId < len(process.claims):
+            maxAmount = process.payoutMaxAmount - process.payoutAmount
+            amount = self._pick([min(process.claims[claimId].claimAmount, maxAmount)], lambda: amount)
+
+        return (self._process_id(process), claimId, amount)
+
+    def _declineClaim(self):
+        (process, claimId) = self._claim(lambda claim: claim.state == CLAIM_APPLIED)
+        return (self._process_id(process), claimId)
+
+    def _closeClaim(self):
+        (process, claimId) = self._claim(lambda claim: (
+            claim.state == CLAIM_DECLINED
+            or (claim.state == CLAIM_CONFIRMED and claim.claimAmount == claim.paidAmount)))
+
+        return (self._process_id(process), claimId)
+
+    def _createPayout(self):
+        (process, claimId) = self._claim(lambda claim: claim.state == CLAIM_CONFIRMED and claim.paidAmount < claim.claimAmount)
+
+        amount = self._amount(self.maxAmount // 4)
+        if process and claimId < len(process.claims):
+            claim = process.claims[claimId]
+            outstanding = claim.claimAmount - claim.paidAmount
+            amount = self._pick([outstanding, self._amount(outstanding)], lambda: amount)
+
+        return (self._process_id(process), claimId, amount)
+
+    def _expire(self):
+        process = self._process(lambda process: process.policyState == POLICY_ACTIVE)
+        return (self._process_id(process),)
+
+    def _close(self):
+        process = self._process(lambda process: process.policyState == POLICY_EXPIRED and process.openClaimsCount == 0)
+        return (self._process_id(process),)
+
+    def _setFeeAccrual(self):
+        return (self.random.random() < 0.5,)
+
+    def _sweepFees(self):
+        return ()
+
+    def _forwardNetPremiums(self):
+        return ()
+
+
+def simulate(
+    sequences: int,
+    steps: int,
+    seed: int = None,
+    maxActiveBundles: int = 3,
+    checkInvariants: bool = True,
+) -> dict:
+    # random operation sequences against fresh models
+    # returns the number of executed and reverted operations over all sequences
+    rnd = random.Random(seed)
+    executed = dict.fromkeys(OPERATIONS, 0)
+    reverted = dict.fromkeys(OPERATIONS, 0)
+
+    for _ in range(sequences):
+        model = GifModel(maxActiveBundles=maxActiveBundles)
+        model.approve(RISKPOOL_WALLET, MAX_UINT256)
+        generator = OperationGenerator(model, seed=rnd.getrandbits(32))
+
+        for (op, args) in generator.steps(steps):
+            model.try_execute(op, *args)
+
+            if checkInvariants:
+                model.check_invariants()
+
+        for op in OPERATIONS:
+            executed[op] += model.executed[op]
+            reverted[op] += model.reverted[op]
+
+    return {'executed': executed, 'reverted': reverted}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='random operation sequences against the gif reference model')
+    parser.add_argument('--sequences', type=int, default=1000)
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--bundles', type=int, default=3, help='max number of active bundles')
+    parser.add_argument('--no-invariants', action='store_true', help='skip invariant checks after each step')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = simulate(args.sequences, args.steps, args.seed, args.bundles, not args.no_invariants)
+    elapsed = time.perf_counter() - start
+    operations = args.sequences * args.steps
+
+    print('{:<20} {:>10} {:>10}'.format('operation', 'executed', 'reverted'))
+    for op in OPERATIONS:
+        print('{:<20} {:>10} {:>10}'.format(op, counts['executed'][op], counts['reverted'][op]))
+
+    print('{:<32} {}'.format('operations', operations))
+    print('{:<32} {:.2f}'.format('seconds', elapsed))
+    print('{:<32} {:.0f}'.format('operationsPerSecond', operations / elapsed if elapsed > 0 else 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,15 +4,15 @@ from brownie.convert import to_bytes
 from brownie.network import accounts
 from brownie.network.account import Account
 
-# pylint: disable-msg=E0611
-from brownie import (
-    Wei,
-    Contract, 
+from brownie import Wei, Contract
+
+from scripts.containers import (
     PolicyController,
     OracleService,
     ComponentOwnerService,
     InstanceOperatorService,
     TestRiskpool,
+    TestCapacityRiskpool,
     TestOracle,
     TestProduct,
 )
@@ -49,7 +49,8 @@ class GifTestRiskpool(object):
         collateralization:int,
         name=RISKPOOL_NAME, 
         publishSource=False,
-        setRiskpoolWallet=True
+        setRiskpoolWallet=True,
+        riskpoolContract=TestRiskpool
     ):
         instanceService = instance.getInstanceService()
         operatorService = instance.getInstanceOperatorService()
@@ -67,7 +68,7 @@ class GifTestRiskpool(object):
         if not setRiskpoolWallet:
             name += '_NO_WALLET'
         
-        self.riskpool = TestRiskpool.deploy(
+        self.riskpool = riskpoolContract.deploy(
             s2b32(name),
             collateralization,
             erc20Token,
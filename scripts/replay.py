@@ -0,0 +1,433 @@
+import gzip
+import json
+import os
+
+from brownie import (
+    chain,
+    history,
+    web3,
+)
+from brownie.exceptions import VirtualMachineError
+from brownie.network import accounts
+from brownie.network.account import LocalAccount
+from brownie.network.rpc import Rpc
+from brownie.network.transaction import TransactionReceipt
+
+from scripts.containers import find_container
+from scripts.snapshot import private_method
+
+# record and replay of the transactions of a scenario
+#
+# TraceRecorder captures every transaction of the brownie session between start
+# and stop (contract wrappers of GifInstance, test fixtures, deployments) together
+# with transactions sent as raw transactions (scripts/load.py). chain reverts
+# (chain.revert, chain.reset, snapshot layers, test isolation) are recorded as well.
+# the recording is written to a gzipped json lines replay file.
+#
+# replay re-executes the file against the current contract build on a chain in the
+# state the recording started from (usually a fresh dev chain). deployments use the
+# bytecode of the current build with the recorded constructor arguments, calls are
+# sent with the recorded calldata. the replay report lists per call gas differences
+# and changed status, return values and events.
+#
+# senders need to be available on the replay chain: the unlocked dev accounts,
+# accounts loaded in the session or local accounts recorded with keys=True
+# (dev chains only, the replay file then contains their private keys).
+#
+# usage (brownie console)
+# >>> from scripts.deploy_ayii import stakeholders_accounts_ganache, deploy
+# >>> from scripts.replay import TraceRecorder, replay
+# >>> a = stakeholders_accounts_ganache()
+# >>> recorder = TraceRecorder().start()
+# >>> usdc = TestCoin.deploy({'from': a['instanceOperator']})
+# >>> d = deploy(a, usdc)
+# >>> recorder.stop().save('ayii.trace.gz')
+#
+# >>> chain.reset()
+# >>> report = replay('ayii.trace.gz')
+# >>> report.print_report()
+#
+# usage (tests)
+# $ brownie test tests/test_treasury_module.py --record-trace treasury.trace.gz
+# with xdist (-n) every worker records its own node to a file suffixed with the
+# worker id, eg treasury.gw0.trace.gz
+#
+# usage (replay with a different build)
+# $ brownie run scripts/replay.py main treasury.trace.gz
+
+REPLAY_VERSION = 1
+
+ENTRY_TX = 'tx'
+ENTRY_REVERT = 'revert'
+
+
+def worker_file_name(fileName: str, workerId: str) -> str:
+    # treasury.trace.gz -> treasury.gw0.trace.gz for xdist worker gw0
+    (directory, baseName) = os.path.split(fileName)
+    (name, dot, extension) = baseName.partition('.')
+    return os.path.join(directory, '{}.{}{}{}'.format(name, workerId, dot, extension))
+
+
+class TraceRecorder(object):
+
+    def __init__(self, keys: bool = False):
+        self.keys = keys
+        self.header = None
+        self.entries = []
+
+        # receipts since the last chain revert, serialized when the chain reverts or on stop
+        self.pending = []
+        self.seen = set()
+        self.segmentStart = 0
+
+        self._addTx = None
+        self._revert = None
+
+    def start(self):
+        assert self._addTx is None, 'recording already started'
+
+        height = web3.eth.block_number
+        self.header = {
+            'version': REPLAY_VERSION,
+            'chainId': chain.id,
+            'startHeight': height,
+            'startTime': web3.eth.get_block(height)['timestamp'],
+            'keys': {},
+        }
+        self.segmentStart = height
+
+        # history and chain are singletons, every receipt and revert passes through them
+        self._addTx = private_method(history, '_add_tx')
+        self._revert = private_method(chain, '_revert')
+        history._add_tx = self._add_tx
+        chain._revert = self._chain_revert
+        return self
+
+    def stop(self):
+        assert self._addTx is not None, 'recording not started'
+
+        self._flush()
+        history._add_tx = self._addTx
+        chain._revert = self._revert
+        self._addTx = None
+        self._revert = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def transactions(self) -> int:
+        return len([entry for entry in self.entries if entry['type'] == ENTRY_TX])
+
+    def save(self, fileName: str):
+        save_trace(fileName, self.header, self.entries)
+
+    def _add_tx(self, tx: TransactionReceipt):
+        self._addTx(tx)
+
+        if tx.txid not in self.seen:
+            self.seen.add(tx.txid)
+            self.pending.append(tx)
+
+    def _chain_revert(self, snapshotId) -> int:
+        # return values and events need the trace, which is gone after the revert
+        self._flush()
+
+        newSnapshotId = self._revert(snapshotId)
+        height = web3.eth.block_number
+        self.entries.append({'type': ENTRY_REVERT, 'height': height})
+        self.segmentStart = height
+        return newSnapshotId
+
+    def _flush(self):
+        # raw transactions (not sent via brownie) are picked up from the blocks
+        for blockNumber in range(self.segmentStart + 1, web3.eth.block_number + 1):
+            for txHash in web3.eth.get_block(blockNumber)['transactions']:
+                txid = txHash.hex()
+                if txid not in self.seen:
+                    self.seen.add(txid)
+                    self.pending.append(chain.get_transaction(txid))
+
+        pending = sorted(self.pending, key=lambda tx: (tx.block_number, tx.txindex))
+        for tx in pending:
+            self.entries.append(serialize_tx(tx))
+
+            if self.keys and isinstance(tx.sender, LocalAccount):
+                self.header['keys'][tx.sender.address] = tx.sender.private_key
+
+        self.pending = []
+        self.segmentStart = web3.eth.block_number
+
+
+class ReplayReport(object):
+
+    def __init__(self, header: dict):
+        self.header = header
+        self.calls = []
+
+    def add(self, recorded: dict, replayed: dict):
+        self.calls.append((recorded, replayed))
+
+    def changes(self) -> list:
+        # (idx, recorded, replayed, changed fields) for all calls with changed status, return value or events
+        changes = []
+        for (idx, (recorded, replayed)) in enumerate(self.calls):
+            fields = [
+                field for field in ['status', 'returnValue', 'events', 'address']
+                if recorded.get(field) != replayed.get(field)]
+
+            if fields:
+                changes.append((idx, recorded, replayed, fields))
+
+        return changes
+
+    def gas_by_function(self) -> dict:
+        # (contract, function) => [calls, recorded gas, replayed gas]
+        gas = {}
+        for (recorded, replayed) in self.calls:
+            key = (recorded['contract'] or '-', recorded['fn'] or ('deploy' if recorded['deploy'] else '-'))
+            values = gas.setdefault(key, [0, 0, 0])
+            values[0] += 1
+            values[1] += recorded['gasUsed']
+            values[2] += replayed['gasUsed']
+
+        return gas
+
+    def summary(self) -> dict:
+        recordedGas = sum(recorded['gasUsed'] for (recorded, _) in self.calls)
+        replayedGas = sum(replayed['gasUsed'] for (_, replayed) in self.calls)
+
+        return {
+            'calls': len(self.calls),
+            'changedGas': len([1 for (recorded, replayed) in self.calls if recorded['gasUsed'] != replayed['gasUsed']]),
+            'changedCalls': len(self.changes()),
+            'recordedGas': recordedGas,
+            'replayedGas': replayedGas,
+            'gasDiff': replayedGas - recordedGas,
+        }
+
+    def print_report(self, calls: bool = False):
+        # gas per function, changed calls and optionally the gas of each call
+        print('{:<48} {:>6} {:>12} {:>12} {:>8}'.format('function', 'calls', 'recorded', 'replayed', 'diff[%]'))
+        for ((contract, fn), (count, recordedGas, replayedGas)) in sorted(self.gas_by_function().items()):
+            print('{:<48} {:>6} {:>12} {:>12} {:>8}'.format(
+                '{}.{}'.format(contract, fn), count, recordedGas, replayedGas, gas_diff_percent(recordedGas, replayedGas)))
+
+        if calls:
+            print()
+            for (idx, (recorded, replayed)) in enumerate(self.calls):
+                print('{:>6} {:<48} {:>12} {:>12} {:>8}'.format(
+                    idx, call_name(recorded), recorded['gasUsed'], replayed['gasUsed'],
+                    gas_diff_percent(recorded['gasUsed'], replayed['gasUsed'])))
+
+        changes = self.changes()
+        if changes:
+            print()
+            for (idx, recorded, replayed, fields) in changes:
+                print('{:>6} {}'.format(idx, call_name(recorded)))
+                for field in fields:
+                    print('       {} recorded {}'.format(field, recorded.get(field)))
+                    print('       {} replayed {}'.format(field, replayed.get(field)))
+
+        print()
+        for (name, value) in self.summary().items():
+            print('{:<32} {}'.format(name, value))
+
+
+def replay(fileName: str, senders: list = None) -> ReplayReport:
+    (header, entries) = load_trace(fileName)
+
+    if web3.eth.block_number != header['startHeight']:
+        print('WARNING: replay starts at block {}, recording started at block {}'.format(
+            web3.eth.block_number, header['startHeight']))
+
+    senderByAddress = {account.address: account for account in senders or []}
+    for privateKey in header['keys'].values():
+        account = accounts.add(privateKey)
+        senderByAddress[account.address] = account
+
+    # evm snapshot before each transaction to replay chain reverts, only needed with reverts
+    reverts = any(entry['type'] == ENTRY_REVERT for entry in entries)
+    snapshots = [] # (recorded block number, snapshot id before the transaction)
+
+    timeOffset = chain.time() - header['startTime']
+    addresses = {}
+    report = ReplayReport(header)
+
+    for entry in entries:
+        if entry['type'] == ENTRY_REVERT:
+            snapshotId = None
+            while snapshots and snapshots[-1][0] > entry['height']:
+                snapshotId = snapshots.pop()[1]
+
+            if snapshotId is not None:
+                chain._revert(snapshotId)
+
+            continue
+
+        if reverts:
+            snapshots.append((entry['block'], Rpc().snapshot()))
+
+        # keep block timestamps at least as far from the start as in the recording
+        delay = entry['time'] + timeOffset - chain.time()
+        if delay > 0:
+            chain.sleep(delay)
+
+        sender = get_sender(entry['sender'], senderByAddress)
+        tx = replay_tx(entry, sender, addresses)
+        replayed = serialize_tx(tx)
+
+        if entry['deploy'] and replayed['address']:
+            addresses[entry['address']] = replayed['address']
+
+        report.add(entry, replayed)
+
+    return report
+
+
+def replay_tx(entry: dict, sender, addresses: dict) -> TransactionReceipt:
+    if entry['deploy']:
+        container = get_container(entry['contract'])
+        if container is not None and entry['args'] is not None:
+            data = '0x' + container.bytecode + entry['args']
+        else:
+            data = entry['input']
+
+        tx = send(sender, None, entry['value'], data)
+        if tx.status == 1 and container is not None:
+            container.at(tx.contract_address)
+
+        return tx
+
+    to = addresses.get(entry['to'], entry['to'])
+    return send(sender, to, entry['value'], entry['input'])
+
+
+def send(sender, to, value: int, data: str) -> TransactionReceipt:
+    # reverting transactions are mined on dev chains and raise after the fact
+    try:
+        return sender.transfer(to, value, data=data, silent=True)
+    except VirtualMachineError:
+        return history[-1]
+
+
+def get_sender(address: str, senderByAddress: dict):
+    if address in senderByAddress:
+        return senderByAddress[address]
+
+    if address in accounts:
+        return accounts.at(address)
+
+    # unlocked or impersonated account of the node
+    return accounts.at(address, force=True)
+
+
+def get_container(name: str):
+    if name is None:
+        return None
+
+    try:
+        return find_container(name)
+    except AttributeError:
+        return None
+
+
+def serialize_tx(tx: TransactionReceipt) -> dict:
+    deploy = tx.receiver is None
+    entry = {
+        'type': ENTRY_TX,
+        'block': tx.block_number,
+        'time': tx.timestamp,
+        'sender': str(tx.sender),
+        'to': None if deploy else str(tx.receiver),
+        'value': int(tx.value),
+        'deploy': deploy,
+        'contract': tx.contract_name,
+        'fn': tx.fn_name,
+        'address': str(tx.contract_address) if tx.contract_address else None,
+        'status': int(tx.status),
+        'gasUsed': tx.gas_used,
+        'returnValue': None,
+        'events': [],
+    }
+
+    # deployments store the constructor arguments only, replays use the bytecode of their build
+    container = get_container(tx.contract_name) if deploy else None
+    bytecode = '0x' + container.bytecode if container is not None else None
+    if bytecode and tx.input.startswith(bytecode):
+        entry['input'] = None
+        entry['args'] = tx.input[len(bytecode):]
+    else:
+        entry['input'] = tx.input
+        entry['args'] = None
+
+    try:
+        entry['returnValue'] = to_json(tx.return_value)
+    except Exception:
+        # return values need a debug trace of the node
+        pass
+
+    try:
+        entry['events'] = [[event.name, to_json(dict(event))] for event in tx.events]
+    except Exception:
+        pass
+
+    return entry
+
+
+def to_json(value):
+    if isinstance(value, bytes):
+        return '0x' + value.hex()
+
+    if isinstance(value, dict):
+        return {str(key): to_json(item) for (key, item) in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+
+    if isinstance(value, bool) or value is None:
+        return value
+
+    if isinstance(value, int):
+        return int(value)
+
+    return str(value)
+
+
+def save_trace(fileName: str, header: dict, entries: list):
+    with gzip.open(fileName, 'wt') as f:
+        f.write(json.dumps(header, separators=(',', ':')) + '\n')
+        for entry in entries:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+
+def load_trace(fileName: str) -> tuple:
+    with gzip.open(fileName, 'rt') as f:
+        lines = [line for line in f if line.strip()]
+
+    header = json.loads(lines[0])
+    assert header['version'] == REPLAY_VERSION, 'unsupported replay file version {}'.format(header['version'])
+
+    return (header, [json.loads(line) for line in lines[1:]])
+
+
+def call_name(entry: dict) -> str:
+    if entry['deploy']:
+        return '{}.deploy'.format(entry['contract'] or '-')
+
+    return '{}.{}'.format(entry['contract'] or entry['to'], entry['fn'] or 'transfer')
+
+
+def gas_diff_percent(recordedGas: int, replayedGas: int) -> str:
+    if recordedGas == 0:
+        return '-'
+
+    return '{:+.2f}'.format(100.0 * (replayedGas - recordedGas) / recordedGas)
+
+
+def main(fileName: str, calls: bool = False):
+    report = replay(fileName)
+    report.print_report(calls)
@@ -0,0 +1,282 @@
+import csv
+import time
+
+from brownie.network.account import Account
+
+from scripts.containers import (
+    AyiiProduct,
+    AyiiOracle,
+    ChainlinkOperator,
+    TestOracle,
+)
+
+from scripts.benchmark import (
+    AYII_PROJECT_ID,
+    AYII_CROP_ID,
+)
+from scripts.util import s2b32
+
+# gas and wall time of operations whose cost depends on the size of contract state
+#
+# each scaling function grows one dimension step by step on the current chain
+# and measures the operations of interest after reaching every size.
+# wall time is measured around the brownie call and includes client overhead.
+#
+# usage (brownie console, use a fresh instance per dimension)
+# >>> from scripts.scaling import ScalingRecorder, scale_bundles, scale_registry
+# >>> recorder = ScalingRecorder()
+# >>> scale_bundles(instance, owner, product, riskpool, riskpoolKeeper, capitalOwner, customer, coin, [1, 10, 100, 1000, 10000], recorder)
+# >>> scale_risk_policies(product, oracle, clOperator, insurer, customer, [1, 10, 100, 1000, 10000], recorder)
+# >>> scale_registry(instance, owner, [1, 10, 50], recorder)
+# >>> scale_components(instance, oracleProvider, [1, 10, 100, 1000], recorder)
+# >>> recorder.save_csv('scaling.csv')
+# >>> recorder.plot('scaling.png')  # requires matplotlib
+
+DIMENSION_BUNDLES = 'activeBundles'
+DIMENSION_RISK_POLICIES = 'riskPolicies'
+DIMENSION_REGISTRY = 'registryEntries'
+DIMENSION_COMPONENTS = 'components'
+
+SCALING_SIZES = [1, 10, 100, 1000, 10000]
+CSV_COLUMNS = ['dimension', 'size', 'operation', 'gasUsed', 'seconds']
+
+
+class ScalingRecorder(object):
+
+    def __init__(self):
+        self.rows = []
+
+    def record(self, dimension: str, size: int, operation: str, call):
+        start = time.perf_counter()
+        tx = call()
+        seconds = time.perf_counter() - start
+
+        self.rows.append({
+            'dimension': dimension,
+            'size': size,
+            'operation': operation,
+            'gasUsed': tx.gas_used,
+            'seconds': round(seconds, 6),
+        })
+
+        return tx
+
+    def series(self, dimension: str, operation: str, value: str = 'gasUsed') -> list:
+        # (size, value) pairs, averaged over repeated measurements per size
+        values = {}
+        for row in self.rows:
+            if row['dimension'] == dimension and row['operation'] == operation:
+                values.setdefault(row['size'], []).append(row[value])
+
+        return [(size, sum(v) / len(v)) for (size, v) in sorted(values.items())]
+
+    def operations(self) -> list:
+        keys = []
+        for row in self.rows:
+            key = (row['dimension'], row['operation'])
+            if key not in keys:
+                keys.append(key)
+
+        return keys
+
+    def save_csv(self, path: str):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def plot(self, path: str):
+        # optional dependency, only needed for plots
+        try:
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+        except ImportError:
+            raise RuntimeError('plotting requires matplotlib (pip install matplotlib)')
+
+        keys = self.operations()
+        (fig, axes) = plt.subplots(len(keys), 2, figsize=(12, 3 * len(keys)), squeeze=False)
+
+        for (row, (dimension, operation)) in enumerate(keys):
+            for (col, value) in enumerate(['gasUsed', 'seconds']):
+                series = self.series(dimension, operation, value)
+                ax = axes[row][col]
+                ax.plot([size for (size, _) in series], [v for (_, v) in series], marker='o')
+                ax.set_xscale('log')
+                ax.set_xlabel(dimension)
+                ax.set_ylabel(value)
+                ax.set_title(operation)
+
+        fig.tight_layout()
+        fig.savefig(path)
+        plt.close(fig)
+
+
+def scale_bundles(
+    instance,
+    owner: Account,
+    product,
+    riskpool,
+    riskpoolKeeper: Account,
+    capitalOwner: Account,
+    customer: Account,
+    coin,
+    sizes: list = SCALING_SIZES,
+    recorder: ScalingRecorder = None,
+    bundleFunding: int = 10000,
+    premium: int = 100,
+    sumInsured: int = 1000,
+) -> ScalingRecorder:
+    # bundle selection during underwriting and active bundle set updates (PoolController)
+    # over a growing number of active bundles of a test riskpool
+    recorder = recorder or ScalingRecorder()
+    treasury = instance.getTreasury()
+    maxSize = max(sizes)
+
+    riskpool.setMaximumNumberOfActiveBundles(riskpool.activeBundles() + maxSize, {'from': riskpoolKeeper})
+    coin.transfer(riskpoolKeeper, maxSize * bundleFunding, {'from': owner})
+    coin.approve(treasury, maxSize * bundleFunding, {'from': riskpoolKeeper})
+    coin.approve(treasury, 2**256-1, {'from': capitalOwner})
+
+    coin.transfer(customer, len(sizes) * premium, {'from': owner})
+    coin.approve(treasury, len(sizes) * premium, {'from': customer})
+
+    bundleIds = []
+    for size in sorted(sizes):
+        while len(bundleIds) < size:
+            tx = riskpool.createBundle(bytes(0), bundleFunding, {'from': riskpoolKeeper})
+            bundleIds.append(tx.return_value)
+
+        recorder.record(DIMENSION_BUNDLES, size, 'applyForPolicy', lambda: product.applyForPolicy(
+            premium, sumInsured, bytes(0), bytes(0), {'from': customer}))
+
+        # removes the first bundle from the active set and adds it again
+        recorder.record(DIMENSION_BUNDLES, size, 'lockBundle', lambda: riskpool.lockBundle(
+            bundleIds[0], {'from': riskpoolKeeper}))
+        recorder.record(DIMENSION_BUNDLES, size, 'unlockBundle', lambda: riskpool.unlockBundle(
+            bundleIds[0], {'from': riskpoolKeeper}))
+
+    return recorder
+
+
+def scale_risk_policies(
+    product: AyiiProduct,
+    oracle: AyiiOracle,
+    clOperator: ChainlinkOperator,
+    insurer: Account,
+    customer: Account,
+    sizes: list = SCALING_SIZES,
+    recorder: ScalingRecorder = None,
+    premium: int = 300,
+    sumInsured: int = 2000,
+) -> ScalingRecorder:
+    # processPoliciesForRisk over a growing number of policies for a single risk
+    # the riskpool needs to be funded to cover (max(sizes) + len(sizes)) * sumInsured
+    # every measurement processes a single policy which is replaced before the next size
+    recorder = recorder or ScalingRecorder()
+    multiplier = product.getPercentageMultiplier()
+
+    projectId = s2b32(AYII_PROJECT_ID)
+    cropId = s2b32(AYII_CROP_ID)
+    uaiId = s2b32('scale{}'.format(product.risks()))
+
+    tx = product.createRisk(
+        projectId, uaiId, cropId,
+        multiplier * 0.75, multiplier * 0.1, multiplier * 0.9, multiplier * 2.0,
+        {'from': insurer})
+    riskId = tx.return_value
+
+    # policies are underwritten without premium collection
+    tx = product.applyForPolicy(customer, premium, sumInsured, riskId, {'from': insurer})
+
+    # the oracle response for the risk is needed before policies can be processed
+    tx = product.triggerOracle(tx.return_value, {'from': insurer})
+    clRequestEvent = tx.events['OracleRequest'][0]
+    clOperator.fulfillOracleRequest2(
+        clRequestEvent['requestId'],
+        clRequestEvent['payment'],
+        clRequestEvent['callbackAddr'],
+        clRequestEvent['callbackFunctionId'],
+        clRequestEvent['cancelExpiration'],
+        oracle.encodeFulfillParameters(clRequestEvent['requestId'], projectId, uaiId, cropId, multiplier * 1.1))
+
+    # processed policies are removed from the policies of the risk
+    product.processPoliciesForRisk(riskId, 0, {'from': insurer})
+    policies = 0
+
+    for size in sorted(sizes):
+        while policies < size - 1:
+            product.applyForPolicy(customer, premium, sumInsured, riskId, {'from': insurer})
+            policies += 1
+
+        recorder.record(DIMENSION_RISK_POLICIES, size, 'applyForPolicy', lambda: product.applyForPolicy(
+            customer, premium, sumInsured, riskId, {'from': insurer}))
+        recorder.record(DIMENSION_RISK_POLICIES, size, 'processPoliciesForRisk', lambda: product.processPoliciesForRisk(
+            riskId, 1, {'from': insurer}))
+
+    return recorder
+
+
+def scale_registry(
+    instance,
+    owner: Account,
+    sizes: list = SCALING_SIZES,
+    recorder: ScalingRecorder = None,
+) -> ScalingRecorder:
+    # prepareRelease copies all contract names of the current release
+    # sizes are capped by the registry limit of MAX_CONTRACTS names per release
+    recorder = recorder or ScalingRecorder()
+    registry = instance.getRegistry()
+    maxContracts = registry.MAX_CONTRACTS()
+
+    # the instance already comes with its own registry entries, these count towards the size
+    names = registry.contracts()
+    for (idx, size) in enumerate(sorted(sizes)):
+        while names < min(size, maxContracts):
+            registry.register(s2b32('Scale{}'.format(names)), owner, {'from': owner})
+            names += 1
+
+        release = s2b32('scale-{}'.format(idx))
+        recorder.record(DIMENSION_REGISTRY, names, 'prepareRelease', lambda: registry.prepareRelease(
+            release, {'from': owner}))
+
+    return recorder
+
+
+def scale_components(
+    instance,
+    oracleProvider: Account,
+    sizes: list = SCALING_SIZES,
+    recorder: ScalingRecorder = None,
+) -> ScalingRecorder:
+    # component registration (ComponentController) over a growing number of oracles
+    recorder = recorder or ScalingRecorder()
+    owner = instance.getOwner()
+    registry = instance.getRegistry()
+    componentOwnerService = instance.getComponentOwnerService()
+    operatorService = instance.getInstanceOperatorService()
+    instanceService = instance.getInstanceService()
+
+    operatorService.grantRole(instanceService.getOracleProviderRole(), oracleProvider, {'from': owner})
+
+    components = instanceService.oracles()
+    for size in sorted(sizes):
+        while components < size:
+            deploy_oracle(registry, componentOwnerService, operatorService, owner, oracleProvider, components)
+            components += 1
+
+        oracle = TestOracle.deploy(s2b32('ScaleOracle{}'.format(components)), registry, {'from': oracleProvider})
+        recorder.record(DIMENSION_COMPONENTS, size, 'propose', lambda: componentOwnerService.propose(
+            oracle, {'from': oracleProvider}))
+        recorder.record(DIMENSION_COMPONENTS, size, 'approve', lambda: operatorService.approve(
+            oracle.getId(), {'from': owner}))
+        components += 1
+
+    return recorder
+
+
+def deploy_oracle(registry, componentOwnerService, operatorService, owner, oracleProvider, idx):
+    oracle = TestOracle.deploy(s2b32('ScaleOracle{}'.format(idx)), registry, {'from': oracleProvider})
+    componentOwnerService.propose(oracle, {'from': oracleProvider})
+    operatorService.approve(oracle.getId(), {'from': owner})
+    return oracle
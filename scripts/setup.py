@@ -1,13 +1,13 @@
 from brownie.network import accounts
-from brownie.network.account import Account
+from brownie.network.account import Account, LocalAccount
 
-# pylint: disable-msg=E0611
-from brownie import (
+from scripts.containers import (
     TestCoin,
 )
 
 from scripts.instance import GifInstance
 from scripts.ayii_product import GifAyiiProductComplete
+from scripts.util import sign_permit
 
 def fund_riskpool(
     instance: GifInstance, 
@@ -81,3 +81,53 @@ def apply_for_policy(
 
     # returns policy id
     return tx.return_value
+
+
+def fund_riskpool_with_permit(
+    instance: GifInstance, 
+    owner: Account,
+    capitalOwner: Account,
+    riskpool,
+    bundleOwner: LocalAccount,
+    coin,
+    amount: int
+):
+    # same as fund_riskpool, the allowance is created by a permit instead of an approve transaction
+    coin.transfer(bundleOwner, amount, {'from': owner})
+
+    # create approval for treasury from capital owner to allow for withdrawls
+    maxUint256 = 2**256-1
+    coin.approve(instance.getTreasury(), maxUint256, {'from': capitalOwner})
+
+    (deadline, v, r, s) = sign_permit(coin, bundleOwner, instance.getTreasury(), amount)
+    tx = riskpool.createBundleWithPermit(
+        bytes(0), 
+        amount, 
+        deadline, v, r, s,
+        {'from': bundleOwner})
+
+    return tx.return_value
+
+
+def apply_for_policy_with_permit(
+    instance: GifInstance, 
+    owner: Account,
+    product, 
+    customer: LocalAccount,
+    coin,
+    premium: int,
+    sumInsured: int
+):
+    # same as apply_for_policy, the allowance is created by a permit instead of an approve transaction
+    coin.transfer(customer, premium, {'from': owner})
+
+    (deadline, v, r, s) = sign_permit(coin, customer, instance.getTreasury(), premium)
+    tx = product.applyForPolicyWithPermit(
+        premium,
+        sumInsured,
+        bytes(0),
+        bytes(0),
+        deadline, v, r, s,
+        {'from': customer})
+
+    return tx.return_value
@@ -0,0 +1,345 @@
+import argparse
+import csv
+import heapq
+import random
+import time
+
+from collections import namedtuple
+
+# offline model of bundle collateralization for riskpool capacity planning.
+# reproduces the allocation rules of PoolController/BundleController together
+# with the bundle selection of BasicRiskpool (round robin over the active
+# bundles) or CapacityIndexedRiskpool (bundle with max free capacity first).
+# pure python without brownie dependency, state is kept in parallel lists
+# indexed by bundle (bundleId - 1).
+#
+# usage (python)
+# >>> from scripts.simulator import RiskpoolSimulator, synthetic_applications
+# >>> sim = RiskpoolSimulator(maxActiveBundles=10)
+# >>> for _ in range(10): sim.create_bundle(100000)
+# >>> sim.run(synthetic_applications(10**6, 1000, 5000, duration=30, seed=42))
+# >>> sim.print_report()
+#
+# usage (command line)
+# $ python -m scripts.simulator --applications 1000000 --bundles 10 --bundle-capital 100000 --duration 30
+
+FULL_COLLATERALIZATION_LEVEL = 10**18
+
+ALLOCATION_ROUND_ROBIN = 'roundRobin' # BasicRiskpool
+ALLOCATION_MAX_CAPACITY = 'maxCapacity' # CapacityIndexedRiskpool
+ALLOCATIONS = [ALLOCATION_ROUND_ROBIN, ALLOCATION_MAX_CAPACITY]
+
+REJECTED_SUM_INSURED_CAP = 'sumInsuredCap' # POL-022
+REJECTED_NO_ACTIVE_BUNDLES = 'noActiveBundles'
+REJECTED_NO_FREE_CAPITAL = 'noFreeCapital' # riskpool capital cannot cover collateral
+REJECTED_FRAGMENTATION = 'fragmentation' # riskpool capital sufficient but no single bundle can cover collateral
+REJECTED_FILTER = 'filter' # bundles with sufficient capacity exist but none matches the application
+REJECTIONS = [
+    REJECTED_SUM_INSURED_CAP,
+    REJECTED_NO_ACTIVE_BUNDLES,
+    REJECTED_NO_FREE_CAPITAL,
+    REJECTED_FRAGMENTATION,
+    REJECTED_FILTER,
+]
+
+APPLICATION_COLUMNS = ['timestamp', 'sumInsured', 'duration', 'data']
+
+# timestamp: application time, policies expire at timestamp + duration (duration 0: never)
+# data: application data handed to the bundle filter
+Application = namedtuple('Application', APPLICATION_COLUMNS)
+
+
+def match_all(bundleFilter, applicationData) -> bool:
+    return True
+
+
+def max_sum_insured_filter(bundleFilter, applicationData) -> bool:
+    # mirrors TestCapacityRiskpool: empty filter matches everything,
+    # otherwise the filter holds the max sum insured and the data the sum insured
+    return bundleFilter is None or applicationData <= bundleFilter
+
+
+class RiskpoolSimulator(object):
+
+    def __init__(
+        self,
+        collateralizationLevel: int = FULL_COLLATERALIZATION_LEVEL,
+        sumOfSumInsuredCap: int = 10**24,
+        maxActiveBundles: int = 1,
+        allocation: str = ALLOCATION_ROUND_ROBIN,
+        bundleMatchesApplication=match_all,
+    ):
+        assert allocation in ALLOCATIONS
+
+        self.collateralizationLevel = collateralizationLevel
+        self.sumOfSumInsuredCap = sumOfSumInsuredCap
+        self.maxActiveBundles = maxActiveBundles
+        self.allocation = allocation
+        self.bundleMatchesApplication = bundleMatchesApplication
+
+        # per bundle state
+        self.capital = []
+        self.lockedCapital = []
+        self.filter = []
+        self.policies = []
+
+        # active bundle indices in the order of the pool's active bundle set
+        self.activeBundles = []
+
+        # riskpool state
+        self.poolCapital = 0
+        self.poolLockedCapital = 0
+        self.sumOfSumInsuredAtRisk = 0
+        self.policiesCounter = 0
+
+        # (expiry, bundle idx, collateral, sum insured) of active policies with a duration
+        self._expiries = []
+
+        self.applications = 0
+        self.accepted = 0
+        self.rejected = dict.fromkeys(REJECTIONS, 0)
+        self.peakUtilization = 0.0
+        self._utilizationSum = 0.0
+
+    def create_bundle(self, capital: int, bundleFilter=None) -> int:
+        # new bundles join the active set, like RiskpoolService.createBundle
+        if len(self.activeBundles) >= self.maxActiveBundles:
+            raise ValueError('max number of active bundles reached ({})'.format(self.maxActiveBundles))
+
+        self.capital.append(capital)
+        self.lockedCapital.append(0)
+        self.filter.append(bundleFilter)
+        self.policies.append(0)
+        self.poolCapital += capital
+
+        bundleIdx = len(self.capital) - 1
+        self.activeBundles.append(bundleIdx)
+        return bundleIdx
+
+    def fund_bundle(self, bundleIdx: int, amount: int):
+        self.capital[bundleIdx] += amount
+        self.poolCapital += amount
+
+    def lock_bundle(self, bundleIdx: int):
+        # EnumerableSet.remove: last element takes the place of the removed one
+        idx = self.activeBundles.index(bundleIdx)
+        last = self.activeBundles.pop()
+        if idx < len(self.activeBundles):
+            self.activeBundles[idx] = last
+
+    def unlock_bundle(self, bundleIdx: int):
+        if len(self.activeBundles) >= self.maxActiveBundles:
+            raise ValueError('max number of active bundles reached ({})'.format(self.maxActiveBundles))
+
+        self.activeBundles.append(bundleIdx)
+
+    def calculate_collateral(self, sumInsured: int) -> int:
+        if self.collateralizationLevel == FULL_COLLATERALIZATION_LEVEL:
+            return sumInsured
+
+        return (self.collateralizationLevel * sumInsured) // FULL_COLLATERALIZATION_LEVEL
+
+    def underwrite(self, sumInsured: int, data=None) -> int:
+        # returns the idx of the collateralizing bundle, -1 if the application is rejected
+        self.applications += 1
+
+        if self.sumOfSumInsuredAtRisk + sumInsured > self.sumOfSumInsuredCap:
+            self.rejected[REJECTED_SUM_INSURED_CAP] += 1
+            return -1
+
+        activeBundles = self.activeBundles
+        numberOfActiveBundles = len(activeBundles)
+        if numberOfActiveBundles == 0:
+            self.rejected[REJECTED_NO_ACTIVE_BUNDLES] += 1
+            return -1
+
+        collateral = self.calculate_collateral(sumInsured)
+        if self.poolCapital < self.poolLockedCapital + collateral or self.poolCapital <= self.poolLockedCapital:
+            self.rejected[REJECTED_NO_FREE_CAPITAL] += 1
+            return -1
+
+        capital = self.capital
+        lockedCapital = self.lockedCapital
+        bundleFilter = self.filter
+        matches = self.bundleMatchesApplication
+        bundleIdx = -1
+
+        if self.allocation == ALLOCATION_ROUND_ROBIN:
+            start = self.policiesCounter % numberOfActiveBundles
+            for i in range(numberOfActiveBundles):
+                candidate = activeBundles[(start + i) % numberOfActiveBundles]
+                if capital[candidate] - lockedCapital[candidate] >= collateral and matches(bundleFilter[candidate], data):
+                    bundleIdx = candidate
+                    break
+        else:
+            candidate = max(activeBundles, key=lambda idx: capital[idx] - lockedCapital[idx])
+            if capital[candidate] - lockedCapital[candidate] >= collateral:
+                if matches(bundleFilter[candidate], data):
+                    bundleIdx = candidate
+                else:
+                    for candidate in activeBundles:
+                        if capital[candidate] - lockedCapital[candidate] >= collateral and matches(bundleFilter[candidate], data):
+                            bundleIdx = candidate
+                            break
+
+        if bundleIdx < 0:
+            for candidate in activeBundles:
+                if capital[candidate] - lockedCapital[candidate] >= collateral:
+                    self.rejected[REJECTED_FILTER] += 1
+                    return -1
+
+            self.rejected[REJECTED_FRAGMENTATION] += 1
+            return -1
+
+        lockedCapital[bundleIdx] += collateral
+        self.policies[bundleIdx] += 1
+        self.poolLockedCapital += collateral
+        self.sumOfSumInsuredAtRisk += sumInsured
+        self.policiesCounter += 1
+        self.accepted += 1
+        return bundleIdx
+
+    def release(self, bundleIdx: int, collateral: int, sumInsured: int):
+        self.lockedCapital[bundleIdx] -= collateral
+        self.policies[bundleIdx] -= 1
+        self.poolLockedCapital -= collateral
+        self.sumOfSumInsuredAtRisk -= sumInsured
+
+    def run(self, applications):
+        # replays an application stream ordered by timestamp, policies are released at expiry
+        expiries = self._expiries
+        underwrite = self.underwrite
+        calculate_collateral = self.calculate_collateral
+
+        for (timestamp, sumInsured, duration, data) in applications:
+            while expiries and expiries[0][0] <= timestamp:
+                (_, bundleIdx, collateral, expiredSumInsured) = heapq.heappop(expiries)
+                self.release(bundleIdx, collateral, expiredSumInsured)
+
+            bundleIdx = underwrite(sumInsured, data)
+            if bundleIdx >= 0 and duration > 0:
+                heapq.heappush(expiries, (timestamp + duration, bundleIdx, calculate_collateral(sumInsured), sumInsured))
+
+            utilization = self.poolLockedCapital / self.poolCapital if self.poolCapital > 0 else 0.0
+            self._utilizationSum += utilization
+            if utilization > self.peakUtilization:
+                self.peakUtilization = utilization
+
+        return self
+
+    def fragmentation(self) -> float:
+        # share of free capacity that is not available to the largest single application
+        free = [self.capital[idx] - self.lockedCapital[idx] for idx in self.activeBundles]
+        totalFree = sum(free)
+
+        if totalFree <= 0:
+            return 0.0
+
+        return 1.0 - max(free) / totalFree
+
+    def report(self) -> dict:
+        bundleUtilization = [
+            self.lockedCapital[idx] / self.capital[idx] if self.capital[idx] > 0 else 0.0
+            for idx in range(len(self.capital))]
+
+        return {
+            'applications': self.applications,
+            'accepted': self.accepted,
+            'acceptanceRate': self.accepted / self.applications if self.applications > 0 else 0.0,
+            'rejected': dict(self.rejected),
+            'bundles': len(self.capital),
+            'activeBundles': len(self.activeBundles),
+            'capital': self.poolCapital,
+            'lockedCapital': self.poolLockedCapital,
+            'sumOfSumInsuredAtRisk': self.sumOfSumInsuredAtRisk,
+            'utilization': self.poolLockedCapital / self.poolCapital if self.poolCapital > 0 else 0.0,
+            'averageUtilization': self._utilizationSum / self.applications if self.applications > 0 else 0.0,
+            'peakUtilization': self.peakUtilization,
+            'bundleUtilizationMin': min(bundleUtilization) if bundleUtilization else 0.0,
+            'bundleUtilizationMax': max(bundleUtilization) if bundleUtilization else 0.0,
+            'fragmentation': self.fragmentation(),
+        }
+
+    def print_report(self):
+        for name, value in self.report().items():
+            if name == 'rejected':
+                for reason, count in value.items():
+                    print('{:<24} {}'.format('rejected.' + reason, count))
+            elif isinstance(value, float):
+                print('{:<24} {:.4f}'.format(name, value))
+            else:
+                print('{:<24} {}'.format(name, value))
+
+
+def synthetic_applications(
+    applications: int,
+    sumInsuredMin: int,
+    sumInsuredMax: int,
+    duration: int = 0,
+    interval: int = 1,
+    seed: int = None,
+    data=None,
+):
+    # uniformly distributed sum insured, one application every interval
+    # data: None, a fixed value or 'sumInsured' to pass the sum insured to the bundle filter
+    rnd = random.Random(seed)
+
+    for i in range(applications):
+        sumInsured = rnd.randint(sumInsuredMin, sumInsuredMax)
+        applicationData = sumInsured if data == 'sumInsured' else data
+        yield Application(i * interval, sumInsured, duration, applicationData)
+
+
+def load_applications(path: str):
+    # historical applications from a csv file with the columns in APPLICATION_COLUMNS
+    # (data is optional and passed to the bundle filter as string)
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            yield Application(
+                int(row['timestamp']),
+                int(row['sumInsured']),
+                int(row.get('duration') or 0),
+                row.get('data'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='offline bundle allocation simulator')
+    parser.add_argument('--applications', type=int, default=10**6)
+    parser.add_argument('--csv', help='replay historical applications instead of synthetic ones')
+    parser.add_argument('--bundles', type=int, default=10)
+    parser.add_argument('--bundle-capital', type=int, default=100000)
+    parser.add_argument('--sum-insured', type=int, nargs=2, default=[1000, 5000], metavar=('MIN', 'MAX'))
+    parser.add_argument('--duration', type=int, default=30)
+    parser.add_argument('--collateralization', type=float, default=1.0)
+    parser.add_argument('--sum-insured-cap', type=int, default=10**24)
+    parser.add_argument('--allocation', choices=ALLOCATIONS, default=ALLOCATION_ROUND_ROBIN)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    sim = RiskpoolSimulator(
+        collateralizationLevel=int(args.collateralization * FULL_COLLATERALIZATION_LEVEL),
+        sumOfSumInsuredCap=args.sum_insured_cap,
+        maxActiveBundles=args.bundles,
+        allocation=args.allocation)
+
+    for _ in range(args.bundles):
+        sim.create_bundle(args.bundle_capital)
+
+    if args.csv:
+        applications = load_applications(args.csv)
+    else:
+        applications = synthetic_applications(
+            args.applications, args.sum_insured[0], args.sum_insured[1],
+            duration=args.duration, seed=args.seed)
+
+    start = time.perf_counter()
+    sim.run(applications)
+    elapsed = time.perf_counter() - start
+
+    sim.print_report()
+    print('{:<24} {:.2f}'.format('seconds', elapsed))
+    print('{:<24} {:.0f}'.format('applicationsPerMinute', 60 * sim.applications / elapsed if elapsed > 0 else 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import time
+
+from brownie import chain
+from brownie.network.rpc import Rpc
+
+# layered chain snapshots for expensive deployments
+#
+# a layer is built once on top of its parent layer and captured in an evm snapshot.
+# activating a layer reverts the chain to the layer snapshot instead of redeploying.
+# local dev nodes drop all snapshots taken after the snapshot reverted to, so activating
+# a layer discards the layers built on top of it. to build every layer only once,
+# run users of the same layer in sequence, deepest layers last.
+#
+# usage (brownie console)
+# >>> from scripts.snapshot import ChainLayers
+# >>> layers = ChainLayers()
+# >>> layers.add('instance', lambda: {'instance': GifInstance(owner, feeOwner)})
+# >>> layers.activate('instance')
+# >>> instance = layers.value('instance')
+# >>> layers.print_report()
+
+GENESIS = 'genesis'
+
+
+def private_method(owner, name: str):
+    # brownie has no public hooks for reverts and receipts, callers rely on private
+    # methods that may change between brownie releases. fail with a clear message
+    # instead of an AttributeError deep inside a test session
+    method = getattr(owner, name, None)
+    if not callable(method):
+        raise RuntimeError('{}.{} not found, the installed brownie release is not supported'.format(
+            type(owner).__name__, name))
+
+    return method
+
+
+class ChainLayers(object):
+
+    def __init__(self):
+        self.definitions = {GENESIS: (None, None)}
+        self.timing = {}
+
+        # active layers from bottom to top: (name, snapshotId, values)
+        self.stack = []
+
+    def add(self, name: str, builder, parent: str = GENESIS):
+        # builder returns a dict with the values provided by the layer
+        assert parent in self.definitions, 'unknown parent layer {}'.format(parent)
+        self.definitions[name] = (parent, builder)
+        self.timing[name] = {'builds': 0, 'buildTime': 0.0, 'activations': 0, 'revertTime': 0.0}
+
+    def path(self, name: str) -> list:
+        # layer names from the bottom layer up to the named layer
+        path = []
+        while name != GENESIS:
+            path.insert(0, name)
+            name = self.definitions[name][0]
+
+        return path
+
+    def depth(self, name: str) -> int:
+        return len(self.path(name))
+
+    def common(self, names: list) -> str:
+        # deepest layer shared by all named layers
+        paths = [self.path(name) for name in names]
+        if not paths:
+            return GENESIS
+
+        common = GENESIS
+        for layers in zip(*paths):
+            if len(set(layers)) > 1:
+                break
+            common = layers[0]
+
+        return common
+
+    def active(self) -> list:
+        return [name for (name, _, _) in self.stack]
+
+    def activate(self, name: str):
+        if name == GENESIS:
+            chain.reset()
+            self.stack = []
+            return
+
+        path = self.path(name)
+
+        # keep the active layers on the path, drop the rest
+        keep = 0
+        while keep < min(len(path), len(self.stack)) and self.stack[keep][0] == path[keep]:
+            keep += 1
+
+        if keep == 0:
+            chain.reset()
+            self.stack = []
+        else:
+            (layerName, snapshotId, values) = self.stack[keep - 1]
+            start = time.perf_counter()
+            self.stack = self.stack[:keep - 1]
+            self.stack.append((layerName, self._revert(snapshotId), values))
+
+            self.timing[layerName]['activations'] += 1
+            self.timing[layerName]['revertTime'] += time.perf_counter() - start
+
+        for layerName in path[keep:]:
+            self._build(layerName)
+
+    def value(self, key: str, default=None):
+        for (_, _, values) in reversed(self.stack):
+            if key in values:
+                return values[key]
+
+        return default
+
+    def report(self) -> dict:
+        return {name: dict(timing) for (name, timing) in self.timing.items() if timing['builds'] > 0}
+
+    def merge_report(self, report: dict):
+        # adds the report of another process with the same layers, eg an xdist worker
+        for (name, values) in report.items():
+            for (key, value) in values.items():
+                self.timing[name][key] += value
+
+    def report_lines(self) -> list:
+        lines = ['{:<16} {:>7} {:>10} {:>12} {:>10}'.format('layer', 'builds', 'build[s]', 'activations', 'revert[s]')]
+
+        for name, values in self.report().items():
+            lines.append('{:<16} {:>7} {:>10.2f} {:>12} {:>10.2f}'.format(
+                name, values['builds'], values['buildTime'], values['activations'], values['revertTime']))
+
+        return lines
+
+    def print_report(self):
+        for line in self.report_lines():
+            print(line)
+
+    def _build(self, name: str):
+        builder = self.definitions[name][1]
+
+        start = time.perf_counter()
+        values = builder()
+        self.stack.append((name, Rpc().snapshot(), values))
+
+        self.timing[name]['builds'] += 1
+        self.timing[name]['buildTime'] += time.perf_counter() - start
+
+    def _revert(self, snapshotId) -> int:
+        # reverts via brownie to keep its transaction history and contract registry
+        # in sync with the chain, returns a fresh snapshot id for the same state
+        return private_method(chain, '_revert')(snapshotId)
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# startup time of the scripts package
+#
+# every scenario runs in a fresh python process that imports a script module and
+# makes a first call that does not need a network connection. the process reports
+# the import time, the time of the first call and whether brownie connected to a
+# network during import or call. scripts must not touch the network on import.
+#
+# usage (command line)
+# $ python -m scripts.startup --runs 5
+# $ python -m scripts.startup --scenario deploy_ayii --runs 10 --json build/startup.json
+
+# name => (module, first call evaluated in the module namespace, None for import only)
+SCENARIOS = {
+    'brownie': ('brownie', None),
+    'util': ('scripts.util', "s2b32('Registry')"),
+    'instance': ('scripts.instance', "s2b32(GIF_RELEASE)"),
+    'product': ('scripts.product', None),
+    'setup': ('scripts.setup', None),
+    'deploy_ayii': ('scripts.deploy_ayii', 'get_required_funds(10**9)'),
+    'load': ('scripts.load', 'percentiles([1, 2, 3])'),
+    'replay': ('scripts.replay', "to_json({'data': bytes(4)})"),
+    'model': ('scripts.model', 'simulate(sequences=1, steps=10, seed=1)'),
+}
+
+PROBE = '''
+import importlib
+import json
+import sys
+import time
+
+start = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+
+if sys.argv[2]:
+    eval(sys.argv[2], vars(module))
+called = time.perf_counter()
+
+brownie = sys.modules.get('brownie')
+connected = brownie is not None and brownie.network.is_connected()
+
+print(json.dumps({
+    'import': imported - start,
+    'call': called - imported,
+    'modules': len(sys.modules),
+    'connected': connected,
+}))
+'''
+
+
+def measure(module: str, call: str = None, cwd: str = None) -> dict:
+    # single run in a fresh interpreter, raises on a failing import or call
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE, module, call or ''],
+        cwd=cwd or os.getcwd(),
+        capture_output=True,
+        text=True)
+
+    if result.returncode != 0:
+        raise RuntimeError('{} failed:\n{}'.format(module, result.stderr.strip()))
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark(scenarios: list = None, runs: int = 5, cwd: str = None) -> dict:
+    # name => median import, call and total time [s] over all runs, or the error
+    results = {}
+
+    for name in scenarios or SCENARIOS.keys():
+        (module, call) = SCENARIOS[name]
+
+        try:
+            samples = [measure(module, call, cwd) for _ in range(runs)]
+        except RuntimeError as e:
+            results[name] = {'error': str(e).splitlines()[-1]}
+            continue
+
+        results[name] = {
+            'import': statistics.median(sample['import'] for sample in samples),
+            'call': statistics.median(sample['call'] for sample in samples),
+            'total': statistics.median(sample['import'] + sample['call'] for sample in samples),
+            'modules': samples[-1]['modules'],
+            'connected': any(sample['connected'] for sample in samples),
+        }
+
+    return results
+
+
+def print_report(results: dict):
+    print('{:<14} {:>11} {:>11} {:>11} {:>8} {:>10}'.format(
+        'scenario', 'import[ms]', 'call[ms]', 'total[ms]', 'modules', 'connected'))
+
+    for (name, result) in results.items():
+        if 'error' in result:
+            print('{:<14} {}'.format(name, result['error']))
+            continue
+
+        print('{:<14} {:>11.1f} {:>11.1f} {:>11.1f} {:>8} {:>10}'.format(
+            name,
+            1000 * result['import'],
+            1000 * result['call'],
+            1000 * result['total'],
+            result['modules'],
+            'yes' if result['connected'] else 'no'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='time to first call of the scripts package')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS.keys()), help='scenario to measure, all by default')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', help='write the results to a json file')
+    args = parser.parse_args()
+
+    results = benchmark(args.scenario, args.runs)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
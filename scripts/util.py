@@ -1,14 +1,17 @@
 from web3 import Web3
 
-# pylint: disable-msg=E0611
-from brownie import (
-    Contract, 
+from eth_account import Account as EthAccount
+from eth_account.messages import encode_structured_data
+
+from brownie import Contract
+
+from scripts.containers import (
     CoreProxy,
 )
 
 from brownie.convert import to_bytes
-from brownie.network import accounts
-from brownie.network.account import Account
+from brownie.network import accounts, chain
+from brownie.network.account import Account, LocalAccount
 
 def s2h(text: str) -> str:
     return Web3.toHex(text.encode('ascii'))
@@ -40,6 +43,47 @@ def get_account(mnemonic: str, account_offset: int) -> Account:
         count=1,
         offset=account_offset)
 
+# off-chain signature for an EIP-2612 permit, the owner needs to be a local account
+# returns the permit arguments (deadline, v, r, s) expected by the contracts
+def sign_permit(token, owner: LocalAccount, spender, value: int, deadline: int = None) -> tuple:
+    if deadline is None:
+        deadline = chain.time() + 3600
+
+    data = {
+        'types': {
+            'EIP712Domain': [
+                {'name': 'name', 'type': 'string'},
+                {'name': 'version', 'type': 'string'},
+                {'name': 'chainId', 'type': 'uint256'},
+                {'name': 'verifyingContract', 'type': 'address'},
+            ],
+            'Permit': [
+                {'name': 'owner', 'type': 'address'},
+                {'name': 'spender', 'type': 'address'},
+                {'name': 'value', 'type': 'uint256'},
+                {'name': 'nonce', 'type': 'uint256'},
+                {'name': 'deadline', 'type': 'uint256'},
+            ],
+        },
+        'primaryType': 'Permit',
+        'domain': {
+            'name': token.name(),
+            'version': '1',
+            'chainId': chain.id,
+            'verifyingContract': token.address,
+        },
+        'message': {
+            'owner': owner.address,
+            'spender': str(spender),
+            'value': value,
+            'nonce': token.nonces(owner),
+            'deadline': deadline,
+        },
+    }
+
+    signed = EthAccount.sign_message(encode_structured_data(data), owner.private_key)
+    return (deadline, signed.v, signed.r.to_bytes(32, 'big'), signed.s.to_bytes(32, 'big'))
+
 # source: https://github.com/brownie-mix/upgrades-mix/blob/main/scripts/helpful_scripts.py 
 def encode_function_data(*args, initializer=None):
     """Encodes the function call so we can work with an initializer.
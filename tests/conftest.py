@@ -1,3 +1,4 @@
+import os
 import pytest
 import web3
 
@@ -63,6 +64,26 @@ from scripts.ayii_product import (
     GifAyiiProductComplete,
 )
 
+from scripts.setup import fund_riskpool
+
+from scripts.replay import (
+    TraceRecorder,
+    worker_file_name,
+)
+
+from scripts.snapshot import (
+    ChainLayers,
+    GENESIS,
+)
+
+from scripts.devnode import (
+    cached_state,
+    cached_state_dir,
+    configure_worker_node,
+    instance_from_deployment,
+    load_deployment,
+)
+
 from scripts.util import (
     get_account,
     encode_function_data,
@@ -75,6 +96,53 @@ from scripts.util import (
 
 PUBLISH_SOURCE = False
 
+# session level deployments captured in layered evm snapshots (see scripts/snapshot.py)
+# a test module starts from the deepest layer shared by its tests, the corresponding
+# module fixtures return the layer objects instead of redeploying them per module
+LAYER_INSTANCE = 'instance'
+LAYER_TEST_PRODUCT = 'testProduct'
+LAYER_FUNDED_RISKPOOL = 'fundedRiskpool'
+LAYER_AYII = 'ayii'
+
+# fixtures that pull in a layer
+LAYER_FIXTURES = {
+    'instance': LAYER_INSTANCE,
+    'erc20Token': LAYER_INSTANCE,
+    'gifTestProduct': LAYER_TEST_PRODUCT,
+    'fundedBundleId': LAYER_FUNDED_RISKPOOL,
+    'gifAyiiDeploy': LAYER_AYII,
+}
+
+FUNDED_BUNDLE_AMOUNT = 10000
+
+# stakeholder name => account index, shared by the account fixtures and the layer builders
+STAKEHOLDER_ACCOUNTS = {
+    'instanceOperator': 0,
+    'instanceWallet': 1,
+    'oracleProvider': 2,
+    'chainlinkNodeOperator': 3,
+    'riskpoolKeeper': 4,
+    'riskpoolWallet': 5,
+    'investor': 6,
+    'productOwner': 7,
+    'insurer': 8,
+    'customer': 9,
+    'customer2': 10,
+    'theOutsider': 19,
+}
+
+STAKEHOLDER_FUNDING = "1 ether"
+
+GIF_LAYERS = ChainLayers()
+MODULE_LAYERS = {}
+
+# addresses of the prebuilt instance when the dev node starts from a state dump
+DEV_NODE_DEPLOYMENT = {}
+DEV_NODE_STATE_CACHE = 'cache'
+
+# committed gas baselines (see gasBaseline)
+GAS_BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'gas')
+
 # @pytest.fixture(scope="function", autouse=True)
 # def isolate(fn_isolation):
 #     # perform a chain rewind after completing each test, to ensure proper isolation
@@ -89,6 +157,214 @@ def get_filled_account(accounts, account_no, funding) -> Account:
     accounts[account_no].transfer(owner, funding)
     return owner
 
+def get_stakeholder(accounts, name) -> Account:
+    return get_filled_account(accounts, STAKEHOLDER_ACCOUNTS[name], STAKEHOLDER_FUNDING)
+
+def build_instance_layer() -> dict:
+    if DEV_NODE_DEPLOYMENT:
+        return instance_from_deployment(DEV_NODE_DEPLOYMENT)
+
+    owner = get_stakeholder(accounts, 'instanceOperator')
+    feeOwner = get_stakeholder(accounts, 'instanceWallet')
+
+    return {
+        'erc20Token': TestCoin.deploy({'from': owner}),
+        'instance': GifInstance(owner, feeOwner),
+    }
+
+def build_test_product_layer() -> dict:
+    instance = GIF_LAYERS.value('instance')
+    testCoin = GIF_LAYERS.value('erc20Token')
+    capitalOwner = get_stakeholder(accounts, 'riskpoolWallet')
+
+    oracle = GifTestOracle(instance, get_stakeholder(accounts, 'oracleProvider'))
+    riskpool = GifTestRiskpool(instance, get_stakeholder(accounts, 'riskpoolKeeper'), testCoin, capitalOwner, 10**18)
+    product = GifTestProduct(instance, testCoin, capitalOwner, get_stakeholder(accounts, 'productOwner'), oracle, riskpool)
+
+    return {
+        'gifTestOracle': oracle,
+        'gifTestRiskpool': riskpool,
+        'gifTestProduct': product,
+    }
+
+def build_funded_riskpool_layer() -> dict:
+    bundleId = fund_riskpool(
+        GIF_LAYERS.value('instance'),
+        get_stakeholder(accounts, 'instanceOperator'),
+        get_stakeholder(accounts, 'riskpoolWallet'),
+        GIF_LAYERS.value('gifTestRiskpool').getContract(),
+        get_stakeholder(accounts, 'riskpoolKeeper'),
+        GIF_LAYERS.value('erc20Token'),
+        FUNDED_BUNDLE_AMOUNT)
+
+    return {'fundedBundleId': bundleId}
+
+def build_ayii_layer() -> dict:
+    return {
+        'gifAyiiDeploy': GifAyiiProductComplete(
+            GIF_LAYERS.value('instance'),
+            get_stakeholder(accounts, 'productOwner'),
+            get_stakeholder(accounts, 'insurer'),
+            get_stakeholder(accounts, 'oracleProvider'),
+            get_stakeholder(accounts, 'chainlinkNodeOperator'),
+            get_stakeholder(accounts, 'riskpoolKeeper'),
+            get_stakeholder(accounts, 'investor'),
+            GIF_LAYERS.value('erc20Token'),
+            get_stakeholder(accounts, 'riskpoolWallet'))
+    }
+
+GIF_LAYERS.add(LAYER_INSTANCE, build_instance_layer)
+GIF_LAYERS.add(LAYER_TEST_PRODUCT, build_test_product_layer, parent=LAYER_INSTANCE)
+GIF_LAYERS.add(LAYER_FUNDED_RISKPOOL, build_funded_riskpool_layer, parent=LAYER_TEST_PRODUCT)
+GIF_LAYERS.add(LAYER_AYII, build_ayii_layer, parent=LAYER_INSTANCE)
+
+def layer_value(gifLayers: ChainLayers, key: str, build):
+    value = gifLayers.value(key)
+    return build() if value is None else value
+
+def get_item_layer(item) -> str:
+    layers = [layer for (name, layer) in LAYER_FIXTURES.items() if name in item.fixturenames]
+    if not layers:
+        return GENESIS
+
+    deepest = max(layers, key=GIF_LAYERS.depth)
+    if all(layer in GIF_LAYERS.path(deepest) for layer in layers):
+        return deepest
+
+    return GIF_LAYERS.common(layers)
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-snapshot-layers", 
+        action="store_true", 
+        help="deploy instance and products per test module instead of reverting to session snapshots")
+    parser.addoption(
+        "--dev-node-state", 
+        action="store", 
+        default=None,
+        help="directory with a prebuilt dev node state or 'cache' for the cached state (see scripts/devnode.py)")
+    parser.addoption(
+        "--update-gas-baseline", 
+        action="store_true", 
+        help="overwrite the gas baselines in tests/gas with the current measurements")
+    parser.addoption(
+        "--record-trace", 
+        action="store", 
+        default=None,
+        help="record all transactions of the session to a replay file (see scripts/replay.py)")
+
+def get_dev_node_state(config) -> str:
+    stateDir = config.getoption("--dev-node-state")
+    if stateDir != DEV_NODE_STATE_CACHE:
+        return stateDir
+
+    # the cached state is built once by the xdist controller (or the single process)
+    if hasattr(config, "workerinput"):
+        return cached_state_dir()
+
+    return cached_state()
+
+# runs before brownie launches the dev node of this process
+# xdist workers get their own node on their own port
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    stateDir = get_dev_node_state(config)
+
+    if stateDir or hasattr(config, "workerinput"):
+        configure_worker_node(stateDir)
+
+    if stateDir:
+        DEV_NODE_DEPLOYMENT.update(load_deployment(stateDir))
+        DEV_NODE_DEPLOYMENT['stateDir'] = stateDir
+
+def pytest_report_header(config):
+    if DEV_NODE_DEPLOYMENT:
+        return "dev node state: {} ({})".format(DEV_NODE_DEPLOYMENT['stateDir'], DEV_NODE_DEPLOYMENT['backend'])
+
+def pytest_collection_modifyitems(session, config, items):
+    if config.getoption("--no-snapshot-layers"):
+        return
+
+    itemLayers = {}
+    for item in items:
+        itemLayers.setdefault(item.module.__file__, []).append(get_item_layer(item))
+
+    # tests without layer fixtures do not depend on the chain state they start from
+    for (module, layers) in itemLayers.items():
+        layers = [layer for layer in layers if layer != GENESIS]
+        MODULE_LAYERS[module] = GIF_LAYERS.common(layers)
+
+    # group modules by layer, each layer is then built once per session
+    order = [GENESIS, LAYER_INSTANCE, LAYER_TEST_PRODUCT, LAYER_FUNDED_RISKPOOL, LAYER_AYII]
+    items.sort(key=lambda item: order.index(MODULE_LAYERS[item.module.__file__]))
+
+# xdist workers build their own layers, their timing is reported by the controller
+def pytest_sessionfinish(session):
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["gifLayers"] = GIF_LAYERS.report()
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    GIF_LAYERS.merge_report(getattr(node, "workeroutput", {}).get("gifLayers", {}))
+
+def pytest_terminal_summary(terminalreporter):
+    if GIF_LAYERS.report():
+        terminalreporter.write_sep("-", "snapshot layers")
+        for line in GIF_LAYERS.report_lines():
+            terminalreporter.write_line(line)
+
+@pytest.fixture(scope="session")
+def gifLayers() -> ChainLayers:
+    return GIF_LAYERS
+
+# records the session including reverts from layers and test isolation
+@pytest.fixture(scope="session", autouse=True)
+def traceRecording(request):
+    fileName = request.config.getoption("--record-trace")
+    if not fileName:
+        yield None
+        return
+
+    # xdist workers run their own nodes, each worker writes its own recording
+    if hasattr(request.config, "workerinput"):
+        fileName = worker_file_name(fileName, request.config.workerinput["workerid"])
+
+    recorder = TraceRecorder().start()
+    yield recorder
+    recorder.stop().save(fileName)
+
+# checks a gas recorder against its committed baseline in tests/gas
+# a missing baseline fails the test in CI (CI environment variable set, as on github actions)
+# and skips it in local runs, --update-gas-baseline (re)writes the baselines
+@pytest.fixture(scope="session")
+def gasBaseline(request):
+    update = request.config.getoption("--update-gas-baseline")
+
+    def check(recorder, baselineFile: str):
+        baselinePath = os.path.join(GAS_BASELINE_DIR, baselineFile)
+        if not update and not os.path.exists(baselinePath):
+            message = 'no gas baseline tests/gas/{}, record it with --update-gas-baseline and commit it'.format(baselineFile)
+            if os.environ.get('CI'):
+                pytest.fail(message)
+
+            pytest.skip(message)
+
+        regressions = recorder.check_baseline(baselinePath, update=update)
+        if not update:
+            # before/after numbers, shown with -s
+            recorder.print_comparison(baselinePath)
+
+        assert regressions == {}, 'gas regressions against {}: {}'.format(baselineFile, regressions)
+
+    return check
+
+# replaces the brownie fixture that resets the chain before each module
+# fn_isolation depends on module_isolation and is used by all test modules
+@pytest.fixture(scope="module")
+def module_isolation(request, gifLayers: ChainLayers):
+    gifLayers.activate(MODULE_LAYERS.get(request.module.__file__, GENESIS))
+    yield
+
 # fixtures with `yield` execute the code that is placed before the `yield` as setup code
 # and code after `yield` is teardown code. 
 # See https://docs.pytest.org/en/7.1.x/how-to/fixtures.html#yield-fixtures-recommended
@@ -125,71 +401,72 @@ def capitalOwner(riskpoolWallet) -> Account:
 
 @pytest.fixture(scope="module")
 def instanceOperator(accounts) -> Account:
-    return get_filled_account(accounts, 0, "1 ether")
+    return get_stakeholder(accounts, 'instanceOperator')
 
 @pytest.fixture(scope="module")
 def instanceWallet(accounts) -> Account:
-    return get_filled_account(accounts, 1, "1 ether")
+    return get_stakeholder(accounts, 'instanceWallet')
 
 @pytest.fixture(scope="module")
 def oracleProvider(accounts) -> Account:
-    return get_filled_account(accounts, 2, "1 ether")
+    return get_stakeholder(accounts, 'oracleProvider')
 
 @pytest.fixture(scope="module")
 def chainlinkNodeOperator(accounts) -> Account:
-    return get_filled_account(accounts, 3, "1 ether")
+    return get_stakeholder(accounts, 'chainlinkNodeOperator')
 
 @pytest.fixture(scope="module")
 def riskpoolKeeper(accounts) -> Account:
-    return get_filled_account(accounts, 4, "1 ether")
+    return get_stakeholder(accounts, 'riskpoolKeeper')
 
 @pytest.fixture(scope="module")
 def riskpoolWallet(accounts) -> Account:
-    return get_filled_account(accounts, 5, "1 ether")
+    return get_stakeholder(accounts, 'riskpoolWallet')
 
 @pytest.fixture(scope="module")
 def investor(accounts) -> Account:
-    return get_filled_account(accounts, 6, "1 ether")
+    return get_stakeholder(accounts, 'investor')
 
 @pytest.fixture(scope="module")
 def productOwner(accounts) -> Account:
-    return get_filled_account(accounts, 7, "1 ether")
+    return get_stakeholder(accounts, 'productOwner')
 
 @pytest.fixture(scope="module")
 def insurer(accounts) -> Account:
-    return get_filled_account(accounts, 8, "1 ether")
+    return get_stakeholder(accounts, 'insurer')
 
 @pytest.fixture(scope="module")
 def customer(accounts) -> Account:
-    return get_filled_account(accounts, 9, "1 ether")
+    return get_stakeholder(accounts, 'customer')
 
 @pytest.fixture(scope="module")
 def customer2(accounts) -> Account:
-    return get_filled_account(accounts, 10, "1 ether")
+    return get_stakeholder(accounts, 'customer2')
 
 @pytest.fixture(scope="module")
 def theOutsider(accounts) -> Account:
-    return get_filled_account(accounts, 19, "1 ether")
+    return get_stakeholder(accounts, 'theOutsider')
 
 @pytest.fixture(scope="module")
-def instance(owner, feeOwner) -> GifInstance:
-    return GifInstance(owner, feeOwner)
+def instance(gifLayers, owner, feeOwner) -> GifInstance:
+    return layer_value(gifLayers, 'instance', lambda: GifInstance(owner, feeOwner))
 
 @pytest.fixture(scope="module")
 def instanceNoInstanceWallet(owner, feeOwner) -> GifInstance:
     return GifInstance(owner, feeOwner, setInstanceWallet=False)
 
 @pytest.fixture(scope="module")
-def gifTestOracle(instance: GifInstance, oracleProvider: Account) -> GifTestOracle:
-    return GifTestOracle(instance, oracleProvider)
+def gifTestOracle(gifLayers, instance: GifInstance, oracleProvider: Account) -> GifTestOracle:
+    return layer_value(gifLayers, 'gifTestOracle', lambda: GifTestOracle(instance, oracleProvider))
 
 @pytest.fixture(scope="module")
-def gifTestRiskpool(instance: GifInstance, riskpoolKeeper: Account, testCoin: Account, capitalOwner: Account, owner: Account) -> GifTestRiskpool:
+def gifTestRiskpool(gifLayers, instance: GifInstance, riskpoolKeeper: Account, testCoin: Account, capitalOwner: Account, owner: Account) -> GifTestRiskpool:
     capitalization = 10**18
-    return GifTestRiskpool(instance, riskpoolKeeper, testCoin, capitalOwner, capitalization)
+    return layer_value(gifLayers, 'gifTestRiskpool', lambda: GifTestRiskpool(instance, riskpoolKeeper, testCoin, capitalOwner, capitalization))
 
 @pytest.fixture(scope="module")
 def gifTestProduct(
+    gifLayers,
     instance: GifInstance, 
     testCoin,
     capitalOwner: Account, 
@@ -198,16 +475,37 @@ def gifTestProduct(
     gifTestRiskpool: GifTestRiskpool,
     owner
 ) -> GifTestProduct:
-    return GifTestProduct(
+    return layer_value(gifLayers, 'gifTestProduct', lambda: GifTestProduct(
         instance, 
         testCoin,
         capitalOwner,
         productOwner,
         gifTestOracle,
-        gifTestRiskpool)
+        gifTestRiskpool))
+
+# bundle with FUNDED_BUNDLE_AMOUNT of capital in the riskpool of the test product
+@pytest.fixture(scope="module")
+def fundedBundleId(
+    gifLayers,
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    owner: Account,
+    capitalOwner: Account,
+    riskpoolKeeper: Account
+) -> int:
+    return layer_value(gifLayers, 'fundedBundleId', lambda: fund_riskpool(
+        instance, 
+        owner, 
+        capitalOwner, 
+        gifTestProduct.getRiskpool().getContract(), 
+        riskpoolKeeper, 
+        testCoin, 
+        FUNDED_BUNDLE_AMOUNT))
 
 @pytest.fixture(scope="module")
 def gifAyiiDeploy(
+    gifLayers,
     instance: GifInstance, 
     productOwner: Account, 
     insurer: Account, 
@@ -218,7 +516,7 @@ def gifAyiiDeploy(
     testCoin,
     riskpoolWallet: Account
 ) -> GifAyiiProductComplete:
-    return GifAyiiProductComplete(
+    return layer_value(gifLayers, 'gifAyiiDeploy', lambda: GifAyiiProductComplete(
         instance, 
         productOwner, 
         insurer, 
@@ -227,7 +525,7 @@ def gifAyiiDeploy(
         riskpoolKeeper, 
         investor, 
         testCoin, 
-        riskpoolWallet)
+        riskpoolWallet))
 
 @pytest.fixture(scope="module")
 def gifAyiiProduct(gifAyiiDeploy) -> GifAyiiProduct:
@@ -275,8 +573,8 @@ def registry(registryController, owner) -> RegistryController:
     return registry
 
 @pytest.fixture(scope="module")
-def erc20Token(instanceOperator) -> TestCoin:
-    return TestCoin.deploy({'from': instanceOperator})
+def erc20Token(gifLayers, instanceOperator) -> TestCoin:
+    return layer_value(gifLayers, 'erc20Token', lambda: TestCoin.deploy({'from': instanceOperator}))
 
 @pytest.fixture(scope="module")
 def erc20TokenAlternative(instanceOperator) -> TestCoin:
@@ -0,0 +1,140 @@
+import brownie
+import pytest
+
+from brownie import chain
+from brownie.network.account import Account
+
+from scripts.setup import (
+    fund_riskpool,
+    apply_for_policy,
+)
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_checkpoints(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    instanceOperatorService = instance.getInstanceOperatorService()
+    poolController = instance.getPool()
+    bundleController = instance.getBundle()
+
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+    riskpoolId = riskpool.getId()
+
+    bundleId = fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    # checkpointing is optional and disabled by default
+    assert not poolController.isCheckpointingEnabled(riskpoolId)
+    assert poolController.checkpoints(riskpoolId) == 0
+    assert bundleController.checkpoints(bundleId) == 0
+
+    instanceOperatorService.enableRiskpoolCheckpointing(riskpoolId, {'from': owner})
+    enabledBlock = chain.height
+    poolAtEnabled = instanceService.getRiskpool(riskpoolId).dict()
+    bundleAtEnabled = instanceService.getBundle(bundleId).dict()
+
+    assert poolController.isCheckpointingEnabled(riskpoolId)
+    assert bundleController.isCheckpointingEnabled(riskpoolId)
+
+    # history of riskpool and active bundles starts with the current values
+    assert poolController.checkpoints(riskpoolId) == 1
+    assert bundleController.checkpoints(bundleId) == 1
+    assert_checkpoint(instanceService.getBundleCheckpointAtBlock(bundleId, enabledBlock), bundleAtEnabled)
+
+    with brownie.reverts('ERROR:BUC-090:NO_CHECKPOINT_AT_BLOCK'):
+        instanceService.getBundleCheckpointAtBlock(bundleId, enabledBlock - 1)
+
+    # advance to have distinct block timestamps
+    chain.sleep(100)
+    tx = riskpool.fundBundle(bundleId, 5000, {'from': riskpoolKeeper})
+    fundedBlock = tx.block_number
+    fundedTimestamp = tx.timestamp
+    poolAtFunded = instanceService.getRiskpool(riskpoolId).dict()
+    bundleAtFunded = instanceService.getBundle(bundleId).dict()
+
+    chain.sleep(100)
+    sumInsured = 1000
+    apply_for_policy(instance, owner, product, customer, testCoin, 100, sumInsured)
+    underwrittenBlock = chain.height
+    poolAtUnderwritten = instanceService.getRiskpool(riskpoolId).dict()
+    bundleAtUnderwritten = instanceService.getBundle(bundleId).dict()
+
+    assert poolAtUnderwritten['lockedCapital'] == sumInsured
+    assert bundleAtUnderwritten['lockedCapital'] == sumInsured
+
+    # underwriting writes a single checkpoint per block for riskpool and bundle
+    assert poolController.checkpoints(riskpoolId) == 3
+    assert bundleController.checkpoints(bundleId) == 3
+
+    # point in time lookups by block
+    assert_checkpoint(instanceService.getRiskpoolCheckpointAtBlock(riskpoolId, enabledBlock), poolAtEnabled)
+    assert_checkpoint(instanceService.getRiskpoolCheckpointAtBlock(riskpoolId, fundedBlock), poolAtFunded)
+    assert_checkpoint(instanceService.getRiskpoolCheckpointAtBlock(riskpoolId, underwrittenBlock - 1), poolAtFunded)
+    assert_checkpoint(instanceService.getRiskpoolCheckpointAtBlock(riskpoolId, underwrittenBlock), poolAtUnderwritten)
+    assert_checkpoint(instanceService.getRiskpoolCheckpointAtBlock(riskpoolId, underwrittenBlock + 1000), poolAtUnderwritten)
+
+    assert_checkpoint(instanceService.getBundleCheckpointAtBlock(bundleId, fundedBlock), bundleAtFunded)
+    assert_checkpoint(instanceService.getBundleCheckpointAtBlock(bundleId, underwrittenBlock), bundleAtUnderwritten)
+
+    with brownie.reverts('ERROR:POL-051:NO_CHECKPOINT_AT_BLOCK'):
+        instanceService.getRiskpoolCheckpointAtBlock(riskpoolId, enabledBlock - 1)
+
+    # point in time lookups by timestamp
+    assert_checkpoint(instanceService.getRiskpoolCheckpointAtTimestamp(riskpoolId, fundedTimestamp), poolAtFunded)
+    assert_checkpoint(instanceService.getRiskpoolCheckpointAtTimestamp(riskpoolId, fundedTimestamp + 50), poolAtFunded)
+    assert_checkpoint(instanceService.getBundleCheckpointAtTimestamp(bundleId, fundedTimestamp + 50), bundleAtFunded)
+
+    with brownie.reverts('ERROR:BUC-091:NO_CHECKPOINT_AT_TIMESTAMP'):
+        instanceService.getBundleCheckpointAtTimestamp(bundleId, fundedTimestamp - 1)
+
+    # enabling is final, the history has no gaps
+    with brownie.reverts('ERROR:POL-057:CHECKPOINTING_ALREADY_ENABLED'):
+        instanceOperatorService.enableRiskpoolCheckpointing(riskpoolId, {'from': owner})
+
+
+def test_checkpointing_authorization(
+    instance: GifInstance,
+    gifTestProduct: GifTestProduct,
+    owner: Account,
+    riskpoolKeeper: Account,
+):
+    instanceOperatorService = instance.getInstanceOperatorService()
+    riskpoolId = gifTestProduct.getRiskpool().getContract().getId()
+
+    with brownie.reverts('ERROR:IOS-001:NOT_INSTANCE_OPERATOR'):
+        instanceOperatorService.enableRiskpoolCheckpointing(riskpoolId, {'from': riskpoolKeeper})
+
+    with brownie.reverts('ERROR:POL-001:NOT_INSTANCE_OPERATOR'):
+        instance.getPool().enableCheckpointing(riskpoolId, {'from': owner})
+
+    with brownie.reverts('ERROR:BUC-004:NOT_INSTANCE_OPERATOR_SERVICE'):
+        instance.getBundle().enableCheckpointing(riskpoolId, {'from': owner})
+
+    with brownie.reverts('ERROR:POL-050:RISKPOOL_DOES_NOT_EXIST'):
+        instanceOperatorService.enableRiskpoolCheckpointing(riskpoolId + 100, {'from': owner})
+
+
+def assert_checkpoint(checkpoint, expected):
+    checkpoint = checkpoint.dict()
+    assert checkpoint['capital'] == expected['capital']
+    assert checkpoint['lockedCapital'] == expected['lockedCapital']
+    assert checkpoint['balance'] == expected['balance']
+
+    if 'sumOfSumInsuredAtRisk' in expected:
+        assert checkpoint['sumOfSumInsuredAtRisk'] == expected['sumOfSumInsuredAtRisk']
+    else:
+        assert checkpoint['sumOfSumInsuredAtRisk'] == 0
@@ -0,0 +1,75 @@
+import pytest
+
+from scripts.ayii_product import GifAyiiProduct
+from scripts.benchmark import (
+    benchmark_ayii_risk,
+    AYII_CREATE_RISK,
+    AYII_TRIGGER_ORACLE,
+    AYII_ORACLE_CALLBACK,
+    AYII_PROCESS_POLICY,
+    POLICY_APPLY_FOR_POLICY,
+)
+from scripts.setup import (
+    fund_riskpool,
+    fund_customer,
+)
+from scripts.instance import GifInstance
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_ayii_risk_gas(
+    instance: GifInstance,
+    instanceOperator,
+    gifAyiiProduct: GifAyiiProduct,
+    riskpoolWallet,
+    investor,
+    insurer,
+    customer,
+    gasBaseline,
+    tmp_path,
+):
+    product = gifAyiiProduct.getContract()
+    oracle = gifAyiiProduct.getOracle().getContract()
+    clOperator = gifAyiiProduct.getOracle().getClOperator()
+    riskpool = gifAyiiProduct.getRiskpool().getContract()
+    token = gifAyiiProduct.getToken()
+
+    risks = 3
+    fund_riskpool(instance, instanceOperator, riskpoolWallet, riskpool, investor, token, 200000)
+    fund_customer(instance, instanceOperator, customer, token, 300 * risks)
+
+    recorder = benchmark_ayii_risk(product, oracle, clOperator, insurer, customer, risks=risks)
+    recorder.print_summary()
+
+    summary = recorder.summary()
+    for operation in [AYII_CREATE_RISK, POLICY_APPLY_FOR_POLICY, AYII_TRIGGER_ORACLE, AYII_ORACLE_CALLBACK, AYII_PROCESS_POLICY]:
+        assert summary[operation]['count'] == risks
+        assert summary[operation]['min'] > 0
+
+    # comparing against itself yields no deltas
+    baselinePath = str(tmp_path / 'gas_ayii.json')
+    recorder.save(baselinePath)
+    for values in recorder.compare(baselinePath).values():
+        assert values['delta'] == 0
+
+    # packed risk storage against the committed baseline in tests/gas
+    gasBaseline(recorder, 'ayii_risk.json')
+
+    # packed risk storage is exposed through the unchanged risk struct
+    riskId = product.getRiskId(0)
+    risk = product.getRisk(riskId).dict()
+    multiplier = product.getPercentageMultiplier()
+
+    assert risk['id'] == riskId
+    assert risk['trigger'] == multiplier * 0.75
+    assert risk['aph'] == multiplier * 2.0
+    assert risk['aaay'] == multiplier * 1.1
+    assert risk['requestTriggered'] == True
+    assert risk['responseAt'] >= risk['createdAt']
+    assert risk['updatedAt'] == risk['responseAt']
+    assert risk['payoutPercentage'] == product.calculatePayoutPercentage(
+        risk['tsi'], risk['trigger'], risk['exit'], risk['aph'], risk['aaay'])
@@ -0,0 +1,207 @@
+import brownie
+import pytest
+
+from brownie.network.account import Account
+
+from brownie import (
+    interface,
+    AyiiProduct,
+)
+
+from scripts.ayii_product import (
+    GifAyiiProduct
+)
+
+from scripts.setup import (
+    fund_riskpool,
+    fund_customer,
+)
+
+from scripts.instance import GifInstance
+from scripts.util import s2b32
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_batch_request_and_fulfill(
+    instance: GifInstance,
+    instanceOperator,
+    gifAyiiProduct: GifAyiiProduct,
+    riskpoolWallet,
+    investor,
+    insurer,
+    customer,
+):
+    product = gifAyiiProduct.getContract()
+    oracle = gifAyiiProduct.getOracle().getContract()
+    clOperator = gifAyiiProduct.getOracle().getClOperator()
+
+    (projectId, uaiIds, cropId, riskIds, policyIds) = create_risks_and_policies(
+        instance, instanceOperator, gifAyiiProduct, riskpoolWallet, investor, insurer, customer)
+
+    print('--- step trigger single batch oracle request -------------')
+
+    tx = product.triggerOracleBatch(policyIds, {'from': insurer})
+    requestId = tx.return_value
+
+    # one gif request and one chainlink request for all risks
+    assert requestId == 0
+    assert len(tx.events['OracleRequest']) == 1
+    assert len(tx.events['LogAyiiBatchRequest']) == 1
+    assert tx.events['LogAyiiBatchRequest'][0]['risks'] == len(riskIds)
+    assert len(tx.events['LogAyiiRiskDataRequested']) == len(riskIds)
+    assert tx.events['LogAyiiRiskBatchRequested'][0]['requestId'] == requestId
+    assert product.getBatchRequestRiskIds(requestId) == riskIds
+
+    for i in range(len(riskIds)):
+        requestEvent = tx.events['LogAyiiRiskDataRequested'][i]
+        assert requestEvent['requestId'] == requestId
+        assert requestEvent['riskId'] == riskIds[i]
+        assert requestEvent['uaiId'] == uaiIds[i]
+
+        risk = product.getRisk(riskIds[i]).dict()
+        assert risk['requestId'] == requestId
+        assert risk['requestTriggered'] == True
+        assert risk['responseAt'] == 0
+
+    # risks pending in a batch may neither be triggered individually nor be batched again
+    with brownie.reverts('ERROR:AYI-015:RISK_IN_PENDING_BATCH_REQUEST'):
+        product.triggerOracle(policyIds[0], {'from': insurer})
+
+    with brownie.reverts('ERROR:AYI-019:ORACLE_REQUEST_PENDING'):
+        product.triggerOracleBatch([policyIds[1]], {'from': insurer})
+
+    print('--- step oracle responds to batch request ----------------')
+
+    clRequestEvent = tx.events['OracleRequest'][0]
+    multiplier = product.getPercentageMultiplier()
+    aaays = [
+        multiplier * 1.1, # payout
+        multiplier * 2.5, # no payout
+        multiplier * 0.1, # max payout
+    ]
+
+    data = oracle.encodeFulfillBatchParameters(
+        clRequestEvent['requestId'],
+        [projectId] * len(riskIds),
+        uaiIds,
+        [cropId] * len(riskIds),
+        aaays
+    )
+
+    tx = clOperator.fulfillOracleRequest2(
+        clRequestEvent['requestId'],
+        clRequestEvent['payment'],
+        clRequestEvent['callbackAddr'],
+        clRequestEvent['callbackFunctionId'],
+        clRequestEvent['cancelExpiration'],
+        data
+    )
+
+    assert tx.return_value == True
+    assert len(tx.events['LogAyiiFulfillBatch']) == 1
+    assert len(tx.events['LogAyiiRiskDataReceived']) == len(riskIds)
+    assert tx.events['LogAyiiRiskBatchReceived'][0]['risks'] == len(riskIds)
+    assert len(product.getBatchRequestRiskIds(requestId)) == 0
+
+    for i in range(len(riskIds)):
+        risk = product.getRisk(riskIds[i]).dict()
+        assert risk['aaay'] == aaays[i]
+        assert risk['responseAt'] > 0
+        assert risk['payoutPercentage'] == product.calculatePayoutPercentage(
+            risk['tsi'], risk['trigger'], risk['exit'], risk['aph'], aaays[i])
+
+    print('--- step process policies of all batched risks -----------')
+
+    for riskId in riskIds:
+        product.processPoliciesForRisk(riskId, 0, {'from': insurer})
+        assert product.policies(riskId) == 0
+
+
+def test_batch_request_cancel(
+    instance: GifInstance,
+    instanceOperator,
+    gifAyiiProduct: GifAyiiProduct,
+    riskpoolWallet,
+    investor,
+    insurer,
+    customer,
+):
+    product = gifAyiiProduct.getContract()
+
+    (projectId, uaiIds, cropId, riskIds, policyIds) = create_risks_and_policies(
+        instance, instanceOperator, gifAyiiProduct, riskpoolWallet, investor, insurer, customer)
+
+    with brownie.reverts('ERROR:AYI-016:BATCH_EMPTY'):
+        product.triggerOracleBatch([], {'from': insurer})
+
+    # the same risk must not show up twice in a batch
+    with brownie.reverts('ERROR:AYI-019:ORACLE_REQUEST_PENDING'):
+        product.triggerOracleBatch([policyIds[0], policyIds[0]], {'from': insurer})
+
+    tx = product.triggerOracleBatch(policyIds, {'from': insurer})
+    requestId = tx.return_value
+
+    # cancelling via any policy of the batch resets all risks of the batch
+    tx = product.cancelOracleRequest(policyIds[1], {'from': insurer})
+    assert tx.events['LogAyiiRiskDataRequestCancelled'][0]['requestId'] == requestId
+    assert len(product.getBatchRequestRiskIds(requestId)) == 0
+
+    for riskId in riskIds:
+        risk = product.getRisk(riskId).dict()
+        assert risk['requestTriggered'] == False
+
+    # risks may be triggered again after the cancellation
+    tx = product.triggerOracle(policyIds[0], {'from': insurer})
+    assert tx.return_value == requestId + 1
+
+    tx = product.triggerOracleBatch(policyIds[1:], {'from': insurer})
+    assert tx.return_value == requestId + 2
+
+
+def create_risks_and_policies(
+    instance,
+    instanceOperator,
+    gifAyiiProduct,
+    riskpoolWallet,
+    investor,
+    insurer,
+    customer,
+):
+    product = gifAyiiProduct.getContract()
+    riskpool = gifAyiiProduct.getRiskpool().getContract()
+    token = gifAyiiProduct.getToken()
+
+    riskpoolFunding = 200000
+    fund_riskpool(instance, instanceOperator, riskpoolWallet, riskpool, investor, token, riskpoolFunding)
+
+    projectId = s2b32('2022.kenya.wfp.ayii')
+    uaiIds = [s2b32('1234'), s2b32('2345'), s2b32('3456')]
+    cropId = s2b32('mixed')
+
+    multiplier = product.getPercentageMultiplier()
+    trigger = multiplier * 0.75
+    exit = multiplier * 0.1
+    tsi = multiplier * 0.9
+    aph = multiplier * 2.0
+
+    customerFunding = 5000
+    fund_customer(instance, instanceOperator, customer, token, customerFunding)
+
+    premium = 300
+    sumInsured = 2000
+
+    riskIds = []
+    policyIds = []
+
+    for uaiId in uaiIds:
+        tx = product.createRisk(projectId, uaiId, cropId, trigger, exit, tsi, aph, {'from': insurer})
+        riskIds.append(tx.return_value)
+
+        tx = product.applyForPolicy(customer, premium, sumInsured, riskIds[-1], {'from': insurer})
+        policyIds.append(tx.return_value)
+
+    return (projectId, uaiIds, cropId, riskIds, policyIds)
@@ -0,0 +1,155 @@
+import brownie
+import pytest
+
+from scripts.ayii_product import (
+    GifAyiiProduct,
+    get_risks,
+    RISK_INDEX_PROJECT,
+    RISK_INDEX_CROP,
+    RISK_INDEX_STATE,
+    RISK_STATE_CREATED,
+    RISK_STATE_REQUESTED,
+    RISK_STATE_RESPONDED,
+    RISK_STATE_SETTLED,
+)
+
+from scripts.setup import (
+    fund_riskpool,
+    fund_customer,
+)
+
+from scripts.instance import GifInstance
+from scripts.util import s2b32
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_risk_indices_and_pagination(
+    gifAyiiProduct: GifAyiiProduct,
+    insurer,
+):
+    product = gifAyiiProduct.getContract()
+
+    projects = [s2b32('2022.kenya.wfp.ayii'), s2b32('2022.kenya.acre.ayii')]
+    crops = [s2b32('maize'), s2b32('beans')]
+    uaiIds = [s2b32(str(1000 + i)) for i in range(5)]
+
+    riskIds = {}
+    for projectId in projects:
+        for cropId in crops:
+            for uaiId in uaiIds:
+                riskIds[(projectId, cropId, uaiId)] = create_risk(product, insurer, projectId, uaiId, cropId)
+
+    assert product.risks() == 20
+    assert product.risksForProject(projects[0]) == 10
+    assert product.risksForCrop(crops[1]) == 10
+    assert product.risksForProject(s2b32('unknown')) == 0
+    assert product.risksInState(RISK_STATE_CREATED) == 20
+    assert product.risksInState(RISK_STATE_REQUESTED) == 0
+
+    # pages are cut at the end of the index
+    page = product.getRisksForProject(projects[1], 8, 5)
+    assert len(page) == 2
+    assert len(product.getRisksForProject(projects[1], 10, 5)) == 0
+    assert len(product.getRisksForProject(projects[1], 100, 5)) == 0
+
+    # full risk structs in creation order
+    page = product.getRisksForCrop(crops[0], 0, 3)
+    assert page[0].dict()['id'] == riskIds[(projects[0], crops[0], uaiIds[0])]
+    assert page[2].dict()['uaiId'] == uaiIds[2]
+    assert page[2].dict()['cropId'] == crops[0]
+
+    # python pager
+    risks = list(get_risks(product, RISK_INDEX_PROJECT, projects[0], pageSize=3))
+    assert len(risks) == 10
+    assert set([risk['projectId'] for risk in risks]) == set([projects[0]])
+    assert set([risk['id'] for risk in risks]) == set([riskIds[(projects[0], c, u)] for c in crops for u in uaiIds])
+
+    risks = list(get_risks(product, RISK_INDEX_CROP, crops[1], pageSize=4))
+    assert len(risks) == 10
+
+    risks = list(get_risks(product, RISK_INDEX_STATE, RISK_STATE_CREATED, pageSize=7))
+    assert len(risks) == 20
+    assert len(set([risk['id'] for risk in risks])) == 20
+
+
+def test_risk_state_lifecycle(
+    instance: GifInstance,
+    instanceOperator,
+    gifAyiiProduct: GifAyiiProduct,
+    riskpoolWallet,
+    investor,
+    insurer,
+    customer,
+):
+    product = gifAyiiProduct.getContract()
+    oracle = gifAyiiProduct.getOracle().getContract()
+    clOperator = gifAyiiProduct.getOracle().getClOperator()
+    riskpool = gifAyiiProduct.getRiskpool().getContract()
+    token = gifAyiiProduct.getToken()
+
+    fund_riskpool(instance, instanceOperator, riskpoolWallet, riskpool, investor, token, 200000)
+    fund_customer(instance, instanceOperator, customer, token, 5000)
+
+    projectId = s2b32('2022.kenya.wfp.ayii')
+    cropId = s2b32('mixed')
+    uaiIds = [s2b32('1234'), s2b32('2345')]
+
+    riskIds = [create_risk(product, insurer, projectId, uaiId, cropId) for uaiId in uaiIds]
+    policyIds = [product.applyForPolicy(customer, 300, 2000, riskId, {'from': insurer}).return_value for riskId in riskIds]
+
+    assert product.getRiskState(riskIds[0]) == RISK_STATE_CREATED
+    assert product.getRiskState(s2b32('unknown')) == 0
+
+    tx = product.triggerOracle(policyIds[0], {'from': insurer})
+    assert product.getRiskState(riskIds[0]) == RISK_STATE_REQUESTED
+    assert product.getRiskState(riskIds[1]) == RISK_STATE_CREATED
+    assert product.risksInState(RISK_STATE_REQUESTED) == 1
+    assert product.getRisksInState(RISK_STATE_REQUESTED, 0, 10)[0].dict()['id'] == riskIds[0]
+
+    stateChanged = tx.events['LogAyiiRiskStateChanged'][0]
+    assert stateChanged['riskId'] == riskIds[0]
+    assert stateChanged['oldState'] == RISK_STATE_CREATED
+    assert stateChanged['newState'] == RISK_STATE_REQUESTED
+
+    # cancelled requests move the risk back to created
+    product.cancelOracleRequest(policyIds[0], {'from': insurer})
+    assert product.getRiskState(riskIds[0]) == RISK_STATE_CREATED
+    assert product.risksInState(RISK_STATE_REQUESTED) == 0
+
+    tx = product.triggerOracle(policyIds[0], {'from': insurer})
+    clRequestEvent = tx.events['OracleRequest'][0]
+
+    aaay = product.getPercentageMultiplier() * 1.1
+    data = oracle.encodeFulfillParameters(clRequestEvent['requestId'], projectId, uaiIds[0], cropId, aaay)
+    clOperator.fulfillOracleRequest2(
+        clRequestEvent['requestId'],
+        clRequestEvent['payment'],
+        clRequestEvent['callbackAddr'],
+        clRequestEvent['callbackFunctionId'],
+        clRequestEvent['cancelExpiration'],
+        data
+    )
+
+    assert product.getRiskState(riskIds[0]) == RISK_STATE_RESPONDED
+    assert product.risksInState(RISK_STATE_RESPONDED) == 1
+
+    # risk is settled once its last policy is processed
+    product.processPoliciesForRisk(riskIds[0], 0, {'from': insurer})
+    assert product.getRiskState(riskIds[0]) == RISK_STATE_SETTLED
+    assert product.risksInState(RISK_STATE_RESPONDED) == 0
+    assert product.risksInState(RISK_STATE_SETTLED) == 1
+    assert product.risksInState(RISK_STATE_CREATED) == 1
+
+
+def create_risk(product, insurer, projectId, uaiId, cropId):
+    multiplier = product.getPercentageMultiplier()
+    tx = product.createRisk(
+        projectId, uaiId, cropId,
+        multiplier * 0.75, multiplier * 0.1, multiplier * 0.9, multiplier * 2.0,
+        {'from': insurer})
+
+    return tx.return_value
@@ -0,0 +1,156 @@
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.setup import (
+    fund_riskpool,
+    apply_for_policy,
+)
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+from scripts.simulator import (
+    RiskpoolSimulator,
+    Application,
+    synthetic_applications,
+    max_sum_insured_filter,
+    FULL_COLLATERALIZATION_LEVEL,
+    ALLOCATION_MAX_CAPACITY,
+    REJECTED_SUM_INSURED_CAP,
+    REJECTED_NO_FREE_CAPITAL,
+    REJECTED_FRAGMENTATION,
+    REJECTED_FILTER,
+)
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_simulator_matches_riskpool(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    initialFunding = [10000, 2500, 1500]
+    sumInsureds = [1000, 1000, 500, 1500, 1000, 700, 1000, 1000, 300, 2000]
+
+    riskpool.setMaximumNumberOfActiveBundles(len(initialFunding), {'from': riskpoolKeeper})
+    bundleIds = [
+        fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, funding)
+        for funding in initialFunding]
+
+    # simulator starts from on-chain capital (net of capital fees)
+    sim = RiskpoolSimulator(maxActiveBundles=len(initialFunding))
+    for bundleId in bundleIds:
+        sim.create_bundle(instanceService.getBundle(bundleId).dict()['capital'])
+
+    for sumInsured in sumInsureds:
+        apply_for_policy(instance, owner, product, customer, testCoin, 100, sumInsured)
+        sim.underwrite(sumInsured)
+
+    for (idx, bundleId) in enumerate(bundleIds):
+        assert instanceService.getBundle(bundleId).dict()['lockedCapital'] == sim.lockedCapital[idx]
+
+    assert instanceService.getTotalValueLocked(riskpool.getId()) == sim.poolLockedCapital
+    assert product.policies() == sim.accepted
+
+
+def test_simulator_collateralization_and_cap():
+    sim = RiskpoolSimulator(
+        collateralizationLevel=FULL_COLLATERALIZATION_LEVEL // 2,
+        sumOfSumInsuredCap=5000,
+        maxActiveBundles=2)
+
+    sim.create_bundle(1000)
+    sim.create_bundle(1000)
+
+    assert sim.underwrite(2000) == 0
+    assert sim.underwrite(2000) == 1
+    assert sim.lockedCapital == [1000, 1000]
+    assert sim.sumOfSumInsuredAtRisk == 4000
+
+    assert sim.underwrite(2000) == -1
+    assert sim.rejected[REJECTED_SUM_INSURED_CAP] == 1
+
+    assert sim.underwrite(1000) == -1
+    assert sim.rejected[REJECTED_NO_FREE_CAPITAL] == 1
+
+    with pytest.raises(ValueError):
+        sim.create_bundle(1000)
+
+
+def test_simulator_filter_and_fragmentation():
+    sim = RiskpoolSimulator(
+        maxActiveBundles=3,
+        allocation=ALLOCATION_MAX_CAPACITY,
+        bundleMatchesApplication=max_sum_insured_filter)
+
+    sim.create_bundle(3000, 1000)
+    sim.create_bundle(2000)
+    sim.create_bundle(1000, 500)
+
+    # largest bundle does not match, fallback to scanning the active bundles
+    assert sim.underwrite(1500, 1500) == 1
+
+    # largest bundle first
+    assert sim.underwrite(1000, 1000) == 0
+    assert sim.underwrite(1000, 1000) == 0
+
+    # riskpool capacity 2500 suffices, no single bundle can take 1100
+    assert sim.underwrite(1100, 1100) == -1
+    assert sim.rejected[REJECTED_FRAGMENTATION] == 1
+
+    assert sim.underwrite(800, 800) == 0
+
+    # only a bundle with a non matching filter has sufficient capacity
+    assert sim.underwrite(600, 600) == -1
+    assert sim.rejected[REJECTED_FILTER] == 1
+
+    report = sim.report()
+    assert report['applications'] == 6
+    assert report['accepted'] == 4
+    assert report['acceptanceRate'] == 4 / 6
+    assert report['utilization'] == 4300 / 6000
+    assert report['fragmentation'] == 1.0 - 1000 / 1700
+
+    # locked bundles leave the active set like EnumerableSet.remove
+    sim.lock_bundle(0)
+    assert sim.activeBundles == [2, 1]
+
+
+def test_simulator_replay():
+    sim = RiskpoolSimulator(maxActiveBundles=2)
+    sim.create_bundle(10000)
+    sim.create_bundle(10000)
+
+    # policies expire and release their collateral
+    sim.run([
+        Application(0, 8000, 10, None),
+        Application(1, 8000, 10, None),
+        Application(2, 8000, 0, None),
+        Application(10, 8000, 0, None),
+        Application(11, 8000, 0, None),
+    ])
+
+    assert sim.accepted == 4
+    assert sim.rejected[REJECTED_NO_FREE_CAPITAL] == 1
+    assert sim.lockedCapital == [8000, 8000]
+
+    applications = 10**5
+    sim = RiskpoolSimulator(maxActiveBundles=10)
+    for _ in range(10):
+        sim.create_bundle(100000)
+
+    report = sim.run(synthetic_applications(applications, 1000, 5000, duration=100, seed=42)).report()
+    assert report['applications'] == applications
+    assert report['accepted'] + sum(report['rejected'].values()) == applications
+    assert 0 < report['averageUtilization'] <= report['peakUtilization'] <= 1
@@ -0,0 +1,174 @@
+import pytest
+
+from scripts.ayii_product import GifAyiiProduct
+from scripts.chainlink_node import (
+    AaayDataset,
+    ChainlinkNodeStandIn,
+    FAILURE_INVALID,
+    write_dataset,
+)
+from scripts.setup import (
+    fund_riskpool,
+    fund_customer,
+)
+from scripts.instance import GifInstance
+from scripts.util import s2b32
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_node_fulfills_single_and_batch_requests(
+    instance: GifInstance,
+    instanceOperator,
+    gifAyiiProduct: GifAyiiProduct,
+    riskpoolWallet,
+    investor,
+    insurer,
+    customer,
+    chainlinkNodeOperator,
+    tmp_path,
+):
+    product = gifAyiiProduct.getContract()
+    oracle = gifAyiiProduct.getOracle().getContract()
+    clOperator = gifAyiiProduct.getOracle().getClOperator()
+
+    uaiIds = ['1234', '2345', '3456']
+    (riskIds, policyIds) = create_policies(instance, instanceOperator, gifAyiiProduct, riskpoolWallet, investor, insurer, customer, uaiIds)
+
+    aaays = [1.1, 2.5, 0.1]
+    datasetPath = str(tmp_path / 'aaay.csv')
+    write_dataset(datasetPath, [('2022.kenya.wfp.ayii', uaiId, 'mixed', aaay) for (uaiId, aaay) in zip(uaiIds, aaays)])
+    dataset = AaayDataset(datasetPath, product.getPercentageMultiplier())
+    assert len(dataset) == 3
+
+    node = ChainlinkNodeStandIn(product, oracle, clOperator, chainlinkNodeOperator, dataset, pollInterval=0)
+
+    product.triggerOracle(policyIds[0], {'from': insurer})
+    product.triggerOracleBatch(policyIds[1:], {'from': insurer})
+
+    node.step()
+    node.drain()
+
+    assert node.stats['requests'] == 2
+    assert node.stats['risks'] == 3
+    assert node.stats['fulfilled'] == 2
+    assert node.stats['failed'] == 0
+
+    for (riskId, aaay) in zip(riskIds, aaays):
+        risk = product.getRisk(riskId).dict()
+        assert risk['responseAt'] > 0
+        assert risk['aaay'] == dataset.multiplier * aaay
+
+    dataset.close()
+
+
+def test_node_failure_injection(
+    instance: GifInstance,
+    instanceOperator,
+    gifAyiiProduct: GifAyiiProduct,
+    riskpoolWallet,
+    investor,
+    insurer,
+    customer,
+    chainlinkNodeOperator,
+    tmp_path,
+):
+    product = gifAyiiProduct.getContract()
+    oracle = gifAyiiProduct.getOracle().getContract()
+    clOperator = gifAyiiProduct.getOracle().getClOperator()
+
+    uaiIds = ['1234']
+    (riskIds, policyIds) = create_policies(instance, instanceOperator, gifAyiiProduct, riskpoolWallet, investor, insurer, customer, uaiIds)
+
+    datasetPath = str(tmp_path / 'aaay.csv')
+    write_dataset(datasetPath, [('2022.kenya.wfp.ayii', '1234', 'mixed', 1.1)])
+    dataset = AaayDataset(datasetPath)
+
+    node = ChainlinkNodeStandIn(
+        product, oracle, clOperator, chainlinkNodeOperator, dataset,
+        pollInterval=0,
+        failureRate=1.0,
+        failureModes=[FAILURE_INVALID])
+
+    product.triggerOracle(policyIds[0], {'from': insurer})
+
+    node.step()
+    node.drain()
+
+    # invalid aaay values are rejected by the product callback
+    assert node.stats['requests'] == 1
+    assert node.stats['fulfilled'] == 0
+    assert node.stats['failed'] == 1
+    assert product.getRisk(riskIds[0]).dict()['responseAt'] == 0
+
+    dataset.close()
+
+
+def test_node_skips_requests_with_unknown_keys(
+    instance: GifInstance,
+    instanceOperator,
+    gifAyiiProduct: GifAyiiProduct,
+    riskpoolWallet,
+    investor,
+    insurer,
+    customer,
+    chainlinkNodeOperator,
+    tmp_path,
+):
+    product = gifAyiiProduct.getContract()
+    oracle = gifAyiiProduct.getOracle().getContract()
+    clOperator = gifAyiiProduct.getOracle().getClOperator()
+
+    uaiIds = ['1234', '2345']
+    (riskIds, policyIds) = create_policies(instance, instanceOperator, gifAyiiProduct, riskpoolWallet, investor, insurer, customer, uaiIds)
+
+    # dataset without a value for uai 2345
+    datasetPath = str(tmp_path / 'aaay.csv')
+    write_dataset(datasetPath, [('2022.kenya.wfp.ayii', '1234', 'mixed', 1.1)])
+    dataset = AaayDataset(datasetPath)
+
+    node = ChainlinkNodeStandIn(product, oracle, clOperator, chainlinkNodeOperator, dataset, pollInterval=0)
+
+    product.triggerOracleBatch(policyIds, {'from': insurer})
+
+    node.step()
+    node.drain()
+
+    # the whole batch is dropped, no risk gets a made up aaay value
+    assert node.stats['requests'] == 1
+    assert node.stats['unknownKeys'] == 1
+    assert node.stats['dropped'] == 1
+    assert node.stats['fulfilled'] == 0
+
+    for riskId in riskIds:
+        assert product.getRisk(riskId).dict()['responseAt'] == 0
+
+    dataset.close()
+
+
+def create_policies(instance, instanceOperator, gifAyiiProduct, riskpoolWallet, investor, insurer, customer, uaiIds):
+    product = gifAyiiProduct.getContract()
+    riskpool = gifAyiiProduct.getRiskpool().getContract()
+    token = gifAyiiProduct.getToken()
+
+    fund_riskpool(instance, instanceOperator, riskpoolWallet, riskpool, investor, token, 200000)
+    fund_customer(instance, instanceOperator, customer, token, 5000)
+
+    multiplier = product.getPercentageMultiplier()
+    riskIds = []
+    policyIds = []
+
+    for uaiId in uaiIds:
+        tx = product.createRisk(
+            s2b32('2022.kenya.wfp.ayii'), s2b32(uaiId), s2b32('mixed'),
+            multiplier * 0.75, multiplier * 0.1, multiplier * 0.9, multiplier * 2.0,
+            {'from': insurer})
+        riskIds.append(tx.return_value)
+
+        tx = product.applyForPolicy(customer, 300, 2000, riskIds[-1], {'from': insurer})
+        policyIds.append(tx.return_value)
+
+    return (riskIds, policyIds)
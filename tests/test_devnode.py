@@ -0,0 +1,85 @@
+import json
+import os
+import pytest
+
+from scripts.devnode import (
+    ANVIL,
+    GANACHE,
+    ANVIL_STATE_FILE,
+    GANACHE_DB_DIR,
+    DEPLOYMENT_FILE,
+    DEPLOY_SCRIPTS,
+    MASTER,
+    cached_state_dir,
+    node_command,
+    prune_state_cache,
+    state_key,
+    worker_id,
+    worker_index,
+)
+
+
+def test_worker_index(monkeypatch):
+    monkeypatch.delenv('PYTEST_XDIST_WORKER', raising=False)
+    assert worker_id() == MASTER
+    assert worker_index() == 0
+
+    monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw13')
+    assert worker_id() == 'gw13'
+    assert worker_index() == 13
+
+
+def test_node_command():
+    stateDir = os.path.join('build', 'devnode')
+
+    assert node_command(ANVIL) == 'anvil'
+    assert node_command(ANVIL, stateDir) == 'anvil --load-state {}'.format(os.path.join(stateDir, ANVIL_STATE_FILE))
+    assert node_command(ANVIL, stateDir, dumpState=True) == 'anvil --dump-state {}'.format(os.path.join(stateDir, ANVIL_STATE_FILE))
+
+    # ganache keeps loading and persisting the same database
+    assert node_command(GANACHE) == 'ganache-cli'
+    assert node_command(GANACHE, stateDir) == 'ganache-cli --database.dbPath {}'.format(os.path.join(stateDir, GANACHE_DB_DIR))
+    assert node_command(GANACHE, stateDir, dumpState=True) == node_command(GANACHE, stateDir)
+
+
+def test_state_key(tmp_path, monkeypatch):
+    for path in DEPLOY_SCRIPTS:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(path)
+
+    artifacts = tmp_path / 'build' / 'contracts'
+    artifacts.mkdir(parents=True)
+    artifact = artifacts / 'TestCoin.json'
+    artifact.write_text(json.dumps({'contractName': 'TestCoin', 'bytecode': '6080', 'abi': []}))
+
+    monkeypatch.chdir(tmp_path)
+    key = state_key(ANVIL)
+
+    assert state_key(ANVIL) == key
+    assert state_key(GANACHE) != key
+    assert cached_state_dir('cache', ANVIL) == os.path.join('cache', key)
+
+    # abi only changes keep the cached state
+    artifact.write_text(json.dumps({'contractName': 'TestCoin', 'bytecode': '6080', 'abi': [{}]}))
+    assert state_key(ANVIL) == key
+
+    artifact.write_text(json.dumps({'contractName': 'TestCoin', 'bytecode': '6081', 'abi': []}))
+    assert state_key(ANVIL) != key
+
+    (tmp_path / DEPLOY_SCRIPTS[-1]).write_text('changed')
+    assert state_key(ANVIL) != key
+
+
+def test_prune_state_cache(tmp_path):
+    for (idx, name) in enumerate(['a', 'b', 'c', 'd']):
+        entry = tmp_path / name
+        entry.mkdir()
+        (entry / DEPLOYMENT_FILE).write_text('{}')
+        os.utime(entry, (idx, idx))
+
+    # incomplete builds are not cache entries
+    (tmp_path / 'e.1234').mkdir()
+
+    pruned = prune_state_cache(str(tmp_path), keep=2)
+    assert sorted(os.path.basename(path) for path in pruned) == ['a', 'b']
+    assert sorted(os.listdir(tmp_path)) == ['c', 'd', 'e.1234']
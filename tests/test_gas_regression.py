@@ -0,0 +1,124 @@
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.ayii_product import GifAyiiProduct
+from scripts.benchmark import (
+    benchmark_lifecycle,
+    benchmark_ayii_lifecycle,
+    AYII_CREATE_RISK,
+    AYII_TRIGGER_ORACLE,
+    AYII_ORACLE_CALLBACK,
+    AYII_PROCESS_POLICY,
+    POLICY_APPLY_FOR_POLICY,
+    POLICY_NEW_APPLICATION,
+    POLICY_UNDERWRITE,
+    POLICY_COLLECT_PREMIUM,
+    POLICY_ADJUST_PREMIUM_SUM_INSURED,
+    POLICY_NEW_CLAIM,
+    POLICY_CONFIRM_CLAIM,
+    POLICY_NEW_PAYOUT,
+    POLICY_PROCESS_PAYOUT,
+    POLICY_EXPIRE,
+    POLICY_CLOSE,
+    ORACLE_REQUEST,
+    ORACLE_RESPOND,
+    BUNDLE_CREATE,
+    BUNDLE_FUND,
+    BUNDLE_DEFUND,
+    BUNDLE_CLOSE,
+    BUNDLE_BURN,
+)
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+
+# baselines are committed in tests/gas, tests without baseline are skipped
+# use --update-gas-baseline to record them or to accept intended gas changes
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_lifecycle_gas_test_product(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    productOwner: Account,
+    oracleProvider: Account,
+    riskpoolKeeper: Account,
+    capitalOwner: Account,
+    owner: Account,
+    customer: Account,
+    gasBaseline,
+):
+    policies = 3
+    recorder = benchmark_lifecycle(
+        instance,
+        owner,
+        gifTestProduct.getContract(),
+        productOwner,
+        gifTestProduct.getOracle().getContract(),
+        oracleProvider,
+        gifTestProduct.getRiskpool().getContract(),
+        riskpoolKeeper,
+        capitalOwner,
+        customer,
+        testCoin,
+        policies=policies)
+
+    recorder.print_summary()
+    summary = recorder.summary()
+
+    for operation in [
+        POLICY_APPLY_FOR_POLICY, POLICY_NEW_APPLICATION, POLICY_UNDERWRITE, POLICY_ADJUST_PREMIUM_SUM_INSURED,
+        POLICY_COLLECT_PREMIUM, POLICY_NEW_CLAIM, POLICY_CONFIRM_CLAIM, POLICY_NEW_PAYOUT, POLICY_PROCESS_PAYOUT,
+        ORACLE_REQUEST, ORACLE_RESPOND,
+    ]:
+        assert summary[operation]['count'] == policies
+
+    assert summary[POLICY_EXPIRE]['count'] == 2 * policies
+    assert summary[POLICY_CLOSE]['count'] == 2 * policies
+
+    for operation in [BUNDLE_CREATE, BUNDLE_FUND, BUNDLE_DEFUND, BUNDLE_CLOSE, BUNDLE_BURN]:
+        assert summary[operation]['count'] == 1
+
+    gasBaseline(recorder, 'lifecycle_test_product.json')
+
+
+def test_lifecycle_gas_ayii_product(
+    instance: GifInstance,
+    gifAyiiProduct: GifAyiiProduct,
+    instanceOperator: Account,
+    insurer: Account,
+    investor: Account,
+    riskpoolWallet: Account,
+    customer: Account,
+    gasBaseline,
+):
+    policies = 3
+    recorder = benchmark_ayii_lifecycle(
+        instance,
+        instanceOperator,
+        gifAyiiProduct.getContract(),
+        gifAyiiProduct.getOracle().getContract(),
+        gifAyiiProduct.getOracle().getClOperator(),
+        gifAyiiProduct.getRiskpool().getContract(),
+        insurer,
+        investor,
+        riskpoolWallet,
+        customer,
+        gifAyiiProduct.getToken(),
+        policies=policies)
+
+    recorder.print_summary()
+    summary = recorder.summary()
+
+    for operation in [
+        AYII_CREATE_RISK, POLICY_APPLY_FOR_POLICY, POLICY_ADJUST_PREMIUM_SUM_INSURED, POLICY_COLLECT_PREMIUM,
+        AYII_TRIGGER_ORACLE, AYII_ORACLE_CALLBACK, AYII_PROCESS_POLICY,
+    ]:
+        assert summary[operation]['count'] == policies
+
+    gasBaseline(recorder, 'lifecycle_ayii_product.json')
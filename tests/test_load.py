@@ -0,0 +1,70 @@
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+from scripts.load import (
+    setup_load,
+    percentiles,
+    LoadGenerator,
+    OP_APPLICATION,
+    OP_PREMIUM,
+    OP_CLAIM,
+    OP_PAYOUT,
+)
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_load_generator(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    capitalOwner: Account,
+):
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    customers = setup_load(instance, owner, riskpool, riskpoolKeeper, capitalOwner, testCoin, customers=3, bundles=2)
+    assert riskpool.activeBundles() == 2
+
+    policies = 7
+    mix = {OP_PREMIUM: 1.0, OP_CLAIM: 1.0, OP_PAYOUT: 1.0}
+    generator = LoadGenerator(instance, product, productOwner, testCoin, customers, mix=mix, seed=42)
+
+    report = generator.run(policies, inFlight=4)
+    report.print_report()
+    summary = report.summary()
+
+    # 7 transactions per policy: application, underwrite, approve, premium, claim, confirm, payout
+    assert summary['failed'] == 0
+    assert summary['completed'] == policies
+    assert summary['sent'] == summary['mined'] == 7 * policies
+    assert summary['txPerSecond'] > 0
+    assert summary['latencyPerOperation'][OP_APPLICATION]['count'] == policies
+
+    assert product.applications() == policies
+    assert product.claims() == policies
+
+    # every customer paid a premium and received a payout per policy
+    for (idx, customer) in enumerate(customers):
+        customerPolicies = len(range(idx, policies, len(customers)))
+        assert testCoin.balanceOf(customer) == 10000 + customerPolicies * (500 - 100)
+        assert testCoin.allowance(customer, instance.getTreasury()) == 0
+
+
+def test_percentiles():
+    values = [i / 100 for i in range(1, 101)]
+    result = percentiles(values)
+
+    assert result['count'] == 100
+    assert result[50] == 0.51
+    assert result[99] == 1.0
+    assert percentiles([])[50] == 0.0
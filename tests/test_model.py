@@ -0,0 +1,210 @@
+import pytest
+
+from brownie.network.account import Account
+from brownie.test import state_machine
+
+from scripts.differential import (
+    ChainDriver,
+    DifferentialStateMachine,
+)
+from scripts.instance import GifInstance
+from scripts.model import (
+    GifModel,
+    ModelRevert,
+    simulate,
+    calculate_fee,
+    MAX_UINT256,
+    BUNDLE_OWNER,
+    CUSTOMER,
+    RISKPOOL_WALLET,
+    INSTANCE_WALLET,
+    TREASURY,
+    BUNDLE_ACTIVE,
+    BUNDLE_LOCKED,
+    BUNDLE_BURNED,
+    POLICY_ACTIVE,
+    POLICY_CLOSED,
+    CLAIM_CLOSED,
+    CAPITAL_FIXED_FEE,
+    CAPITAL_FRACTIONAL_FEE,
+    PREMIUM_FIXED_FEE,
+    PREMIUM_FRACTIONAL_FEE,
+)
+from scripts.product import GifTestProduct
+
+# number of examples and steps per example of the state machine tests are set
+# in the hypothesis section of brownie-config.yaml
+CUSTOMER_FUNDING = 1000
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_model_fees():
+    assert calculate_fee(CAPITAL_FIXED_FEE, CAPITAL_FRACTIONAL_FEE, 10000) == 42 + 500
+    assert calculate_fee(PREMIUM_FIXED_FEE, PREMIUM_FRACTIONAL_FEE, 100) == 3 + 10
+
+    with pytest.raises(ModelRevert) as e:
+        calculate_fee(CAPITAL_FIXED_FEE, CAPITAL_FRACTIONAL_FEE, 42)
+
+    assert e.value.reason == 'ERROR:TRS-091:FEE_TOO_BIG'
+
+
+def test_model_policy_lifecycle():
+    model = funded_model(bundleAmount=10000)
+    bundle = model.bundles[0]
+    assert bundle.capital == 10000 - 542
+    assert model.balances[INSTANCE_WALLET] == 542
+
+    processId = model.execute('applyForPolicy', 100, 1000)
+    process = model.processes[processId]
+    assert process.policyState == POLICY_ACTIVE
+    assert process.premiumPaidAmount == 100
+    assert bundle.lockedCapital == 1000
+    assert bundle.balance == 10000 - 542 + 100 - 13
+
+    claimId = model.execute('submitClaim', processId, 300)
+    model.execute('confirmClaim', processId, claimId, 300)
+    model.execute('createPayout', processId, claimId, 300)
+    assert process.claims[claimId].state == CLAIM_CLOSED
+    assert model.balances[CUSTOMER] == CUSTOMER_FUNDING - 100 + 300
+    assert bundle.lockedCapital == 700
+
+    model.execute('expire', processId)
+    model.execute('close', processId)
+    assert process.policyState == POLICY_CLOSED
+    assert bundle.lockedCapital == 0
+    assert model.poolLockedCapital == 0
+    model.check_invariants()
+
+
+def test_model_bundle_lifecycle():
+    model = funded_model(bundleAmount=10000, maxActiveBundles=2)
+    model.execute('createBundle', 10000)
+    assert model.activeBundles == [1, 2]
+
+    model.execute('lockBundle', 1)
+    assert model.bundles[0].state == BUNDLE_LOCKED
+    assert model.activeBundles == [2]
+
+    model.execute('unlockBundle', 1)
+    assert model.bundles[0].state == BUNDLE_ACTIVE
+    assert model.activeBundles == [2, 1]
+
+    assert model.try_execute('burnBundle', 2) == (True, 'ERROR:RPS-020:BUNDLE_NOT_CLOSED')
+
+    model.execute('closeBundle', 2)
+    model.execute('burnBundle', 2)
+    assert model.bundles[1].state == BUNDLE_BURNED
+    assert model.bundles[1].balance == 0
+    assert model.activeBundles == [1]
+
+    assert model.try_execute('fundBundle', 2, 1000) == (True, 'ERROR:RPS-010:BUNDLE_CLOSED_OR_BURNED')
+    model.check_invariants()
+
+
+def test_model_revert_leaves_state_unchanged():
+    model = funded_model(bundleAmount=10000)
+    processId = model.execute('applyForPolicy', 100, 1000)
+    state = model.state()
+
+    # bundle with active policy, claim beyond sum insured, premium beyond expected amount
+    assert model.try_execute('closeBundle', 1) == (True, 'ERROR:BUC-015:BUNDLE_WITH_ACTIVE_POLICIES')
+    assert model.try_execute('submitClaim', processId, 1001) == (True, 'ERROR:POC-042:CLAIM_AMOUNT_EXCEEDS_MAX_PAYOUT')
+    assert model.try_execute('collectPremium', processId, 1) == (True, 'ERROR:TRS-030:AMOUNT_TOO_BIG')
+    assert model.try_execute('createBundle', 10000) == (True, 'ERROR:POL-043:MAXIMUM_NUMBER_OF_ACTIVE_BUNDLES_REACHED')
+
+    assert model.state() == state
+    assert model.reverted['closeBundle'] == 1
+
+
+def test_model_fee_accrual():
+    model = funded_model(bundleAmount=10000)
+    model.execute('setFeeAccrual', True)
+    processId = model.execute('applyForPolicy', 100, 1000)
+    poolBalance = model.poolBalance
+
+    # the treasury holds the premium, the net premium is pending for the riskpool wallet
+    assert model.accruedFees == 13
+    assert model.pendingNetPremiums == 87
+    assert model.balances[TREASURY] == 100
+    assert model.balances[RISKPOOL_WALLET] == poolBalance - 87
+    model.check_invariants()
+
+    # payouts forward the pending net premiums first
+    claimId = model.execute('submitClaim', processId, 50)
+    model.execute('confirmClaim', processId, claimId, 50)
+    model.execute('createPayout', processId, claimId, 50)
+    assert model.pendingNetPremiums == 0
+    assert model.balances[TREASURY] == 13
+    assert model.balances[RISKPOOL_WALLET] == poolBalance - 50
+    model.check_invariants()
+
+    assert model.execute('forwardNetPremiums') == 0
+
+    assert model.execute('sweepFees') == 13
+    assert model.accruedFees == 0
+    assert model.balances[TREASURY] == 0
+    assert model.balances[INSTANCE_WALLET] == 542 + 13
+
+
+def test_model_random_sequences():
+    # invariants are checked after every step
+    counts = simulate(sequences=2000, steps=100, seed=42, maxActiveBundles=3)
+
+    executed = counts['executed']
+    assert executed['createBundle'] > 0
+    assert executed['applyForPolicy'] > 0
+    assert executed['createPayout'] > 0
+    assert executed['close'] > 0
+    assert executed['burnBundle'] > 0
+    assert sum(counts['reverted'].values()) > 0
+
+
+# model only, the state machine checks the invariants after every step
+def test_model_state_machine():
+    state_machine(DifferentialStateMachine, None, 3)
+
+
+def test_model_matches_chain(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    owner: Account,
+    feeOwner: Account,
+    riskpoolKeeper: Account,
+    capitalOwner: Account,
+    productOwner: Account,
+    customer: Account,
+):
+    maxActiveBundles = 3
+    driver = ChainDriver(
+        instance,
+        gifTestProduct.getContract(),
+        gifTestProduct.getRiskpool().getContract(),
+        testCoin,
+        owner,
+        riskpoolKeeper,
+        customer,
+        productOwner,
+        capitalOwner,
+        feeOwner,
+        maxActiveBundles)
+
+    # failing operation sequences are shrunk and reported by hypothesis
+    state_machine(DifferentialStateMachine, driver, maxActiveBundles)
+
+
+def funded_model(bundleAmount: int, maxActiveBundles: int = 1) -> GifModel:
+    model = GifModel(maxActiveBundles=maxActiveBundles)
+    model.execute('approve', RISKPOOL_WALLET, MAX_UINT256)
+
+    model.execute('fund', BUNDLE_OWNER, 10 * bundleAmount)
+    model.execute('approve', BUNDLE_OWNER, MAX_UINT256)
+    model.execute('fund', CUSTOMER, CUSTOMER_FUNDING)
+    model.execute('approve', CUSTOMER, MAX_UINT256)
+
+    model.execute('createBundle', bundleAmount)
+    return model
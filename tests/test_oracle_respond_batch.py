@@ -0,0 +1,127 @@
+import brownie
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.setup import fund_riskpool
+
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_respond_batch(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account
+):
+    instanceService = instance.getInstanceService()
+    product = gifTestProduct.getContract()
+    oracle = gifTestProduct.getOracle().getContract()
+
+    policyIds = create_policies(instance, testCoin, gifTestProduct, riskpoolKeeper, owner, customer, capitalOwner, 3)
+
+    requestIds = []
+    claimIds = []
+    for policyId in policyIds:
+        tx = product.submitClaimWithDeferredResponse(policyId, 50, {'from': customer})
+        (claimId, requestId) = tx.return_value
+        claimIds.append(claimId)
+        requestIds.append(requestId)
+
+    # single transaction responding to all requests
+    tx = oracle.respondBatch(requestIds, [True, False, True])
+    assert tx.return_value == [True, True, True]
+
+    assert len(tx.events['LogOracleResponded']) == 3
+    assert len(tx.events['LogTestOracleCallbackReceived']) == 3
+
+    for i in range(len(requestIds)):
+        assert tx.events['LogOracleResponded'][i]['requestId'] == requestIds[i]
+        assert tx.events['LogOracleResponded'][i]['success'] == True
+
+    # loss events lead to fully paid out (closed) claims, no loss to declined claim
+    assert instanceService.getClaim(policyIds[0], claimIds[0]).dict()['state'] == 3
+    assert instanceService.getClaim(policyIds[1], claimIds[1]).dict()['state'] == 2
+    assert instanceService.getClaim(policyIds[2], claimIds[2]).dict()['state'] == 3
+
+    # answered requests are no longer open
+    with brownie.reverts('ERROR:QUC-002:REQUEST_ID_INVALID'):
+        oracle.respond(requestIds[0], True)
+
+
+def test_respond_batch_partial_failures(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account
+):
+    product = gifTestProduct.getContract()
+    oracle = gifTestProduct.getOracle().getContract()
+
+    policyIds = create_policies(instance, testCoin, gifTestProduct, riskpoolKeeper, owner, customer, capitalOwner, 1)
+    policyId = policyIds[0]
+
+    # two claims for the same policy: the test product only keeps track
+    # of the latest claim, declining it a 2nd time makes the callback fail
+    tx = product.submitClaimWithDeferredResponse(policyId, 50, {'from': customer})
+    requestId1 = tx.return_value[1]
+    tx = product.submitClaimWithDeferredResponse(policyId, 50, {'from': customer})
+    requestId2 = tx.return_value[1]
+
+    unknownRequestId = requestId2 + 100
+
+    with brownie.reverts('ERROR:QUC-021:BATCH_SIZE_MISMATCH'):
+        oracle.respondBatch([requestId1, requestId2], [False])
+
+    tx = oracle.respondBatch([requestId1, requestId2, unknownRequestId], [False, False, False])
+    assert tx.return_value == [True, False, False]
+
+    responded = tx.events['LogOracleResponded']
+    assert len(responded) == 2
+    assert responded[0]['requestId'] == requestId1
+    assert responded[0]['success'] == True
+    assert responded[1]['requestId'] == requestId2
+    assert responded[1]['success'] == False
+
+    rejected = tx.events['LogOracleResponseRejected']
+    assert len(rejected) == 1
+    assert rejected[0]['requestId'] == unknownRequestId
+    assert rejected[0]['responder'] == oracle
+
+    # request with failed callback remains open
+    assert instance.getQuery().getProcessId(requestId2) == policyId
+
+    with brownie.reverts('ERROR:QUC-040:REQUEST_ID_INVALID'):
+        instance.getQuery().getProcessId(requestId1)
+
+
+def create_policies(instance, testCoin, gifTestProduct, riskpoolKeeper, owner, customer, capitalOwner, policies):
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    initialFunding = 10000
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, initialFunding)
+
+    premium = 100
+    sumInsured = 1000
+    testCoin.transfer(customer, premium * policies, {'from': owner})
+    testCoin.approve(instance.getTreasury(), premium * policies, {'from': customer})
+
+    policyIds = []
+    for _ in range(policies):
+        tx = product.applyForPolicy(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
+        policyIds.append(tx.return_value)
+
+    return policyIds
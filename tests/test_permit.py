@@ -0,0 +1,98 @@
+import brownie
+import pytest
+
+from brownie.network import accounts
+from brownie.network.account import Account
+
+from scripts.setup import (
+    fund_riskpool_with_permit,
+    apply_for_policy_with_permit,
+)
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+from scripts.util import sign_permit
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+# permits need to be signed off-chain with the private key of the token owner
+@pytest.fixture
+def permitOwner(owner) -> Account:
+    account = accounts.add()
+    owner.transfer(account, 10**18)
+    return account
+
+
+def test_apply_for_policy_with_permit(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    capitalOwner: Account,
+    permitOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    treasury = instance.getTreasury()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    # bundle creation without approve transaction
+    bundleId = fund_riskpool_with_permit(instance, owner, capitalOwner, riskpool, permitOwner, testCoin, 10000)
+
+    bundle = instanceService.getBundle(bundleId).dict()
+    assert instance.getBundleToken().ownerOf(bundle['tokenId']) == permitOwner
+    assert bundle['capital'] > 0
+    assert testCoin.balanceOf(permitOwner) == 0
+    assert testCoin.allowance(permitOwner, treasury) == 0
+
+    # policy application without approve transaction
+    premium = 100
+    sumInsured = 1000
+    policyId = apply_for_policy_with_permit(instance, owner, product, permitOwner, testCoin, premium, sumInsured)
+
+    policy = instanceService.getPolicy(policyId).dict()
+    assert policy['premiumPaidAmount'] == premium
+    assert testCoin.balanceOf(permitOwner) == 0
+    assert testCoin.allowance(permitOwner, treasury) == 0
+    assert testCoin.nonces(permitOwner) == 2
+
+
+def test_permit_front_run_and_invalid(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+    permitOwner: Account,
+):
+    treasury = instance.getTreasury()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    fund_riskpool_with_permit(instance, owner, capitalOwner, riskpool, permitOwner, testCoin, 10000)
+
+    premium = 100
+    sumInsured = 1000
+    testCoin.transfer(permitOwner, 2 * premium, {'from': owner})
+
+    # a permit already submitted by someone else does not block the application
+    (deadline, v, r, s) = sign_permit(testCoin, permitOwner, treasury, premium)
+    testCoin.permit(permitOwner, treasury, premium, deadline, v, r, s, {'from': customer})
+
+    tx = product.applyForPolicyWithPermit(premium, sumInsured, bytes(0), bytes(0), deadline, v, r, s, {'from': permitOwner})
+    assert instance.getInstanceService().getPolicy(tx.return_value).dict()['premiumPaidAmount'] == premium
+
+    # permit signed for a different amount
+    (deadline, v, r, s) = sign_permit(testCoin, permitOwner, treasury, premium - 1)
+
+    with brownie.reverts('ERROR:TRS-081:PERMIT_FAILED'):
+        product.applyForPolicyWithPermit(premium, sumInsured, bytes(0), bytes(0), deadline, v, r, s, {'from': permitOwner})
+
+    with brownie.reverts('ERROR:TRS-080:NOT_PRODUCT_OR_RISKPOOL_SERVICE'):
+        treasury.processPermit(product.getId(), permitOwner, premium, deadline, v, r, s, {'from': permitOwner})
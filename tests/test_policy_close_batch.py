@@ -0,0 +1,190 @@
+import brownie
+import pytest
+
+from brownie.network.account import Account
+from brownie import TestCapacityRiskpool
+
+from scripts.setup import fund_riskpool
+from scripts.instance import GifInstance
+from scripts.product import (
+    GifTestOracle,
+    GifTestProduct,
+    GifTestRiskpool,
+)
+
+# PolicyState {Active, Expired, Closed}
+POLICY_STATE_EXPIRED = 1
+POLICY_STATE_CLOSED = 2
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@pytest.fixture(scope="module")
+def gifCapacityProduct(
+    instance: GifInstance,
+    testCoin,
+    capitalOwner: Account,
+    productOwner: Account,
+    riskpoolKeeper: Account,
+    gifTestOracle: GifTestOracle,
+) -> GifTestProduct:
+    capitalization = 10**18
+    riskpool = GifTestRiskpool(
+        instance, riskpoolKeeper, testCoin, capitalOwner, capitalization,
+        name='CapacityRiskpool',
+        riskpoolContract=TestCapacityRiskpool)
+
+    return GifTestProduct(
+        instance,
+        testCoin,
+        capitalOwner,
+        productOwner,
+        gifTestOracle,
+        riskpool,
+        name='CapacityProduct')
+
+
+def test_close_batch(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    # riskpool without batch release support, bundles released one policy at a time
+    (product, riskpoolId, bundleIds, policyIds) = create_policies(
+        instance, testCoin, gifTestProduct, riskpoolKeeper, productOwner, owner, customer, capitalOwner)
+
+    tx = product.closeBatch(policyIds, {'from': productOwner})
+    assert_released(instance, riskpoolId, bundleIds, policyIds, tx)
+
+
+def test_close_batch_bundle_aggregation(
+    instance: GifInstance,
+    testCoin,
+    gifCapacityProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    (product, riskpoolId, bundleIds, policyIds) = create_policies(
+        instance, testCoin, gifCapacityProduct, riskpoolKeeper, productOwner, owner, customer, capitalOwner)
+
+    tx = product.closeBatch(policyIds, {'from': productOwner})
+    assert_released(instance, riskpoolId, bundleIds, policyIds, tx)
+
+    # capacity index reflects released collateral
+    capacities = [instance.getBundle().getCapacity(bundleId) for bundleId in bundleIds]
+    assert instance.getInstanceService().getActiveBundleIdWithMaxCapacity(riskpoolId)[1] == max(capacities)
+
+
+def test_close_batch_fully_paid_out(
+    instance: GifInstance,
+    testCoin,
+    gifCapacityProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    # batch release of the capacity riskpool
+    (product, riskpoolId, bundleIds, policyIds) = create_policies(
+        instance, testCoin, gifCapacityProduct, riskpoolKeeper, productOwner, owner, customer, capitalOwner, expire=False)
+
+    # payout of the full sum insured leaves no locked capital for the policy
+    processId = policyIds[0]
+    sumInsured = instance.getInstanceService().getApplication(processId).dict()['sumInsuredAmount']
+    tx = product.submitClaimNoOracle(processId, sumInsured, {'from': customer})
+    claimId = tx.return_value
+    product.confirmClaim(processId, claimId, sumInsured, {'from': productOwner})
+    product.createPayout(processId, claimId, sumInsured, {'from': productOwner})
+
+    product.expireBatch(policyIds, {'from': productOwner})
+    tx = product.closeBatch(policyIds, {'from': productOwner})
+    assert_released(instance, riskpoolId, bundleIds, policyIds, tx)
+
+
+def test_close_batch_invalid_state(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    (product, riskpoolId, bundleIds, policyIds) = create_policies(
+        instance, testCoin, gifTestProduct, riskpoolKeeper, productOwner, owner, customer, capitalOwner, expire=False)
+
+    with brownie.reverts('ERROR:POC-032:POLICY_STATE_INVALID'):
+        product.closeBatch(policyIds, {'from': productOwner})
+
+    product.expireBatch(policyIds[:2], {'from': productOwner})
+
+    # one active policy reverts the whole batch
+    with brownie.reverts('ERROR:POC-032:POLICY_STATE_INVALID'):
+        product.closeBatch(policyIds, {'from': productOwner})
+
+    with brownie.reverts('ERROR:POC-029:APPLICATION_STATE_INVALID'):
+        product.expireBatch(policyIds, {'from': productOwner})
+
+
+def create_policies(instance, testCoin, gifTestProduct, riskpoolKeeper, productOwner, owner, customer, capitalOwner, expire=True):
+    instanceService = instance.getInstanceService()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+    riskpoolId = riskpool.getId()
+
+    riskpool.setMaximumNumberOfActiveBundles(2, {'from': riskpoolKeeper})
+    bundleIds = [
+        fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+        for _ in range(2)]
+
+    premium = 100
+    sumInsureds = [1000, 2000, 1500, 500, 2500]
+    testCoin.transfer(customer, premium * len(sumInsureds), {'from': owner})
+    testCoin.approve(instance.getTreasury(), premium * len(sumInsureds), {'from': customer})
+
+    policyIds = []
+    for sumInsured in sumInsureds:
+        tx = product.applyForPolicy(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
+        policyIds.append(tx.return_value)
+
+    pool = instanceService.getRiskpool(riskpoolId).dict()
+    assert pool['lockedCapital'] == sum(sumInsureds)
+    assert pool['sumOfSumInsuredAtRisk'] == sum(sumInsureds)
+
+    if expire:
+        product.expireBatch(policyIds, {'from': productOwner})
+
+        for policyId in policyIds:
+            assert instanceService.getPolicy(policyId).dict()['state'] == POLICY_STATE_EXPIRED
+
+    return (product, riskpoolId, bundleIds, policyIds)
+
+
+def assert_released(instance, riskpoolId, bundleIds, policyIds, tx):
+    instanceService = instance.getInstanceService()
+
+    for policyId in policyIds:
+        assert instanceService.getPolicy(policyId).dict()['state'] == POLICY_STATE_CLOSED
+
+    pool = instanceService.getRiskpool(riskpoolId).dict()
+    assert pool['lockedCapital'] == 0
+    assert pool['sumOfSumInsuredAtRisk'] == 0
+
+    for bundleId in bundleIds:
+        assert instanceService.getBundle(bundleId).dict()['lockedCapital'] == 0
+
+    assert len(tx.events['LogRiskpoolCollateralReleased']) >= len(policyIds)
+    assert len(tx.events['LogBundlePolicyReleased']) == len(policyIds)
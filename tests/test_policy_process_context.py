@@ -0,0 +1,107 @@
+import brownie
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.benchmark import (
+    benchmark_policy_flow,
+    POLICY_NEW_APPLICATION,
+    POLICY_UNDERWRITE,
+    POLICY_COLLECT_PREMIUM,
+    POLICY_EXPIRE,
+    POLICY_CLOSE,
+)
+from scripts.setup import fund_riskpool
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_process_context(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    policyController = instance.getPolicy()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    premium = 100
+    sumInsured = 1000
+    tx = product.newAppliation(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
+    processId = tx.return_value
+
+    context = policyController.getProcessContext(processId)
+    assert context['processId'] == processId
+    assert context['metadata']['owner'] == customer
+    assert context['metadata']['productId'] == product.getId()
+    assert context['riskpoolId'] == riskpool.getId()
+
+    # ApplicationState {Applied, Revoked, Underwritten, Declined}
+    assert context['application']['state'] == 0
+    assert context['application']['premiumAmount'] == premium
+    assert context['application']['sumInsuredAmount'] == sumInsured
+
+    # no policy yet
+    assert context['policy']['createdAt'] == 0
+
+    testCoin.transfer(customer, premium, {'from': owner})
+    testCoin.approve(instance.getTreasury(), premium, {'from': customer})
+    product.underwrite(processId, {'from': productOwner})
+
+    context = policyController.getProcessContext(processId)
+    assert context['application']['state'] == 2
+    assert context['policy']['createdAt'] > 0
+    assert context['policy']['premiumExpectedAmount'] == premium
+    assert context['policy']['premiumPaidAmount'] == premium
+
+    with brownie.reverts('ERROR:POC-100:METADATA_DOES_NOT_EXIST'):
+        policyController.getProcessContext('0x' + '11' * 32)
+
+
+def test_policy_flow_gas(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+    gasBaseline,
+):
+    instanceService = instance.getInstanceService()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    policies = 3
+    premium = 100
+    customerBalance = testCoin.balanceOf(customer)
+    recorder = benchmark_policy_flow(instance, owner, product, productOwner, customer, testCoin, policies=policies, premium=premium)
+    recorder.print_summary()
+
+    summary = recorder.summary()
+    for operation in [POLICY_NEW_APPLICATION, POLICY_UNDERWRITE, POLICY_COLLECT_PREMIUM, POLICY_EXPIRE, POLICY_CLOSE]:
+        assert summary[operation]['count'] == policies
+        assert summary[operation]['min'] > 0
+
+    # all policies closed and premiums collected
+    assert product.policies() == policies
+    assert instanceService.getTotalValueLocked(riskpool.getId()) == 0
+    assert testCoin.balanceOf(customer) == customerBalance
+
+    # per step gas against the committed baseline
+    gasBaseline(recorder, 'policy_flow.json')
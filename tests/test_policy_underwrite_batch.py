@@ -0,0 +1,136 @@
+import brownie
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.setup import fund_riskpool
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_underwrite_batch(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    premium = 100
+    sumInsureds = [1000, 2000, 10**6, 3000]
+    testCoin.transfer(customer, premium * len(sumInsureds), {'from': owner})
+    testCoin.approve(instance.getTreasury(), premium * len(sumInsureds), {'from': customer})
+
+    processIds = []
+    for sumInsured in sumInsureds:
+        tx = product.newAppliation(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
+        processIds.append(tx.return_value)
+
+    # underwrite first application individually, it is no longer in applied state for the batch
+    product.underwrite(processIds[0], {'from': productOwner})
+    assert product.policies() == 1
+
+    tx = product.underwriteBatch(processIds, {'from': productOwner})
+
+    # already underwritten and insufficient capacity do not revert the batch
+    assert tx.return_value == [False, True, False, True]
+    assert product.policies() == 3
+
+    # ApplicationState {Applied, Revoked, Underwritten, Declined}
+    assert instanceService.getApplication(processIds[1]).dict()['state'] == 2
+    assert instanceService.getApplication(processIds[2]).dict()['state'] == 0
+    assert instanceService.getApplication(processIds[3]).dict()['state'] == 2
+
+    # applications collateralized in a single pool call, premiums of the payer in a single transfer
+    assert len(tx.events['LogRiskpoolCollateralizationSucceeded']) == 2
+    assert len(tx.events['LogRiskpoolCollateralizationFailed']) == 1
+    assert len(tx.events['LogTreasuryFeesTransferred']) == 1
+    assert len(tx.events['LogTreasuryPremiumTransferred']) == 1
+    assert len(tx.events['LogTreasuryPremiumProcessed']) == 2
+
+    # premium collected for each new policy
+    for processId in [processIds[1], processIds[3]]:
+        policy = instanceService.getPolicy(processId).dict()
+        assert policy['premiumPaidAmount'] == premium
+
+    assert instanceService.getTotalValueLocked(riskpool.getId()) == sumInsureds[0] + sumInsureds[1] + sumInsureds[3]
+
+
+def test_underwrite_batch_exhausts_capital(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+    riskpoolId = riskpool.getId()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+    capital = instanceService.getCapital(riskpoolId)
+
+    # first application locks all capital of the pool
+    premium = 100
+    sumInsureds = [capital, 1000, 2000]
+    testCoin.transfer(customer, premium * len(sumInsureds), {'from': owner})
+    testCoin.approve(instance.getTreasury(), premium * len(sumInsureds), {'from': customer})
+
+    processIds = []
+    for sumInsured in sumInsureds:
+        tx = product.newAppliation(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
+        processIds.append(tx.return_value)
+
+    # same outcome as underwriting the applications one by one
+    tx = product.underwriteBatch(processIds, {'from': productOwner})
+    assert tx.return_value == [True, False, False]
+    assert product.policies() == 1
+
+    assert instanceService.getTotalValueLocked(riskpoolId) == capital
+    assert instanceService.getCapacity(riskpoolId) == 0
+    assert instanceService.getRiskpool(riskpoolId).dict()['sumOfSumInsuredAtRisk'] == capital
+
+    assert len(tx.events['LogRiskpoolCollateralizationSucceeded']) == 1
+    assert len(tx.events['LogRiskpoolCollateralizationFailed']) == 2
+
+
+def test_underwrite_batch_unknown_process_id(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    tx = product.newAppliation(100, 1000, bytes(0), bytes(0), {'from': customer})
+    processId = tx.return_value
+
+    assert product.underwriteBatch([], {'from': productOwner}).return_value == []
+
+    # unknown process ids revert the whole batch
+    with brownie.reverts('ERROR:POC-100:METADATA_DOES_NOT_EXIST'):
+        product.underwriteBatch([processId, '0x' + '11' * 32], {'from': productOwner})
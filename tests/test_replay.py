@@ -0,0 +1,115 @@
+import pytest
+
+from brownie import chain
+from brownie.network.account import Account
+from brownie.network.rpc import Rpc
+
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+from scripts.replay import (
+    TraceRecorder,
+    replay,
+    load_trace,
+    worker_file_name,
+    ENTRY_TX,
+    ENTRY_REVERT,
+)
+from scripts.setup import (
+    fund_riskpool,
+    apply_for_policy,
+)
+from scripts.snapshot import private_method
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_replay_same_build(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+    tmp_path,
+):
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+    snapshotId = Rpc().snapshot()
+
+    with TraceRecorder() as recorder:
+        fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+        processId = apply_for_policy(instance, owner, product, customer, testCoin, 100, 1000)
+        product.submitClaimNoOracle(processId, 500, {'from': customer})
+
+    fileName = str(tmp_path / 'scenario.trace.gz')
+    recorder.save(fileName)
+
+    (header, entries) = load_trace(fileName)
+    assert len(entries) == recorder.transactions()
+    assert all(entry['type'] == ENTRY_TX for entry in entries)
+
+    calls = [entry['fn'] for entry in entries]
+    assert 'createBundle' in calls
+    assert 'applyForPolicy' in calls
+    assert 'submitClaimNoOracle' in calls
+
+    # replay against the chain state the recording started from
+    chain._revert(snapshotId)
+    report = replay(fileName)
+
+    assert report.changes() == []
+    summary = report.summary()
+    assert summary['calls'] == len(entries)
+    assert summary['gasDiff'] == 0
+    assert product.claims() == 1
+
+
+def test_replay_chain_reverts(
+    instance: GifInstance,
+    testCoin,
+    owner: Account,
+    customer: Account,
+    tmp_path,
+):
+    snapshotId = Rpc().snapshot()
+    balance = testCoin.balanceOf(customer)
+    recorder = TraceRecorder().start()
+
+    testCoin.transfer(customer, 100, {'from': owner})
+    transferSnapshotId = Rpc().snapshot()
+    testCoin.transfer(customer, 200, {'from': owner})
+    chain._revert(transferSnapshotId)
+    testCoin.transfer(customer, 300, {'from': owner})
+
+    recorder.stop()
+    assert testCoin.balanceOf(customer) == balance + 400
+    assert [entry['type'] for entry in recorder.entries] == [ENTRY_TX, ENTRY_TX, ENTRY_REVERT, ENTRY_TX]
+
+    fileName = str(tmp_path / 'reverts.trace.gz')
+    recorder.save(fileName)
+
+    # the reverted transfer is replayed and undone again
+    chain._revert(snapshotId)
+    report = replay(fileName)
+
+    assert report.changes() == []
+    assert len(report.calls) == 3
+    assert testCoin.balanceOf(customer) == balance + 400
+
+
+def test_recorder_hooks(monkeypatch):
+    assert private_method(chain, '_revert') == chain._revert
+
+    # unsupported brownie releases fail before the recorder patches anything
+    monkeypatch.delattr(type(chain), '_revert')
+    with pytest.raises(RuntimeError, match='Chain._revert not found'):
+        TraceRecorder().start()
+
+
+def test_worker_file_name():
+    assert worker_file_name('build/treasury.trace.gz', 'gw0') == 'build/treasury.gw0.trace.gz'
+    assert worker_file_name('trace', 'gw12') == 'trace.gw12'
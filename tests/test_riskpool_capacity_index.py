@@ -0,0 +1,227 @@
+import brownie
+import pytest
+
+from brownie.network.account import Account
+from brownie import TestCapacityRiskpool
+
+from scripts.benchmark import (
+    GasRecorder,
+    benchmark_bundle_selection,
+    benchmark_bundle_search,
+)
+from scripts.setup import fund_riskpool
+from scripts.instance import GifInstance
+from scripts.product import (
+    GifTestOracle,
+    GifTestProduct,
+    GifTestRiskpool,
+)
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@pytest.fixture(scope="module")
+def gifCapacityProduct(
+    instance: GifInstance,
+    testCoin,
+    capitalOwner: Account,
+    productOwner: Account,
+    riskpoolKeeper: Account,
+    gifTestOracle: GifTestOracle,
+) -> GifTestProduct:
+    capitalization = 10**18
+    riskpool = GifTestRiskpool(
+        instance, riskpoolKeeper, testCoin, capitalOwner, capitalization,
+        name='CapacityRiskpool',
+        riskpoolContract=TestCapacityRiskpool)
+
+    return GifTestProduct(
+        instance,
+        testCoin,
+        capitalOwner,
+        productOwner,
+        gifTestOracle,
+        riskpool,
+        name='CapacityProduct')
+
+
+def test_capacity_index_maintenance(
+    instance: GifInstance,
+    testCoin,
+    gifCapacityProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    pool = instance.getPool()
+    product = gifCapacityProduct.getContract()
+    riskpool = gifCapacityProduct.getRiskpool().getContract()
+    riskpoolId = riskpool.getId()
+
+    assert instanceService.getActiveBundleIdWithMaxCapacity(riskpoolId) == (0, 0)
+
+    riskpool.setMaximumNumberOfActiveBundles(3, {'from': riskpoolKeeper})
+    bundleIds = [
+        fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, amount)
+        for amount in [5000, 20000, 10000]]
+
+    capacities = [pool.getActiveBundleCapacity(riskpoolId, bundleId) for bundleId in bundleIds]
+    assert capacities == [instance.getBundle().getCapacity(bundleId) for bundleId in bundleIds]
+    assert instanceService.getActiveBundleIdWithMaxCapacity(riskpoolId) == (bundleIds[1], capacities[1])
+
+    # policy goes to bundle with largest capacity, capacity index follows collateralization
+    sumInsured = 12000
+    testCoin.transfer(customer, 100, {'from': owner})
+    testCoin.approve(instance.getTreasury(), 100, {'from': customer})
+    tx = product.applyForPolicy(100, sumInsured, bytes(0), bytes(0), {'from': customer})
+
+    selected = tx.events['LogCapacityRiskpoolBundleSelected'][0]
+    assert selected['bundleId'] == bundleIds[1]
+    assert selected['fromIndex'] == True
+
+    assert pool.getActiveBundleCapacity(riskpoolId, bundleIds[1]) == capacities[1] - sumInsured
+    assert instanceService.getActiveBundleIdWithMaxCapacity(riskpoolId) == (bundleIds[2], capacities[2])
+
+    # funding moves a bundle up
+    riskpool.fundBundle(bundleIds[0], 10000, {'from': riskpoolKeeper})
+    assert instanceService.getActiveBundleIdWithMaxCapacity(riskpoolId)[0] == bundleIds[0]
+
+    # locked bundles leave the index
+    riskpool.lockBundle(bundleIds[0], {'from': riskpoolKeeper})
+    assert instanceService.getActiveBundleIdWithMaxCapacity(riskpoolId) == (bundleIds[2], capacities[2])
+    assert pool.getActiveBundleCapacity(riskpoolId, bundleIds[0]) == 0
+
+    riskpool.unlockBundle(bundleIds[0], {'from': riskpoolKeeper})
+    assert instanceService.getActiveBundleIdWithMaxCapacity(riskpoolId)[0] == bundleIds[0]
+
+    # no bundle with sufficient capacity
+    testCoin.transfer(customer, 100, {'from': owner})
+    testCoin.approve(instance.getTreasury(), 100, {'from': customer})
+    tx = product.applyForPolicy(100, 10**6, bytes(0), bytes(0), {'from': customer})
+    assert len(tx.events['LogCapacityRiskpoolNoBundleFound']) == 1
+
+
+def test_capacity_index_filter_fallback(
+    instance: GifInstance,
+    testCoin,
+    gifCapacityProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    product = gifCapacityProduct.getContract()
+    riskpool = gifCapacityProduct.getRiskpool().getContract()
+    riskpoolId = riskpool.getId()
+
+    riskpool.setMaximumNumberOfActiveBundles(2, {'from': riskpoolKeeper})
+    smallBundleId = fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 5000)
+
+    # largest bundle only accepts sum insured amounts up to 500
+    maxSumInsured = 500
+    tx = riskpool.createBundle(maxSumInsured.to_bytes(32, 'big'), 50000, {'from': riskpoolKeeper})
+    largeBundleId = tx.return_value
+    assert instanceService.getActiveBundleIdWithMaxCapacity(riskpoolId)[0] == largeBundleId
+
+    testCoin.transfer(customer, 200, {'from': owner})
+    testCoin.approve(instance.getTreasury(), 200, {'from': customer})
+
+    tx = product.applyForPolicy(100, 400, bytes(0), bytes(0), {'from': customer})
+    selected = tx.events['LogCapacityRiskpoolBundleSelected'][0]
+    assert selected['bundleId'] == largeBundleId
+    assert selected['fromIndex'] == True
+
+    # linear scan finds the smaller matching bundle
+    tx = product.applyForPolicy(100, 1000, bytes(0), bytes(0), {'from': customer})
+    selected = tx.events['LogCapacityRiskpoolBundleSelected'][0]
+    assert selected['bundleId'] == smallBundleId
+    assert selected['fromIndex'] == False
+
+
+@pytest.mark.parametrize('bundles', [1, 10])
+def test_capacity_index_underwriting_gas(
+    instance: GifInstance,
+    testCoin,
+    gifCapacityProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+    bundles,
+):
+    # runs for 100 and 1000 bundles are available via scripts/benchmark.py
+    product = gifCapacityProduct.getContract()
+    riskpool = gifCapacityProduct.getRiskpool().getContract()
+
+    recorder = benchmark_bundle_selection(
+        instance, owner, product, riskpool, riskpoolKeeper, capitalOwner, customer, testCoin,
+        bundles, policies=3)
+
+    recorder.print_summary()
+    assert riskpool.activeBundles() == bundles
+    assert recorder.summary()['underwrite[bundles={}]'.format(bundles)]['count'] == 3
+
+
+def test_capacity_index_opt_in(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    gifCapacityProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    capitalOwner: Account,
+):
+    pool = instance.getPool()
+    basicRiskpool = gifTestProduct.getRiskpool().getContract()
+    capacityRiskpool = gifCapacityProduct.getRiskpool().getContract()
+
+    assert pool.isCapacityIndexEnabled(capacityRiskpool.getId()) == True
+    assert pool.isCapacityIndexEnabled(basicRiskpool.getId()) == False
+
+    # bundles of riskpools without capacity index stay out of the index
+    bundleId = fund_riskpool(instance, owner, capitalOwner, basicRiskpool, riskpoolKeeper, testCoin, 10000)
+    assert basicRiskpool.activeBundles() == 1
+    assert pool.getActiveBundleIdWithMaxCapacity(basicRiskpool.getId()) == (0, 0)
+    assert pool.getActiveBundleCapacity(basicRiskpool.getId(), bundleId) == 0
+
+    with brownie.reverts('ERROR:CCR-007:COMPONENT_UNKNOWN'):
+        instance.getRiskpoolService().enableCapacityIndex({'from': riskpoolKeeper})
+
+
+def test_capacity_index_scaling_against_basic_riskpool(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    gifCapacityProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    # only one active bundle can collateralize the policies. the basic riskpool of the
+    # test product walks the active bundles to find it, the capacity riskpool reads it
+    # from the index
+    gas = {}
+    for (kind, gifProduct) in [('basic', gifTestProduct), ('capacity', gifCapacityProduct)]:
+        product = gifProduct.getContract()
+        riskpool = gifProduct.getRiskpool().getContract()
+        recorder = GasRecorder()
+
+        for bundles in [1, 10]:
+            benchmark_bundle_search(
+                instance, owner, product, riskpool, riskpoolKeeper, capitalOwner, customer, testCoin,
+                bundles, policies=3, recorder=recorder)
+
+        recorder.print_summary()
+        summary = recorder.summary()
+        gas[kind] = {bundles: summary['underwrite[search,bundles={}]'.format(bundles)]['avg'] for bundles in [1, 10]}
+
+    print(gas)
+    assert gas['capacity'][10] - gas['capacity'][1] < gas['basic'][10] - gas['basic'][1]
+    assert gas['capacity'][10] < gas['basic'][10]
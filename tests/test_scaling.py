@@ -0,0 +1,86 @@
+import csv
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+from scripts.scaling import (
+    ScalingRecorder,
+    scale_bundles,
+    scale_components,
+    scale_registry,
+    CSV_COLUMNS,
+    DIMENSION_BUNDLES,
+    DIMENSION_COMPONENTS,
+    DIMENSION_REGISTRY,
+)
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_scale_bundles(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+    tmp_path,
+):
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    sizes = [1, 3]
+    recorder = scale_bundles(instance, owner, product, riskpool, riskpoolKeeper, capitalOwner, customer, testCoin, sizes)
+
+    assert riskpool.activeBundles() == max(sizes)
+    assert product.policies() == len(sizes)
+
+    series = recorder.series(DIMENSION_BUNDLES, 'applyForPolicy')
+    assert [size for (size, _) in series] == sizes
+    assert all(gasUsed > 0 for (_, gasUsed) in series)
+
+    path = tmp_path / 'scaling.csv'
+    recorder.save_csv(str(path))
+
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+
+    assert list(rows[0].keys()) == CSV_COLUMNS
+    assert len(rows) == 3 * len(sizes)
+
+
+def test_scale_registry_and_components(
+    instance: GifInstance,
+    owner: Account,
+    oracleProvider: Account,
+):
+    registry = instance.getRegistry()
+    names = registry.contracts()
+
+    recorder = ScalingRecorder()
+    scale_registry(instance, owner, [names + 1, names + 2], recorder)
+    scale_components(instance, oracleProvider, [1, 2], recorder)
+
+    assert registry.contracts() == names + 2
+    assert [size for (size, _) in recorder.series(DIMENSION_REGISTRY, 'prepareRelease')] == [names + 1, names + 2]
+    assert [size for (size, _) in recorder.series(DIMENSION_COMPONENTS, 'approve')] == [1, 2]
+    assert instance.getInstanceService().oracles() == 3
+
+
+def test_scaling_plot(tmp_path):
+    pytest.importorskip('matplotlib')
+
+    recorder = ScalingRecorder()
+    recorder.rows = [
+        {'dimension': DIMENSION_BUNDLES, 'size': size, 'operation': 'applyForPolicy', 'gasUsed': 1000 * size, 'seconds': 0.1}
+        for size in [1, 10, 100]]
+
+    path = tmp_path / 'scaling.png'
+    recorder.plot(str(path))
+    assert path.stat().st_size > 0
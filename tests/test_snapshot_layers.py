@@ -0,0 +1,65 @@
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.setup import apply_for_policy
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+from scripts.snapshot import (
+    ChainLayers,
+    GENESIS,
+)
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_funded_bundle(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    fundedBundleId: int,
+    owner: Account,
+    customer: Account,
+):
+    instanceService = instance.getInstanceService()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    bundle = instanceService.getBundle(fundedBundleId).dict()
+    assert bundle['riskpoolId'] == riskpool.getId()
+    assert bundle['capital'] > 0
+    assert bundle['lockedCapital'] == 0
+    assert product.policies() == 0
+
+    apply_for_policy(instance, owner, product, customer, testCoin, 100, 1000)
+    assert product.policies() == 1
+
+
+def test_funded_bundle_state_reverted(
+    instance: GifInstance,
+    gifTestProduct: GifTestProduct,
+    fundedBundleId: int,
+):
+    # policy of the previous test is reverted by function isolation
+    bundle = instance.getInstanceService().getBundle(fundedBundleId).dict()
+    assert bundle['lockedCapital'] == 0
+    assert gifTestProduct.getContract().policies() == 0
+
+
+def test_layer_definitions():
+    layers = ChainLayers()
+    layers.add('instance', lambda: {})
+    layers.add('product', lambda: {}, parent='instance')
+    layers.add('bundle', lambda: {}, parent='product')
+    layers.add('ayii', lambda: {}, parent='instance')
+
+    assert layers.path('bundle') == ['instance', 'product', 'bundle']
+    assert layers.depth('ayii') == 2
+    assert layers.common(['bundle', 'product']) == 'product'
+    assert layers.common(['bundle', 'ayii']) == 'instance'
+    assert layers.common([]) == GENESIS
+    assert layers.active() == []
+    assert layers.value('instance', 42) == 42
@@ -0,0 +1,22 @@
+import pytest
+
+from scripts.startup import (
+    SCENARIOS,
+    measure,
+)
+
+# scripts import in a fresh interpreter without loaded brownie project or network
+@pytest.mark.parametrize('scenario', [name for name in SCENARIOS.keys() if name != 'brownie'])
+def test_import_without_network(scenario):
+    (module, call) = SCENARIOS[scenario]
+    result = measure(module, call)
+
+    assert not result['connected']
+
+
+def test_lazy_container_resolves_on_use(testCoin):
+    from scripts.containers import TestCoin, LazyContainer
+
+    assert isinstance(TestCoin, LazyContainer)
+    assert TestCoin.at(testCoin.address).address == testCoin.address
+    assert len(TestCoin) > 0
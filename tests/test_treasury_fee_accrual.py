@@ -0,0 +1,258 @@
+import brownie
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.setup import fund_riskpool
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_fee_accrual(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    instanceOperatorService = instance.getInstanceOperatorService()
+    treasury = instance.getTreasury()
+
+    product = gifTestProduct.getContract()
+    productId = product.getId()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+    riskpoolId = riskpool.getId()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    premium = 100
+    sumInsured = 1000
+    feeAmount = treasury.calculateFee(productId, premium)[0]
+
+    # policies are underwritten without allowance, premiums are collected by the product
+    policies = 3
+    policyIds = [
+        underwrite_policy(product, productOwner, customer, premium, sumInsured) 
+        for _ in range(policies + 1)]
+
+    # tokens in excess of the premiums keep the customer balance from dropping to zero
+    testCoin.transfer(customer, 2 * (policies + 1) * premium, {'from': owner})
+    testCoin.approve(treasury, 2 * (policies + 1) * premium, {'from': customer})
+
+    # fee transferred to instance wallet for each premium
+    tx = product.collectPremium(policyIds[0], {'from': productOwner})
+    assert 'LogTreasuryFeesTransferred' in tx.events
+    gasWithFeeTransfer = tx.gas_used
+
+    assert not instanceService.isFeeAccrualEnabled()
+    instanceOperatorService.setFeeAccrual(True, {'from': owner})
+    assert instanceService.isFeeAccrualEnabled()
+
+    instanceWallet = instanceService.getInstanceWallet()
+    riskpoolWallet = instanceService.getRiskpoolWallet(riskpoolId)
+    instanceBalance = testCoin.balanceOf(instanceWallet)
+    riskpoolWalletBalance = testCoin.balanceOf(riskpoolWallet)
+    treasuryBalance = testCoin.balanceOf(treasury)
+    poolBalance = instanceService.getRiskpool(riskpoolId).dict()['balance']
+
+    # with fee accrual the treasury collects the premium with a single transfer
+    for policyId in policyIds[1:]:
+        tx = product.collectPremium(policyId, {'from': productOwner})
+        assert 'LogTreasuryFeesTransferred' not in tx.events
+        assert tx.events['LogTreasuryFeesAccrued'][0]['amount'] == feeAmount
+        assert tx.events['LogTreasuryFeesAccrued'][0]['token'] == testCoin
+        assert tx.events['LogTreasuryFeesAccrued'][0]['productId'] == productId
+        assert len(tx.events['LogTreasuryPremiumTransferred']) == 1
+        assert tx.events['LogTreasuryPremiumTransferred'][0]['amount'] == premium
+
+    # once the accrual slot of the riskpool is in use a premium is cheaper than with the fee transfer
+    assert tx.gas_used < gasWithFeeTransfer
+
+    assert testCoin.balanceOf(instanceWallet) == instanceBalance
+    assert testCoin.balanceOf(riskpoolWallet) == riskpoolWalletBalance
+    assert testCoin.balanceOf(treasury) == treasuryBalance + policies * premium
+
+    # riskpool book keeping only covers net premiums, including the ones not yet forwarded
+    assert instanceService.getRiskpool(riskpoolId).dict()['balance'] == poolBalance + policies * (premium - feeAmount)
+
+    assert instanceService.getAccruedFees(testCoin) == policies * feeAmount
+    assert instanceService.getPendingNetPremiums(riskpoolId) == policies * (premium - feeAmount)
+
+    # forward the net premiums to the riskpool wallet with a single transfer
+    tx = instanceOperatorService.forwardNetPremiums(riskpoolId, {'from': owner})
+    assert tx.return_value == policies * (premium - feeAmount)
+    assert tx.events['LogTreasuryNetPremiumsForwarded'][0]['amount'] == policies * (premium - feeAmount)
+
+    assert testCoin.balanceOf(riskpoolWallet) == riskpoolWalletBalance + policies * (premium - feeAmount)
+    assert testCoin.balanceOf(treasury) == treasuryBalance + policies * feeAmount
+    assert instanceService.getPendingNetPremiums(riskpoolId) == 0
+
+    # nothing left to forward
+    tx = instanceOperatorService.forwardNetPremiums(riskpoolId, {'from': owner})
+    assert tx.return_value == 0
+    assert 'LogTreasuryNetPremiumsForwarded' not in tx.events
+
+    # sweep accrued fees from the treasury to instance wallet, no riskpool wallet allowance involved
+    tx = instanceOperatorService.sweepFees(testCoin, {'from': owner})
+    assert tx.return_value == policies * feeAmount
+    assert tx.events['LogTreasuryFeesSwept'][0]['amount'] == policies * feeAmount
+
+    assert testCoin.balanceOf(instanceWallet) == instanceBalance + policies * feeAmount
+    assert testCoin.balanceOf(riskpoolWallet) == riskpoolWalletBalance + policies * (premium - feeAmount)
+    assert testCoin.balanceOf(treasury) == treasuryBalance
+
+    assert instanceService.getAccruedFees(testCoin) == 0
+
+    # nothing left to sweep
+    tx = instanceOperatorService.sweepFees(testCoin, {'from': owner})
+    assert tx.return_value == 0
+    assert 'LogTreasuryFeesSwept' not in tx.events
+
+    # disabling fee accrual restores fee transfers
+    instanceOperatorService.setFeeAccrual(False, {'from': owner})
+    tx = apply_for_policy(instance, owner, product, customer, testCoin, premium, sumInsured)
+    assert 'LogTreasuryFeesTransferred' in tx.events
+    assert instanceService.getPendingNetPremiums(riskpoolId) == 0
+
+
+def test_fee_accrual_payout_forwards(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    treasury = instance.getTreasury()
+
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+    riskpoolId = riskpool.getId()
+    riskpoolWallet = instanceService.getRiskpoolWallet(riskpoolId)
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+    instance.getInstanceOperatorService().setFeeAccrual(True, {'from': owner})
+
+    premium = 100
+    sumInsured = 1000
+    netPremium = premium - treasury.calculateFee(product.getId(), premium)[0]
+
+    tx = apply_for_policy(instance, owner, product, customer, testCoin, premium, sumInsured)
+    processId = tx.return_value
+    assert instanceService.getPendingNetPremiums(riskpoolId) == netPremium
+
+    riskpoolWalletBalance = testCoin.balanceOf(riskpoolWallet)
+    payoutAmount = 300
+
+    # net premiums held by the treasury are forwarded before the payout leaves the riskpool wallet
+    tx = product.submitClaimNoOracle(processId, payoutAmount, {'from': customer})
+    claimId = tx.return_value
+    product.confirmClaim(processId, claimId, payoutAmount, {'from': productOwner})
+    tx = product.createPayout(processId, claimId, payoutAmount, {'from': productOwner})
+
+    assert tx.events['LogTreasuryNetPremiumsForwarded'][0]['amount'] == netPremium
+    assert instanceService.getPendingNetPremiums(riskpoolId) == 0
+    assert testCoin.balanceOf(riskpoolWallet) == riskpoolWalletBalance + netPremium - payoutAmount
+    assert testCoin.balanceOf(riskpoolWallet) == instanceService.getRiskpool(riskpoolId).dict()['balance']
+
+
+def test_fee_accrual_premium_batch(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    customer2: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    treasury = instance.getTreasury()
+
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+    riskpoolWallet = instanceService.getRiskpoolWallet(riskpool.getId())
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    # policies are underwritten without allowance, premiums remain unpaid
+    premium = 100
+    customers = [customer, customer2, customer]
+    policyIds = []
+    for payer in customers:
+        testCoin.transfer(payer, premium, {'from': owner})
+        tx = product.newAppliation(premium, 1000, bytes(0), bytes(0), {'from': payer})
+        product.underwrite(tx.return_value, {'from': productOwner})
+        policyIds.append(tx.return_value)
+
+    for payer in set(customers):
+        testCoin.approve(treasury, premium * customers.count(payer), {'from': payer})
+
+    instance.getInstanceOperatorService().setFeeAccrual(True, {'from': owner})
+    feeAmount = treasury.calculateFee(product.getId(), premium)[0]
+    riskpoolWalletBalance = testCoin.balanceOf(riskpoolWallet)
+
+    tx = product.collectPremiumBatch(policyIds, [premium] * len(policyIds), {'from': productOwner})
+    assert tx.return_value == [True] * len(policyIds)
+
+    # one premium transfer per payer to the treasury, net premiums are held for the riskpool
+    transfers = tx.events['LogTreasuryPremiumTransferred']
+    assert len(transfers) == 2
+    assert sum(transfer['amount'] for transfer in transfers) == len(policyIds) * premium
+
+    assert testCoin.balanceOf(riskpoolWallet) == riskpoolWalletBalance
+    assert instanceService.getAccruedFees(testCoin) == len(policyIds) * feeAmount
+    assert instanceService.getPendingNetPremiums(riskpool.getId()) == len(policyIds) * (premium - feeAmount)
+
+def test_fee_accrual_authorization(
+    instance: GifInstance,
+    testCoin,
+    owner: Account,
+    riskpoolKeeper: Account,
+):
+    instanceOperatorService = instance.getInstanceOperatorService()
+    treasury = instance.getTreasury()
+
+    with brownie.reverts('ERROR:IOS-001:NOT_INSTANCE_OPERATOR'):
+        instanceOperatorService.setFeeAccrual(True, {'from': riskpoolKeeper})
+
+    with brownie.reverts('ERROR:IOS-001:NOT_INSTANCE_OPERATOR'):
+        instanceOperatorService.sweepFees(testCoin, {'from': riskpoolKeeper})
+
+    with brownie.reverts('ERROR:IOS-001:NOT_INSTANCE_OPERATOR'):
+        instanceOperatorService.forwardNetPremiums(1, {'from': riskpoolKeeper})
+
+    with brownie.reverts('ERROR:CRC-001:NOT_INSTANCE_OPERATOR'):
+        treasury.setFeeAccrual(True, {'from': owner})
+
+    with brownie.reverts('ERROR:CRC-001:NOT_INSTANCE_OPERATOR'):
+        treasury.sweepFees(testCoin, {'from': owner})
+
+    with brownie.reverts('ERROR:CRC-001:NOT_INSTANCE_OPERATOR'):
+        treasury.forwardNetPremiums(1, {'from': owner})
+
+
+def underwrite_policy(product, productOwner, customer, premium, sumInsured):
+    tx = product.newAppliation(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
+    product.underwrite(tx.return_value, {'from': productOwner})
+    return tx.return_value
+
+
+def apply_for_policy(instance, owner, product, customer, testCoin, premium, sumInsured):
+    testCoin.transfer(customer, premium, {'from': owner})
+    testCoin.approve(instance.getTreasury(), premium, {'from': customer})
+
+    return product.applyForPolicy(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
@@ -97,6 +97,14 @@ def test_guard_processPremium(
     with brownie.reverts("ERROR:CRC-003:NOT_PRODUCT_SERVICE"):
         instance.getTreasury().processPremium(processId, premium, {'from': theOutsider})
 
+    # same for the variant taking the process context
+    context = policyController.getProcessContext(processId)
+    with brownie.reverts("ERROR:CRC-003:NOT_PRODUCT_SERVICE"):
+        instance.getTreasury().processPremium(processId, premium, context, {'from': customer})
+
+    with brownie.reverts("ERROR:CRC-003:NOT_PRODUCT_SERVICE"):
+        instance.getTreasury().processPremium(processId, premium, context, {'from': theOutsider})
+
 
 def test_guard_processPayout(
     instance: GifInstance,
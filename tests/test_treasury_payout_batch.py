@@ -0,0 +1,157 @@
+import brownie
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.benchmark import (
+    benchmark_payouts,
+    POLICY_PROCESS_PAYOUT,
+    POLICY_PROCESS_PAYOUT_BATCH,
+    PER_ITEM,
+    TOKEN_CALLS,
+)
+from scripts.setup import fund_riskpool
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+
+# PayoutState {Expected, PaidOut}
+PAYOUT_STATE_PAIDOUT = 1
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_process_payout_batch(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    customer2: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+    riskpoolId = riskpool.getId()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    premium = 100
+    sumInsured = 1000
+    payout = 500
+    customers = [customer, customer2, customer]
+    (policyIds, payoutIds) = create_payouts(instance, testCoin, product, productOwner, owner, customers, premium, sumInsured, payout)
+
+    customerBalance = testCoin.balanceOf(customer)
+    customer2Balance = testCoin.balanceOf(customer2)
+    poolBefore = instanceService.getRiskpool(riskpoolId).dict()
+
+    tx = product.processPayoutBatch(policyIds, payoutIds, {'from': productOwner})
+
+    # one transfer per policy holder, accounting events per payout
+    assert len(tx.events['LogTreasuryPayoutTransferred']) == 2
+    assert len(tx.events['LogTreasuryPayoutProcessed']) == len(policyIds)
+    assert len(tx.events['LogPayoutProcessed']) == len(policyIds)
+
+    assert testCoin.balanceOf(customer) == customerBalance + 2 * payout
+    assert testCoin.balanceOf(customer2) == customer2Balance + payout
+
+    poolAfter = instanceService.getRiskpool(riskpoolId).dict()
+    assert poolAfter['balance'] == poolBefore['balance'] - len(policyIds) * payout
+    assert poolAfter['lockedCapital'] == poolBefore['lockedCapital'] - len(policyIds) * payout
+
+    for (policyId, payoutId) in zip(policyIds, payoutIds):
+        assert instanceService.getPayout(policyId, payoutId).dict()['state'] == PAYOUT_STATE_PAIDOUT
+
+    with brownie.reverts('ERROR:POC-093:PAYOUT_ALREADY_PAIDOUT'):
+        product.processPayoutBatch(policyIds[:1], payoutIds[:1], {'from': productOwner})
+
+    with brownie.reverts('ERROR:TRS-045:BATCH_LENGTH_MISMATCH'):
+        product.processPayoutBatch(policyIds, payoutIds[:1], {'from': productOwner})
+
+
+def test_process_payout_batch_allowance(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    payout = 500
+    (policyIds, payoutIds) = create_payouts(instance, testCoin, product, productOwner, owner, [customer, customer], 100, 1000, payout)
+
+    # allowance covers each payout individually but not the total
+    testCoin.approve(instance.getTreasury(), payout, {'from': capitalOwner})
+
+    with brownie.reverts('ERROR:TRS-048:PAYOUT_ALLOWANCE_TOO_SMALL'):
+        product.processPayoutBatch(policyIds, payoutIds, {'from': productOwner})
+
+
+def test_payout_batch_gas(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    customer2: Account,
+    capitalOwner: Account,
+):
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 100000)
+
+    policies = 6
+    customers = [customer, customer2]
+    recorder = benchmark_payouts(instance, owner, product, productOwner, customers, testCoin, policies=policies, batch=False)
+    benchmark_payouts(instance, owner, product, productOwner, customers, testCoin, policies=policies, batch=True, recorder=recorder)
+    recorder.print_summary()
+
+    summary = recorder.summary()
+    assert summary[POLICY_PROCESS_PAYOUT]['count'] == policies
+    assert summary[POLICY_PROCESS_PAYOUT_BATCH]['count'] == 1
+
+    # treasury checks balance and allowance per payout against once per batch,
+    # the transfer helper checks balance and allowance again before each transferFrom
+    assert summary[POLICY_PROCESS_PAYOUT + TOKEN_CALLS]['avg'] == (2 + 3) * policies
+    assert summary[POLICY_PROCESS_PAYOUT_BATCH + TOKEN_CALLS]['avg'] == 2 + 3 * len(customers)
+
+    assert summary[POLICY_PROCESS_PAYOUT_BATCH + PER_ITEM]['avg'] < summary[POLICY_PROCESS_PAYOUT + PER_ITEM]['avg']
+
+
+def create_payouts(instance, testCoin, product, productOwner, owner, customers, premium, sumInsured, payout):
+    policyIds = []
+    payoutIds = []
+
+    for customer in customers:
+        testCoin.transfer(customer, premium, {'from': owner})
+        testCoin.approve(instance.getTreasury(), premium, {'from': customer})
+
+        tx = product.applyForPolicy(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
+        policyId = tx.return_value
+
+        tx = product.submitClaimNoOracle(policyId, payout, {'from': customer})
+        claimId = tx.return_value
+
+        product.confirmClaim(policyId, claimId, payout, {'from': productOwner})
+        tx = product.newPayout(policyId, claimId, payout, {'from': productOwner})
+
+        policyIds.append(policyId)
+        payoutIds.append(tx.return_value)
+
+    return (policyIds, payoutIds)
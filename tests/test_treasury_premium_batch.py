@@ -0,0 +1,167 @@
+import brownie
+import pytest
+
+from brownie.network.account import Account
+
+from scripts.setup import fund_riskpool
+from scripts.instance import GifInstance
+from scripts.product import GifTestProduct
+
+# enforce function isolation for tests below
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+def test_collect_premium_batch(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    customer2: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    treasury = instance.getTreasury()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+    riskpoolId = riskpool.getId()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    premium = 100
+    sumInsured = 1000
+    customers = [customer, customer, customer2, customer]
+    policyIds = create_unpaid_policies(instance, testCoin, product, productOwner, owner, customers, premium, sumInsured)
+
+    # single approval per payer covers all policies of the payer
+    for payer in set(customers):
+        testCoin.approve(treasury, premium * customers.count(payer), {'from': payer})
+
+    instanceWallet = instanceService.getInstanceWallet()
+    riskpoolWallet = instanceService.getRiskpoolWallet(riskpoolId)
+    instanceBalance = testCoin.balanceOf(instanceWallet)
+    riskpoolBalance = testCoin.balanceOf(riskpoolWallet)
+    poolBalance = instanceService.getRiskpool(riskpoolId).dict()['balance']
+
+    tx = product.collectPremiumBatch(policyIds, [premium] * len(policyIds), {'from': productOwner})
+    assert tx.return_value == [True] * len(policyIds)
+
+    # one fee and one net premium transfer per payer, accounting events per policy
+    assert len(tx.events['LogTreasuryFeesTransferred']) == 2
+    assert len(tx.events['LogTreasuryPremiumTransferred']) == 2
+    assert len(tx.events['LogTreasuryPremiumProcessed']) == len(policyIds)
+
+    feeAmount = treasury.calculateFee(product.getId(), premium)[0]
+    totalFees = feeAmount * len(policyIds)
+    totalNetPremium = (premium - feeAmount) * len(policyIds)
+
+    assert testCoin.balanceOf(instanceWallet) == instanceBalance + totalFees
+    assert testCoin.balanceOf(riskpoolWallet) == riskpoolBalance + totalNetPremium
+    assert instanceService.getRiskpool(riskpoolId).dict()['balance'] == poolBalance + totalNetPremium
+
+    for policyId in policyIds:
+        assert instanceService.getPolicy(policyId).dict()['premiumPaidAmount'] == premium
+
+    with brownie.reverts('ERROR:TRS-036:AMOUNT_TOO_BIG'):
+        product.collectPremiumBatch(policyIds[:1], [premium], {'from': productOwner})
+
+
+def test_collect_premium_batch_insufficient_allowance(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    customer2: Account,
+    capitalOwner: Account,
+):
+    instanceService = instance.getInstanceService()
+    treasury = instance.getTreasury()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    premium = 100
+    sumInsured = 1000
+    customers = [customer, customer2, customer]
+    policyIds = create_unpaid_policies(instance, testCoin, product, productOwner, owner, customers, premium, sumInsured)
+
+    # allowance of customer only covers a single premium
+    testCoin.approve(treasury, premium, {'from': customer})
+    testCoin.approve(treasury, premium, {'from': customer2})
+    customerBalance = testCoin.balanceOf(customer)
+
+    tx = product.collectPremiumBatch(policyIds, [premium] * len(policyIds), {'from': productOwner})
+    assert tx.return_value == [False, True, False]
+
+    assert len(tx.events['LogTreasuryFeesTransferred']) == 1
+    assert len(tx.events['LogTreasuryPremiumProcessed']) == 1
+    assert testCoin.balanceOf(customer) == customerBalance
+
+    assert instanceService.getPolicy(policyIds[0]).dict()['premiumPaidAmount'] == 0
+    assert instanceService.getPolicy(policyIds[1]).dict()['premiumPaidAmount'] == premium
+
+    with brownie.reverts('ERROR:TRS-033:BATCH_LENGTH_MISMATCH'):
+        product.collectPremiumBatch(policyIds, [premium], {'from': productOwner})
+
+    with brownie.reverts('ERROR:CRC-003:NOT_PRODUCT_SERVICE'):
+        treasury.processPremiumBatch(policyIds, [premium] * len(policyIds), {'from': productOwner})
+
+
+
+def test_collect_premium_batch_closed_policy(
+    instance: GifInstance,
+    testCoin,
+    gifTestProduct: GifTestProduct,
+    riskpoolKeeper: Account,
+    productOwner: Account,
+    owner: Account,
+    customer: Account,
+    capitalOwner: Account,
+):
+    treasury = instance.getTreasury()
+    product = gifTestProduct.getContract()
+    riskpool = gifTestProduct.getRiskpool().getContract()
+
+    fund_riskpool(instance, owner, capitalOwner, riskpool, riskpoolKeeper, testCoin, 10000)
+
+    premium = 100
+    sumInsured = 1000
+    policyIds = create_unpaid_policies(instance, testCoin, product, productOwner, owner, [customer, customer], premium, sumInsured)
+
+    product.expire(policyIds[1], {'from': productOwner})
+    product.close(policyIds[1], {'from': productOwner})
+
+    testCoin.approve(treasury, 2 * premium, {'from': customer})
+    customerBalance = testCoin.balanceOf(customer)
+
+    # a closed policy in the batch reverts before any premium is transferred
+    with brownie.reverts('ERROR:PFD-003:POLICY_CLOSED'):
+        product.collectPremiumBatch(policyIds, [premium] * len(policyIds), {'from': productOwner})
+
+    assert testCoin.balanceOf(customer) == customerBalance
+
+    tx = product.collectPremiumBatch(policyIds[:1], [premium], {'from': productOwner})
+    assert tx.return_value == [True]
+
+def create_unpaid_policies(instance, testCoin, product, productOwner, owner, customers, premium, sumInsured):
+    policyIds = []
+
+    # policies are underwritten without allowance, premiums remain unpaid
+    for customer in customers:
+        testCoin.transfer(customer, premium, {'from': owner})
+        tx = product.newAppliation(premium, sumInsured, bytes(0), bytes(0), {'from': customer})
+        policyId = tx.return_value
+
+        product.underwrite(policyId, {'from': productOwner})
+        assert instance.getInstanceService().getPolicy(policyId).dict()['premiumPaidAmount'] == 0
+        policyIds.append(policyId)
+
+    return policyIds
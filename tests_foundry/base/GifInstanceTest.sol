@@ -0,0 +1,206 @@
+pragma solidity 0.8.2;
+
+import "forge-std/Test.sol";
+
+import "../../contracts/flows/PolicyDefaultFlow.sol";
+import "../../contracts/modules/AccessController.sol";
+import "../../contracts/modules/BundleController.sol";
+import "../../contracts/modules/ComponentController.sol";
+import "../../contracts/modules/LicenseController.sol";
+import "../../contracts/modules/PolicyController.sol";
+import "../../contracts/modules/PoolController.sol";
+import "../../contracts/modules/QueryModule.sol";
+import "../../contracts/modules/RegistryController.sol";
+import "../../contracts/modules/TreasuryModule.sol";
+import "../../contracts/services/ComponentOwnerService.sol";
+import "../../contracts/services/InstanceOperatorService.sol";
+import "../../contracts/services/InstanceService.sol";
+import "../../contracts/services/OracleService.sol";
+import "../../contracts/services/ProductService.sol";
+import "../../contracts/services/RiskpoolService.sol";
+import "../../contracts/shared/CoreProxy.sol";
+import "../../contracts/test/TestCoin.sol";
+import "../../contracts/test/TestOracle.sol";
+import "../../contracts/test/TestProduct.sol";
+import "../../contracts/test/TestRiskpool.sol";
+import "../../contracts/tokens/BundleToken.sol";
+import "../../contracts/tokens/RiskpoolToken.sol";
+
+// full gif instance deployed in solidity, mirrors GifInstance.deployWithRegistry
+// and the test components of scripts/product.py
+abstract contract GifInstanceTest is Test {
+
+    bytes32 public constant GIF_RELEASE = "2.0.0";
+    uint256 public constant FULL_COLLATERALIZATION_LEVEL = 10**18;
+    uint256 public constant MAX_ACTIVE_BUNDLES = 10;
+
+    address internal instanceOperator = address(0x1000);
+    address internal instanceWallet = address(0x1001);
+    address internal oracleProvider = address(0x1002);
+    address internal riskpoolKeeper = address(0x1004);
+    address internal riskpoolWallet = address(0x1005);
+    address internal productOwner = address(0x1007);
+    address internal customer = address(0x1009);
+
+    RegistryController internal registry;
+    BundleToken internal bundleToken;
+    RiskpoolToken internal riskpoolToken;
+
+    AccessController internal access;
+    ComponentController internal component;
+    QueryModule internal query;
+    LicenseController internal license;
+    PolicyController internal policy;
+    BundleController internal bundle;
+    PoolController internal pool;
+    TreasuryModule internal treasury;
+
+    PolicyDefaultFlow internal policyFlow;
+    InstanceService internal instanceService;
+    ComponentOwnerService internal componentOwnerService;
+    OracleService internal oracleService;
+    RiskpoolService internal riskpoolService;
+    ProductService internal productService;
+    InstanceOperatorService internal instanceOperatorService;
+
+    TestCoin internal token;
+    TestOracle internal oracle;
+    TestRiskpool internal riskpool;
+    TestProduct internal product;
+
+    function _deployInstance() internal {
+        vm.startPrank(instanceOperator);
+
+        RegistryController registryController = new RegistryController();
+        CoreProxy registryProxy = new CoreProxy(
+            address(registryController),
+            abi.encodeWithSignature("initializeRegistry(bytes32)", GIF_RELEASE));
+
+        registry = RegistryController(address(registryProxy));
+        registry.register("Registry", address(registryProxy));
+        registry.register("RegistryController", address(registryController));
+
+        // gif instance tokens
+        bundleToken = new BundleToken();
+        registry.register("BundleToken", address(bundleToken));
+        riskpoolToken = new RiskpoolToken();
+        registry.register("RiskpoolToken", address(riskpoolToken));
+
+        // modules, deploy order needs to respect module dependencies
+        access = AccessController(_deployModule("Access", "AccessController", address(new AccessController())));
+        component = ComponentController(_deployModule("Component", "ComponentController", address(new ComponentController())));
+        query = QueryModule(_deployModule("Query", "QueryController", address(new QueryModule())));
+        license = LicenseController(_deployModule("License", "LicenseController", address(new LicenseController())));
+        policy = PolicyController(_deployModule("Policy", "PolicyController", address(new PolicyController())));
+        bundle = BundleController(_deployModule("Bundle", "BundleController", address(new BundleController())));
+        pool = PoolController(_deployModule("Pool", "PoolController", address(new PoolController())));
+        treasury = TreasuryModule(_deployModule("Treasury", "TreasuryController", address(new TreasuryModule())));
+
+        policyFlow = new PolicyDefaultFlow(address(registry));
+        registry.register(policyFlow.NAME(), address(policyFlow));
+
+        // services
+        instanceService = InstanceService(_deployModule("InstanceService", "InstanceServiceController", address(new InstanceService())));
+        componentOwnerService = ComponentOwnerService(_deployModule("ComponentOwnerService", "ComponentOwnerServiceController", address(new ComponentOwnerService())));
+        oracleService = OracleService(_deployModule("OracleService", "OracleServiceController", address(new OracleService())));
+        riskpoolService = RiskpoolService(_deployModule("RiskpoolService", "RiskpoolServiceController", address(new RiskpoolService())));
+
+        productService = new ProductService(address(registry));
+        registry.register(productService.NAME(), address(productService));
+
+        // needs to be the last module to register, replaces the instance operator address in the registry
+        instanceOperatorService = InstanceOperatorService(_deployModule("InstanceOperatorService", "InstanceOperatorServiceControlle", address(new InstanceOperatorService())));
+        instanceOperatorService.setInstanceWallet(instanceWallet);
+
+        token = new TestCoin();
+        vm.stopPrank();
+
+        assertEq(registry.contracts(), 32);
+    }
+
+    function _deployTestComponents() internal {
+        // oracle
+        _grantRole(instanceService.getOracleProviderRole(), oracleProvider);
+        vm.prank(oracleProvider);
+        oracle = new TestOracle("Test.Oracle", address(registry));
+        _proposeAndApprove(oracleProvider, IComponent(address(oracle)));
+
+        // riskpool with capital fees of 42 + 5%
+        _grantRole(instanceService.getRiskpoolKeeperRole(), riskpoolKeeper);
+        vm.prank(riskpoolKeeper);
+        riskpool = new TestRiskpool("Test.Riskpool", FULL_COLLATERALIZATION_LEVEL, address(token), riskpoolWallet, address(registry));
+        _proposeAndApprove(riskpoolKeeper, IComponent(address(riskpool)));
+
+        vm.startPrank(instanceOperator);
+        instanceOperatorService.setRiskpoolWallet(riskpool.getId(), riskpoolWallet);
+        instanceOperatorService.setCapitalFees(
+            instanceOperatorService.createFeeSpecification(riskpool.getId(), 42, instanceService.getFeeFractionFullUnit() / 20, ""));
+        vm.stopPrank();
+
+        vm.prank(riskpoolKeeper);
+        riskpool.setMaximumNumberOfActiveBundles(MAX_ACTIVE_BUNDLES);
+
+        // product with premium fees of 3 + 10%
+        _grantRole(instanceService.getProductOwnerRole(), productOwner);
+        vm.prank(productOwner);
+        product = new TestProduct("Test.Product", address(token), riskpoolWallet, oracle.getId(), riskpool.getId(), address(registry));
+        _proposeAndApprove(productOwner, IComponent(address(product)));
+
+        vm.startPrank(instanceOperator);
+        instanceOperatorService.setProductToken(product.getId(), address(token));
+        instanceOperatorService.setPremiumFees(
+            instanceOperatorService.createFeeSpecification(product.getId(), 3, instanceService.getFeeFractionFullUnit() / 10, ""));
+        vm.stopPrank();
+
+        // the riskpool wallet pays out claims and returns capital
+        vm.prank(riskpoolWallet);
+        token.approve(address(treasury), type(uint256).max);
+    }
+
+    function _fund(address account, uint256 amount) internal {
+        vm.prank(instanceOperator);
+        token.transfer(account, amount);
+    }
+
+    function _createBundle(uint256 amount) internal returns(uint256 bundleId) {
+        _fund(riskpoolKeeper, amount);
+
+        vm.startPrank(riskpoolKeeper);
+        token.approve(address(treasury), amount);
+        bundleId = riskpool.createBundle("", amount);
+        vm.stopPrank();
+    }
+
+    function _applyForPolicy(uint256 premium, uint256 sumInsured) internal returns(bytes32 processId) {
+        _fund(customer, premium);
+
+        vm.startPrank(customer);
+        token.approve(address(treasury), premium);
+        processId = product.applyForPolicy(premium, sumInsured, "", "");
+        vm.stopPrank();
+    }
+
+    function _deployModule(bytes32 moduleName, bytes32 controllerName, address controller) private returns(address) {
+        CoreProxy proxy = new CoreProxy(
+            controller,
+            abi.encodeWithSignature("initialize(address)", address(registry)));
+
+        registry.register(controllerName, controller);
+        registry.register(moduleName, address(proxy));
+
+        return address(proxy);
+    }
+
+    function _grantRole(bytes32 role, address principal) private {
+        vm.prank(instanceOperator);
+        instanceOperatorService.grantRole(role, principal);
+    }
+
+    function _proposeAndApprove(address owner, IComponent newComponent) private {
+        vm.prank(owner);
+        componentOwnerService.propose(newComponent);
+
+        vm.prank(instanceOperator);
+        instanceOperatorService.approve(newComponent.getId());
+    }
+}
@@ -0,0 +1,116 @@
+pragma solidity 0.8.2;
+
+import "../base/GifInstanceTest.sol";
+
+// gas per policy and bundle lifecycle operation, mirrors tests/test_gas_regression.py
+// setUp prepares the state for every operation so that each test only runs the measured call
+//
+// $ forge snapshot --match-contract LifecycleGasTest
+// $ forge snapshot --match-contract LifecycleGasTest --check
+contract LifecycleGasTest is GifInstanceTest {
+
+    uint256 public constant BUNDLE_AMOUNT = 100000;
+    uint256 public constant PREMIUM = 100;
+    uint256 public constant SUM_INSURED = 1000;
+    uint256 public constant CLAIM_AMOUNT = 500;
+
+    uint256 internal bundleId;
+    uint256 internal emptyBundleId;
+
+    bytes32 internal activePolicyId;
+    bytes32 internal claimedPolicyId;
+    bytes32 internal confirmedPolicyId;
+    bytes32 internal expiredPolicyId;
+
+    uint256 internal claimId;
+    uint256 internal confirmedClaimId;
+
+    function setUp() public {
+        _deployInstance();
+        _deployTestComponents();
+
+        bundleId = _createBundle(BUNDLE_AMOUNT);
+
+        activePolicyId = _applyForPolicy(PREMIUM, SUM_INSURED);
+        claimedPolicyId = _applyForPolicy(PREMIUM, SUM_INSURED);
+        confirmedPolicyId = _applyForPolicy(PREMIUM, SUM_INSURED);
+        expiredPolicyId = _applyForPolicy(PREMIUM, SUM_INSURED);
+
+        vm.startPrank(customer);
+        claimId = product.submitClaimNoOracle(claimedPolicyId, CLAIM_AMOUNT);
+        confirmedClaimId = product.submitClaimNoOracle(confirmedPolicyId, CLAIM_AMOUNT);
+        vm.stopPrank();
+
+        vm.startPrank(productOwner);
+        product.confirmClaim(confirmedPolicyId, confirmedClaimId, CLAIM_AMOUNT);
+        product.expire(expiredPolicyId);
+        vm.stopPrank();
+
+        // bundle without policies for close, created after the policies to keep them in the first bundle
+        emptyBundleId = _createBundle(BUNDLE_AMOUNT);
+
+        // allowances for the measured calls
+        _fund(riskpoolKeeper, 2 * BUNDLE_AMOUNT);
+        vm.prank(riskpoolKeeper);
+        token.approve(address(treasury), 2 * BUNDLE_AMOUNT);
+
+        _fund(customer, PREMIUM);
+        vm.prank(customer);
+        token.approve(address(treasury), PREMIUM);
+    }
+
+    function testGasCreateBundle() public {
+        vm.prank(riskpoolKeeper);
+        riskpool.createBundle("", BUNDLE_AMOUNT);
+    }
+
+    function testGasFundBundle() public {
+        vm.prank(riskpoolKeeper);
+        riskpool.fundBundle(bundleId, BUNDLE_AMOUNT);
+    }
+
+    function testGasDefundBundle() public {
+        vm.prank(riskpoolKeeper);
+        riskpool.defundBundle(bundleId, BUNDLE_AMOUNT / 10);
+    }
+
+    function testGasLockBundle() public {
+        vm.prank(riskpoolKeeper);
+        riskpool.lockBundle(bundleId);
+    }
+
+    function testGasCloseBundle() public {
+        vm.prank(riskpoolKeeper);
+        riskpool.closeBundle(emptyBundleId);
+    }
+
+    function testGasApplyForPolicy() public {
+        vm.prank(customer);
+        product.applyForPolicy(PREMIUM, SUM_INSURED, "", "");
+    }
+
+    function testGasSubmitClaim() public {
+        vm.prank(customer);
+        product.submitClaimNoOracle(activePolicyId, CLAIM_AMOUNT);
+    }
+
+    function testGasConfirmClaim() public {
+        vm.prank(productOwner);
+        product.confirmClaim(claimedPolicyId, claimId, CLAIM_AMOUNT);
+    }
+
+    function testGasCreatePayout() public {
+        vm.prank(productOwner);
+        product.createPayout(confirmedPolicyId, confirmedClaimId, CLAIM_AMOUNT);
+    }
+
+    function testGasExpirePolicy() public {
+        vm.prank(productOwner);
+        product.expire(activePolicyId);
+    }
+
+    function testGasClosePolicy() public {
+        vm.prank(productOwner);
+        product.close(expiredPolicyId);
+    }
+}
@@ -0,0 +1,200 @@
+pragma solidity 0.8.2;
+
+import "forge-std/Test.sol";
+
+import "../../contracts/services/InstanceService.sol";
+import "../../contracts/test/TestCoin.sol";
+import "../../contracts/test/TestProduct.sol";
+import "../../contracts/test/TestRiskpool.sol";
+
+import "@etherisc/gif-interface/contracts/modules/IBundle.sol";
+import "@etherisc/gif-interface/contracts/modules/IPolicy.sol";
+
+// bounded bundle and policy operations for invariant runs
+// every operation picks its bundle or policy from the ids created so far
+contract RiskpoolHandler is Test {
+
+    uint256 public constant MAX_BUNDLE_AMOUNT = 10**9;
+    uint256 public constant MIN_BUNDLE_AMOUNT = 1000;
+    uint256 public constant MAX_SUM_INSURED = 10**7;
+    uint256 public constant MIN_PREMIUM = 100;
+
+    InstanceService private _instanceService;
+    TestCoin private _token;
+    TestProduct private _product;
+    TestRiskpool private _riskpool;
+
+    address private _treasury;
+    address private _tokenOwner;
+    address private _riskpoolKeeper;
+    address private _productOwner;
+    address private _customer;
+
+    uint256 [] private _bundleIds;
+    bytes32 [] private _policyIds;
+
+    mapping(string => uint256) public calls;
+
+    constructor(
+        InstanceService instanceService,
+        TestCoin token,
+        TestProduct product,
+        TestRiskpool riskpool,
+        address treasury,
+        address tokenOwner,
+        address riskpoolKeeper,
+        address productOwner,
+        address customer
+    ) {
+        _instanceService = instanceService;
+        _token = token;
+        _product = product;
+        _riskpool = riskpool;
+        _treasury = treasury;
+        _tokenOwner = tokenOwner;
+        _riskpoolKeeper = riskpoolKeeper;
+        _productOwner = productOwner;
+        _customer = customer;
+    }
+
+    function createBundle(uint256 amount) external {
+        if (_instanceService.activeBundles(_riskpool.getId()) >= _riskpool.getMaximumNumberOfActiveBundles()) { return; }
+
+        amount = bound(amount, MIN_BUNDLE_AMOUNT, MAX_BUNDLE_AMOUNT);
+        _fundAndApprove(_riskpoolKeeper, amount);
+
+        vm.prank(_riskpoolKeeper);
+        _bundleIds.push(_riskpool.createBundle("", amount));
+        calls["createBundle"]++;
+    }
+
+    function fundBundle(uint256 bundleSeed, uint256 amount) external {
+        if (_bundleIds.length == 0) { return; }
+
+        uint256 bundleId = _bundleIds[bundleSeed % _bundleIds.length];
+        IBundle.BundleState state = _instanceService.getBundle(bundleId).state;
+        if (state == IBundle.BundleState.Closed || state == IBundle.BundleState.Burned) { return; }
+
+        amount = bound(amount, MIN_BUNDLE_AMOUNT, MAX_BUNDLE_AMOUNT);
+        _fundAndApprove(_riskpoolKeeper, amount);
+
+        vm.prank(_riskpoolKeeper);
+        _riskpool.fundBundle(bundleId, amount);
+        calls["fundBundle"]++;
+    }
+
+    function defundBundle(uint256 bundleSeed, uint256 amount) external {
+        if (_bundleIds.length == 0) { return; }
+
+        uint256 bundleId = _bundleIds[bundleSeed % _bundleIds.length];
+        IBundle.Bundle memory bundle = _instanceService.getBundle(bundleId);
+        if (bundle.state == IBundle.BundleState.Burned) { return; }
+
+        // same withdrawal limit as BundleController.defund
+        uint256 maxAmount = bundle.lockedCapital == 0 ? bundle.balance : bundle.capital - bundle.lockedCapital;
+        if (maxAmount == 0) { return; }
+
+        amount = bound(amount, 1, maxAmount);
+
+        vm.prank(_riskpoolKeeper);
+        _riskpool.defundBundle(bundleId, amount);
+        calls["defundBundle"]++;
+    }
+
+    function closeBundle(uint256 bundleSeed) external {
+        if (_bundleIds.length == 0) { return; }
+
+        uint256 bundleId = _bundleIds[bundleSeed % _bundleIds.length];
+        IBundle.BundleState state = _instanceService.getBundle(bundleId).state;
+        if (state == IBundle.BundleState.Closed || state == IBundle.BundleState.Burned) { return; }
+
+        // bundles with active policies cannot be closed
+        vm.prank(_riskpoolKeeper);
+        try _riskpool.closeBundle(bundleId) {
+            calls["closeBundle"]++;
+        } catch {
+        }
+    }
+
+    function burnBundle(uint256 bundleSeed) external {
+        if (_bundleIds.length == 0) { return; }
+
+        uint256 bundleId = _bundleIds[bundleSeed % _bundleIds.length];
+        if (_instanceService.getBundle(bundleId).state != IBundle.BundleState.Closed) { return; }
+
+        vm.prank(_riskpoolKeeper);
+        _riskpool.burnBundle(bundleId);
+        calls["burnBundle"]++;
+    }
+
+    function applyForPolicy(uint256 premium, uint256 sumInsured) external {
+        sumInsured = bound(sumInsured, MIN_PREMIUM, MAX_SUM_INSURED);
+        premium = bound(premium, MIN_PREMIUM, sumInsured);
+        _fundAndApprove(_customer, premium);
+
+        // applications without sufficient bundle capacity are not underwritten
+        uint256 policies = _product.policies();
+        vm.prank(_customer);
+        bytes32 processId = _product.applyForPolicy(premium, sumInsured, "", "");
+
+        if (_product.policies() > policies) {
+            _policyIds.push(processId);
+            calls["applyForPolicy"]++;
+        }
+    }
+
+    function payout(uint256 policySeed, uint256 amount) external {
+        if (_policyIds.length == 0) { return; }
+
+        bytes32 processId = _policyIds[policySeed % _policyIds.length];
+        IPolicy.Policy memory policy = _instanceService.getPolicy(processId);
+        if (policy.state != IPolicy.PolicyState.Active || policy.openClaimsCount > 0) { return; }
+        if (policy.payoutAmount >= policy.payoutMaxAmount) { return; }
+
+        amount = bound(amount, 1, policy.payoutMaxAmount - policy.payoutAmount);
+
+        vm.prank(_customer);
+        uint256 claimId = _product.submitClaimNoOracle(processId, amount);
+
+        vm.startPrank(_productOwner);
+        _product.confirmClaim(processId, claimId, amount);
+        _product.createPayout(processId, claimId, amount);
+        vm.stopPrank();
+
+        calls["payout"]++;
+    }
+
+    function expireAndClose(uint256 policySeed) external {
+        if (_policyIds.length == 0) { return; }
+
+        bytes32 processId = _policyIds[policySeed % _policyIds.length];
+        IPolicy.Policy memory policy = _instanceService.getPolicy(processId);
+        if (policy.state == IPolicy.PolicyState.Closed || policy.openClaimsCount > 0) { return; }
+
+        vm.startPrank(_productOwner);
+        if (policy.state == IPolicy.PolicyState.Active) {
+            _product.expire(processId);
+        }
+
+        _product.close(processId);
+        vm.stopPrank();
+
+        calls["expireAndClose"]++;
+    }
+
+    function bundleIds() external view returns(uint256 [] memory) {
+        return _bundleIds;
+    }
+
+    function policyIds() external view returns(bytes32 [] memory) {
+        return _policyIds;
+    }
+
+    function _fundAndApprove(address account, uint256 amount) internal {
+        vm.prank(_tokenOwner);
+        _token.transfer(account, amount);
+
+        vm.prank(account);
+        _token.approve(_treasury, amount);
+    }
+}
@@ -0,0 +1,185 @@
+pragma solidity 0.8.2;
+
+import "../base/GifInstanceTest.sol";
+import "../handlers/RiskpoolHandler.sol";
+
+// foundry counterpart of tests/test_bundle_create_use_burn.py and tests/test_riskpool_capacity_index.py
+// fuzzes bundle funding and policy collateralization against the fee and capital accounting
+contract BundlePoolAccountingTest is GifInstanceTest {
+
+    uint256 public constant CAPITAL_FIXED_FEE = 42;
+    uint256 public constant CAPITAL_FRACTION_DIVISOR = 20;
+
+    function setUp() public {
+        _deployInstance();
+        _deployTestComponents();
+    }
+
+    function testFuzzCreateBundle(uint256 amount) public {
+        amount = bound(amount, 1000, 10**18);
+        uint256 bundleId = _createBundle(amount);
+
+        uint256 netAmount = amount - _capitalFee(amount);
+        IBundle.Bundle memory bundle = instanceService.getBundle(bundleId);
+        assertEq(bundle.capital, netAmount);
+        assertEq(bundle.balance, netAmount);
+        assertEq(bundle.lockedCapital, 0);
+
+        IPool.Pool memory pool = instanceService.getRiskpool(riskpool.getId());
+        assertEq(pool.capital, netAmount);
+        assertEq(pool.balance, netAmount);
+
+        assertEq(token.balanceOf(riskpoolWallet), netAmount);
+        assertEq(token.balanceOf(instanceWallet), amount - netAmount);
+    }
+
+    function testFuzzFundDefundBundle(uint256 amount, uint256 fundingAmount, uint256 withdrawalAmount) public {
+        amount = bound(amount, 1000, 10**18);
+        fundingAmount = bound(fundingAmount, 1000, 10**18);
+        uint256 bundleId = _createBundle(amount);
+
+        _fund(riskpoolKeeper, fundingAmount);
+        vm.startPrank(riskpoolKeeper);
+        token.approve(address(treasury), fundingAmount);
+        riskpool.fundBundle(bundleId, fundingAmount);
+        vm.stopPrank();
+
+        uint256 capital = amount - _capitalFee(amount) + fundingAmount - _capitalFee(fundingAmount);
+        assertEq(instanceService.getBundle(bundleId).capital, capital);
+
+        // withdrawals are free of fees
+        withdrawalAmount = bound(withdrawalAmount, 1, capital);
+        vm.prank(riskpoolKeeper);
+        riskpool.defundBundle(bundleId, withdrawalAmount);
+
+        IBundle.Bundle memory bundle = instanceService.getBundle(bundleId);
+        assertEq(bundle.capital, capital - withdrawalAmount);
+        assertEq(bundle.balance, capital - withdrawalAmount);
+        assertEq(instanceService.getRiskpool(riskpool.getId()).capital, capital - withdrawalAmount);
+        assertEq(token.balanceOf(riskpoolKeeper), withdrawalAmount);
+    }
+
+    function testFuzzLockAndReleaseCollateral(uint256 amount, uint256 sumInsured, uint256 premium) public {
+        amount = bound(amount, 1000, 10**12);
+        sumInsured = bound(sumInsured, 100, 10**12);
+        premium = bound(premium, 100, sumInsured);
+
+        uint256 bundleId = _createBundle(amount);
+        uint256 capital = instanceService.getBundle(bundleId).capital;
+
+        bytes32 processId = _applyForPolicy(premium, sumInsured);
+
+        // full collateralization, underwriting only succeeds with sufficient capacity
+        IBundle.Bundle memory bundle = instanceService.getBundle(bundleId);
+        if (sumInsured > capital) {
+            assertEq(product.policies(), 0);
+            assertEq(bundle.lockedCapital, 0);
+            return;
+        }
+
+        assertEq(product.policies(), 1);
+        assertEq(bundle.lockedCapital, sumInsured);
+        assertEq(instanceService.getRiskpool(riskpool.getId()).lockedCapital, sumInsured);
+
+        vm.startPrank(productOwner);
+        product.expire(processId);
+        product.close(processId);
+        vm.stopPrank();
+
+        bundle = instanceService.getBundle(bundleId);
+        assertEq(bundle.lockedCapital, 0);
+        assertEq(bundle.capital, capital);
+        assertEq(instanceService.getRiskpool(riskpool.getId()).lockedCapital, 0);
+    }
+
+    function testFuzzPayout(uint256 sumInsured, uint256 payoutAmount) public {
+        sumInsured = bound(sumInsured, 100, 10**9);
+        payoutAmount = bound(payoutAmount, 1, sumInsured);
+
+        uint256 bundleId = _createBundle(2 * sumInsured + 1000);
+        bytes32 processId = _applyForPolicy(100, sumInsured);
+        IBundle.Bundle memory before = instanceService.getBundle(bundleId);
+
+        vm.prank(customer);
+        uint256 claimId = product.submitClaimNoOracle(processId, payoutAmount);
+
+        vm.startPrank(productOwner);
+        product.confirmClaim(processId, claimId, payoutAmount);
+        product.createPayout(processId, claimId, payoutAmount);
+        product.expire(processId);
+        product.close(processId);
+        vm.stopPrank();
+
+        IBundle.Bundle memory bundle = instanceService.getBundle(bundleId);
+        assertEq(bundle.capital, before.capital - payoutAmount);
+        assertEq(bundle.balance, before.balance - payoutAmount);
+        assertEq(bundle.lockedCapital, 0);
+        assertEq(token.balanceOf(customer), payoutAmount);
+    }
+
+    function _capitalFee(uint256 amount) internal view returns(uint256) {
+        return CAPITAL_FIXED_FEE + amount / CAPITAL_FRACTION_DIVISOR;
+    }
+}
+
+
+// bundle and riskpool accounting after random sequences of handler operations
+contract BundlePoolInvariantTest is GifInstanceTest {
+
+    RiskpoolHandler internal handler;
+
+    function setUp() public {
+        _deployInstance();
+        _deployTestComponents();
+
+        handler = new RiskpoolHandler(
+            instanceService,
+            token,
+            product,
+            riskpool,
+            address(treasury),
+            instanceOperator,
+            riskpoolKeeper,
+            productOwner,
+            customer);
+
+        targetContract(address(handler));
+    }
+
+    function invariantBundleCapitalCoversLockedCapital() public {
+        uint256 bundles = instanceService.bundles();
+
+        for (uint256 bundleId = 1; bundleId <= bundles; bundleId++) {
+            IBundle.Bundle memory bundle = instanceService.getBundle(bundleId);
+            assertGe(bundle.capital, bundle.lockedCapital);
+            assertGe(bundle.balance, bundle.lockedCapital);
+        }
+    }
+
+    function invariantPoolMatchesSumOfBundles() public {
+        uint256 bundles = instanceService.bundles();
+        uint256 capital;
+        uint256 lockedCapital;
+        uint256 balance;
+
+        for (uint256 bundleId = 1; bundleId <= bundles; bundleId++) {
+            IBundle.Bundle memory bundle = instanceService.getBundle(bundleId);
+            capital += bundle.capital;
+            lockedCapital += bundle.lockedCapital;
+            balance += bundle.balance;
+        }
+
+        IPool.Pool memory pool = instanceService.getRiskpool(riskpool.getId());
+        assertEq(pool.lockedCapital, lockedCapital);
+        assertEq(pool.balance, balance);
+
+        // a bundle defunded beyond its capital (premiums in the balance) is capped at zero capital
+        // while the pool capital is reduced by the full amount
+        assertLe(pool.capital, capital);
+    }
+
+    function invariantRiskpoolWalletHoldsPoolBalance() public {
+        IPool.Pool memory pool = instanceService.getRiskpool(riskpool.getId());
+        assertEq(token.balanceOf(riskpoolWallet), pool.balance);
+    }
+}